@@ -31,6 +31,14 @@ class CheckCommand(Command):
             default=argparse.SUPPRESS,
             help='Show an help message and exit.'
         )
+        self.parser.add_argument(
+            '--upgrade-plugin',
+            dest="upgrade_plugin",
+            required=False,
+            action='store_true',
+            default=False,
+            help='Upgrade the network plugin of the manager to the latest version before the checks.'
+        )
 
     def run(self, current_path: str, argv: List[str]) -> None:
         self.parse_args(argv)
@@ -53,6 +61,11 @@ class CheckCommand(Command):
         )
         print("*\tOperating System version is: %s" % str(platform_info))
 
+        if args['upgrade_plugin']:
+            print("*\tUpgrading the network plugin...")
+            Kathara.get_instance().upgrade_plugin()
+            print("*\tNetwork plugin upgraded successfully.")
+
         print("*\tTrying to run `Hello World` container...")
 
         Setting.get_instance().open_terminals = False
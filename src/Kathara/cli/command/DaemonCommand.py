@@ -0,0 +1,33 @@
+import argparse
+from typing import List
+
+from ..daemon.KatharaDaemon import KatharaDaemon
+from ...foundation.cli.command.Command import Command
+from ...strings import strings, wiki_description
+
+
+class DaemonCommand(Command):
+    def __init__(self) -> None:
+        Command.__init__(self)
+
+        self.parser: argparse.ArgumentParser = argparse.ArgumentParser(
+            prog='kathara daemon',
+            description=strings['daemon'],
+            epilog=wiki_description,
+            add_help=False
+        )
+
+        self.parser.add_argument(
+            '-h', '--help',
+            action='help',
+            default=argparse.SUPPRESS,
+            help='Show an help message and exit.'
+        )
+
+    def run(self, current_path: str, argv: List[str]) -> None:
+        self.parse_args(argv)
+
+        try:
+            KatharaDaemon().serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,6 +1,8 @@
 import argparse
+import logging
 import sys
-from typing import List
+from collections import defaultdict
+from typing import List, Optional, Dict, Any, TextIO
 
 from ... import utils
 from ...foundation.cli.command.Command import Command
@@ -16,6 +18,8 @@ class ExecCommand(Command):
 
         self.parser: argparse.ArgumentParser = argparse.ArgumentParser(
             prog='kathara exec',
+            usage='kathara exec [-h] [-d DIRECTORY | -v] [--no-stdout] [--no-stderr] '
+                  '[-a | --devices DEVICE_NAMES] [DEVICE_NAME] COMMAND [COMMAND ...]',
             description=strings['exec'],
             epilog=wiki_description,
             add_help=False
@@ -52,16 +56,27 @@ class ExecCommand(Command):
             action="store_true",
             help='Disable stderr of the executed command.',
         )
-        self.parser.add_argument(
-            'machine_name',
-            metavar='DEVICE_NAME',
-            help='Name of the device to execute the command into.'
+
+        devices_group = self.parser.add_mutually_exclusive_group(required=False)
+
+        devices_group.add_argument(
+            '-a', '--all',
+            dest="all",
+            action="store_true",
+            help='Execute the command into all the devices of the network scenario. DEVICE_NAME must be omitted.',
+        )
+        devices_group.add_argument(
+            '--devices',
+            dest="devices",
+            metavar='DEVICE_NAMES',
+            help='Comma-separated list of the devices to execute the command into. DEVICE_NAME must be omitted.',
         )
         self.parser.add_argument(
-            'command',
-            metavar='COMMAND',
-            nargs='+',
-            help='Shell command that will be executed inside the device.'
+            'arguments',
+            metavar='DEVICE_NAME COMMAND',
+            nargs='*',
+            help='Name of the device to execute the command into (omitted with --all or --devices), followed by the '
+                 'shell command that will be executed inside the device.'
         )
 
     def run(self, current_path: str, argv: List[str]) -> None:
@@ -78,7 +93,20 @@ class ExecCommand(Command):
             except (Exception, IOError):
                 lab = Lab(None, path=lab_path)
 
-        exec_output = Kathara.get_instance().exec(args['machine_name'], args['command'], lab_hash=lab.hash)
+        # With --all or --devices the devices are already selected, so all the positional arguments are the command
+        if args['all'] or args['devices']:
+            if not args['arguments']:
+                self.parser.error("the following arguments are required: COMMAND")
+
+            machine_names = args['devices'].split(',') if args['devices'] else None
+            self._exec_machines(machine_names, args['arguments'], lab, args)
+            return
+
+        if len(args['arguments']) < 2:
+            self.parser.error("the following arguments are required: DEVICE_NAME, COMMAND")
+
+        (machine_name, *command) = args['arguments']
+        exec_output = Kathara.get_instance().exec(machine_name, command, lab_hash=lab.hash)
 
         try:
             while True:
@@ -92,3 +120,48 @@ class ExecCommand(Command):
                     sys.stderr.write(stderr)
         except StopIteration:
             pass
+
+    def _exec_machines(self, machine_names: Optional[List[str]], command: List[str], lab: Lab,
+                       args: Dict[str, Any]) -> None:
+        exec_output = Kathara.get_instance().exec_machines(command, machine_names=machine_names, lab_hash=lab.hash)
+
+        # Partial lines of each device, printed when they are complete
+        buffers = defaultdict(bytes)
+        exit_codes = {}
+        for (machine_name, stdout, stderr, exit_code) in exec_output:
+            if stdout is None and stderr is None:
+                exit_codes[machine_name] = exit_code
+                for stream in [sys.stdout, sys.stderr]:
+                    self._write_lines(stream, machine_name, buffers.pop((machine_name, stream), b""), flush=True)
+                continue
+
+            if stdout and not args['no_stdout']:
+                buffers[(machine_name, sys.stdout)] = self._write_lines(
+                    sys.stdout, machine_name, buffers[(machine_name, sys.stdout)] + stdout
+                )
+            if stderr and not args['no_stderr']:
+                buffers[(machine_name, sys.stderr)] = self._write_lines(
+                    sys.stderr, machine_name, buffers[(machine_name, sys.stderr)] + stderr
+                )
+
+        failed = sorted(name for name, exit_code in exit_codes.items() if exit_code != 0)
+        if failed:
+            logging.error("Command failed on %d of %d devices: %s." % (
+                len(failed), len(exit_codes),
+                ", ".join("%s (%s)" % (name, exit_codes[name] if exit_codes[name] is not None else "no exit code")
+                          for name in failed)
+            ))
+            sys.exit(1)
+
+    @staticmethod
+    def _write_lines(stream: TextIO, machine_name: str, data: bytes, flush: bool = False) -> bytes:
+        # Write the complete lines prefixed with the device name, and return the incomplete one
+        *lines, remaining = data.split(b"\n")
+        if flush and remaining:
+            lines.append(remaining)
+            remaining = b""
+
+        for line in lines:
+            stream.write("[%s] %s\n" % (machine_name, line.decode('utf-8', errors='replace')))
+
+        return remaining
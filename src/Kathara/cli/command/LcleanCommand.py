@@ -41,6 +41,25 @@ class LcleanCommand(Command):
             help='Clean only specified devices.'
         )
 
+        group = self.parser.add_mutually_exclusive_group(required=False)
+
+        group.add_argument(
+            '--no-shutdown',
+            dest='shutdown',
+            required=False,
+            action='store_false',
+            default=True,
+            help='Delete the devices without running their shutdown commands.'
+        )
+        group.add_argument(
+            '--shutdown-timeout',
+            dest='shutdown_timeout',
+            metavar='SECONDS',
+            required=False,
+            type=float,
+            help='Wait at most SECONDS for the shutdown commands of all the devices before deleting them.'
+        )
+
     def run(self, current_path: str, argv: List[str]) -> None:
         self.parse_args(argv)
         args = self.get_args()
@@ -54,4 +73,5 @@ class LcleanCommand(Command):
 
         logging.info(format_headers("Stopping Network Scenario"))
 
-        Kathara.get_instance().undeploy_lab(lab_hash=lab.hash, selected_machines=set(args['machine_names']))
+        Kathara.get_instance().undeploy_lab(lab_hash=lab.hash, selected_machines=set(args['machine_names']),
+                                            shutdown=args['shutdown'], shutdown_timeout=args['shutdown_timeout'])
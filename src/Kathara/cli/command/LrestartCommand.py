@@ -111,6 +111,12 @@ class LrestartCommand(Command):
             const=True,
             help='Mount "/shared" directory inside devices.'
         )
+        self.parser.add_argument(
+            '--reconcile',
+            required=False,
+            action='store_true',
+            help='Recreate only the devices whose configuration changed, leaving the others running.'
+        )
         self.parser.add_argument(
             'machine_name',
             metavar='DEVICE_NAME',
@@ -125,6 +131,10 @@ class LrestartCommand(Command):
         lab_path = args['directory'].replace('"', '').replace("'", '') if args['directory'] else current_path
         lab_path = utils.get_absolute_path(lab_path)
 
+        if args['reconcile']:
+            LstartCommand().run(lab_path, [arg for arg in argv if arg != '--reconcile'], reconcile=True)
+            return
+
         lclean_argv = ['-d', args['directory']] if args['directory'] else []
 
         if args['machine_name']:
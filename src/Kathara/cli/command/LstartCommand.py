@@ -74,6 +74,12 @@ class LstartCommand(Command):
             action='store_true',
             help='Force the network scenario to start without a lab.conf or lab.dep file.'
         )
+        self.parser.add_argument(
+            '--resume',
+            required=False,
+            action='store_true',
+            help='Resume a deploy that failed partway, starting only the missing devices.'
+        )
         self.parser.add_argument(
             '-l', '--list',
             required=False,
@@ -137,7 +143,7 @@ class LstartCommand(Command):
             help='Launches only specified devices.'
         )
 
-    def run(self, current_path: str, argv: List[str]) -> Lab:
+    def run(self, current_path: str, argv: List[str], reconcile: bool = False) -> Lab:
         self.parse_args(argv)
         args = self.get_args()
 
@@ -169,9 +175,9 @@ class LstartCommand(Command):
                 lab = FolderParser.parse(lab_path)
 
         # Reorder machines by lab.dep file, if present.
-        dependencies = DepParser.parse(lab_path)
+        dependencies = DepParser.parse_graph(lab_path)
         if dependencies:
-            lab.apply_dependencies(dependencies)
+            lab.apply_dependency_graph(dependencies)
 
         lab_meta_information = str(lab)
 
@@ -220,7 +226,12 @@ class LstartCommand(Command):
         lab.add_option('shared_mount', args['shared_mount'])
         lab.add_option('privileged_machines', args['privileged'])
 
-        Kathara.get_instance().deploy_lab(lab, selected_machines=set(args['machine_name']))
+        if args['resume']:
+            Kathara.get_instance().resume_lab(lab, selected_machines=set(args['machine_name']))
+        elif reconcile:
+            Kathara.get_instance().reconcile_lab(lab, selected_machines=set(args['machine_name']))
+        else:
+            Kathara.get_instance().deploy_lab(lab, selected_machines=set(args['machine_name']))
 
         if args['list']:
             machines_stats = Kathara.get_instance().get_machines_stats(lab_hash=lab.hash)
@@ -0,0 +1,83 @@
+import argparse
+import logging
+from typing import List
+
+from ..ui.utils import format_headers
+from ... import utils
+from ...foundation.cli.command.Command import Command
+from ...manager.Kathara import Kathara
+from ...parser.netkit.FolderParser import FolderParser
+from ...parser.netkit.LabParser import LabParser
+from ...strings import strings, wiki_description
+
+
+class LsyncCommand(Command):
+    def __init__(self) -> None:
+        Command.__init__(self)
+
+        self.parser: argparse.ArgumentParser = argparse.ArgumentParser(
+            prog='kathara lsync',
+            description=strings['lsync'],
+            epilog=wiki_description,
+            add_help=False
+        )
+
+        self.parser.add_argument(
+            '-h', '--help',
+            action='help',
+            default=argparse.SUPPRESS,
+            help='Show an help message and exit.'
+        )
+
+        self.parser.add_argument(
+            '-d', '--directory',
+            required=False,
+            help='Specify the folder containing the network scenario.'
+        )
+        self.parser.add_argument(
+            '-F', '--force-lab',
+            dest='force_lab',
+            required=False,
+            action='store_true',
+            help='Force the network scenario to be read without a lab.conf file.'
+        )
+        self.parser.add_argument(
+            '--reload',
+            dest='reload_command',
+            metavar='COMMAND',
+            required=False,
+            help='Run COMMAND in each device whose files changed, after copying them.'
+        )
+        self.parser.add_argument(
+            'machine_names',
+            metavar='DEVICE_NAME',
+            nargs='*',
+            help='Copy only the files of the specified devices.'
+        )
+
+    def run(self, current_path: str, argv: List[str]) -> None:
+        self.parse_args(argv)
+        args = self.get_args()
+
+        lab_path = args['directory'].replace('"', '').replace("'", '') if args['directory'] else current_path
+        lab_path = utils.get_absolute_path(lab_path)
+
+        try:
+            lab = LabParser.parse(lab_path)
+        except IOError as e:
+            if not args['force_lab']:
+                raise e
+            else:
+                lab = FolderParser.parse(lab_path)
+
+        logging.info(format_headers("Syncing Network Scenario Files"))
+
+        copied_files = Kathara.get_instance().sync_lab_files(
+            lab, selected_machines=set(args['machine_names']), reload_command=args['reload_command']
+        )
+
+        for (machine_name, files) in sorted(copied_files.items()):
+            if files:
+                logging.info("Copied %d files in device `%s`: %s" % (len(files), machine_name, ", ".join(files)))
+            else:
+                logging.info("Files of device `%s` are up to date." % machine_name)
@@ -53,6 +53,25 @@ class WipeCommand(Command):
             help='Wipe all Kathara devices and collision domains of all users. MUST BE ROOT FOR THIS OPTION.'
         )
 
+        shutdown_group = self.parser.add_mutually_exclusive_group(required=False)
+
+        shutdown_group.add_argument(
+            '--no-shutdown',
+            dest='shutdown',
+            required=False,
+            action='store_false',
+            default=True,
+            help='Delete the devices without running their shutdown commands.'
+        )
+        shutdown_group.add_argument(
+            '--shutdown-timeout',
+            dest='shutdown_timeout',
+            metavar='SECONDS',
+            required=False,
+            type=float,
+            help='Wait at most SECONDS for the shutdown commands of all the devices before deleting them.'
+        )
+
     def run(self, current_path: str, argv: List[str]) -> None:
         self.parse_args(argv)
         args = self.get_args()
@@ -66,7 +85,8 @@ class WipeCommand(Command):
             if args['all'] and not utils.is_admin():
                 raise PrivilegeError("You must be root in order to wipe all Kathara devices of all users.")
 
-            Kathara.get_instance().wipe(all_users=bool(args['all']))
+            Kathara.get_instance().wipe(all_users=bool(args['all']), shutdown=args['shutdown'],
+                                        shutdown_timeout=args['shutdown_timeout'])
 
             vlab_dir = utils.get_vlab_temp_path(force_creation=False)
             shutil.rmtree(vlab_dir, ignore_errors=True)
@@ -0,0 +1,88 @@
+import json
+import os
+import socket
+import sys
+from typing import List, Optional
+
+from ... import utils
+from ...setting.Setting import Setting
+
+# Commands served by the daemon. The other commands need the terminal of the user (e.g., connect, settings or wipe),
+# so they always run in the CLI process.
+DAEMON_COMMANDS = ['exec', 'lclean', 'lconfig', 'linfo', 'list', 'lrestart', 'lstart', 'lsync', 'ltest', 'vclean',
+                   'vconfig', 'vstart']
+# Arguments that make a served command interactive
+INTERACTIVE_ARGS = {'linfo': ['-l', '--live'], 'list': ['-l', '--live']}
+# Commands that may open device terminals, which must be opened by the CLI process
+TERMINAL_COMMANDS = ['lrestart', 'lstart', 'vstart']
+# Commands that may prompt the user to update the device images, the daemon sends them back to the CLI process
+PROMPT_COMMANDS = ['lrestart', 'lstart', 'ltest', 'vstart']
+
+
+class DaemonClient(object):
+    """Class responsible for running CLI commands through a running Kathara daemon."""
+
+    @staticmethod
+    def can_serve(command: str, argv: List[str]) -> bool:
+        """Check if the specified command can be run by a Kathara daemon.
+
+        Args:
+            command (str): The name of the Kathara command.
+            argv (List[str]): The arguments of the command.
+
+        Returns:
+            bool: True if the command can be served and a daemon socket exists, else False.
+        """
+        if not hasattr(socket, 'AF_UNIX') or command not in DAEMON_COMMANDS:
+            return False
+
+        if any(arg in INTERACTIVE_ARGS.get(command, []) for arg in argv):
+            return False
+
+        if command in TERMINAL_COMMANDS:
+            open_terminals = Setting.get_instance().open_terminals and "--noterminals" not in argv
+            if open_terminals or "--terminals" in argv:
+                return False
+
+        return os.path.exists(utils.get_daemon_socket_path())
+
+    @staticmethod
+    def run(command: str, argv: List[str], current_path: str) -> Optional[int]:
+        """Run the specified command through the Kathara daemon, streaming its output.
+
+        Args:
+            command (str): The name of the Kathara command.
+            argv (List[str]): The arguments of the command.
+            current_path (str): The directory where the command is launched.
+
+        Returns:
+            Optional[int]: The exit code of the command, None if the daemon cannot run it and the command must run
+                in the CLI process.
+        """
+        daemon_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            daemon_socket.connect(utils.get_daemon_socket_path())
+        except OSError:
+            # Stale socket of a daemon that is not running anymore
+            daemon_socket.close()
+            return None
+
+        with daemon_socket, daemon_socket.makefile('rwb') as daemon_stream:
+            request = {'command': command, 'argv': argv, 'current_path': current_path}
+            daemon_stream.write(json.dumps(request).encode('utf-8') + b"\n")
+            daemon_stream.flush()
+
+            for line in daemon_stream:
+                message = json.loads(line)
+
+                if 'fallback' in message:
+                    return None
+                elif 'exit_code' in message:
+                    return message['exit_code']
+
+                output = sys.stdout if message['stream'] == 'stdout' else sys.stderr
+                output.write(message['data'])
+                output.flush()
+
+        # The daemon stopped before the end of the command
+        return 1
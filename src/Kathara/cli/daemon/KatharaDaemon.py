@@ -0,0 +1,228 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+from typing import Any, Dict, Optional
+
+from .DaemonClient import DAEMON_COMMANDS, PROMPT_COMMANDS
+from ... import utils
+from ...exceptions import DaemonAlreadyRunningError, NotSupportedError, SettingsNotFoundError
+from ...foundation.cli.command.CommandFactory import CommandFactory
+from ...manager.Kathara import Kathara
+from ...setting.Setting import Setting, DEFAULT_SETTINGS_PATH
+
+
+class _DaemonStream(io.TextIOBase):
+    """Text stream that sends what is written to a daemon client."""
+
+    def __init__(self, client_stream: io.BufferedIOBase, name: str) -> None:
+        self.client_stream: io.BufferedIOBase = client_stream
+        self.name: str = name
+
+    def write(self, data: str) -> int:
+        if data:
+            _send(self.client_stream, {'stream': self.name, 'data': data})
+
+        return len(data)
+
+    def isatty(self) -> bool:
+        return False
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        # Connection used to check if the daemon is listening
+        if not line:
+            return
+        request = json.loads(line)
+
+        try:
+            self.server.kathara_daemon.handle(request, self.wfile)
+        except OSError as e:
+            logging.debug("Client disconnected: %s" % str(e))
+
+
+def _send(client_stream: io.BufferedIOBase, message: Dict[str, Any]) -> None:
+    client_stream.write(json.dumps(message).encode('utf-8') + b"\n")
+    client_stream.flush()
+
+
+class KatharaDaemon(object):
+    """Local service that runs the Kathara CLI commands sent by the DaemonClient.
+
+    The daemon owns a single manager instance, so its client connections and caches are reused by all the commands.
+    Commands are run one at a time, with their output streamed back to the client.
+
+    Attributes:
+        socket_path (str): The path of the unix socket of the daemon.
+    """
+    __slots__ = ['socket_path', '_settings_mtime', '_server']
+
+    def __init__(self, socket_path: Optional[str] = None) -> None:
+        self.socket_path: str = socket_path if socket_path else utils.get_daemon_socket_path()
+        self._settings_mtime: Optional[float] = None
+        self._server: Optional[socketserver.UnixStreamServer] = None
+
+    def serve_forever(self) -> None:
+        """Listen on the daemon socket and run the received commands, until interrupted.
+
+        Returns:
+            None
+
+        Raises:
+            NotSupportedError: If unix sockets are not available on this platform.
+            DaemonAlreadyRunningError: If another daemon is listening on the socket.
+        """
+        if not hasattr(socket, 'AF_UNIX'):
+            raise NotSupportedError("Kathara daemon requires unix sockets, not available on this platform.")
+
+        if os.path.exists(self.socket_path):
+            if self._is_listening():
+                raise DaemonAlreadyRunningError(self.socket_path)
+            os.remove(self.socket_path)
+
+        # Initialize the manager before accepting commands
+        Kathara.get_instance()
+        self._settings_mtime = self._get_settings_mtime()
+
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        # Only the current user can send commands to the daemon, the socket is never accessible by other users
+        old_umask = os.umask(0o077)
+        try:
+            self._server = socketserver.UnixStreamServer(self.socket_path, _DaemonRequestHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.kathara_daemon = self
+        try:
+            os.chmod(self.socket_path, 0o600)
+
+            logging.info("Kathara daemon listening on `%s`..." % self.socket_path)
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            Kathara.get_instance().close()
+
+    def shutdown(self) -> None:
+        """Stop a daemon running serve_forever in another thread, after the current command.
+
+        Returns:
+            None
+        """
+        if self._server:
+            self._server.shutdown()
+
+    def handle(self, request: Dict[str, Any], client_stream: io.BufferedIOBase) -> None:
+        """Run the requested command, sending its output and its exit code to the client.
+
+        Args:
+            request (Dict[str, Any]): The "command" to run, with its "argv" and "current_path".
+            client_stream (io.BufferedIOBase): The stream towards the client.
+
+        Returns:
+            None
+        """
+        # Settings changed after the manager has been created, or the command may prompt the user on the stdin of the
+        # daemon: the command must run in the CLI process
+        if request['command'] not in DAEMON_COMMANDS or self._get_settings_mtime() != self._settings_mtime or \
+                self._can_prompt(request['command']):
+            _send(client_stream, {'fallback': True})
+            return
+
+        logging.debug("Running `%s` from `%s`..." % (request['command'], request['current_path']))
+
+        stdout = _DaemonStream(client_stream, 'stdout')
+        stderr = _DaemonStream(client_stream, 'stderr')
+
+        log_handler = logging.StreamHandler(stderr)
+        log_handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(log_handler)
+
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                exit_code = self._run_command(request)
+        finally:
+            logging.getLogger().removeHandler(log_handler)
+            # Commands override settings with their arguments, restore them for the next command
+            self._reload_settings()
+
+        _send(client_stream, {'exit_code': exit_code})
+
+    @staticmethod
+    def _run_command(request: Dict[str, Any]) -> int:
+        """Run the requested command, as the CLI entry point does.
+
+        Args:
+            request (Dict[str, Any]): The "command" to run, with its "argv" and "current_path".
+
+        Returns:
+            int: The exit code of the command.
+        """
+        try:
+            command_object = CommandFactory().create_instance(class_args=(request['command'].capitalize(),))
+            command_object.run(request['current_path'], request['argv'])
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception as e:
+            if Setting.get_instance().debug_level == "EXCEPTION":
+                logging.exception(f"({type(e).__name__}) {str(e)}")
+            else:
+                logging.critical(f"({type(e).__name__}) {str(e)}")
+            return 1
+
+        return 0
+
+    @staticmethod
+    def _can_prompt(command: str) -> bool:
+        """Check if the specified command may prompt the user for confirmation.
+
+        Args:
+            command (str): The name of the Kathara command.
+
+        Returns:
+            bool: True if the command may prompt the user, else False.
+        """
+        return command in PROMPT_COMMANDS and Setting.get_instance().image_update_policy == 'Prompt'
+
+    @staticmethod
+    def _reload_settings() -> None:
+        """Load the settings from disk again, discarding the changes made by the last command.
+
+        Returns:
+            None
+        """
+        try:
+            Setting.get_instance().load_from_disk()
+        except SettingsNotFoundError:
+            pass
+
+    def _is_listening(self) -> bool:
+        """Check if a daemon is listening on the socket.
+
+        Returns:
+            bool: True if a daemon accepts connections on the socket, else False.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as daemon_socket:
+            try:
+                daemon_socket.connect(self.socket_path)
+            except OSError:
+                return False
+
+        return True
+
+    @staticmethod
+    def _get_settings_mtime() -> Optional[float]:
+        """Return the modification time of the settings file.
+
+        Returns:
+            Optional[float]: The modification time of the settings file, None if it does not exist.
+        """
+        try:
+            return os.stat(DEFAULT_SETTINGS_PATH).st_mtime
+        except OSError:
+            return None
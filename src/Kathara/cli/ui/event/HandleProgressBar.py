@@ -1,8 +1,6 @@
 from typing import Any
 from typing import List
 
-import progressbar
-
 
 class HandleProgressBar(object):
     """Generic listener for handling a progress bar."""
@@ -21,6 +19,9 @@ class HandleProgressBar(object):
         Returns:
             None
         """
+        # Imported here since most commands never show a progress bar
+        import progressbar
+
         self.progress_bar = progressbar.ProgressBar(
             widgets=[self.message, progressbar.Bar(), ' ', progressbar.Counter(format='%(value)d/%(max_value)d')],
             redirect_stdout=True,
@@ -0,0 +1,30 @@
+import logging
+from typing import Dict
+
+from .... import utils
+
+
+class PrintImagesPullProgress(object):
+    """Listener fired when the layers of the Docker Images being pulled make progress."""
+    __slots__ = ['done_layers']
+
+    def __init__(self) -> None:
+        self.done_layers: int = 0
+
+    def run(self, progress: Dict[str, int]) -> None:
+        """Print the combined progress of the running pulls each time a layer is completed.
+
+        Args:
+            progress (Dict[str, int]): The number of "layers" and of "done_layers" of the running pulls, and the
+                "current" and "total" downloaded bytes.
+
+        Returns:
+            None
+        """
+        if progress['done_layers'] == self.done_layers:
+            return
+
+        self.done_layers = progress['done_layers']
+        logging.info("Pulling images: %d/%d layers (%s/%s)." % (progress['done_layers'], progress['layers'],
+                                                                utils.human_readable_bytes(progress['current']),
+                                                                utils.human_readable_bytes(progress['total'])))
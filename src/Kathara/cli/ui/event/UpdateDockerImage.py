@@ -1,12 +1,16 @@
+from typing import TYPE_CHECKING
+
 from ...ui.utils import confirmation_prompt
-from ....manager.docker.DockerImage import DockerImage
 from ....setting.Setting import Setting
 
+if TYPE_CHECKING:
+    from ....manager.docker.DockerImage import DockerImage
+
 
 class UpdateDockerImage(object):
     """Listener fired when there is a Docker Image update."""
 
-    def run(self, docker_image: DockerImage, image_name: str) -> None:
+    def run(self, docker_image: 'DockerImage', image_name: str) -> None:
         """Prompt the user for Docker Image Update.
 
         Args:
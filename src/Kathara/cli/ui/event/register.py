@@ -1,6 +1,7 @@
 from .UpdateDockerImage import UpdateDockerImage
 from .OpenMachineTerminal import OpenMachineTerminal
 from .HandleProgressBar import HandleProgressBar
+from .PrintImagesPullProgress import PrintImagesPullProgress
 from ....event.EventDispatcher import EventDispatcher
 
 
@@ -14,6 +15,7 @@ def register_cli_events() -> None:
     _register_machine_events()
 
     EventDispatcher.get_instance().register("docker_image_update_found", UpdateDockerImage())
+    EventDispatcher.get_instance().register("docker_images_pull_progress", PrintImagesPullProgress())
 
 
 def _register_link_events() -> None:
@@ -12,12 +12,14 @@ from terminaltables import DoubleTable
 from ... import utils
 from ...foundation.manager.stats.IMachineStats import IMachineStats
 from ...setting.Setting import Setting
-from ...trdparty.consolemenu import PromptUtils, Screen
 
 FORBIDDEN_TABLE_COLUMNS = ["container_name"]
 
 
 def confirmation_prompt(prompt_string: str, callback_yes: Callable, callback_no: Callable) -> Any:
+    # Imported here since the console menu is only needed when prompting
+    from ...trdparty.consolemenu import PromptUtils, Screen
+
     prompt_utils = PromptUtils(Screen())
     answer = prompt_utils.prompt_for_bilateral_choice(prompt_string, 'y', 'n')
 
@@ -36,6 +36,11 @@ class NotSupportedError(Exception):
         super().__init__(f"Not Supported: {message}")
 
 
+class DaemonAlreadyRunningError(Exception):
+    def __init__(self, socket_path: str) -> None:
+        super().__init__(f"A Kathara daemon is already listening on `{socket_path}`.")
+
+
 # OS Exceptions
 class PrivilegeError(Exception):
     pass
@@ -111,6 +116,11 @@ class MachineBinaryError(Exception):
         return f"Binary `{self.binary}` not found in device `{self.machine_name}`."
 
 
+class CommandChannelClosedError(Exception):
+    def __init__(self, machine_name: str) -> None:
+        super().__init__(f"The command channel of device `{machine_name}` is closed.")
+
+
 # Link Exceptions
 class LinkNotFoundError(Exception):
     pass
@@ -152,6 +162,11 @@ class DockerImageNotFoundError(Exception):
         super().__init__(f"Docker Image `{image_name}` is not available neither on Docker Hub nor in local repository!")
 
 
+class DockerImagePullError(Exception):
+    def __init__(self, image_name: str, message: str) -> None:
+        super().__init__(f"Cannot pull Docker Image `{image_name}`: {message}")
+
+
 class DockerPluginError(Exception):
     pass
 
@@ -2,6 +2,7 @@ import io
 from abc import ABC, abstractmethod
 from typing import Dict, Set, Any, Generator, Tuple, List, Optional
 
+from .channel.CommandChannel import CommandChannel
 from .stats.ILinkStats import ILinkStats
 from .stats.IMachineStats import IMachineStats
 from ...model.Lab import Lab
@@ -55,6 +56,45 @@ class IManager(ABC):
         """
         raise NotImplementedError("You must implement `deploy_lab` method.")
 
+    @abstractmethod
+    def reconcile_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Update a running Kathara network scenario to match lab, recreating only the devices that changed.
+
+        Devices whose image, options, files or interfaces changed are recreated, devices that are not running are
+        deployed and running devices that are not in lab are undeployed. Collision domains that are not in lab, or
+        whose external interfaces changed, are deleted. Unchanged devices and collision domains are left untouched.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, reconcile only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        raise NotImplementedError("You must implement `reconcile_lab` method.")
+
+    @abstractmethod
+    def resume_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Resume the deploy of a network scenario that failed partway, deploying only what is missing.
+
+        Devices and collision domains already deployed that match the network scenario are kept, the others are
+        recreated (see reconcile_lab). Transient errors of the manager APIs are retried with an exponential backoff.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, resume only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        raise NotImplementedError("You must implement `resume_lab` method.")
+
     @abstractmethod
     def connect_machine_to_link(self, machine: Machine, link: Link) -> None:
         """Connect a Kathara device to a collision domain.
@@ -122,7 +162,8 @@ class IManager(ABC):
 
     @abstractmethod
     def undeploy_lab(self, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
-                     selected_machines: Optional[Set[str]] = None) -> None:
+                     selected_machines: Optional[Set[str]] = None, shutdown: bool = True,
+                     shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy a Kathara network scenario.
 
         Args:
@@ -131,6 +172,9 @@ class IManager(ABC):
             lab_name (Optional[str]): The name of the network scenario. Can be used as an alternative to lab_hash.
                 If None, lab_hash should be set.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -141,12 +185,15 @@ class IManager(ABC):
         raise NotImplementedError("You must implement `undeploy_lab` method.")
 
     @abstractmethod
-    def wipe(self, all_users: bool = False) -> None:
+    def wipe(self, all_users: bool = False, shutdown: bool = True, shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy all the running network scenarios.
 
         Args:
             all_users (bool): If false, undeploy only the current user network scenarios. If true, undeploy the
                 running network scenarios of all users.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -192,6 +239,56 @@ class IManager(ABC):
         """
         raise NotImplementedError("You must implement `exec` method.")
 
+    @abstractmethod
+    def open_command_channel(self, machine_name: str, lab_hash: Optional[str] = None,
+                             lab_name: Optional[str] = None) -> CommandChannel:
+        """Open a persistent command channel on a device in a running network scenario.
+
+        The channel keeps a shell session open on the device, so repeated commands do not pay the setup of a new
+        exec session. It must be closed when it is not needed anymore, it can be used as a context manager.
+
+        Args:
+            machine_name (str): The name of the device.
+            lab_hash (Optional[str]): The hash of the network scenario where the device is deployed.
+            lab_name (Optional[str]): The name of the network scenario where the device is deployed.
+
+        Returns:
+            CommandChannel: A shell session on the device, that executes commands returning their stdout, stderr and
+                exit code.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If the specified device is not running.
+        """
+        raise NotImplementedError("You must implement `open_command_channel` method.")
+
+    @abstractmethod
+    def exec_machines(self, command: List[str], machine_names: Optional[List[str]] = None,
+                      lab_hash: Optional[str] = None, lab_name: Optional[str] = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Exec a command on several devices of a running network scenario, concurrently.
+
+        The number of concurrent commands is bounded by the size of the manager workers pool.
+
+        Args:
+            command (List[str]): The command to exec on the devices.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+            lab_hash (Optional[str]): The hash of the network scenario where the devices are deployed.
+            lab_name (Optional[str]): The name of the network scenario where the devices are deployed.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code, as soon as they are
+                available. The last tuple of each device has no output and contains the exit code, None if the command
+                could not be executed on the device.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        raise NotImplementedError("You must implement `exec_machines` method.")
+
     @abstractmethod
     def copy_files(self, machine: Machine, guest_to_host: Dict[str, io.IOBase]) -> None:
         """Copy files on a running device in the specified paths.
@@ -206,6 +303,29 @@ class IManager(ABC):
         """
         raise NotImplementedError("You must implement `copy_files` method.")
 
+    @abstractmethod
+    def sync_lab_files(self, lab: Lab, selected_machines: Set[str] = None,
+                       reload_command: Optional[str] = None) -> Dict[str, List[str]]:
+        """Copy into the running devices of a network scenario the files changed since they were last copied.
+
+        Only the files of the device folders and the startup/shutdown files that changed since they were copied (when
+        the device was deployed or in a previous call) are sent, in a single archive for each device. Files removed
+        from the host are not removed from the devices.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, copy only the files of the specified devices.
+            reload_command (Optional[str]): A shell command to run in each device whose files changed, after copying
+                them (e.g., to reload the configuration of a daemon).
+
+        Returns:
+            Dict[str, List[str]]: Keys are device names, values are the paths in the device of the copied files.
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        raise NotImplementedError("You must implement `sync_lab_files` method.")
+
     @abstractmethod
     def get_machine_api_object(self, machine_name: str, lab_hash: str = None, lab_name: str = None,
                                all_users: bool = False) -> Any:
@@ -397,6 +517,15 @@ class IManager(ABC):
         """
         raise NotImplementedError("You must implement `check_image` method.")
 
+    @abstractmethod
+    def upgrade_plugin(self) -> None:
+        """Upgrade the network plugin of the manager to the latest version.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError("You must implement `upgrade_plugin` method.")
+
     @abstractmethod
     def get_release_version(self) -> str:
         """Return the current manager version.
@@ -406,6 +535,15 @@ class IManager(ABC):
         """
         raise NotImplementedError("You must implement `get_release_version` method.")
 
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources of the manager, shutting down its pool of workers.
+
+        Returns:
+            None
+        """
+        raise NotImplementedError("You must implement `close` method.")
+
     @staticmethod
     def get_formatted_manager_name() -> str:
         """Return a formatted string containing the current manager name.
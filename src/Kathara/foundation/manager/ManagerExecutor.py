@@ -0,0 +1,259 @@
+import logging
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_EXCEPTION, FIRST_COMPLETED
+from typing import Callable, Iterable, List, Any, Optional, Union, Dict, Generator, Tuple
+
+from ...model.DependencyGraph import DependencyGraph
+
+
+class ManagerExecutor(object):
+    """A long-lived and bounded pool of workers, shared by all the components of a manager.
+
+    Each item is submitted as a separate task, so a worker picks up the next item as soon as it is free, without
+    waiting for the slowest item of a chunk. The underlying pool is created on first use.
+
+    Attributes:
+        max_workers (Union[int, Callable[[], int]]): The maximum number of workers, or a callable returning it.
+            The callable is invoked only once, when the pool is created.
+    """
+    __slots__ = ['max_workers', '_executor', '_lock', '_local']
+
+    def __init__(self, max_workers: Union[int, Callable[[], int]]) -> None:
+        self.max_workers: Union[int, Callable[[], int]] = max_workers
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._local: threading.local = threading.local()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the underlying thread pool, creating it if it does not exist.
+
+        Returns:
+            ThreadPoolExecutor: The underlying thread pool.
+        """
+        with self._lock:
+            if self._executor is None:
+                if callable(self.max_workers):
+                    self.max_workers = self.max_workers()
+
+                logging.debug("Creating manager executor with %d workers..." % self.max_workers)
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kathara")
+
+            return self._executor
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """Submit a single call to the pool.
+
+        Args:
+            func (Callable): The function to call.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Future: The Future associated to the call.
+        """
+        return self._get_executor().submit(self._run_in_worker, func, *args, **kwargs)
+
+    def _run_in_worker(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func marking the current thread as a worker of the pool.
+
+        Args:
+            func (Callable): The function to call.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            Any: The result of the call.
+        """
+        self._local.in_worker = True
+        return func(*args, **kwargs)
+
+    def in_worker(self) -> bool:
+        """Check if the caller is running in a worker of the pool.
+
+        Returns:
+            bool: True if the caller is running in a worker of the pool, else False.
+        """
+        return getattr(self._local, 'in_worker', False)
+
+    def map(self, func: Callable, iterable: Iterable) -> List[Any]:
+        """Apply func to each item of iterable using the pool workers, and wait for all the results.
+
+        If a call raises an exception, the calls that are not started yet are cancelled and the exception is re-raised
+        once the running ones are terminated.
+        If called from a worker of the pool, items are processed sequentially in the calling worker, since waiting for
+        other workers could exhaust the pool.
+
+        Args:
+            func (Callable): The function to apply.
+            iterable (Iterable): The items to process.
+
+        Returns:
+            List[Any]: The results of the calls, in the same order of iterable.
+        """
+        if self.in_worker():
+            return [func(item) for item in iterable]
+
+        futures = [self.submit(func, item) for item in iterable]
+
+        return self.wait(futures)
+
+    def map_graph(self, func: Callable, items: Dict[str, Any], dependencies: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Apply func to each value of items, calling it on an item as soon as all the items it depends on are done.
+
+        Independent items are processed concurrently. Dependencies on names that are not in items are ignored.
+        If a call raises an exception, no more calls are started and the exception is re-raised once the running ones
+        are terminated.
+
+        Args:
+            func (Callable): The function to apply.
+            items (Dict[str, Any]): Keys are item names, Values are the items to process.
+            dependencies (Dict[str, List[str]]): Keys are item names, Values are the names of the items that must be
+                processed before the key item.
+
+        Returns:
+            Dict[str, Any]: Keys are item names, Values are the results of the calls.
+
+        Raises:
+            MachineDependencyError: If there is a dependency loop among the items.
+        """
+        waiting_for = {name: set(dep for dep in dependencies.get(name, []) if dep in items) for name in items}
+        # Check the boot levels before starting anything, raises MachineDependencyError on loops
+        DependencyGraph({name: list(deps) for name, deps in waiting_for.items()}).get_levels()
+
+        dependents = defaultdict(list)
+        for name, deps in waiting_for.items():
+            for dep in deps:
+                dependents[dep].append(name)
+
+        running = {}
+        results = {}
+
+        def submit_ready(names: Iterable[str]) -> None:
+            for ready_name in names:
+                if not waiting_for[ready_name]:
+                    running[self.submit(func, items[ready_name])] = ready_name
+
+        submit_ready(items.keys())
+        try:
+            while running:
+                (done, _) = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+
+                    for dependent in dependents[name]:
+                        waiting_for[dependent].discard(name)
+                    submit_ready(dependents[name])
+        except Exception:
+            for future in running.keys():
+                future.cancel()
+            wait(running.keys())
+            raise
+        except BaseException:
+            # Interrupted by the user, drop the calls that are not started yet
+            for future in running.keys():
+                future.cancel()
+            raise
+
+        return results
+
+    def stream(self, func: Callable, items: Dict[str, Any]) -> Generator[Tuple[str, Any], None, None]:
+        """Apply func, a generator function, to each value of items using the pool workers, yielding the values
+        produced by all the calls as soon as they are available.
+
+        At most as many calls as the pool workers run at the same time, the others start as soon as a worker is free.
+        If a call raises an exception, the values of the other calls are still yielded and the exception is re-raised
+        at the end. If the returned generator is closed, the calls that are not started yet are cancelled and the
+        running ones stop at their next value.
+        If called from a worker of the pool, items are processed sequentially in the calling worker.
+
+        Args:
+            func (Callable): The generator function to apply.
+            items (Dict[str, Any]): Keys are item names, Values are the items to process.
+
+        Returns:
+            Generator[Tuple[str, Any], None, None]: A generator of tuples containing the item name and a value
+                produced by the call on that item.
+        """
+        if self.in_worker():
+            for name, item in items.items():
+                for value in func(item):
+                    yield name, value
+            return
+
+        values = queue.Queue()
+        stopped = threading.Event()
+        # Put by each call when it terminates
+        call_done = object()
+
+        def produce(name: str, item: Any) -> None:
+            try:
+                for value in func(item):
+                    if stopped.is_set():
+                        break
+                    values.put((name, value))
+            finally:
+                values.put((name, call_done))
+
+        futures = [self.submit(produce, name, item) for name, item in items.items()]
+        try:
+            running = len(futures)
+            while running:
+                (name, value) = values.get()
+                if value is call_done:
+                    running -= 1
+                    continue
+
+                yield name, value
+        finally:
+            stopped.set()
+            for future in futures:
+                future.cancel()
+
+        self.wait(futures)
+
+    @staticmethod
+    def wait(futures: List[Future]) -> List[Any]:
+        """Wait for the specified futures, cancelling the pending ones on the first error.
+
+        Args:
+            futures (List[Future]): The futures to wait for.
+
+        Returns:
+            List[Any]: The results of the futures, in the same order.
+        """
+        try:
+            (_, not_done) = wait(futures, return_when=FIRST_EXCEPTION)
+        except BaseException:
+            # Interrupted by the user, drop the calls that are not started yet
+            for future in futures:
+                future.cancel()
+            raise
+
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            wait(not_done)
+
+        for future in futures:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait_workers: bool = True) -> None:
+        """Shut down the pool, cancelling the pending calls. The pool is created again on the next submission.
+
+        Args:
+            wait_workers (bool): If True, wait for the running calls to terminate.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait_workers, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,141 @@
+import logging
+import shlex
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple, Union
+
+from ....exceptions import CommandChannelClosedError
+
+# Shell run by the channel on the device, reading commands from stdin. The argument makes its processes recognizable.
+CHANNEL_SHELL = ["/bin/sh", "-s", "kathara_channel"]
+# Each command runs in a subshell without stdin, then the shell writes the marker on both streams, with the exit code
+# on stdout. Newlines around the command keep trailing comments from hiding the closing parenthesis.
+COMMAND_FRAME = "(\n{command}\n) </dev/null; printf '%s %d\\n' '{marker}' $?; printf '%s\\n' '{marker}' >&2\n"
+
+
+class CommandChannel(ABC):
+    """A long-lived shell session on a device, that executes commands without creating a new session for each one.
+
+    Commands are executed one at a time, each one in a subshell without stdin, so they cannot change the state of the
+    session or read the following commands. The channel must be closed when it is not needed anymore.
+
+    Attributes:
+        machine_name (str): The name of the device.
+    """
+    __slots__ = ['machine_name', '_lock', '_closed']
+
+    def __init__(self, machine_name: str) -> None:
+        self.machine_name: str = machine_name
+
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+
+    def exec(self, command: Union[str, List[str]]) -> Tuple[bytes, bytes, int]:
+        """Execute a command on the device and wait for its termination.
+
+        Args:
+            command (Union[str, List[str]]): The command to execute. A string is interpreted by the shell of the device.
+
+        Returns:
+            Tuple[bytes, bytes, int]: The stdout and the stderr of the command in bytes, and its exit code.
+
+        Raises:
+            CommandChannelClosedError: If the channel is closed, or the shell of the device terminated.
+        """
+        command = shlex.join(command) if type(command) == list else command
+        marker = "KATHARA_%s" % uuid.uuid4().hex
+
+        with self._lock:
+            if self._closed:
+                raise CommandChannelClosedError(self.machine_name)
+
+            logging.debug("Executing command `%s` on channel of device `%s`..." % (command, self.machine_name))
+            try:
+                self._write(COMMAND_FRAME.format(command=command, marker=marker).encode('utf-8'))
+            except OSError:
+                self._close_channel()
+                raise CommandChannelClosedError(self.machine_name)
+
+            return self._read_result(marker.encode('utf-8'))
+
+    def _read_result(self, marker: bytes) -> Tuple[bytes, bytes, int]:
+        """Read the output of the running command, until the marker is received on both streams.
+
+        Args:
+            marker (bytes): The marker written by the shell after the command.
+
+        Returns:
+            Tuple[bytes, bytes, int]: The stdout and the stderr of the command in bytes, and its exit code.
+        """
+        stdout = b""
+        stderr = b""
+        exit_code = None
+        stderr_done = False
+        while exit_code is None or not stderr_done:
+            chunk = self._read()
+            if chunk is None:
+                self._close_channel()
+                raise CommandChannelClosedError(self.machine_name)
+
+            (stdout_chunk, stderr_chunk) = chunk
+            if stdout_chunk:
+                stdout += stdout_chunk
+                marker_start = stdout.find(marker)
+                marker_end = stdout.find(b"\n", marker_start) if marker_start >= 0 else -1
+                if marker_end >= 0:
+                    exit_code = int(stdout[marker_start + len(marker):marker_end])
+                    stdout = stdout[:marker_start]
+            if stderr_chunk:
+                stderr += stderr_chunk
+                marker_start = stderr.find(marker + b"\n")
+                if marker_start >= 0:
+                    stderr_done = True
+                    stderr = stderr[:marker_start]
+
+        return stdout, stderr, exit_code
+
+    def close(self) -> None:
+        """Terminate the shell session on the device.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._closed:
+                return
+
+            try:
+                self._write(b"exit\n")
+            except OSError:
+                pass
+
+            self._close_channel()
+
+    def _close_channel(self) -> None:
+        self._closed = True
+        self._close()
+
+    def __enter__(self) -> 'CommandChannel':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @abstractmethod
+    def _write(self, data: bytes) -> None:
+        raise NotImplementedError("You must implement `_write` method.")
+
+    @abstractmethod
+    def _read(self) -> Optional[Tuple[Optional[bytes], Optional[bytes]]]:
+        """Wait for new output of the shell session.
+
+        Returns:
+            Optional[Tuple[Optional[bytes], Optional[bytes]]]: A tuple containing the stdout and the stderr received,
+                None if the session terminated.
+        """
+        raise NotImplementedError("You must implement `_read` method.")
+
+    @abstractmethod
+    def _close(self) -> None:
+        raise NotImplementedError("You must implement `_close` method.")
@@ -0,0 +1,2 @@
+# Seconds between two snapshots of the devices and collision domains statistics
+STATS_REFRESH_INTERVAL = 1
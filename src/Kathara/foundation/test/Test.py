@@ -1,9 +1,10 @@
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, Union, List
+from typing import Dict, Union, List, Tuple
 
 from deepdiff import DeepDiff
 
+from ...foundation.manager.channel.CommandChannel import CommandChannel
 from ...manager.Kathara import Kathara
 from ...model.Lab import Lab
 
@@ -48,3 +49,9 @@ class Test(ABC):
                     result['stderr'] += stderr.decode('utf-8')
         except StopIteration:
             return result['stdout'], result['stderr']
+
+    @staticmethod
+    def _get_channel_command_output(channel: CommandChannel, command: str) -> Tuple[str, str]:
+        (stdout, stderr, _) = channel.exec(command)
+
+        return stdout.decode('utf-8'), stderr.decode('utf-8')
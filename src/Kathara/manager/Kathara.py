@@ -4,6 +4,7 @@ import io
 from typing import Set, Dict, Generator, Any, Tuple, List, Optional
 
 from ..exceptions import InstantiationError
+from ..foundation.manager.channel.CommandChannel import CommandChannel
 from ..foundation.manager.IManager import IManager
 from ..foundation.manager.ManagerFactory import ManagerFactory
 from ..foundation.manager.stats.ILinkStats import ILinkStats
@@ -87,6 +88,43 @@ class Kathara(IManager):
         """
         self.manager.deploy_lab(lab, selected_machines)
 
+    def reconcile_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Update a running Kathara network scenario to match lab, recreating only the devices that changed.
+
+        Devices whose image, options, files or interfaces changed are recreated, devices that are not running are
+        deployed and running devices that are not in lab are undeployed. Collision domains that are not in lab, or
+        whose external interfaces changed, are deleted. Unchanged devices and collision domains are left untouched.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, reconcile only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        self.manager.reconcile_lab(lab, selected_machines)
+
+    def resume_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Resume the deploy of a network scenario that failed partway, deploying only what is missing.
+
+        Devices and collision domains already deployed that match the network scenario are kept, the others are
+        recreated (see reconcile_lab). Transient errors of the manager APIs are retried with an exponential backoff.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, resume only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        self.manager.resume_lab(lab, selected_machines)
+
     def connect_machine_to_link(self, machine: Machine, link: Link) -> None:
         """Connect a Kathara device to a collision domain.
 
@@ -150,7 +188,8 @@ class Kathara(IManager):
         self.manager.undeploy_link(link)
 
     def undeploy_lab(self, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
-                     selected_machines: Optional[Set[str]] = None) -> None:
+                     selected_machines: Optional[Set[str]] = None, shutdown: bool = True,
+                     shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy a Kathara network scenario.
 
         Args:
@@ -159,6 +198,9 @@ class Kathara(IManager):
             lab_name (Optional[str]): The name of the network scenario. Can be used as an alternative to lab_hash.
                 If None, lab_hash should be set.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -166,19 +208,22 @@ class Kathara(IManager):
         Raises:
             InvocationError: If a running network scenario hash or name is not specified.
         """
-        self.manager.undeploy_lab(lab_hash, lab_name, selected_machines)
+        self.manager.undeploy_lab(lab_hash, lab_name, selected_machines, shutdown, shutdown_timeout)
 
-    def wipe(self, all_users: bool = False) -> None:
+    def wipe(self, all_users: bool = False, shutdown: bool = True, shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy all the running network scenarios.
 
         Args:
             all_users (bool): If false, undeploy only the current user network scenarios. If true, undeploy the
                 running network scenarios of all users.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
         """
-        self.manager.wipe(all_users)
+        self.manager.wipe(all_users, shutdown, shutdown_timeout)
 
     def connect_tty(self, machine_name: str, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
                     shell: str = None, logs: bool = False) -> None:
@@ -217,6 +262,54 @@ class Kathara(IManager):
         """
         return self.manager.exec(machine_name, command, lab_hash, lab_name)
 
+    def open_command_channel(self, machine_name: str, lab_hash: Optional[str] = None,
+                             lab_name: Optional[str] = None) -> CommandChannel:
+        """Open a persistent command channel on a device in a running network scenario.
+
+        The channel keeps a shell session open on the device, so repeated commands do not pay the setup of a new
+        exec session. It must be closed when it is not needed anymore, it can be used as a context manager.
+
+        Args:
+            machine_name (str): The name of the device.
+            lab_hash (Optional[str]): The hash of the network scenario where the device is deployed.
+            lab_name (Optional[str]): The name of the network scenario where the device is deployed.
+
+        Returns:
+            CommandChannel: A shell session on the device, that executes commands returning their stdout, stderr and
+                exit code.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If the specified device is not running.
+        """
+        return self.manager.open_command_channel(machine_name, lab_hash, lab_name)
+
+    def exec_machines(self, command: List[str], machine_names: Optional[List[str]] = None,
+                      lab_hash: Optional[str] = None, lab_name: Optional[str] = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Exec a command on several devices of a running network scenario, concurrently.
+
+        The number of concurrent commands is bounded by the size of the manager workers pool.
+
+        Args:
+            command (List[str]): The command to exec on the devices.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+            lab_hash (Optional[str]): The hash of the network scenario where the devices are deployed.
+            lab_name (Optional[str]): The name of the network scenario where the devices are deployed.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code, as soon as they are
+                available. The last tuple of each device has no output and contains the exit code, None if the command
+                could not be executed on the device.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        return self.manager.exec_machines(command, machine_names, lab_hash, lab_name)
+
     def copy_files(self, machine: Machine, guest_to_host: Dict[str, io.IOBase]) -> None:
         """Copy files on a running device in the specified paths.
 
@@ -230,6 +323,28 @@ class Kathara(IManager):
         """
         self.manager.copy_files(machine, guest_to_host)
 
+    def sync_lab_files(self, lab: Lab, selected_machines: Set[str] = None,
+                       reload_command: Optional[str] = None) -> Dict[str, List[str]]:
+        """Copy into the running devices of a network scenario the files changed since they were last copied.
+
+        Only the files of the device folders and the startup/shutdown files that changed since they were copied (when
+        the device was deployed or in a previous call) are sent, in a single archive for each device. Files removed
+        from the host are not removed from the devices.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, copy only the files of the specified devices.
+            reload_command (Optional[str]): A shell command to run in each device whose files changed, after copying
+                them (e.g., to reload the configuration of a daemon).
+
+        Returns:
+            Dict[str, List[str]]: Keys are device names, values are the paths in the device of the copied files.
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        return self.manager.sync_lab_files(lab, selected_machines, reload_command)
+
     def get_machine_api_object(self, machine_name: str, lab_hash: str = None, lab_name: str = None,
                                all_users: bool = False) -> Any:
         """Return the corresponding API object of a running device in a network scenario.
@@ -410,6 +525,14 @@ class Kathara(IManager):
         """
         self.manager.check_image(image_name)
 
+    def upgrade_plugin(self) -> None:
+        """Upgrade the network plugin of the manager to the latest version.
+
+        Returns:
+            None
+        """
+        self.manager.upgrade_plugin()
+
     def get_release_version(self) -> str:
         """Return the current manager version.
 
@@ -418,6 +541,24 @@ class Kathara(IManager):
         """
         return self.manager.get_release_version()
 
+    def close(self) -> None:
+        """Release the resources of the manager, shutting down its pool of workers.
+
+        Returns:
+            None
+        """
+        self.manager.close()
+
+    @staticmethod
+    def close_instance() -> None:
+        """Release the resources of the manager of the Kathara instance, if it has been created.
+
+        Returns:
+            None
+        """
+        if Kathara.__instance is not None:
+            Kathara.__instance.close()
+
     def get_formatted_manager_name(self) -> str:
         """Return a formatted string containing the current manager name.
 
@@ -1,22 +1,43 @@
 import logging
-from typing import Union, List, Set
+import threading
+from typing import Union, List, Set, Dict, Any, Optional
 
 import docker.models.images
 from docker import DockerClient
 from docker.errors import APIError
+from docker.utils import parse_repository_tag
 
 from ... import utils
 from ...event.EventDispatcher import EventDispatcher
-from ...exceptions import InvalidImageArchitectureError, DockerImageNotFoundError
+from ...exceptions import InvalidImageArchitectureError, DockerImageNotFoundError, DockerImagePullError
+from ...setting.Setting import Setting
+
+# Registry data is cached on disk for this number of seconds
+REGISTRY_CACHE_NAMESPACE = "registry"
+REGISTRY_CACHE_TTL = 3600
+
+# Statuses of the pull stream that refer to a single image layer
+LAYER_DONE_STATUSES = {"Pull complete", "Already exists"}
+LAYER_STATUSES = {"Pulling fs layer", "Waiting", "Downloading", "Verifying Checksum", "Download complete",
+                  "Extracting"} | LAYER_DONE_STATUSES
 
 
 class DockerImage(object):
     """Class responsible for interacting with Docker Images."""
-    __slots__ = ['client']
+    __slots__ = ['client', '_update_lock', '_pull_lock', '_pull_semaphore', '_active_pulls', '_layers']
 
     def __init__(self, client: DockerClient) -> None:
         self.client: DockerClient = client
 
+        # Updates checks may prompt the user, so they are done one at a time
+        self._update_lock: threading.Lock = threading.Lock()
+        # Pulls run in parallel, up to the `max_parallel_pulls` setting
+        self._pull_lock: threading.Lock = threading.Lock()
+        self._pull_semaphore: Optional[threading.BoundedSemaphore] = None
+        self._active_pulls: int = 0
+        # Progress of the layers of the running pulls, by layer id. Layers shared by several images are counted once
+        self._layers: Dict[str, Dict[str, Any]] = {}
+
     def get_local(self, image_name: str) -> docker.models.images.Image:
         """Return the specified Docker Image.
 
@@ -31,6 +52,9 @@ class DockerImage(object):
     def get_remote(self, image_name: str) -> docker.models.images.RegistryData:
         """Gets the registry data for an image.
 
+        The registry data is cached on disk for REGISTRY_CACHE_TTL seconds. If the registry cannot be reached, the
+        cached registry data is returned whatever its age.
+
         Args:
             image_name (str): The name of the image.
 
@@ -40,23 +64,133 @@ class DockerImage(object):
         Raises:
             `docker.errors.APIError`: If the server returns an error.
         """
-        return self.client.images.get_registry_data(image_name)
+        attrs = utils.get_cached_metadata(REGISTRY_CACHE_NAMESPACE, image_name, ttl=REGISTRY_CACHE_TTL)
+        if attrs is None:
+            try:
+                registry_data = self.client.images.get_registry_data(image_name)
+            except APIError as e:
+                attrs = utils.get_cached_metadata(REGISTRY_CACHE_NAMESPACE, image_name) \
+                    if self._is_connection_error(e) else None
+                if attrs is None:
+                    raise e
+
+                logging.debug("Registry not reachable, using cached registry data of %s..." % image_name)
+            else:
+                utils.cache_metadata(REGISTRY_CACHE_NAMESPACE, image_name, registry_data.attrs)
+                return registry_data
+
+        return docker.models.images.RegistryData(image_name=image_name, attrs=attrs, client=self.client,
+                                                 collection=self.client.images)
 
     def pull(self, image_name: str) -> docker.models.images.Image:
         """Pull and return the specified Docker Image.
 
+        At most `max_parallel_pulls` images are pulled at the same time. The progress of the layers of all the running
+        pulls is dispatched with the "docker_images_pull_progress" event.
+
         Args:
             image_name (str): The name of a Docker Image.
 
         Returns:
             docker.models.images.Image: A Docker Image
+
+        Raises:
+            DockerImagePullError: If the Docker daemon fails to pull the image.
         """
         # If no tag or sha key is specified, we add "latest"
-        if (':' or '@') not in image_name:
+        if ':' not in image_name and '@' not in image_name:
             image_name = "%s:latest" % image_name
 
-        logging.info("Pulling image `%s`... This may take a while." % image_name)
-        return self.client.images.pull(image_name)
+        with self._get_pull_semaphore():
+            logging.info("Pulling image `%s`... This may take a while." % image_name)
+
+            with self._pull_lock:
+                if self._active_pulls == 0:
+                    self._layers = {}
+                self._active_pulls += 1
+
+            try:
+                for event in self.client.api.pull(image_name, stream=True, decode=True):
+                    if 'error' in event:
+                        raise DockerImagePullError(image_name, event['error'])
+
+                    self._update_pull_progress(event)
+            finally:
+                with self._pull_lock:
+                    self._active_pulls -= 1
+
+        return self.client.images.get(image_name)
+
+    def _get_pull_semaphore(self) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting the parallel pulls, creating it on first use.
+
+        Returns:
+            threading.BoundedSemaphore: The semaphore limiting the parallel pulls.
+        """
+        with self._pull_lock:
+            if self._pull_semaphore is None:
+                self._pull_semaphore = threading.BoundedSemaphore(max(1, Setting.get_instance().max_parallel_pulls))
+
+            return self._pull_semaphore
+
+    def _update_pull_progress(self, event: Dict[str, Any]) -> None:
+        """Update the progress of the running pulls with an event of a pull stream.
+
+        Args:
+            event (Dict[str, Any]): A decoded event of the pull stream of the Docker daemon.
+
+        Returns:
+            None
+        """
+        status = event.get('status', None)
+        if 'id' not in event or status not in LAYER_STATUSES:
+            return
+
+        with self._pull_lock:
+            layer = self._layers.setdefault(event['id'], {'current': 0, 'total': 0, 'done': False})
+            if layer['done']:
+                return
+
+            progress_detail = event.get('progressDetail', None) or {}
+            if status == "Downloading":
+                layer['current'] = progress_detail.get('current', layer['current'])
+                layer['total'] = progress_detail.get('total', layer['total'])
+            elif status == "Download complete":
+                layer['current'] = layer['total']
+            elif status in LAYER_DONE_STATUSES:
+                layer['current'] = layer['total']
+                layer['done'] = True
+
+            progress = {
+                'layers': len(self._layers),
+                'done_layers': len([x for x in self._layers.values() if x['done']]),
+                'current': sum(x['current'] for x in self._layers.values()),
+                'total': sum(x['total'] for x in self._layers.values()),
+            }
+
+        EventDispatcher.get_instance().dispatch("docker_images_pull_progress", progress=progress)
+
+    def _tag_from_digest(self, image_name: str, digest: str) -> bool:
+        """Tag as `image_name` the local image with the specified digest, if present.
+
+        Args:
+            image_name (str): The name of a Docker Image.
+            digest (str): The digest of the image on the registry.
+
+        Returns:
+            bool: True if an image with the specified digest is locally available and has been tagged, else False.
+        """
+        (repository, tag) = parse_repository_tag(image_name)
+        try:
+            local_image = self.get_local("%s@%s" % (repository, digest))
+        except APIError:
+            return False
+
+        if '@' not in image_name:
+            local_image.tag(repository, tag=tag or "latest")
+        logging.debug("Image %s already available locally with digest %s, skipping pull..." % (image_name, digest))
+
+        return True
 
     def check_for_updates(self, image_name: str) -> None:
         """Update the specified image.
@@ -81,13 +215,13 @@ class DockerImage(object):
             return
 
         remote_image_info = self.get_remote(image_name).attrs['Descriptor']
-        local_repo_digest = local_repo_digests[0]
         remote_image_digest = remote_image_info["digest"]
 
         # Format is image_name@sha256, so we strip the first part.
-        (_, local_image_digest) = local_repo_digest.split("@")
+        local_image_digests = set(map(lambda x: x.split("@")[1], local_repo_digests))
         # We only need to update tagged images, not the ones with digests.
-        if remote_image_digest != local_image_digest:
+        if remote_image_digest not in local_image_digests and \
+                not self._tag_from_digest(image_name, remote_image_digest):
             EventDispatcher.get_instance().dispatch("docker_image_update_found",
                                                     docker_image=self,
                                                     image_name=image_name)
@@ -107,24 +241,44 @@ class DockerImage(object):
         """
         self._check_and_pull(image_name, pull=False)
 
-    def check_from_list(self, images: Union[List[str], Set[str]]) -> None:
+    def check_from_list(self, images: Union[List[str], Set[str]], check_updates: bool = True) -> None:
         """Check a list of specified images.
 
         Args:
             images (Union[List[str], Set[str]]): A list of Docker images name to pull.
+            check_updates (bool): If True, check for updates of the images already available locally.
 
         Returns:
             None
         """
         for image in images:
-            self._check_and_pull(image)
+            self._check_and_pull(image, check_updates=check_updates)
+
+    def check_updates_from_list(self, images: Union[List[str], Set[str]]) -> None:
+        """Check for updates of the specified images that are already available locally.
+
+        Images that are not available locally are skipped, they are pulled by `check_from_list`.
+
+        Args:
+            images (Union[List[str], Set[str]]): A list of Docker images name.
 
-    def _check_and_pull(self, image_name: str, pull: bool = True) -> None:
+        Returns:
+            None
+        """
+        for image in images:
+            try:
+                with self._update_lock:
+                    self.check_for_updates(image)
+            except APIError:
+                logging.debug("Cannot check updates of %s, skipping..." % image)
+
+    def _check_and_pull(self, image_name: str, pull: bool = True, check_updates: bool = True) -> None:
         """Check and pull of the specified image.
 
         Args:
             image_name (str): The name of a Docker Image.
             pull (bool): If True, pull the image from Docker Hub.
+            check_updates (bool): If True and pull is True, check for updates if the image is available locally.
 
         Returns:
             None
@@ -140,8 +294,9 @@ class DockerImage(object):
             image = self.get_local(image_name)
             self._check_image_architecture(image)
             try:
-                if pull:
-                    self.check_for_updates(image_name)
+                if pull and check_updates:
+                    with self._update_lock:
+                        self.check_for_updates(image_name)
             except APIError:
                 logging.debug("Cannot check updates, skipping...")
         except InvalidImageArchitectureError as e:
@@ -152,10 +307,10 @@ class DockerImage(object):
                 # If the image exists on Docker Hub, pulls it.
                 registry_data = self.get_remote(image_name)
                 self._check_image_architecture(registry_data)
-                if pull:
+                if pull and not self._tag_from_digest(image_name, registry_data.id):
                     self.pull(image_name)
             except APIError as e:
-                if e.response.status_code == 500 and 'dial tcp' in e.explanation:
+                if self._is_connection_error(e):
                     raise ConnectionError(
                         "Docker Image `%s` is not available in local repository and "
                         "no Internet connection is available to pull it from Docker Hub." % image_name
@@ -165,6 +320,19 @@ class DockerImage(object):
             except InvalidImageArchitectureError as e:
                 raise e
 
+    @staticmethod
+    def _is_connection_error(error: APIError) -> bool:
+        """Check if the specified error is due to the Docker daemon not reaching the registry.
+
+        Args:
+            error (docker.errors.APIError): An error returned by the Docker daemon.
+
+        Returns:
+            bool: True if the Docker daemon cannot reach the registry, else False.
+        """
+        return error.response is not None and error.response.status_code == 500 and \
+            error.explanation is not None and 'dial tcp' in error.explanation
+
     @staticmethod
     def _check_image_architecture(image: Union[docker.models.images.Image, docker.models.images.RegistryData]) -> None:
         """Check if the specified image is compatible with the host architecture.
@@ -1,12 +1,17 @@
 import logging
 import re
-from multiprocessing.dummy import Pool
-from typing import List, Union, Dict, Generator, Set, Optional
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import List, Union, Dict, Generator, Set, Optional, Iterable, Any, Callable
 
 import docker
+import docker.models.containers
 import docker.models.networks
 from docker import DockerClient
 from docker import types
+from docker.errors import APIError, NotFound
 
 from .stats.DockerLinkStats import DockerLinkStats
 from ..docker.DockerPlugin import PLUGIN_NAME
@@ -14,6 +19,8 @@ from ... import utils
 from ...event.EventDispatcher import EventDispatcher
 from ...exceptions import LinkNotFoundError
 from ...exceptions import PrivilegeError
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
+from ...foundation.manager.stats import STATS_REFRESH_INTERVAL
 from ...model.ExternalLink import ExternalLink
 from ...model.Lab import Lab
 from ...model.Link import BRIDGE_LINK_NAME, Link
@@ -23,11 +30,13 @@ from ...setting.Setting import Setting
 
 class DockerLink(object):
     """The class responsible for deploying Kathara collision domains as Docker networks and interact with them."""
-    __slots__ = ['client']
+    __slots__ = ['client', 'executor']
 
-    def __init__(self, client: DockerClient) -> None:
+    def __init__(self, client: DockerClient, executor: ManagerExecutor) -> None:
         self.client: DockerClient = client
 
+        self.executor: ManagerExecutor = executor
+
     def deploy_links(self, lab: Lab, selected_links: Set[str] = None) -> None:
         """Deploy all the lab collision domains as Docker networks.
 
@@ -42,27 +51,52 @@ class DockerLink(object):
             else lab.links.items()
 
         if len(links) > 0:
-            pool_size = utils.get_pool_size()
-            link_pool = Pool(pool_size)
-
-            items = utils.chunk_list(links, pool_size)
-
             EventDispatcher.get_instance().dispatch("links_deploy_started", items=links)
 
-            for chunk in items:
-                link_pool.map(func=self._deploy_link, iterable=chunk)
+        self.executor.wait(list(self.submit_links(lab, selected_links=selected_links).values()))
 
+        if len(links) > 0:
             EventDispatcher.get_instance().dispatch("links_deploy_ended")
 
+    def submit_links(self, lab: Lab, selected_links: Set[str] = None) -> Dict[str, Future]:
+        """Start deploying the lab collision domains as Docker networks, without waiting for them.
+
+        The Docker bridge is assigned to the bridge link of the lab before returning.
+
+        Args:
+            lab (Kathara.model.Lab.Lab): A Kathara network scenario.
+            selected_links (Set[str]): A set containing the name of the collision domains to deploy.
+
+        Returns:
+            Dict[str, Future]: Keys are the names of the collision domains, values are the Futures of their deployment.
+        """
+        links = {k: v for (k, v) in lab.links.items() if k in selected_links}.items() if selected_links \
+            else lab.links.items()
+
+        links_futures = {}
+        if len(links) > 0:
+            # Read the already existing networks with a single request, instead of one request for each network.
+            user_label = "shared_cd" if Setting.get_instance().shared_cd else utils.get_current_user_name()
+            existing_networks = {network.name: network
+                                 for network in self.get_links_api_objects_by_filters(user=user_label)}
+
+            links_futures = {name: self.executor.submit(self._deploy_link, existing_networks, (name, link))
+                             for (name, link) in links}
+
         # Create a docker bridge link in the lab object and assign the Docker Network object associated to it.
         docker_bridge = self.get_docker_bridge()
         link = lab.get_or_new_link(BRIDGE_LINK_NAME)
         link.api_object = docker_bridge
 
-    def _deploy_link(self, link_item: (str, Link)) -> None:
+        return links_futures
+
+    def _deploy_link(self, existing_networks: Dict[str, docker.models.networks.Network],
+                     link_item: (str, Link)) -> None:
         """Deploy the collision domain contained in the link_item as a Docker network.
 
         Args:
+            existing_networks (Dict[str, docker.models.networks.Network]): The already existing Docker networks. Keys
+                are network names, values are Docker networks.
             link_item (Tuple[str, Link]): A tuple composed by the name of the collision domain and a Link object
 
         Returns:
@@ -73,17 +107,20 @@ class DockerLink(object):
         if link.name == BRIDGE_LINK_NAME:
             return
 
-        self.create(link)
+        self.create(link, existing_networks)
 
         EventDispatcher.get_instance().dispatch("link_deployed", item=link)
 
-    def create(self, link: Link) -> None:
+    def create(self, link: Link, existing_networks: Optional[Dict[str, docker.models.networks.Network]] = None) \
+            -> None:
         """Create a Docker network representing the collision domain object and assign it to link.api_object.
 
         It also connect external collision domains, if present.
 
         Args:
             link (Kathara.model.Link.Link): A Kathara collision domain.
+            existing_networks (Optional[Dict[str, docker.models.networks.Network]]): The already existing Docker
+                networks. Keys are network names, values are Docker networks. If None, they are read from the APIs.
 
         Returns:
             None
@@ -92,11 +129,14 @@ class DockerLink(object):
         if link.name == BRIDGE_LINK_NAME:
             return
 
-        # If a network with the same name exists, return it instead of creating a new one.
         link_name = self.get_network_name(link.name)
-        networks = self.get_links_api_objects_by_filters(link_name=link_name)
-        if networks:
-            link.api_object = networks.pop()
+        if existing_networks is None:
+            existing_networks = {network.name: network
+                                 for network in self.get_links_api_objects_by_filters(link_name=link_name)}
+
+        # If a network with the same name exists, return it instead of creating a new one.
+        if link_name in existing_networks:
+            link.api_object = existing_networks[link_name]
         else:
             network_ipam_config = docker.types.IPAMConfig(driver='null')
 
@@ -134,22 +174,26 @@ class DockerLink(object):
         if selected_links is not None and len(selected_links) > 0:
             networks = [item for item in networks if item.attrs["Labels"]["name"] in selected_links]
 
-        for item in networks:
-            item.reload()
-        networks = [item for item in networks if len(item.containers) <= 0]
+            for item in networks:
+                item.reload()
+            networks = [item for item in networks if len(item.containers) <= 0]
 
-        if len(networks) > 0:
-            pool_size = utils.get_pool_size()
-            links_pool = Pool(pool_size)
+            if len(networks) > 0:
+                EventDispatcher.get_instance().dispatch("links_undeploy_started", items=networks)
 
-            items = utils.chunk_list(networks, pool_size)
+                self.executor.map(self._undeploy_link, networks)
 
-            EventDispatcher.get_instance().dispatch("links_undeploy_started", items=networks)
+                EventDispatcher.get_instance().dispatch("links_undeploy_ended")
+        else:
+            # Networks still used by other devices are not deleted by the prune
+            networks = self._get_unused_links(networks)
+
+            if len(networks) > 0:
+                EventDispatcher.get_instance().dispatch("links_undeploy_started", items=networks)
 
-            for chunk in items:
-                links_pool.map(func=self._undeploy_link, iterable=chunk)
+                self._prune_links(networks, lab_hash=lab_hash)
 
-            EventDispatcher.get_instance().dispatch("links_undeploy_ended")
+                EventDispatcher.get_instance().dispatch("links_undeploy_ended")
 
     def wipe(self, user: str = None) -> None:
         """Undeploy all the Docker networks of the specified user. If user is None, it undeploy all the Docker networks.
@@ -160,19 +204,155 @@ class DockerLink(object):
         Returns:
             None
         """
-        user_label = "shared_cd" if Setting.get_instance().shared_cd else user
+        user_label = self._get_user_label(user)
         networks = self.get_links_api_objects_by_filters(user=user_label)
-        for item in networks:
+
+        if len(networks) > 0:
+            self._prune_links(networks, user=user_label)
+
+    @staticmethod
+    def _get_user_label(user: Optional[str]) -> Optional[str]:
+        """Return the user label of the Docker networks of the specified user.
+
+        Args:
+            user (Optional[str]): The name of a user on the host.
+
+        Returns:
+            Optional[str]: "shared_cd" if the collision domains are shared between users, else user.
+        """
+        return "shared_cd" if Setting.get_instance().shared_cd else user
+
+    def _get_unused_links(self, networks: List[docker.models.networks.Network]) -> \
+            List[docker.models.networks.Network]:
+        """Return the Docker networks that are not attached to any container.
+
+        The attached containers are read with a single request, instead of reloading each network.
+
+        Args:
+            networks (List[docker.models.networks.Network]): A list of Docker networks.
+
+        Returns:
+            List[docker.models.networks.Network]: The Docker networks not attached to any container.
+        """
+        endpoints = self._count_endpoints({item.id: item for item in networks})
+
+        return [item for item in networks if item.id not in endpoints]
+
+    def _prune_links(self, networks: List[docker.models.networks.Network], lab_hash: str = None,
+                     user: str = None) -> None:
+        """Delete the unused Docker networks matching lab_hash and user, logging the time spent.
+
+        Networks without external interfaces are removed by the Docker daemon with a single label-filtered prune.
+        Networks with external interfaces are removed one by one, since their VLAN interfaces must be deleted.
+
+        Args:
+            networks (List[docker.models.networks.Network]): The Docker networks matching lab_hash and user.
+            lab_hash (str): The hash of a network scenario. If specified, delete only the networks of the scenario.
+            user (str): The name of a user on the host. If specified, delete only the networks of the user.
+
+        Returns:
+            None
+        """
+        start = time.monotonic()
+
+        external_networks = [item for item in networks if item.attrs["Labels"].get("external")]
+        for item in external_networks:
             item.reload()
-        networks = [item for item in networks if len(item.containers) <= 0]
+        external_networks = [item for item in external_networks if len(item.containers) <= 0]
+        self.executor.map(self._undeploy_link, external_networks)
+
+        filters = {"label": ["app=kathara", "external="]}
+        if user:
+            filters["label"].append("user=%s" % user)
+        if lab_hash:
+            filters["label"].append("lab_hash=%s" % lab_hash)
+        deleted_networks = set(self.client.networks.prune(filters=filters).get("NetworksDeleted") or [])
+
+        for item in networks:
+            if item.name in deleted_networks:
+                EventDispatcher.get_instance().dispatch("link_undeployed", item=item)
+
+        logging.info("%d collision domains deleted in %.2f seconds." %
+                     (len(external_networks) + len(deleted_networks), time.monotonic() - start))
+
+    def get_released_links_callback(self, lab_hash: str = None, user: str = None) -> \
+            Callable[[docker.models.containers.Container], None]:
+        """Return a callback that deletes the Docker networks released by each deleted container.
+
+        The networks matching lab_hash and user, and the number of containers attached to each of them, are read once.
+        Networks with external interfaces are left to the final undeploy, since their VLAN interfaces are deleted only
+        after checking that the network is not used anymore.
+
+        Args:
+            lab_hash (str): The hash of a network scenario. If specified, delete only the networks of the scenario.
+            user (str): The name of a user on the host. If specified, delete only the networks of the user.
+
+        Returns:
+            Callable[[docker.models.containers.Container], None]: The callback to call with each deleted container.
+        """
+        networks = {item.id: item for item in self.get_links_api_objects_by_filters(lab_hash=lab_hash,
+                                                                                    user=self._get_user_label(user))
+                    if not item.attrs["Labels"].get("external")}
+
+        return partial(self.undeploy_released_links, networks=networks, endpoints=self._count_endpoints(networks),
+                       lock=threading.Lock())
+
+    def undeploy_released_links(self, machine_api_object: docker.models.containers.Container,
+                                networks: Dict[str, docker.models.networks.Network], endpoints: Dict[str, int],
+                                lock: threading.Lock) -> None:
+        """Delete the Docker networks of a deleted container that are not attached to any other container.
+
+        Called as soon as each container is deleted, so that a network is deleted right after its last container,
+        while the other containers are still being deleted. The `link_undeployed` event is not dispatched, since the
+        progress of the collision domains starts after the devices are deleted and only covers the remaining ones.
+
+        Args:
+            machine_api_object (docker.models.containers.Container): A deleted Docker container.
+            networks (Dict[str, docker.models.networks.Network]): Keys are IDs, values are the Docker networks that
+                can be deleted.
+            endpoints (Dict[str, int]): Keys are network IDs, values are the number of containers still attached.
+            lock (threading.Lock): The lock protecting endpoints, shared by the callbacks of the same undeploy.
+
+        Returns:
+            None
+        """
+        released_networks = []
+        with lock:
+            for endpoint in machine_api_object.attrs["NetworkSettings"]["Networks"].values():
+                network_id = endpoint["NetworkID"]
+                if network_id not in networks:
+                    continue
 
-        pool_size = utils.get_pool_size()
-        links_pool = Pool(pool_size)
+                endpoints[network_id] = endpoints.get(network_id, 1) - 1
+                if endpoints[network_id] <= 0:
+                    released_networks.append(networks.pop(network_id))
 
-        items = utils.chunk_list(networks, pool_size)
+        for network in released_networks:
+            try:
+                self._delete_link(network)
+            except APIError as e:
+                # Already deleted, or still in use: it is left to the final prune of the collision domains
+                logging.debug("Cannot delete network `%s`: %s" % (network.name, str(e)))
 
-        for chunk in items:
-            links_pool.map(func=self._undeploy_link, iterable=chunk)
+    def _count_endpoints(self, networks: Dict[str, docker.models.networks.Network]) -> Dict[str, int]:
+        """Return the number of containers attached to each of the specified Docker networks, with a single request.
+
+        Args:
+            networks (Dict[str, docker.models.networks.Network]): Keys are IDs, values are Docker networks.
+
+        Returns:
+            Dict[str, int]: Keys are the IDs of the networks with attached containers, values are their number.
+        """
+        if not networks:
+            return {}
+
+        endpoints = {}
+        for container in self.client.api.containers(all=True, filters={"network": list(networks.keys())}):
+            for endpoint in (container["NetworkSettings"]["Networks"] or {}).values():
+                if endpoint["NetworkID"] in networks:
+                    endpoints[endpoint["NetworkID"]] = endpoints.get(endpoint["NetworkID"], 0) + 1
+
+        return endpoints
 
     def _undeploy_link(self, network: docker.models.networks.Network) -> None:
         """Undeploy a Docker network.
@@ -244,19 +424,97 @@ class DockerLink(object):
 
         networks = sorted(networks, key=lambda x: x.name)
 
-        network_streams = {}
+        # The attached containers change only on network events, so the networks are inspected again only when an
+        # event is received. The stream is opened before the first inspection, so no event is lost.
+        events = self.client.events(decode=True, filters={'type': 'network',
+                                                          'event': ['connect', 'disconnect', 'destroy']})
+        try:
+            network_streams = {network_stats.network_name: network_stats
+                               for network_stats in self.executor.map(DockerLinkStats, networks)}
+            networks_stats = {network_stats.link_api_object.id: network_stats
+                              for network_stats in network_streams.values()}
+            threading.Thread(target=self._watch_network_events, args=(events, networks_stats), daemon=True).start()
+
+            # Traffic counters are read from the host bridges, so they are available only with a local Linux daemon
+            bridges = {}
+            if Setting.get_instance().remote_url is None and utils.is_platform(utils.LINUX):
+                bridges = {self._get_bridge_name(network_stats.link_api_object): network_stats
+                           for network_stats in network_streams.values()}
+
+            is_first_snapshot = True
+            while True:
+                snapshot_time = time.monotonic() + STATS_REFRESH_INTERVAL
+
+                # Destroyed networks are not tracked by the events watcher anymore, so they are not inspected again
+                if len(network_streams) != len(networks_stats):
+                    network_streams = {name: x for (name, x) in network_streams.items()
+                                       if x.link_api_object.id in networks_stats}
+                    bridges = {name: x for (name, x) in bridges.items() if x.link_api_object.id in networks_stats}
+
+                outdated_stats = [x for x in network_streams.values() if x.outdated]
+                if outdated_stats:
+                    self.executor.map(self._update_network_stats, outdated_stats)
+
+                if bridges:
+                    try:
+                        traffic = Networking.get_bridges_traffic(bridges.keys())
+                    except Exception as e:
+                        logging.debug("Cannot read collision domains traffic: %s" % str(e))
+                        traffic = {}
+
+                    for (bridge_name, network_stats) in bridges.items():
+                        network_stats.update_traffic(traffic.get(bridge_name, None))
+
+                if not is_first_snapshot:
+                    time.sleep(max(0.0, snapshot_time - time.monotonic()))
+                is_first_snapshot = False
+
+                yield network_streams
+        finally:
+            events.close()
+
+    @staticmethod
+    def _watch_network_events(events: Iterable[Dict[str, Any]], networks_stats: Dict[str, DockerLinkStats]) -> None:
+        """Mark the statistics of a Docker network as outdated when an event of the network is received.
+
+        When a network is destroyed, its statistics are removed from networks_stats.
 
-        for network in networks:
-            network_streams[network.name] = DockerLinkStats(network)
+        Args:
+            events (Iterable[Dict[str, Any]]): The stream of the Docker network events.
+            networks_stats (Dict[str, DockerLinkStats]): Keys are Docker network IDs, values are the associated
+                DockerLinkStats.
 
-        while True:
-            for network_stats in network_streams.values():
-                try:
-                    network_stats.update()
-                except StopIteration:
+        Returns:
+            None
+        """
+        try:
+            for event in events:
+                network_id = event.get('Actor', {}).get('ID', None)
+                if event.get('Action', None) == 'destroy':
+                    networks_stats.pop(network_id, None)
                     continue
 
-            yield network_streams
+                network_stats = networks_stats.get(network_id, None)
+                if network_stats:
+                    network_stats.outdated = True
+        except Exception as e:
+            # The stream is closed when the statistics are not requested anymore
+            logging.debug("Stopped watching network events: %s" % str(e))
+
+    @staticmethod
+    def _update_network_stats(network_stats: DockerLinkStats) -> None:
+        """Update the statistics of a Docker network, ignoring the errors.
+
+        Args:
+            network_stats (DockerLinkStats): The statistics to update.
+
+        Returns:
+            None
+        """
+        try:
+            network_stats.update()
+        except APIError as e:
+            logging.debug("Cannot update stats of network `%s`: %s" % (network_stats.network_name, str(e)))
 
     def _attach_external_interfaces(self, external_links: List[ExternalLink],
                                     network: docker.models.networks.Network) -> None:
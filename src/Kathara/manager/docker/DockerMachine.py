@@ -1,26 +1,38 @@
 import logging
 import re
 import shlex
-from itertools import islice
-from multiprocessing.dummy import Pool
-from typing import List, Dict, Generator, Optional, Set, Tuple, Union, Any
+import time
+from concurrent.futures import Future, wait
+from functools import partial
+from typing import List, Dict, Generator, Optional, Set, Tuple, Union, Any, Callable, Iterable
 
 import docker.models.containers
 from docker import DockerClient
-from docker.errors import APIError
+from docker.errors import APIError, NotFound
+from docker.utils import version_gte
 
 from .DockerImage import DockerImage
+from .channel.DockerCommandChannel import DockerCommandChannel
 from .stats.DockerMachineStats import DockerMachineStats
 from ... import utils
 from ...event.EventDispatcher import EventDispatcher
 from ...exceptions import MountDeniedError, MachineAlreadyExistsError, MachineNotFoundError, DockerPluginError, \
     MachineBinaryError
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
+from ...foundation.manager.stats import STATS_REFRESH_INTERVAL
 from ...model.Lab import Lab
 from ...model.Link import Link, BRIDGE_LINK_NAME
 from ...model.Machine import Machine
 from ...setting.Setting import Setting
 
 RP_FILTER_NAMESPACE = "net.ipv4.conf.%s.rp_filter"
+# Seconds between two checks of the running shutdown commands
+SHUTDOWN_POLL_INTERVAL = 0.2
+# Namespace of the metadata cache where the manifests of the files copied in the containers are stored
+SYNC_CACHE_NAMESPACE = "sync"
+# Endpoint option to choose the name of the interface in the container, honoured since Docker Engine 28.0
+ENDPOINT_IFNAME_DRIVER_OPT = "com.docker.network.endpoint.ifname"
+ENDPOINT_IFNAME_API_VERSION = "1.48"
 OCI_RUNTIME_RE = re.compile(
     r"OCI runtime exec failed(.*?)(stat (.*): no such file or directory|exec: \"(.*)\": executable file not found)"
 )
@@ -95,19 +107,29 @@ SHUTDOWN_COMMANDS = [
 
 class DockerMachine(object):
     """The class responsible for deploying Kathara devices as Docker container and interact with them."""
-    __slots__ = ['client', 'docker_image']
+    __slots__ = ['client', 'docker_image', 'executor']
 
-    def __init__(self, client: DockerClient, docker_image: DockerImage) -> None:
+    def __init__(self, client: DockerClient, docker_image: DockerImage, executor: ManagerExecutor) -> None:
         self.client: DockerClient = client
 
         self.docker_image: DockerImage = docker_image
 
-    def deploy_machines(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        self.executor: ManagerExecutor = executor
+
+    def deploy_machines(self, lab: Lab, selected_machines: Set[str] = None,
+                        links_futures: Dict[str, Future] = None, check_updates: bool = True) -> None:
         """Deploy all the lab devices as Docker containers.
 
+        Each device is created as soon as its image is available and the collision domains it is attached to are
+        deployed, so image checks, collision domains deployment and devices deployment overlap.
+
         Args:
             lab (Kathara.model.Lab.Lab): A Kathara network scenario.
             selected_machines (Set[str]): A set containing the name of the devices to deploy.
+            links_futures (Dict[str, Future]): Keys are the names of the collision domains still being deployed, values
+                are the Futures of their deployment. If None, all the collision domains are already deployed.
+            check_updates (bool): If True, check for updates of the images while deploying. Set it to False if the
+                updates are already checked, since the checks may prompt the user.
 
         Returns:
             None
@@ -115,10 +137,6 @@ class DockerMachine(object):
         machines = {k: v for (k, v) in lab.machines.items() if k in selected_machines}.items() if selected_machines \
             else lab.machines.items()
 
-        # Check and pulling machine images
-        lab_images = set(map(lambda x: x[1].get_image(), machines))
-        self.docker_image.check_from_list(lab_images)
-
         shared_mount = lab.general_options['shared_mount'] if 'shared_mount' in lab.general_options \
             else Setting.get_instance().shared_mount
 
@@ -130,27 +148,75 @@ class DockerMachine(object):
 
         EventDispatcher.get_instance().dispatch("machines_deploy_started", items=machines)
 
+        # Check and pull the images in background. They are submitted before the devices, so they are always picked up
+        # by the workers before the devices waiting for them.
+        images_futures = {image: self.executor.submit(self.docker_image.check_from_list, [image],
+                                                      check_updates=check_updates)
+                          for image in dict.fromkeys(machine.get_image() for (_, machine) in machines)}
+
+        # Read the already existing devices with a single request, instead of one request for each device.
+        deploy_fn = partial(self._wait_and_deploy_machine, self._get_existing_machine_names(lab.hash),
+                            images_futures, links_futures or {})
+
         # Deploy all lab machines.
         # If there is no lab.dep file, machines can be deployed using multithreading.
-        # If not, they're started sequentially
-        if not lab.has_dependencies:
-            pool_size = utils.get_pool_size()
-            machines_pool = Pool(pool_size)
+        # If not, each machine is started as soon as the machines it depends on are started
+        try:
+            if not lab.has_dependencies:
+                self.executor.map(deploy_fn, machines)
+            else:
+                self.executor.map_graph(deploy_fn, {item[0]: item for item in machines}, lab.dependencies)
+        except BaseException:
+            for future in images_futures.values():
+                future.cancel()
+            raise
 
-            items = utils.chunk_list(machines, pool_size)
+        EventDispatcher.get_instance().dispatch("machines_deploy_ended")
 
-            for chunk in items:
-                machines_pool.map(func=self._deploy_and_start_machine, iterable=chunk)
-        else:
-            for item in machines:
-                self._deploy_and_start_machine(item)
+    def _wait_and_deploy_machine(self, existing_machines: Set[str], images_futures: Dict[str, Future],
+                                 links_futures: Dict[str, Future], machine_item: Tuple[str, Machine]) -> None:
+        """Wait for the image and the collision domains of a device, then deploy and start it.
 
-        EventDispatcher.get_instance().dispatch("machines_deploy_ended")
+        Args:
+            existing_machines (Set[str]): The names of the devices already deployed in the network scenario.
+            images_futures (Dict[str, Future]): Keys are image names, values are the Futures of their checks.
+            links_futures (Dict[str, Future]): Keys are the names of the collision domains still being deployed, values
+                are the Futures of their deployment.
+            machine_item (Tuple[str, Machine]): A tuple composed by the name of the device and a device object
+
+        Returns:
+            None
+        """
+        (_, machine) = machine_item
+
+        images_futures[machine.get_image()].result()
+        for machine_link in machine.interfaces.values():
+            if machine_link.name in links_futures:
+                links_futures[machine_link.name].result()
+
+        self._deploy_and_start_machine(existing_machines, machine_item)
+
+    def _get_existing_machine_names(self, lab_hash: str) -> Set[str]:
+        """Return the names of the devices of the current user already deployed in a network scenario.
 
-    def _deploy_and_start_machine(self, machine_item: Tuple[str, Machine]) -> None:
+        Args:
+            lab_hash (str): The hash of a network scenario.
+
+        Returns:
+            Set[str]: The names of the devices.
+        """
+        filters = {"label": ["app=kathara", "user=%s" % utils.get_current_user_name(), "lab_hash=%s" % lab_hash]}
+
+        # A sparse list is enough, since only the labels are needed
+        containers = self.client.containers.list(all=True, filters=filters, sparse=True)
+
+        return {container.attrs['Labels']['name'] for container in containers}
+
+    def _deploy_and_start_machine(self, existing_machines: Set[str], machine_item: Tuple[str, Machine]) -> None:
         """Deploy and start a Docker container from the device contained in machine_item.
 
         Args:
+            existing_machines (Set[str]): The names of the devices already deployed in the network scenario.
             machine_item (Tuple[str, Machine]): A tuple composed by the name of the device and a device object
 
         Returns:
@@ -158,16 +224,18 @@ class DockerMachine(object):
         """
         (_, machine) = machine_item
 
-        self.create(machine)
+        self.create(machine, existing_machines)
         self.start(machine)
 
         EventDispatcher.get_instance().dispatch("machine_deployed", item=machine)
 
-    def create(self, machine: Machine) -> None:
+    def create(self, machine: Machine, existing_machines: Optional[Set[str]] = None) -> None:
         """Create a Docker container representing the device and assign it to machine.api_object.
 
         Args:
             machine (Kathara.model.Machine.Machine): A Kathara device.
+            existing_machines (Optional[Set[str]]): The names of the devices already deployed in the network scenario.
+                If None, they are read from the APIs.
 
         Returns:
             None
@@ -178,11 +246,15 @@ class DockerMachine(object):
         """
         logging.debug("Creating device `%s`..." % machine.name)
 
-        containers = self.get_machines_api_objects_by_filters(machine_name=machine.name, lab_hash=machine.lab.hash,
-                                                              user=utils.get_current_user_name())
-        if containers:
+        if existing_machines is None:
+            existing_machines = self._get_existing_machine_names(machine.lab.hash)
+
+        if machine.name in existing_machines:
             raise MachineAlreadyExistsError(machine.name)
 
+        # Computed before the metas are updated from the general options, as done when reconciling a running scenario
+        config_digest = machine.get_config_digest()
+
         image = machine.get_image()
         memory = machine.get_mem()
         cpus = machine.get_cpu(multiplier=1000000000)
@@ -223,11 +295,29 @@ class DockerMachine(object):
             first_network = machine.lab.get_or_new_link(BRIDGE_LINK_NAME).api_object
             machine.add_meta("bridge_connected", True)
 
+        # If the daemon allows to choose the interface names, attach all the networks at creation, in a single request.
+        # Otherwise, only the first network is attached here and the others are connected in `start`.
+        attached_interfaces = [0] if first_network else []
+        networking_config = None
+        if first_network and version_gte(self.client.api.api_version, ENDPOINT_IFNAME_API_VERSION):
+            endpoints = [(iface_num, machine_link.api_object) for (iface_num, machine_link) in
+                         machine.interfaces.items()]
+            if "bridge_connected" not in machine.meta and machine.meta['bridged']:
+                endpoints.append((len(endpoints), machine.lab.get_or_new_link(BRIDGE_LINK_NAME).api_object))
+                machine.add_meta("bridge_connected", True)
+
+            attached_interfaces = [iface_num for (iface_num, _) in endpoints]
+            networking_config = {
+                network.name: self.client.api.create_endpoint_config(
+                    driver_opt={ENDPOINT_IFNAME_DRIVER_OPT: "eth%d" % iface_num}
+                ) for (iface_num, network) in endpoints
+            }
+
         # Sysctl params to pass to the container creation
         sysctl_parameters = {RP_FILTER_NAMESPACE % x: 0 for x in ["all", "default", "lo"]}
 
-        if first_network:
-            sysctl_parameters[RP_FILTER_NAMESPACE % "eth0"] = 0
+        for iface_num in attached_interfaces:
+            sysctl_parameters[RP_FILTER_NAMESPACE % ("eth%d" % iface_num)] = 0
 
         sysctl_parameters["net.ipv4.ip_forward"] = 1
         sysctl_parameters["net.ipv4.icmp_ratelimit"] = 0
@@ -268,6 +358,7 @@ class DockerMachine(object):
                                                               privileged=privileged,
                                                               network=first_network.name if first_network else None,
                                                               network_mode="bridge" if first_network else "none",
+                                                              networking_config=networking_config,
                                                               environment=machine.meta['envs'],
                                                               sysctls=sysctl_parameters,
                                                               mem_limit=memory,
@@ -283,16 +374,20 @@ class DockerMachine(object):
                                                                       "app": "kathara",
                                                                       "shell": machine.meta["shell"]
                                                                       if "shell" in machine.meta
-                                                                      else Setting.get_instance().device_shell
+                                                                      else Setting.get_instance().device_shell,
+                                                                      "config_digest": config_digest
                                                                       }
                                                               )
         except APIError as e:
             raise e
 
         # Pack machine files into a tar.gz and extract its content inside `/`
+        # The manifest is taken before packing, so that a file changed meanwhile is copied again by `sync_files`
+        manifest = machine.get_data_manifest()
         tar_data = machine.pack_data()
         if tar_data:
             self.copy_files(machine_container, "/", tar_data)
+            self._cache_sync_manifest(machine_container, manifest)
 
         machine.api_object = machine_container
 
@@ -369,10 +464,14 @@ class DockerMachine(object):
             else:
                 raise e
 
-        # Connect the container to its networks (starting from the second, the first is already connected in `create`)
+        # Connect the container to the networks not already attached in `create`.
         # This should be done after the container start because Docker causes a non-deterministic order when attaching
-        # networks before container startup.
-        for (iface_num, machine_link) in islice(machine.interfaces.items(), 1, None):
+        # networks before container startup (unless the interface names are chosen in `create`).
+        attached_networks = machine.api_object.attrs["NetworkSettings"]["Networks"]
+        for (iface_num, machine_link) in machine.interfaces.items():
+            if machine_link.api_object.name in attached_networks:
+                continue
+
             logging.debug("Connecting device `%s` to collision domain `%s` on interface %d..." % (machine.name,
                                                                                                   machine_link.name,
                                                                                                   iface_num
@@ -427,7 +526,10 @@ class DockerMachine(object):
                             f"Please specify a valid shell for this device."
                             )
 
-    def undeploy(self, lab_hash: str, selected_machines: Set[str] = None) -> None:
+    def undeploy(self, lab_hash: str, selected_machines: Set[str] = None, shutdown: bool = True,
+                 shutdown_timeout: Optional[float] = None,
+                 machine_undeployed_callback: Optional[Callable[[docker.models.containers.Container], None]] = None) \
+            -> None:
         """Undeploy the devices contained in the network scenario defined by the lab_hash.
 
         If a set of selected_machines is specified, undeploy only the specified devices.
@@ -435,6 +537,11 @@ class DockerMachine(object):
         Args:
             lab_hash (str): The hash of the network scenario to undeploy.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
+            machine_undeployed_callback (Optional[Callable[[docker.models.containers.Container], None]]): If
+                specified, called by the pool workers with each container, as soon as it is deleted.
 
         Returns:
             None
@@ -445,47 +552,122 @@ class DockerMachine(object):
             containers = [item for item in containers if item.labels["name"] in selected_machines]
 
         if len(containers) > 0:
-            pool_size = utils.get_pool_size()
-            machines_pool = Pool(pool_size)
-
-            items = utils.chunk_list(containers, pool_size)
-
             EventDispatcher.get_instance().dispatch("machines_undeploy_started", items=containers)
 
-            for chunk in items:
-                machines_pool.map(func=self._undeploy_machine, iterable=chunk)
+            self._undeploy_machines(containers, shutdown, shutdown_timeout, machine_undeployed_callback)
 
             EventDispatcher.get_instance().dispatch("machines_undeploy_ended")
 
-    def wipe(self, user: str = None) -> None:
+    def wipe(self, user: str = None, shutdown: bool = True, shutdown_timeout: Optional[float] = None,
+             machine_undeployed_callback: Optional[Callable[[docker.models.containers.Container], None]] = None) \
+            -> None:
         """Undeploy all the running devices of the specified user. If user is None, it undeploy all the running devices.
 
         Args:
             user (str): The name of a current user on the host.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
+            machine_undeployed_callback (Optional[Callable[[docker.models.containers.Container], None]]): If
+                specified, called by the pool workers with each container, as soon as it is deleted.
 
         Returns:
             None
         """
         containers = self.get_machines_api_objects_by_filters(user=user)
 
-        pool_size = utils.get_pool_size()
-        machines_pool = Pool(pool_size)
+        if len(containers) > 0:
+            self._undeploy_machines(containers, shutdown, shutdown_timeout, machine_undeployed_callback)
+
+    def _undeploy_machines(self, containers: List[docker.models.containers.Container], shutdown: bool,
+                           shutdown_timeout: Optional[float],
+                           machine_undeployed_callback: Optional[Callable[[docker.models.containers.Container], None]]) \
+            -> None:
+        """Undeploy the Docker containers using the pool workers, logging the time spent in each phase.
 
-        items = utils.chunk_list(containers, pool_size)
+        Args:
+            containers (List[docker.models.containers.Container]): The Docker containers to undeploy.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
+            machine_undeployed_callback (Optional[Callable[[docker.models.containers.Container], None]]): If
+                specified, called by the pool workers with each container, as soon as it is deleted.
 
-        for chunk in items:
-            machines_pool.map(func=self._undeploy_machine, iterable=chunk)
+        Returns:
+            None
+        """
+        if shutdown and shutdown_timeout is not None:
+            start = time.monotonic()
+            self._run_shutdown_commands(containers, shutdown_timeout)
+            logging.info("Shutdown commands of %d devices executed in %.2f seconds." %
+                         (len(containers), time.monotonic() - start))
+            # Shutdown commands are already executed, do not run them again before deleting the containers
+            shutdown = False
+
+        undeploy_args = {}
+        if not shutdown:
+            undeploy_args['shutdown'] = False
+        if machine_undeployed_callback:
+            undeploy_args['callback'] = machine_undeployed_callback
+
+        start = time.monotonic()
+        self.executor.map(partial(self._undeploy_machine, **undeploy_args), containers)
+        logging.info("%d devices deleted in %.2f seconds." % (len(containers), time.monotonic() - start))
+
+    def _run_shutdown_commands(self, containers: List[docker.models.containers.Container], timeout: float) -> None:
+        """Run the shutdown commands in the Docker containers, waiting for them until a global deadline.
 
-    def _undeploy_machine(self, machine_api_object: docker.models.containers.Container) -> None:
+        Args:
+            containers (List[docker.models.containers.Container]): The Docker containers to shut down.
+            timeout (float): The maximum number of seconds to wait for the shutdown commands of all the containers.
+
+        Returns:
+            None
+        """
+        deadline = time.monotonic() + timeout
+
+        running_execs = [exec_id for exec_id in self.executor.map(self._start_shutdown_commands, containers)
+                         if exec_id]
+        while running_execs and time.monotonic() < deadline:
+            time.sleep(min(SHUTDOWN_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+            running_execs = [exec_id for exec_id, running in
+                             zip(running_execs, self.executor.map(self._is_exec_running, running_execs)) if running]
+
+        if running_execs:
+            logging.warning("Shutdown commands of %d devices not completed in %s seconds, deleting them anyway." %
+                            (len(running_execs), timeout))
+
+    def _is_exec_running(self, exec_id: str) -> bool:
+        """Check if a Docker exec instance is still running.
+
+        Args:
+            exec_id (str): The ID of the exec instance.
+
+        Returns:
+            bool: True if the exec instance is running, else False.
+        """
+        try:
+            return self.client.api.exec_inspect(exec_id)['Running']
+        except NotFound:
+            return False
+
+    def _undeploy_machine(self, machine_api_object: docker.models.containers.Container, shutdown: bool = True,
+                          callback: Optional[Callable[[docker.models.containers.Container], None]] = None) -> None:
         """Undeploy a Docker container.
 
         Args:
             machine_api_object (docker.models.containers.Container): The Docker container to undeploy.
+            shutdown (bool): If False, do not run the shutdown commands of the device.
+            callback (Optional[Callable[[docker.models.containers.Container], None]]): If specified, called with the
+                container once it is deleted.
 
         Returns:
             None
         """
-        self._delete_machine(machine_api_object)
+        self._delete_machine(machine_api_object, shutdown=shutdown)
+
+        if callback:
+            callback(machine_api_object)
 
         EventDispatcher.get_instance().dispatch("machine_undeployed", item=machine_api_object)
 
@@ -598,6 +780,89 @@ class DockerMachine(object):
 
         return exec_result['output']
 
+    def open_command_channel(self, lab_hash: str, machine_name: str, user: str = None) -> DockerCommandChannel:
+        """Open a persistent command channel on the Docker container specified by the lab_hash and the machine_name.
+
+        Args:
+            lab_hash (str): The hash of the network scenario containing the device.
+            machine_name (str): The name of the device.
+            user (str): The name of a current user on the host.
+
+        Returns:
+            DockerCommandChannel: A shell session on the container, that executes framed commands.
+
+        Raises:
+            MachineNotFoundError: If the specified device is not running.
+        """
+        containers = self.get_machines_api_objects_by_filters(lab_hash=lab_hash, machine_name=machine_name, user=user)
+        if not containers:
+            raise MachineNotFoundError("The specified device `%s` is not running." % machine_name)
+
+        logging.debug("Opening command channel on device with name: %s" % machine_name)
+
+        return DockerCommandChannel(self.client, containers.pop())
+
+    def exec_machines(self, lab_hash: str, command: Union[str, List], machine_names: Optional[List[str]] = None,
+                      user: str = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Execute the command on several Docker containers of a network scenario, concurrently.
+
+        Args:
+            lab_hash (str): The hash of the network scenario containing the devices.
+            command (Union[str, List]): The command to execute.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+            user (str): The name of a current user on the host.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code. The last tuple of
+                each device has no output and contains the exit code, None if the command could not be executed.
+
+        Raises:
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        containers = {container.labels['name']: container
+                      for container in self.get_machines_api_objects_by_filters(lab_hash=lab_hash, user=user)}
+        if machine_names is not None:
+            not_running = [name for name in machine_names if name not in containers]
+            if not_running:
+                raise MachineNotFoundError("The specified devices `%s` are not running." % ", ".join(not_running))
+            containers = {name: containers[name] for name in machine_names}
+
+        command = shlex.split(command) if type(command) == str else command
+        logging.debug("Executing command `%s` on %d devices..." % (command, len(containers)))
+
+        for machine_name, (stdout, stderr, exit_code) in self.executor.stream(
+                partial(self._exec_stream, command), containers
+        ):
+            yield machine_name, stdout, stderr, exit_code
+
+    def _exec_stream(self, command: List[str], container: docker.models.containers.Container) \
+            -> Generator[Tuple[Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Execute the command on a Docker container, streaming its output and then its exit code.
+
+        Args:
+            command (List[str]): The command to execute.
+            container (docker.models.containers.Container): Container object on which the command is executed.
+
+        Returns:
+            Generator[Tuple[Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the stdout and the stderr in bytes, followed by a tuple with the exit code.
+        """
+        try:
+            exec_result = self._exec_run(container, cmd=command, stdout=True, stderr=True, stream=True, demux=True)
+        except MachineBinaryError as e:
+            yield None, str(e).encode('utf-8'), None
+            yield None, None, None
+            return
+
+        for (stdout, stderr) in exec_result['output']:
+            if stdout or stderr:
+                yield stdout, stderr, None
+
+        yield None, None, self.client.api.exec_inspect(exec_result['id'])['ExitCode']
+
     def _exec_run(self, container: docker.models.containers.Container,
                   cmd: Union[str, List], stdout=True, stderr=True, stdin=False, tty=False,
                   privileged=False, user='', detach=False, stream=False,
@@ -623,7 +888,9 @@ class DockerMachine(object):
             demux (bool): Return stdout and stderr separately
 
         Returns:
-            (Dict): A dict of (exit_code, output)
+            (Dict): A dict of (id, exit_code, output)
+                id: (str):
+                    The ID of the exec instance.
                 exit_code: (int):
                     Exit code for the executed command or ``None`` if
                     either ``stream`` or ``socket`` is ``True``.
@@ -663,24 +930,113 @@ class DockerMachine(object):
                 raise MachineBinaryError(matches.group(3) or matches.group(4), container.labels['name'])
 
         if socket or stream:
-            return {'exit_code': None, 'output': exec_output}
+            return {'id': resp['Id'], 'exit_code': None, 'output': exec_output}
 
-        return {'exit_code': int(exit_code) if exit_code is not None else None, 'output': exec_output}
+        return {
+            'id': resp['Id'], 'exit_code': int(exit_code) if exit_code is not None else None, 'output': exec_output
+        }
 
     @staticmethod
-    def copy_files(machine_api_object: docker.models.containers.Container, path: str, tar_data: bytes) -> None:
+    def copy_files(machine_api_object: docker.models.containers.Container, path: str,
+                   tar_data: Union[bytes, Iterable[bytes]]) -> None:
         """Copy the files contained in tar_data in the Docker container path specified by the machine_api_object.
 
         Args:
             machine_api_object (docker.models.containers.Container): A Docker container.
             path (str): The path of the container where copy the tar_data.
-            tar_data (bytes): The data to copy in the container.
+            tar_data (Union[bytes, Iterable[bytes]]): The data to copy in the container. If it is an iterable of
+                chunks, the archive is streamed to the Docker daemon.
 
         Returns:
             None
         """
         machine_api_object.put_archive(path, tar_data)
 
+    def sync_files(self, machine: Machine, reload_command: Optional[str] = None) -> List[str]:
+        """Copy in the Docker container of the device the files changed since they were last copied.
+
+        The changed files are streamed in a single archive. Files removed from the host are not removed from the device.
+
+        Args:
+            machine (Kathara.model.Machine.Machine): A running Kathara device, with the api_object field populated.
+            reload_command (Optional[str]): A shell command to run in the device after copying the files. It is not
+                run if no file changed.
+
+        Returns:
+            List[str]: The paths in the device of the copied files.
+        """
+        container = machine.api_object
+        cached_manifest = utils.get_cached_metadata(SYNC_CACHE_NAMESPACE, self._get_sync_cache_key(container))
+        # A manifest is valid only for the container it was taken for
+        manifest = cached_manifest['files'] \
+            if cached_manifest and cached_manifest['container'] == container.id else None
+
+        (guest_to_host, manifest) = machine.get_data_delta(manifest)
+        if guest_to_host:
+            logging.debug("Copying %d files in device `%s`..." % (len(guest_to_host), machine.name))
+            self.copy_files(container, "/", utils.stream_files_for_tar(guest_to_host))
+
+            if reload_command:
+                self._run_reload_command(container, reload_command)
+
+        self._cache_sync_manifest(container, manifest)
+
+        return sorted(guest_to_host.keys())
+
+    def _run_reload_command(self, container: docker.models.containers.Container, reload_command: str) -> None:
+        """Run the reload command inside a Docker container, logging a warning if it fails.
+
+        Args:
+            container (docker.models.containers.Container): The Docker container where the files are copied.
+            reload_command (str): The shell command to run.
+
+        Returns:
+            None
+        """
+        try:
+            result = self._exec_run(container,
+                                    cmd=[container.labels['shell'], '-c', reload_command],
+                                    stdout=True,
+                                    stderr=True,
+                                    privileged=True
+                                    )
+        except MachineBinaryError as e:
+            logging.warning(f"Shell `{e.binary}` not found in "
+                            f"image `{container.image.tags[0]}` of device `{container.labels['name']}`. "
+                            f"Reload command will not be executed."
+                            )
+            return
+
+        if result['exit_code'] != 0:
+            output = result['output'].decode('utf-8', errors='ignore').strip() if result['output'] else ""
+            logging.warning("Reload command of device `%s` exited with code %d: %s" %
+                            (container.labels['name'], result['exit_code'], output))
+
+    @staticmethod
+    def _get_sync_cache_key(container: docker.models.containers.Container) -> str:
+        """Return the key of the manifest of the files copied in a Docker container.
+
+        Args:
+            container (docker.models.containers.Container): A Docker container.
+
+        Returns:
+            str: The key of the manifest in the metadata cache.
+        """
+        return "%s_%s" % (container.labels['lab_hash'], container.labels['name'])
+
+    def _cache_sync_manifest(self, container: docker.models.containers.Container, manifest: Dict[str, List]) -> None:
+        """Store the manifest of the files copied in a Docker container.
+
+        Args:
+            container (docker.models.containers.Container): A Docker container.
+            manifest (Dict[str, List]): The manifest of the copied files, as returned by the device.
+
+        Returns:
+            None
+        """
+        utils.cache_metadata(SYNC_CACHE_NAMESPACE, self._get_sync_cache_key(container),
+                             {'container': container.id, 'files': manifest})
+
     def get_machines_api_objects_by_filters(self, lab_hash: str = None, machine_name: str = None, user: str = None) -> \
             List[docker.models.containers.Container]:
         """Return the Docker containers objects specified by lab_hash and user.
@@ -701,7 +1057,25 @@ class DockerMachine(object):
         if machine_name:
             filters["label"].append("name=%s" % machine_name)
 
-        return self.client.containers.list(all=True, filters=filters)
+        # Get the matching ids with a single call, then inspect the containers in parallel
+        containers = self.client.containers.list(all=True, filters=filters, sparse=True)
+
+        return [container for container in self.executor.map(self._inspect_container, containers) if container]
+
+    def _inspect_container(self, container: docker.models.containers.Container) -> \
+            Optional[docker.models.containers.Container]:
+        """Return the complete Docker container object of a container returned by a sparse list.
+
+        Args:
+            container (docker.models.containers.Container): A Docker container from a sparse list.
+
+        Returns:
+            Optional[docker.models.containers.Container]: The Docker container, None if it was removed in the meantime.
+        """
+        try:
+            return self.client.containers.get(container.id)
+        except NotFound:
+            return None
 
     def get_machines_stats(self, lab_hash: str = None, machine_name: str = None, user: str = None) -> \
             Generator[Dict[str, DockerMachineStats], None, None]:
@@ -729,17 +1103,37 @@ class DockerMachine(object):
 
         containers = sorted(containers, key=lambda x: x.name)
 
+        one_shot = version_gte(self.client.api.api_version, '1.41')
+
         machine_streams = {}
 
         for machine in containers:
-            machine_streams[machine.name] = DockerMachineStats(machine)
-
+            machine_streams[machine.name] = DockerMachineStats(machine, one_shot=one_shot)
+
+        # Statistics are read concurrently by the executor workers (so the number of connections is bounded).
+        # The first snapshot waits for all the devices, since one-shot callers only read it. Then, a snapshot is
+        # published every STATS_REFRESH_INTERVAL seconds: devices whose statistics are not read yet keep the previous
+        # values, and are not requested again until the pending request completes.
+        pending_updates = {}
+        is_first_snapshot = True
         while True:
-            for machine_stats in machine_streams.values():
-                try:
-                    machine_stats.update()
-                except StopIteration:
-                    continue
+            snapshot_time = time.monotonic() + STATS_REFRESH_INTERVAL
+
+            for (name, machine_stats) in machine_streams.items():
+                if name not in pending_updates:
+                    pending_updates[name] = self.executor.submit(machine_stats.update)
+
+            wait(pending_updates.values(), timeout=None if is_first_snapshot else STATS_REFRESH_INTERVAL)
+
+            for (name, future) in list(pending_updates.items()):
+                if future.done():
+                    pending_updates.pop(name)
+                    if future.exception():
+                        logging.debug("Cannot update stats of device `%s`: %s" % (name, str(future.exception())))
+
+            if not is_first_snapshot:
+                time.sleep(max(0.0, snapshot_time - time.monotonic()))
+            is_first_snapshot = False
 
             yield machine_streams
 
@@ -757,32 +1151,47 @@ class DockerMachine(object):
         lab_hash = lab_hash if "_%s" % lab_hash else ""
         return "%s_%s_%s_%s" % (Setting.get_instance().device_prefix, utils.get_current_user_name(), name, lab_hash)
 
-    def _delete_machine(self, container: docker.models.containers.Container) -> None:
+    def _delete_machine(self, container: docker.models.containers.Container, shutdown: bool = True) -> None:
         """Remove a running Docker container.
 
         Args:
             container (docker.models.containers.Container): The Docker container to remove.
+            shutdown (bool): If False, remove the container without running its shutdown commands.
 
         Returns:
             None
         """
+        if shutdown:
+            self._start_shutdown_commands(container)
+
+        container.remove(force=True)
+
+    def _start_shutdown_commands(self, container: docker.models.containers.Container) -> Optional[str]:
+        """Start the shutdown commands inside a Docker container, without waiting for them.
+
+        Args:
+            container (docker.models.containers.Container): The Docker container to shut down.
+
+        Returns:
+            Optional[str]: The ID of the exec instance running the commands, None if they are not started.
+        """
         # Build the shutdown command string
         shutdown_commands_string = "; ".join(SHUTDOWN_COMMANDS).format(machine_name=container.labels["name"])
 
         # Execute the shutdown commands inside the container (only if it's running)
         if container.status == "running":
             try:
-                self._exec_run(container,
-                               cmd=[container.labels['shell'], '-c', shutdown_commands_string],
-                               stdout=False,
-                               stderr=False,
-                               privileged=True,
-                               detach=True
-                               )
+                return self._exec_run(container,
+                                      cmd=[container.labels['shell'], '-c', shutdown_commands_string],
+                                      stdout=False,
+                                      stderr=False,
+                                      privileged=True,
+                                      detach=True
+                                      )['id']
             except MachineBinaryError as e:
                 logging.warning(f"Shell `{e.binary}` not found in "
                                 f"image `{container.image.tags[0]}` of device `{container.labels['name']}`. "
                                 f"Shutdown commands will not be executed."
                                 )
 
-        container.remove(force=True)
+        return None
@@ -1,11 +1,14 @@
 import io
 import logging
-from typing import Set, Dict, Generator, Tuple, List, Optional
+import time
+from functools import partial
+from typing import Set, Dict, Generator, Tuple, List, Optional, Iterable
 
 import docker
 import docker.models.containers
 import docker.models.networks
-from requests.exceptions import ConnectionError as RequestsConnectionError
+from docker.errors import APIError, DockerException
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
 
 from .DockerImage import DockerImage
 from .DockerLink import DockerLink
@@ -18,7 +21,9 @@ from ...decorators import privileged
 from ...exceptions import DockerDaemonConnectionError, LinkNotFoundError, MachineCollisionDomainError, \
     InvocationError, LabNotFoundError
 from ...exceptions import MachineNotFoundError
+from ...foundation.manager.channel.CommandChannel import CommandChannel
 from ...foundation.manager.IManager import IManager
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
 from ...model.Lab import Lab
 from ...model.Link import Link
 from ...model.Machine import Machine
@@ -27,51 +32,75 @@ from ...utils import pack_files_for_tar, import_pywintypes
 
 pywintypes = import_pywintypes()
 
+# Attempts to resume a deploy after a transient error, and seconds to wait before the first one (doubled at each one)
+RESUME_RETRIES = 3
+RESUME_BACKOFF = 1
+
 
 def check_docker_status(method):
     """Decorator function to check if Docker daemon is running properly."""
 
     @privileged
     def check_docker(*args, **kw):
-        # Call the constructor first
-        method(*args, **kw)
-
-        # Client is initialized after constructor call
-        client = args[0].client
-
-        # Try to ping Docker, to see if it's running and raise an exception on failure
+        # The constructor already talks to Docker (API version negotiation and plugin check), so it fails if Docker
+        # is not running, without the need of a further ping
         try:
-            client.ping()
+            method(*args, **kw)
         except RequestsConnectionError as e:
             raise DockerDaemonConnectionError(str(e))
         except pywintypes.error as e:
             raise DockerDaemonConnectionError(str(e))
+        except DockerException as e:
+            # Raised by the client when it cannot get the API version from Docker
+            if isinstance(e, APIError):
+                raise e
+            raise DockerDaemonConnectionError(str(e))
 
     return check_docker
 
 
 class DockerManager(IManager):
     """The class responsible to interact between Kathara and the Docker APIs."""
-    __slots__ = ['client', 'docker_image', 'docker_machine', 'docker_link']
+    __slots__ = ['client', 'executor', 'docker_plugin', 'docker_image', 'docker_machine', 'docker_link']
 
     @check_docker_status
     def __init__(self) -> None:
+        # Keep enough idle connections for all the executor workers
+        client_pool_size = Setting.get_instance().pool_size or utils.MAX_POOL_SIZE
+
         remote_url = Setting.get_instance().remote_url
         if remote_url is None:
-            self.client: docker.DockerClient = docker.from_env(timeout=None, max_pool_size=utils.get_pool_size())
+            self.client: docker.DockerClient = docker.from_env(timeout=None, max_pool_size=client_pool_size)
         else:
             tls_config = docker.tls.TLSConfig(ca_cert=Setting.get_instance().cert_path)
             self.client: docker.DockerClient = docker.DockerClient(base_url=remote_url, timeout=None,
-                                                                   max_pool_size=utils.get_pool_size(),
+                                                                   max_pool_size=client_pool_size,
                                                                    tls=tls_config)
 
-        docker_plugin = DockerPlugin(self.client)
-        docker_plugin.check_and_download_plugin()
+        self.docker_plugin: DockerPlugin = DockerPlugin(self.client)
+        self.docker_plugin.check_and_download_plugin()
+
+        self.executor: ManagerExecutor = ManagerExecutor(max_workers=self._get_pool_size)
 
         self.docker_image: DockerImage = DockerImage(self.client)
 
-        self.docker_machine: DockerMachine = DockerMachine(self.client, self.docker_image)
-        self.docker_link: DockerLink = DockerLink(self.client)
+        self.docker_machine: DockerMachine = DockerMachine(self.client, self.docker_image, self.executor)
+        self.docker_link: DockerLink = DockerLink(self.client, self.executor)
+
+    def _get_pool_size(self) -> int:
+        """Return the number of workers of the executor.
+
+        If not specified in the settings, it is computed from the number of CPUs of the Docker daemon host, since
+        the daemon (and not the local host) is the one serving the requests.
+
+        Returns:
+            int: The number of workers of the executor.
+        """
+        pool_size = Setting.get_instance().pool_size
+        if pool_size:
+            return pool_size
+
+        return utils.get_pool_size(remote_cpus=self.client.info()["NCPU"])
 
     @privileged
     def deploy_machine(self, machine: Machine) -> None:
@@ -89,8 +118,10 @@ class DockerManager(IManager):
         if not machine.lab:
             raise LabNotFoundError("Device `%s` is not associated to a network scenario." % machine.name)
 
+        check_updates = self._check_image_updates([machine])
+
         self.docker_link.deploy_links(machine.lab, selected_links={x.name for x in machine.interfaces.values()})
-        self.docker_machine.deploy_machines(machine.lab, selected_machines={machine.name})
+        self.docker_machine.deploy_machines(machine.lab, selected_machines={machine.name}, check_updates=check_updates)
 
     @privileged
     def deploy_link(self, link: Link) -> None:
@@ -132,11 +163,170 @@ class DockerManager(IManager):
         if selected_machines:
             selected_links = lab.get_links_from_machines(selected_machines)
 
-        # Deploy all lab links.
-        self.docker_link.deploy_links(lab, selected_links=selected_links)
+        check_updates = self._check_image_updates(
+            [lab.machines[name] for name in selected_machines] if selected_machines else lab.machines.values()
+        )
+
+        # Deploy all lab links in background, each device waits only for its own collision domains.
+        links_futures = self.docker_link.submit_links(lab, selected_links=selected_links)
 
         # Deploy all lab machines.
-        self.docker_machine.deploy_machines(lab, selected_machines=selected_machines)
+        try:
+            self.docker_machine.deploy_machines(lab, selected_machines=selected_machines, links_futures=links_futures,
+                                                check_updates=check_updates)
+        except BaseException:
+            for future in links_futures.values():
+                future.cancel()
+            raise
+
+        # Raise errors of collision domains not attached to any device
+        self.executor.wait(list(links_futures.values()))
+
+    def _check_image_updates(self, machines: Iterable[Machine]) -> bool:
+        """Check for updates of the images of the devices before the deploy, if the user has to be prompted.
+
+        Prompts cannot be interleaved with the deploy progress, so with the `Prompt` update policy the updates are
+        resolved here. Otherwise, they are checked while deploying, together with the other image checks and pulls.
+
+        Args:
+            machines (Iterable[Machine]): The devices to deploy.
+
+        Returns:
+            bool: True if the updates still have to be checked while deploying, else False.
+        """
+        if Setting.get_instance().image_update_policy != 'Prompt':
+            return True
+
+        self.docker_image.check_updates_from_list(list(dict.fromkeys(machine.get_image() for machine in machines)))
+
+        return False
+
+    @privileged
+    def reconcile_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Update a running Kathara network scenario to match lab, recreating only the devices that changed.
+
+        Devices whose image, options, files or interfaces changed are recreated, devices that are not running are
+        deployed and running devices that are not in lab are undeployed. Collision domains that are not in lab, or
+        whose external interfaces changed, are deleted. Unchanged devices and collision domains are left untouched.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, reconcile only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        if selected_machines and not lab.find_machines(selected_machines):
+            machines_not_in_lab = selected_machines - set(lab.machines.keys())
+            raise MachineNotFoundError(f"The following devices are not in the network scenario: {machines_not_in_lab}.")
+
+        running_lab = Lab("running_lab")
+        running_lab.hash = lab.hash
+        self.update_lab_from_api(running_lab)
+
+        # Collision domains that are not in the network scenario anymore, or whose external interfaces changed
+        changed_links = set()
+        for network in self.get_links_api_objects(lab_hash=lab.hash):
+            link = lab.links.get(network.attrs["Labels"]["name"])
+            if link is None or network.attrs["Labels"].get("external", "") != \
+                    ";".join([x.get_full_name() for x in link.external]):
+                changed_links.add(network.attrs["Labels"]["name"])
+
+        machines_to_deploy = set()
+        for name in (selected_machines if selected_machines else lab.machines.keys()):
+            running_machine = running_lab.machines.get(name)
+            if running_machine is None or self._is_machine_changed(lab.machines[name], running_machine, changed_links):
+                machines_to_deploy.add(name)
+            else:
+                lab.machines[name].api_object = running_machine.api_object
+
+        machines_to_undeploy = machines_to_deploy & set(running_lab.machines.keys())
+        if not selected_machines:
+            machines_to_undeploy.update(set(running_lab.machines.keys()) - set(lab.machines.keys()))
+
+        logging.info("Recreating %d devices, deploying %d new devices and undeploying %d devices..." % (
+            len(machines_to_deploy & machines_to_undeploy), len(machines_to_deploy - machines_to_undeploy),
+            len(machines_to_undeploy - machines_to_deploy)
+        ))
+
+        if machines_to_undeploy:
+            self.docker_machine.undeploy(lab.hash, selected_machines=machines_to_undeploy)
+
+        # Collision domains still attached to other devices are not deleted
+        if changed_links:
+            self.docker_link.undeploy(lab.hash, selected_links=changed_links)
+
+        if machines_to_deploy:
+            self.deploy_lab(lab, selected_machines=machines_to_deploy)
+
+    @privileged
+    def resume_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Resume the deploy of a network scenario that failed partway, deploying only what is missing.
+
+        Devices and collision domains already deployed that match the network scenario are kept, the others are
+        recreated (see reconcile_lab). Transient errors of the manager APIs are retried with an exponential backoff.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, resume only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        for attempt in range(RESUME_RETRIES + 1):
+            try:
+                self.reconcile_lab(lab, selected_machines)
+                return
+            except (APIError, RequestsConnectionError, RequestsTimeout) as e:
+                if attempt == RESUME_RETRIES or not self._is_transient_error(e):
+                    raise e
+
+                backoff = RESUME_BACKOFF * 2 ** attempt
+                logging.warning("Deploy failed with a transient error (%s), resuming in %d seconds..." %
+                                (str(e), backoff))
+                time.sleep(backoff)
+
+    @staticmethod
+    def _is_transient_error(error: Exception) -> bool:
+        """Check if an error of the Docker APIs may not happen again when retrying the same request.
+
+        Args:
+            error (Exception): An error raised by the Docker client.
+
+        Returns:
+            bool: True if the error is transient (connection errors, timeouts and server errors), else False.
+        """
+        if isinstance(error, APIError):
+            return error.is_server_error()
+
+        return isinstance(error, (RequestsConnectionError, RequestsTimeout))
+
+    @staticmethod
+    def _is_machine_changed(machine: Machine, running_machine: Machine, changed_links: Set[str]) -> bool:
+        """Check if a running device must be recreated to match its definition in the network scenario.
+
+        Args:
+            machine (Kathara.model.Machine): The device, as defined in the network scenario.
+            running_machine (Kathara.model.Machine): The running device, built from the API objects.
+            changed_links (Set[str]): The names of the collision domains that are deleted.
+
+        Returns:
+            bool: True if the device must be recreated, else False.
+        """
+        container = running_machine.api_object
+        if container.status != "running" or container.labels.get("config_digest") != machine.get_config_digest():
+            return True
+
+        links = {link.name for link in machine.interfaces.values()}
+        running_links = {link.name for link in running_machine.interfaces.values()}
+
+        return links != running_links or len(links & changed_links) > 0
 
     @privileged
     def connect_machine_to_link(self, machine: Machine, link: Link) -> None:
@@ -241,7 +431,8 @@ class DockerManager(IManager):
 
     @privileged
     def undeploy_lab(self, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
-                     selected_machines: Optional[Set[str]] = None) -> None:
+                     selected_machines: Optional[Set[str]] = None, shutdown: bool = True,
+                     shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy a Kathara network scenario.
 
         Args:
@@ -250,6 +441,9 @@ class DockerManager(IManager):
             lab_name (Optional[str]): The name of the network scenario. Can be used as an alternative to lab_hash.
                 If None, lab_hash should be set.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -263,12 +457,16 @@ class DockerManager(IManager):
         if lab_name:
             lab_hash = utils.generate_urlsafe_hash(lab_name)
 
-        self.docker_machine.undeploy(lab_hash, selected_machines=selected_machines)
+        # Each collision domain is deleted as soon as its last device is gone, while other devices are still deleted.
+        release_links = self.docker_link.get_released_links_callback(lab_hash=lab_hash)
+        self.docker_machine.undeploy(lab_hash, selected_machines=selected_machines, shutdown=shutdown,
+                                     shutdown_timeout=shutdown_timeout, machine_undeployed_callback=release_links)
 
+        # Delete the remaining collision domains, not attached to any device.
         self.docker_link.undeploy(lab_hash)
 
     @privileged
-    def wipe(self, all_users: bool = False) -> None:
+    def wipe(self, all_users: bool = False, shutdown: bool = True, shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy all the running network scenarios.
 
         If multiuser scenarios are active, undeploy only current user devices.
@@ -276,6 +474,9 @@ class DockerManager(IManager):
         Args:
             all_users (bool): If false, undeploy only the current user network scenarios. If true, undeploy the
                 running network scenarios of all users.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -286,7 +487,9 @@ class DockerManager(IManager):
 
         user_name = utils.get_current_user_name() if not all_users else None
 
-        self.docker_machine.wipe(user=user_name)
+        release_links = self.docker_link.get_released_links_callback(user=user_name)
+        self.docker_machine.wipe(user=user_name, shutdown=shutdown, shutdown_timeout=shutdown_timeout,
+                                 machine_undeployed_callback=release_links)
         self.docker_link.wipe(user=user_name)
 
     @privileged
@@ -348,6 +551,70 @@ class DockerManager(IManager):
 
         return self.docker_machine.exec(lab_hash, machine_name, command, user=user_name, tty=False)
 
+    @privileged
+    def open_command_channel(self, machine_name: str, lab_hash: Optional[str] = None,
+                             lab_name: Optional[str] = None) -> CommandChannel:
+        """Open a persistent command channel on a device in a running network scenario.
+
+        The channel keeps a shell session open on the device, so repeated commands do not pay the setup of a new
+        exec session. It must be closed when it is not needed anymore, it can be used as a context manager.
+
+        Args:
+            machine_name (str): The name of the device.
+            lab_hash (Optional[str]): The hash of the network scenario where the device is deployed.
+            lab_name (Optional[str]): The name of the network scenario where the device is deployed.
+
+        Returns:
+            CommandChannel: A shell session on the device, that executes commands returning their stdout, stderr and
+                exit code.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If the specified device is not running.
+        """
+        if not lab_hash and not lab_name:
+            raise InvocationError("You must specify a running network scenario hash or name.")
+
+        user_name = utils.get_current_user_name()
+        if lab_name:
+            lab_hash = utils.generate_urlsafe_hash(lab_name)
+
+        return self.docker_machine.open_command_channel(lab_hash, machine_name, user=user_name)
+
+    @privileged
+    def exec_machines(self, command: List[str], machine_names: Optional[List[str]] = None,
+                      lab_hash: Optional[str] = None, lab_name: Optional[str] = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Exec a command on several devices of a running network scenario, concurrently.
+
+        The number of concurrent commands is bounded by the size of the manager workers pool.
+
+        Args:
+            command (List[str]): The command to exec on the devices.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+            lab_hash (Optional[str]): The hash of the network scenario where the devices are deployed.
+            lab_name (Optional[str]): The name of the network scenario where the devices are deployed.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code, as soon as they are
+                available. The last tuple of each device has no output and contains the exit code, None if the command
+                could not be executed on the device.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        if not lab_hash and not lab_name:
+            raise InvocationError("You must specify a running network scenario hash or name.")
+
+        user_name = utils.get_current_user_name()
+        if lab_name:
+            lab_hash = utils.generate_urlsafe_hash(lab_name)
+
+        return self.docker_machine.exec_machines(lab_hash, command, machine_names=machine_names, user=user_name)
+
     @privileged
     def copy_files(self, machine: Machine, guest_to_host: Dict[str, io.IOBase]) -> None:
         """Copy files on a running device in the specified paths.
@@ -367,6 +634,48 @@ class DockerManager(IManager):
                                        tar_data=tar_data
                                        )
 
+    @privileged
+    def sync_lab_files(self, lab: Lab, selected_machines: Set[str] = None,
+                       reload_command: Optional[str] = None) -> Dict[str, List[str]]:
+        """Copy into the running devices of a network scenario the files changed since they were last copied.
+
+        Only the files of the device folders and the startup/shutdown files that changed since they were copied (when
+        the device was deployed or in a previous call) are sent, in a single archive for each device. Files removed
+        from the host are not removed from the devices.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, copy only the files of the specified devices.
+            reload_command (Optional[str]): A shell command to run in each device whose files changed, after copying
+                them (e.g., to reload the configuration of a daemon).
+
+        Returns:
+            Dict[str, List[str]]: Keys are device names, values are the paths in the device of the copied files.
+
+        Raises:
+            MachineNotFoundError: If the specified devices are not in the network scenario.
+        """
+        if selected_machines and not lab.find_machines(selected_machines):
+            machines_not_in_lab = selected_machines - set(lab.machines.keys())
+            raise MachineNotFoundError(f"The following devices are not in the network scenario: {machines_not_in_lab}.")
+
+        containers = {container.labels["name"]: container for container in
+                      self.get_machines_api_objects(lab_hash=lab.hash)}
+
+        machines = []
+        for name in (selected_machines if selected_machines else lab.machines.keys()):
+            if name not in containers:
+                logging.warning("Device `%s` is not running, its files are not copied." % name)
+                continue
+
+            lab.machines[name].api_object = containers[name]
+            machines.append(lab.machines[name])
+
+        copied_files = self.executor.map(partial(self.docker_machine.sync_files, reload_command=reload_command),
+                                         machines)
+
+        return {machine.name: files for (machine, files) in zip(machines, copied_files)}
+
     @privileged
     def get_machine_api_object(self, machine_name: str, lab_hash: str = None, lab_name: str = None,
                                all_users: bool = False) -> docker.models.containers.Container:
@@ -501,7 +810,6 @@ class DockerManager(IManager):
         )
 
         for container in lab_containers:
-            container.reload()
             device = reconstructed_lab.get_or_new_machine(container.labels["name"])
             device.api_object = container
 
@@ -554,18 +862,12 @@ class DockerManager(IManager):
         """
         running_containers = self.get_machines_api_objects(lab_hash=lab.hash)
 
-        deployed_networks = dict(
-            map(lambda x: (x.name, x), self.get_links_api_objects(lab_hash=lab.hash))
-        )
-        for network in deployed_networks.values():
-            network.reload()
-
-        deployed_networks_by_link_name = dict(
-            map(lambda x: (x.attrs["Labels"]["name"], x), self.get_links_api_objects(lab_hash=lab.hash))
-        )
+        # Labels are returned by the list call, so networks are listed only once and do not need to be reloaded
+        lab_networks = self.get_links_api_objects(lab_hash=lab.hash)
+        deployed_networks = dict(map(lambda x: (x.name, x), lab_networks))
+        deployed_networks_by_link_name = dict(map(lambda x: (x.attrs["Labels"]["name"], x), lab_networks))
 
         for container in running_containers:
-            container.reload()
             device = lab.get_or_new_machine(container.labels["name"])
             device.api_object = container
 
@@ -711,6 +1013,18 @@ class DockerManager(IManager):
         """
         self.docker_image.check(image_name)
 
+    @privileged
+    def upgrade_plugin(self) -> None:
+        """Upgrade the Kathara Network Plugin to the latest version.
+
+        Returns:
+            None
+
+        Raises:
+            DockerPluginError: If the Kathara Network Plugin is not enabled on remote Docker connection.
+        """
+        self.docker_plugin.check_and_download_plugin(upgrade=True)
+
     @privileged
     def get_release_version(self) -> str:
         """Return the current manager version.
@@ -720,6 +1034,14 @@ class DockerManager(IManager):
         """
         return self.client.version()["Version"]
 
+    def close(self) -> None:
+        """Release the resources of the manager, shutting down its pool of workers.
+
+        Returns:
+            None
+        """
+        self.executor.shutdown()
+
     @staticmethod
     def get_formatted_manager_name() -> str:
         """Return a formatted string containing the current manager name.
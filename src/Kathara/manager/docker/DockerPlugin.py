@@ -1,6 +1,7 @@
 import logging
-from typing import Callable
+from typing import Callable, Dict, Any, Optional
 
+import docker.models.plugins
 from docker import DockerClient
 from docker.errors import NotFound
 
@@ -13,6 +14,10 @@ PLUGIN_NAME = "kathara/katharanp:" + utils.get_architecture()
 XTABLES_CONFIGURATION_KEY = "xtables_lock"
 XTABLES_LOCK_PATH = "/run/xtables.lock"
 
+# The plugin health record is cached on disk for this number of seconds, after that the plugin is checked again
+PLUGIN_CACHE_NAMESPACE = "plugin"
+PLUGIN_CACHE_TTL = 604800
+
 
 class DockerPlugin(object):
     """Class responsible for interacting with Docker Plugins."""
@@ -21,9 +26,15 @@ class DockerPlugin(object):
     def __init__(self, client: DockerClient):
         self.client: DockerClient = client
 
-    def check_and_download_plugin(self) -> None:
+    def check_and_download_plugin(self, upgrade: bool = False) -> None:
         """Check the presence of the Kathara Network Plugin and download it or upgrade it, if needed.
 
+        The result of the check is cached, keyed by the Docker daemon URL and the plugin name. If the same plugin has
+        already been checked on the daemon, it is not configured again.
+
+        Args:
+            upgrade (bool): If True, upgrade the plugin even if it has already been checked.
+
         Returns:
             None
 
@@ -31,11 +42,12 @@ class DockerPlugin(object):
             DockerPluginError: If the Kathara Network Plugin is not found on remote Docker connection.
             DockerPluginError: If the Kathara Network Plugin is not enabled on remote Docker connection.
         """
+        # The daemon URL is known without any request, the plugin ID in the health record identifies the daemon
+        cache_key = "%s:%s" % (self.client.api.base_url, PLUGIN_NAME)
+
         try:
             logging.debug("Checking plugin `%s`..." % PLUGIN_NAME)
             plugin = self.client.plugins.get(PLUGIN_NAME)
-            # Check for plugin updates.
-            plugin.upgrade()
         except NotFound:
             if Setting.get_instance().remote_url is None:
                 logging.info("Installing Kathara Network Plugin...")
@@ -43,6 +55,14 @@ class DockerPlugin(object):
                 logging.info("Kathara Network Plugin installed successfully!")
             else:
                 raise DockerPluginError("Kathara Network Plugin not found on remote Docker connection.")
+        else:
+            if upgrade:
+                self._upgrade_plugin(plugin)
+            else:
+                health = utils.get_cached_metadata(PLUGIN_CACHE_NAMESPACE, cache_key, ttl=PLUGIN_CACHE_TTL)
+                if health is not None and health == self._get_health(plugin):
+                    logging.debug("Plugin `%s` already checked, skipping..." % PLUGIN_NAME)
+                    return
 
         if Setting.get_instance().remote_url is None:
             xtables_lock_mount = self._get_xtables_lock_mount()
@@ -65,6 +85,52 @@ class DockerPlugin(object):
             if not plugin.enabled:
                 raise DockerPluginError("Kathara Network Plugin not enabled on remote Docker connection.")
 
+        plugin.reload()
+        utils.cache_metadata(PLUGIN_CACHE_NAMESPACE, cache_key, self._get_health(plugin))
+
+    @staticmethod
+    def _upgrade_plugin(plugin: docker.models.plugins.Plugin) -> None:
+        """Upgrade the specified plugin to the latest version.
+
+        The plugin is left disabled on a local Docker connection, so that it is configured and enabled again.
+
+        Args:
+            plugin (docker.models.plugins.Plugin): The Kathara Network Plugin.
+
+        Returns:
+            None
+        """
+        logging.info("Upgrading Kathara Network Plugin...")
+        if plugin.enabled:
+            plugin.disable()
+
+        for _ in plugin.upgrade():
+            pass
+
+        if Setting.get_instance().remote_url is not None:
+            plugin.enable()
+
+    @staticmethod
+    def _get_health(plugin: docker.models.plugins.Plugin) -> Optional[Dict[str, Any]]:
+        """Return the health record of the specified plugin.
+
+        Args:
+            plugin (docker.models.plugins.Plugin): The Kathara Network Plugin.
+
+        Returns:
+            Optional[Dict[str, Any]]: The ID and the xtables.lock source of the plugin, None if it is not enabled.
+        """
+        if not plugin.enabled:
+            return None
+
+        mounts = plugin.attrs["Settings"]["Mounts"]
+        xtables_lock_sources = [x["Source"] for x in mounts if x["Name"] == XTABLES_CONFIGURATION_KEY]
+
+        return {
+            'id': plugin.id,
+            'xtables_lock': xtables_lock_sources.pop() if xtables_lock_sources else None
+        }
+
     def _get_xtables_lock_mount(self) -> Callable:
         def _mount_xtables_lock_linux():
             iptables_version = Networking.get_iptables_version()
@@ -0,0 +1,40 @@
+from typing import Optional, Tuple
+
+import docker.models.containers
+from docker import DockerClient
+from docker.utils.socket import next_frame_header, read_exactly, SocketError, STDOUT
+
+from ....foundation.manager.channel.CommandChannel import CommandChannel, CHANNEL_SHELL
+
+
+class DockerCommandChannel(CommandChannel):
+    """A long-lived shell session on a Docker container, attached through a single exec instance."""
+    __slots__ = ['_socket']
+
+    def __init__(self, client: DockerClient, container: docker.models.containers.Container) -> None:
+        super().__init__(container.labels['name'])
+
+        resp = client.api.exec_create(container.id, CHANNEL_SHELL, stdout=True, stderr=True, stdin=True, tty=False)
+        self._socket = client.api.exec_start(resp['Id'], tty=False, socket=True)
+
+    def _write(self, data: bytes) -> None:
+        # On unix sockets, the exec socket is a read-only SocketIO wrapping the connection
+        getattr(self._socket, '_sock', self._socket).sendall(data)
+
+    def _read(self) -> Optional[Tuple[Optional[bytes], Optional[bytes]]]:
+        # Without a tty, stdout and stderr are multiplexed in frames with a header
+        (stream, size) = next_frame_header(self._socket)
+        if size < 0:
+            return None
+
+        try:
+            data = read_exactly(self._socket, size)
+        except SocketError:
+            return None
+
+        return (data, None) if stream == STDOUT else (None, data)
+
+    def _close(self) -> None:
+        self._socket.close()
+        if hasattr(self._socket, '_sock'):
+            self._socket._sock.close()
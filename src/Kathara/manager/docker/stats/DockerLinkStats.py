@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from docker.models.containers import Container
 from docker.models.networks import Network
@@ -18,8 +18,14 @@ class DockerLinkStats(ILinkStats):
         enable_ipv6 (bool): True if ipv6 is enabled, else None.
         external (List[str]): A list with the name of the attached external networks.
         containers (List[Container]): A list of the Docker Container associated with the Docker Network.
+        outdated (bool): True if the attached containers must be read again from the Docker Network, else False.
+        rx_bytes (Optional[int]): The bytes entering the collision domain, None if not available.
+        tx_bytes (Optional[int]): The bytes delivered by the collision domain, None if not available.
+        rx_packets (Optional[int]): The packets entering the collision domain, None if not available.
+        tx_packets (Optional[int]): The packets delivered by the collision domain, None if not available.
     """
-    __slots__ = ['link_api_object', 'lab_hash', 'name', 'network_name', 'user', 'enable_ipv6', 'external', 'containers']
+    __slots__ = ['link_api_object', 'lab_hash', 'name', 'network_name', 'user', 'enable_ipv6', 'external', 'containers',
+                 'outdated', 'rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets']
 
     def __init__(self, link_api_object: Network):
         self.link_api_object: Network = link_api_object
@@ -31,18 +37,51 @@ class DockerLinkStats(ILinkStats):
         external = link_api_object.attrs.get('Labels')['external']
         self.external: List[str] = external.split(";") if external else []
         self.containers: List[Container] = []
+        self.outdated: bool = True
+        self.rx_bytes: Optional[int] = None
+        self.tx_bytes: Optional[int] = None
+        self.rx_packets: Optional[int] = None
+        self.tx_packets: Optional[int] = None
         self.update()
 
     def update(self) -> None:
         """Update dynamic statistics with the current ones.
 
+        The Docker Network is inspected again only if it is outdated, since its attached containers change only on
+        Docker network events.
+
         Returns:
             None
         """
-        self.link_api_object.reload()
+        if not self.outdated:
+            return
+
+        # Reset before reading, so events received meanwhile trigger another read
+        self.outdated = False
+        try:
+            self.link_api_object.reload()
+        except Exception:
+            self.outdated = True
+            raise
 
         self.containers = [container for container in self.link_api_object.containers]
 
+    def update_traffic(self, traffic: Optional[Dict[str, int]]) -> None:
+        """Update the traffic counters of the collision domain.
+
+        Args:
+            traffic (Optional[Dict[str, int]]): A dict with "rx_bytes", "tx_bytes", "rx_packets" and "tx_packets"
+                keys. If None, the counters are not available.
+
+        Returns:
+            None
+        """
+        traffic = traffic or {}
+        self.rx_bytes = traffic.get('rx_bytes', None)
+        self.tx_bytes = traffic.get('tx_bytes', None)
+        self.rx_packets = traffic.get('rx_packets', None)
+        self.tx_packets = traffic.get('tx_packets', None)
+
     def to_dict(self) -> Dict[str, Any]:
         """Transform statistics into a dict representation.
 
@@ -56,7 +95,11 @@ class DockerLinkStats(ILinkStats):
             "user": self.user,
             "enable_ipv6": self.enable_ipv6,
             "external": self.external,
-            "containers": self.containers
+            "containers": self.containers,
+            "rx_bytes": self.rx_bytes,
+            "tx_bytes": self.tx_bytes,
+            "rx_packets": self.rx_packets,
+            "tx_packets": self.tx_packets
         }
 
     def __repr__(self) -> str:
@@ -76,6 +119,9 @@ class DockerLinkStats(ILinkStats):
             formatted_stats += f"\nExternal Interfaces:"
             for ext in self.external:
                 formatted_stats += f"\n\t- {ext}\n"
+        if self.rx_bytes is not None:
+            formatted_stats += f"\nRX: {self.rx_packets} packets, {self.rx_bytes} bytes"
+            formatted_stats += f"\nTX: {self.tx_packets} packets, {self.tx_bytes} bytes"
         if self.containers:
             formatted_stats += f"\nAttached Devices:"
             for container in self.containers:
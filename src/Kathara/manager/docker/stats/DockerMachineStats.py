@@ -1,4 +1,4 @@
-from typing import Dict, Any, Generator, Optional
+from typing import Dict, Any, Optional
 
 from docker.models.containers import Container
 
@@ -11,7 +11,7 @@ class DockerMachineStats(IMachineStats):
 
     Attributes:
         machine_api_object (Container): The Docker Container associated with this statistics.
-        stats (Generator[Dict[str, Any], None, None]): A generator containing dicts with the Docker statistics
+        one_shot (bool): If True, statistics are read without waiting for a second sample (Docker API >= 1.41).
         lab_hash (str): The hash identifier of the network scenario of the Docker Container.
         name (str): The name of the device.
         container_name (str): The Docker Container Name.
@@ -24,12 +24,12 @@ class DockerMachineStats(IMachineStats):
         mem_percent (str): The memory usage of the Docker Container as a percentage.
         net_usage (str): The network usage of the Docker Container.
     """
-    __slots__ = ['machine_api_object', 'stats', 'lab_hash', 'name', 'container_name', 'user', 'status', 'image',
+    __slots__ = ['machine_api_object', 'one_shot', 'lab_hash', 'name', 'container_name', 'user', 'status', 'image',
                  'pids', 'cpu_usage', 'mem_usage', 'mem_percent', 'net_usage']
 
-    def __init__(self, machine_api_object: Container):
+    def __init__(self, machine_api_object: Container, one_shot: bool = False):
         self.machine_api_object: Container = machine_api_object
-        self.stats: Generator[Dict[str, Any], None, None] = machine_api_object.stats(stream=True, decode=True)
+        self.one_shot: bool = one_shot
         # Static Information
         self.lab_hash: str = machine_api_object.labels['lab_hash']
         self.name: str = machine_api_object.labels['name']
@@ -44,15 +44,18 @@ class DockerMachineStats(IMachineStats):
         self.mem_percent: str = "-"
         self.net_usage: str = "-"
 
-        self.update()
-
     def update(self) -> None:
         """Update dynamic statistics with the current ones.
 
+        Each call performs a single request, without keeping a streaming connection open.
+
         Returns:
             None
         """
-        updated_stats = next(self.stats)
+        if self.one_shot:
+            updated_stats = self.machine_api_object.stats(stream=False, one_shot=True)
+        else:
+            updated_stats = self.machine_api_object.stats(stream=False)
 
         self.status = self.machine_api_object.status
         self.pids = updated_stats['pids_stats']['current'] if 'current' in updated_stats['pids_stats'] else 0
@@ -4,7 +4,6 @@ import logging
 import re
 from functools import partial
 from multiprocessing import Manager
-from multiprocessing.dummy import Pool
 from typing import Dict, Optional, Set, Any, List, Generator
 
 from kubernetes import client
@@ -14,9 +13,9 @@ from kubernetes.client.rest import ApiException
 from .KubernetesConfig import KubernetesConfig
 from .KubernetesNamespace import KubernetesNamespace
 from .stats.KubernetesLinkStats import KubernetesLinkStats
-from ... import utils
 from ...event.EventDispatcher import EventDispatcher
 from ...exceptions import LinkNotFoundError
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
 from ...model.Lab import Lab
 from ...model.Link import Link
 from ...setting.Setting import Setting
@@ -30,13 +29,15 @@ K8S_NET_PLURAL = "network-attachment-definitions"
 
 class KubernetesLink(object):
     """The class responsible for deploying Kathara collision domains as Kubernetes networks and interact with them."""
-    __slots__ = ['client', 'kubernetes_namespace', 'seed']
+    __slots__ = ['client', 'kubernetes_namespace', 'seed', 'executor']
 
-    def __init__(self, kubernetes_namespace: KubernetesNamespace) -> None:
+    def __init__(self, kubernetes_namespace: KubernetesNamespace, executor: ManagerExecutor) -> None:
         self.client: custom_objects_api.CustomObjectsApi = custom_objects_api.CustomObjectsApi()
 
         self.kubernetes_namespace: KubernetesNamespace = kubernetes_namespace
 
+        self.executor: ManagerExecutor = executor
+
         self.seed: str = KubernetesConfig.get_cluster_user()
 
     def deploy_links(self, lab: Lab, selected_links: Set[str] = None) -> None:
@@ -53,11 +54,6 @@ class KubernetesLink(object):
             else lab.links.items()
 
         if len(links) > 0:
-            pool_size = utils.get_pool_size()
-            link_pool = Pool(pool_size)
-
-            items = utils.chunk_list(links, pool_size)
-
             EventDispatcher.get_instance().dispatch("links_deploy_started", items=links)
 
             with Manager() as manager:
@@ -66,8 +62,7 @@ class KubernetesLink(object):
                     network_id: 1 for network_id in self._get_existing_network_ids()
                 })
 
-                for chunk in items:
-                    link_pool.map(func=partial(self._deploy_link, network_ids), iterable=chunk)
+                self.executor.map(partial(self._deploy_link, network_ids), links)
 
             EventDispatcher.get_instance().dispatch("links_deploy_ended")
 
@@ -131,15 +126,9 @@ class KubernetesLink(object):
             networks = [item for item in networks if item["metadata"]["name"] in selected_links]
 
         if len(networks) > 0:
-            pool_size = utils.get_pool_size()
-            links_pool = Pool(pool_size)
-
-            items = utils.chunk_list(networks, pool_size)
-
             EventDispatcher.get_instance().dispatch("links_undeploy_started", items=networks)
 
-            for chunk in items:
-                links_pool.map(func=self._undeploy_link, iterable=chunk)
+            self.executor.map(self._undeploy_link, networks)
 
             EventDispatcher.get_instance().dispatch("links_undeploy_ended")
 
@@ -151,13 +140,7 @@ class KubernetesLink(object):
         """
         networks = self.get_links_api_objects_by_filters()
 
-        pool_size = utils.get_pool_size()
-        links_pool = Pool(pool_size)
-
-        items = utils.chunk_list(networks, pool_size)
-
-        for chunk in items:
-            links_pool.map(func=self._undeploy_link, iterable=chunk)
+        self.executor.map(self._undeploy_link, networks)
 
     def _undeploy_link(self, link_item: Any) -> None:
         """Undeploy a Kubernetes network.
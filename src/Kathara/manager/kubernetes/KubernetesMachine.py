@@ -4,8 +4,9 @@ import logging
 import re
 import shlex
 import sys
+import time
 import uuid
-from multiprocessing.dummy import Pool
+from functools import partial
 from typing import Optional, Set, List, Union, Generator, Tuple, Dict
 
 from kubernetes import client
@@ -17,10 +18,13 @@ from kubernetes.watch import watch
 
 from .KubernetesConfigMap import KubernetesConfigMap
 from .KubernetesNamespace import KubernetesNamespace
+from .KubernetesPodInformer import KubernetesPodInformer
+from .channel.KubernetesCommandChannel import KubernetesCommandChannel
 from .stats.KubernetesMachineStats import KubernetesMachineStats
-from ... import utils
 from ...event.EventDispatcher import EventDispatcher
 from ...exceptions import MachineAlreadyExistsError, MachineNotFoundError, MachineNotReadyError
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
+from ...foundation.manager.stats import STATS_REFRESH_INTERVAL
 from ...model.Lab import Lab
 from ...model.Machine import Machine
 from ...setting.Setting import Setting
@@ -115,9 +119,9 @@ SHUTDOWN_COMMANDS = [
 
 class KubernetesMachine(object):
     """Class responsible for managing Kathara devices representation in Kubernetes."""
-    __slots__ = ['client', 'core_client', 'kubernetes_config_map', 'kubernetes_namespace']
+    __slots__ = ['client', 'core_client', 'kubernetes_config_map', 'kubernetes_namespace', 'executor', 'pod_informer']
 
-    def __init__(self, kubernetes_namespace: KubernetesNamespace) -> None:
+    def __init__(self, kubernetes_namespace: KubernetesNamespace, executor: ManagerExecutor) -> None:
         self.client: apps_v1_api.AppsV1Api = apps_v1_api.AppsV1Api()
         self.core_client: core_v1_api.CoreV1Api = core_v1_api.CoreV1Api()
 
@@ -125,6 +129,10 @@ class KubernetesMachine(object):
 
         self.kubernetes_namespace: KubernetesNamespace = kubernetes_namespace
 
+        self.executor: ManagerExecutor = executor
+
+        self.pod_informer: KubernetesPodInformer = KubernetesPodInformer(self.core_client)
+
     def deploy_machines(self, lab: Lab, selected_machines: Set[str] = None) -> None:
         """Deploy all the devices contained in lab.machines.
 
@@ -148,18 +156,11 @@ class KubernetesMachine(object):
 
         # Deploy all lab machines.
         # If there is no lab.dep file, machines can be deployed using multithreading.
-        # If not, they're started sequentially
+        # If not, each machine is started as soon as the machines it depends on are started
         if not lab.has_dependencies:
-            pool_size = utils.get_pool_size()
-            machines_pool = Pool(pool_size)
-
-            items = utils.chunk_list(machines, pool_size)
-
-            for chunk in items:
-                machines_pool.map(func=self._deploy_machine, iterable=chunk)
+            self.executor.map(self._deploy_machine, machines)
         else:
-            for item in machines:
-                self._deploy_machine(item)
+            self.executor.map_graph(self._deploy_machine, {item[0]: item for item in machines}, lab.dependencies)
 
         self._wait_machines_startup(lab, selected_machines if selected_machines else None)
 
@@ -436,7 +437,7 @@ class KubernetesMachine(object):
                                    spec=deployment_spec
                                    )
 
-    def undeploy(self, lab_hash: str, selected_machines: Optional[Set[str]] = None) -> None:
+    def undeploy(self, lab_hash: str, selected_machines: Optional[Set[str]] = None, shutdown: bool = True) -> None:
         """Undeploy all the running Kubernetes deployments and Pods contained in the scenario defined by the lab_hash.
 
         If selected_machines is not None, undeploy only the specified devices.
@@ -444,6 +445,7 @@ class KubernetesMachine(object):
         Args:
             lab_hash (str): The hash of the network scenario to undeploy.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
 
         Returns:
             None
@@ -455,13 +457,8 @@ class KubernetesMachine(object):
             selected_machines = {item.metadata.labels["name"] for item in pods}
 
         if len(pods) > 0:
-            pool_size = utils.get_pool_size()
-            machines_pool = Pool(pool_size)
-
-            items = utils.chunk_list(pods, pool_size)
-
-            for chunk in items:
-                machines_pool.map(func=self._undeploy_machine, iterable=chunk)
+            self.executor.map(self._undeploy_machine if shutdown else partial(self._undeploy_machine, shutdown=False),
+                              pods)
 
             self._wait_machines_shutdown(lab_hash, selected_machines)
 
@@ -503,31 +500,27 @@ class KubernetesMachine(object):
         """
         pods = self.get_machines_api_objects_by_filters()
 
-        pool_size = utils.get_pool_size()
-        machines_pool = Pool(pool_size)
-
-        items = utils.chunk_list(pods, pool_size)
-
-        for chunk in items:
-            machines_pool.map(func=self._undeploy_machine, iterable=chunk)
+        self.executor.map(self._undeploy_machine, pods)
 
-    def _undeploy_machine(self, pod_api_object: client.V1Pod) -> None:
+    def _undeploy_machine(self, pod_api_object: client.V1Pod, shutdown: bool = True) -> None:
         """Undeploy a Kubernetes pod.
 
         Args:
             pod_api_object (client.V1Pod): The Kubernetes pod to undeploy.
+            shutdown (bool): If False, do not run the shutdown commands of the device.
 
         Returns:
             None
         """
 
-        self._delete_machine(pod_api_object)
+        self._delete_machine(pod_api_object, shutdown=shutdown)
 
-    def _delete_machine(self, pod_api_object: client.V1Pod) -> None:
+    def _delete_machine(self, pod_api_object: client.V1Pod, shutdown: bool = True) -> None:
         """Delete the Kubernetes deployment and Pod associated to pod_api_object.
 
         Args:
             pod_api_object (client.V1Pod): A Kubernetes Pod API object.
+            shutdown (bool): If False, delete the deployment without running the shutdown commands.
 
         Returns:
             None
@@ -539,17 +532,18 @@ class KubernetesMachine(object):
         shutdown_commands_string = "; ".join(SHUTDOWN_COMMANDS).format(machine_name=machine_name)
 
         try:
-            shell_env_value = self.get_env_var_value_from_pod(pod_api_object, "_MEGALOS_SHELL")
-            shell = shell_env_value if shell_env_value else Setting.get_instance().device_shell
-            output = self.exec(machine_namespace,
-                               machine_name,
-                               command=[shell, '-c', shutdown_commands_string],
-                               )
+            if shutdown:
+                shell_env_value = self.get_env_var_value_from_pod(pod_api_object, "_MEGALOS_SHELL")
+                shell = shell_env_value if shell_env_value else Setting.get_instance().device_shell
+                output = self.exec(machine_namespace,
+                                   machine_name,
+                                   command=[shell, '-c', shutdown_commands_string],
+                                   )
 
-            try:
-                next(output)
-            except StopIteration:
-                pass
+                try:
+                    next(output)
+                except StopIteration:
+                    pass
 
             deployment_name = self.get_deployment_name(machine_name)
             self.kubernetes_config_map.delete_for_machine(deployment_name, machine_namespace)
@@ -727,6 +721,102 @@ class KubernetesMachine(object):
         if not is_stream:
             yield result['stdout'].encode('utf-8'), result['stderr'].encode('utf-8')
 
+    def open_command_channel(self, lab_hash: str, machine_name: str) -> KubernetesCommandChannel:
+        """Open a persistent command channel on the Kubernetes Pod specified by the lab_hash and the machine_name.
+
+        Args:
+            lab_hash (str): The hash of the network scenario containing the device.
+            machine_name (str): The name of the device.
+
+        Returns:
+            KubernetesCommandChannel: A shell session on the Pod, that executes framed commands.
+
+        Raises:
+            MachineNotFoundError: If the specified device is not running.
+        """
+        pods = self.get_machines_api_objects_by_filters(lab_hash=lab_hash, machine_name=machine_name)
+        if not pods:
+            raise MachineNotFoundError("The specified device `%s` is not running." % machine_name)
+
+        logging.debug("Opening command channel on device with name: %s" % machine_name)
+
+        return KubernetesCommandChannel(self.core_client, pods.pop())
+
+    def exec_machines(self, lab_hash: str, command: Union[str, List], machine_names: Optional[List[str]] = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Execute the command on several Kubernetes Pods of a network scenario, concurrently.
+
+        Args:
+            lab_hash (str): The hash of the network scenario containing the devices.
+            command (Union[str, List]): The command to execute.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code. The last tuple of
+                each device has no output and contains the exit code, None if it could not be retrieved.
+
+        Raises:
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        pods = {pod.metadata.labels['name']: pod for pod in self.get_machines_api_objects_by_filters(lab_hash=lab_hash)}
+        if machine_names is not None:
+            not_running = [name for name in machine_names if name not in pods]
+            if not_running:
+                raise MachineNotFoundError("The specified devices `%s` are not running." % ", ".join(not_running))
+            pods = {name: pods[name] for name in machine_names}
+
+        command = shlex.split(command) if type(command) == str else command
+        logging.debug("Executing command `%s` on %d devices..." % (command, len(pods)))
+
+        for machine_name, (stdout, stderr, exit_code) in self.executor.stream(
+                partial(self._exec_stream, command), pods
+        ):
+            yield machine_name, stdout, stderr, exit_code
+
+    def _exec_stream(self, command: List[str], pod: client.V1Pod) \
+            -> Generator[Tuple[Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Execute the command on a Kubernetes Pod, streaming its output and then its exit code.
+
+        Args:
+            command (List[str]): The command to execute.
+            pod (client.V1Pod): The Kubernetes Pod on which the command is executed.
+
+        Returns:
+            Generator[Tuple[Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the stdout and the stderr in bytes, followed by a tuple with the exit code.
+        """
+        response = stream(self.core_client.connect_get_namespaced_pod_exec,
+                          name=pod.metadata.name,
+                          namespace=pod.metadata.namespace,
+                          command=command,
+                          stdout=True,
+                          stderr=True,
+                          stdin=False,
+                          tty=False,
+                          _preload_content=False
+                          )
+
+        try:
+            while response.is_open():
+                # Wait for new data instead of polling the channels
+                response.update(timeout=1)
+                stdout = response.read_stdout() if response.peek_stdout() else None
+                stderr = response.read_stderr() if response.peek_stderr() else None
+                if stdout or stderr:
+                    yield stdout.encode('utf-8') if stdout else None, stderr.encode('utf-8') if stderr else None, None
+
+            try:
+                exit_code = response.returncode
+            except (KeyError, IndexError, TypeError, ValueError):
+                # The error channel does not contain an exit code (e.g., the binary does not exist)
+                exit_code = None
+        finally:
+            response.close()
+
+        yield None, None, exit_code
+
     def copy_files(self, machine_api_object: client.V1Deployment, path: str, tar_data: bytes) -> None:
         """Copy the files contained in tar_data in the Kubernetes deployment path specified by the machine_api_object.
 
@@ -767,19 +857,16 @@ class KubernetesMachine(object):
         if machine_name:
             filters.append("name=%s" % machine_name)
 
-        # Get all Kathara namespaces if lab_hash is None
-        namespaces = list(map(lambda x: x.metadata.name, self.kubernetes_namespace.get_all())) \
-            if not lab_hash else [lab_hash]
-
-        machines = []
-        for namespace in namespaces:
-            machines.extend(self.core_client.list_namespaced_pod(namespace=namespace,
-                                                                 label_selector=",".join(filters),
-                                                                 timeout_seconds=9999
-                                                                 ).items
-                            )
+        # Get the Pods of all Kathara namespaces with a single request if lab_hash is None
+        if not lab_hash:
+            return self.core_client.list_pod_for_all_namespaces(label_selector=",".join(filters),
+                                                                timeout_seconds=9999
+                                                                ).items
 
-        return machines
+        return self.core_client.list_namespaced_pod(namespace=lab_hash,
+                                                    label_selector=",".join(filters),
+                                                    timeout_seconds=9999
+                                                    ).items
 
     def get_machines_stats(self, lab_hash: str = None, machine_name: str = None) -> \
             Generator[Dict[str, KubernetesMachineStats], None, None]:
@@ -794,24 +881,33 @@ class KubernetesMachine(object):
             Generator[Dict[str, KubernetesMachineStats], None, None]: A generator containing device name as keys and
                 KubernetesMachineStats as values.
         """
+        # Pods are read from the informer cache, so each refresh does not call the API. Statistics are kept across
+        # refreshes and updated only when the Pod changes.
+        machines_stats = {}
+        snapshot_time = None
         while True:
-            pods = self.get_machines_api_objects_by_filters(lab_hash=lab_hash, machine_name=machine_name)
+            if snapshot_time is not None:
+                time.sleep(max(0.0, snapshot_time - time.monotonic()))
+            snapshot_time = time.monotonic() + STATS_REFRESH_INTERVAL
+
+            pods = self.pod_informer.get_pods(lab_hash=lab_hash, machine_name=machine_name)
             if not pods:
                 if not machine_name:
                     raise MachineNotFoundError("No devices found.")
                 else:
                     raise MachineNotFoundError(f"Devices with name {machine_name} not found.")
 
+            previous_stats = machines_stats
             machines_stats = {}
-
             for pod in pods:
-                machines_stats[pod.metadata.name] = KubernetesMachineStats(pod)
-
-            for machine_stats in machines_stats.values():
-                try:
+                machine_stats = previous_stats.get(pod.metadata.name, None)
+                if machine_stats is None:
+                    machine_stats = KubernetesMachineStats(pod)
+                elif machine_stats.machine_api_object is not pod:
+                    machine_stats.machine_api_object = pod
                     machine_stats.update()
-                except StopIteration:
-                    continue
+
+                machines_stats[pod.metadata.name] = machine_stats
 
             yield machines_stats
 
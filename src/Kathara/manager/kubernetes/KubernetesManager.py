@@ -15,24 +15,31 @@ from .stats.KubernetesMachineStats import KubernetesMachineStats
 from ... import utils
 from ...exceptions import NotSupportedError, MachineNotFoundError, LinkNotFoundError, LabAlreadyExistsError, \
     InvocationError, LabNotFoundError
+from ...foundation.manager.channel.CommandChannel import CommandChannel
 from ...foundation.manager.IManager import IManager
+from ...foundation.manager.ManagerExecutor import ManagerExecutor
 from ...model.Lab import Lab
 from ...model.Link import Link
 from ...model.Machine import Machine
+from ...setting.Setting import Setting
 from ...utils import pack_files_for_tar
 
 
 class KubernetesManager(IManager):
     """Class responsible for interacting with Kubernetes API."""
 
-    __slots__ = ['k8s_namespace', 'k8s_machine', 'k8s_link']
+    __slots__ = ['executor', 'k8s_namespace', 'k8s_machine', 'k8s_link']
 
     def __init__(self) -> None:
         KubernetesConfig.load_kube_config()
 
+        self.executor: ManagerExecutor = ManagerExecutor(
+            max_workers=lambda: Setting.get_instance().pool_size or utils.get_pool_size()
+        )
+
         self.k8s_namespace: KubernetesNamespace = KubernetesNamespace()
-        self.k8s_machine: KubernetesMachine = KubernetesMachine(self.k8s_namespace)
-        self.k8s_link: KubernetesLink = KubernetesLink(self.k8s_namespace)
+        self.k8s_machine: KubernetesMachine = KubernetesMachine(self.k8s_namespace, self.executor)
+        self.k8s_link: KubernetesLink = KubernetesLink(self.k8s_namespace, self.executor)
 
     def deploy_machine(self, machine: Machine) -> None:
         """Deploy a Kathara device.
@@ -113,6 +120,36 @@ class KubernetesManager(IManager):
             else:
                 raise e
 
+    def reconcile_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Update a running Kathara network scenario to match lab.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, reconcile only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            NotSupportedError: Unable to reconcile a running network scenario on Kubernetes.
+        """
+        raise NotSupportedError("Unable to reconcile a running network scenario.")
+
+    def resume_lab(self, lab: Lab, selected_machines: Set[str] = None) -> None:
+        """Resume the deploy of a network scenario that failed partway.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, resume only the specified devices.
+
+        Returns:
+            None
+
+        Raises:
+            NotSupportedError: Unable to resume the deploy of a network scenario on Kubernetes.
+        """
+        raise NotSupportedError("Unable to resume the deploy of a network scenario.")
+
     def connect_machine_to_link(self, machine: Machine, link: Link) -> None:
         """Connect a Kathara device to a collision domain.
 
@@ -218,7 +255,8 @@ class KubernetesManager(IManager):
         self.k8s_link.undeploy(link.lab.hash, selected_links={network_name})
 
     def undeploy_lab(self, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
-                     selected_machines: Optional[Set[str]] = None) -> None:
+                     selected_machines: Optional[Set[str]] = None, shutdown: bool = True,
+                     shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy a Kathara network scenario.
 
         Args:
@@ -227,6 +265,9 @@ class KubernetesManager(IManager):
             lab_name (Optional[str]): The name of the network scenario. Can be used as an alternative to lab_hash.
                 If None, lab_hash should be set.
             selected_machines (Optional[Set[str]]): If not None, undeploy only the specified devices.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
@@ -242,6 +283,9 @@ class KubernetesManager(IManager):
 
         lab_hash = lab_hash.lower()
 
+        if shutdown_timeout is not None:
+            logging.warning("Shutdown timeout has no effect on Megalos.")
+
         # When only some machines should be undeployed, special checks are required.
         if selected_machines:
             # Get all current deployed networks and save only their name
@@ -272,7 +316,7 @@ class KubernetesManager(IManager):
             networks_to_delete = None
             running_machines = set()
 
-        self.k8s_machine.undeploy(lab_hash, selected_machines=selected_machines)
+        self.k8s_machine.undeploy(lab_hash, selected_machines=selected_machines, shutdown=shutdown)
         self.k8s_link.undeploy(lab_hash, selected_links=networks_to_delete)
 
         # If no machines are selected or there are no running machines, undeploy the namespace
@@ -281,19 +325,25 @@ class KubernetesManager(IManager):
 
             self.k8s_namespace.undeploy(lab_hash=lab_hash)
 
-    def wipe(self, all_users: bool = False) -> None:
+    def wipe(self, all_users: bool = False, shutdown: bool = True, shutdown_timeout: Optional[float] = None) -> None:
         """Undeploy all the running network scenarios.
 
         Args:
             all_users (bool): If false, undeploy only the current user network scenarios. If true, undeploy the
                 running network scenarios of all users.
+            shutdown (bool): If False, do not run the shutdown commands of the devices.
+            shutdown_timeout (Optional[float]): If specified, wait at most this number of seconds for the shutdown
+                commands of all the devices before deleting them.
 
         Returns:
             None
         """
         if all_users:
             logging.warning("User-specific options have no effect on Megalos.")
+        if shutdown_timeout is not None:
+            logging.warning("Shutdown timeout has no effect on Megalos.")
 
+        # Namespaces are deleted directly, shutdown commands are never executed
         self.k8s_namespace.wipe()
 
     def connect_tty(self, machine_name: str, lab_hash: Optional[str] = None, lab_name: Optional[str] = None,
@@ -353,6 +403,70 @@ class KubernetesManager(IManager):
 
         return self.k8s_machine.exec(lab_hash, machine_name, command, stderr=True, tty=False, is_stream=True)
 
+    def open_command_channel(self, machine_name: str, lab_hash: Optional[str] = None,
+                             lab_name: Optional[str] = None) -> CommandChannel:
+        """Open a persistent command channel on a device in a running network scenario.
+
+        The channel keeps a shell session open on the device, so repeated commands do not pay the setup of a new
+        exec session. It must be closed when it is not needed anymore, it can be used as a context manager.
+
+        Args:
+            machine_name (str): The name of the device.
+            lab_hash (Optional[str]): The hash of the network scenario where the device is deployed.
+            lab_name (Optional[str]): The name of the network scenario where the device is deployed.
+
+        Returns:
+            CommandChannel: A shell session on the device, that executes commands returning their stdout, stderr and
+                exit code.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If the specified device is not running.
+        """
+        if not lab_hash and not lab_name:
+            raise InvocationError("You must specify a running network scenario hash or name.")
+
+        if lab_name:
+            lab_hash = utils.generate_urlsafe_hash(lab_name)
+
+        lab_hash = lab_hash.lower()
+
+        return self.k8s_machine.open_command_channel(lab_hash, machine_name)
+
+    def exec_machines(self, command: List[str], machine_names: Optional[List[str]] = None,
+                      lab_hash: Optional[str] = None, lab_name: Optional[str] = None) \
+            -> Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]:
+        """Exec a command on several devices of a running network scenario, concurrently.
+
+        The number of concurrent commands is bounded by the size of the manager workers pool.
+
+        Args:
+            command (List[str]): The command to exec on the devices.
+            machine_names (Optional[List[str]]): The names of the devices. If None, all the devices of the network
+                scenario.
+            lab_hash (Optional[str]): The hash of the network scenario where the devices are deployed.
+            lab_name (Optional[str]): The name of the network scenario where the devices are deployed.
+
+        Returns:
+            Generator[Tuple[str, Optional[bytes], Optional[bytes], Optional[int]], None, None]: A generator of tuples
+                containing the device name, the stdout and the stderr in bytes and the exit code, as soon as they are
+                available. The last tuple of each device has no output and contains the exit code, None if the command
+                could not be executed on the device.
+
+        Raises:
+            InvocationError: If a running network scenario hash or name is not specified.
+            MachineNotFoundError: If one of the specified devices is not running.
+        """
+        if not lab_hash and not lab_name:
+            raise InvocationError("You must specify a running network scenario hash or name.")
+
+        if lab_name:
+            lab_hash = utils.generate_urlsafe_hash(lab_name)
+
+        lab_hash = lab_hash.lower()
+
+        return self.k8s_machine.exec_machines(lab_hash, command, machine_names=machine_names)
+
     def copy_files(self, machine: Machine, guest_to_host: Dict[str, io.IOBase]) -> None:
         """Copy files on a running device in the specified paths.
 
@@ -368,6 +482,23 @@ class KubernetesManager(IManager):
 
         self.k8s_machine.copy_files(machine.api_object, path="/", tar_data=tar_data)
 
+    def sync_lab_files(self, lab: Lab, selected_machines: Set[str] = None,
+                       reload_command: Optional[str] = None) -> Dict[str, List[str]]:
+        """Copy into the running devices of a network scenario the files changed since they were last copied.
+
+        Args:
+            lab (Kathara.model.Lab): A Kathara network scenario.
+            selected_machines (Set[str]): If not None, copy only the files of the specified devices.
+            reload_command (Optional[str]): A shell command to run in each device whose files changed.
+
+        Returns:
+            Dict[str, List[str]]: Keys are device names, values are the paths in the device of the copied files.
+
+        Raises:
+            NotSupportedError: Unable to sync the files of a running network scenario on Kubernetes.
+        """
+        raise NotSupportedError("Unable to sync the files of a running network scenario.")
+
     def get_machine_api_object(self, machine_name: str, lab_hash: str = None, lab_name: str = None,
                                all_users: bool = False) -> client.V1Pod:
         """Return the corresponding API object of a running device in a network scenario.
@@ -530,7 +661,11 @@ class KubernetesManager(IManager):
             reconstructed_lab = Lab("reconstructed_lab")
             reconstructed_lab.hash = lab_hash
 
-        lab_pods = self.get_machines_api_objects(lab_hash=reconstructed_lab.hash)
+        # If the informer is already running (e.g., stats are being watched), read the Pods without calling the API
+        if self.k8s_machine.pod_informer.is_running():
+            lab_pods = self.k8s_machine.pod_informer.get_pods(lab_hash=reconstructed_lab.hash)
+        else:
+            lab_pods = self.get_machines_api_objects(lab_hash=reconstructed_lab.hash)
         lab_networks = dict(
             map(lambda x: (x['metadata']['name'], x), self.get_links_api_objects(lab_hash=reconstructed_lab.hash))
         )
@@ -680,6 +815,14 @@ class KubernetesManager(IManager):
         # Delegate the image check to Kubernetes
         return
 
+    def upgrade_plugin(self) -> None:
+        """Useless. The network plugin is managed by the Kubernetes cluster.
+
+        Returns:
+            None
+        """
+        return
+
     def get_release_version(self) -> str:
         """Return the current manager version.
 
@@ -688,6 +831,14 @@ class KubernetesManager(IManager):
         """
         return client.VersionApi().get_code().git_version
 
+    def close(self) -> None:
+        """Release the resources of the manager, shutting down its pool of workers.
+
+        Returns:
+            None
+        """
+        self.executor.shutdown()
+
     @staticmethod
     def get_formatted_manager_name() -> str:
         """Return a formatted string containing the current manager name.
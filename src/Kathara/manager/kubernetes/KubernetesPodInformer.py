@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from kubernetes import client
+from kubernetes.client.api import core_v1_api
+from kubernetes.client.rest import ApiException
+from kubernetes.watch import watch
+
+# Seconds to wait before listing the Pods again after a watch failure
+RESYNC_BACKOFF = 1
+
+
+class KubernetesPodInformer(object):
+    """Keep an in-memory cache of the Kathara Pods of the cluster.
+
+    The cache is filled with a single cluster-wide list and then kept up to date by a single cluster-wide watch, both
+    filtered by label selector. Reads are served from memory, without calling the API.
+
+    Attributes:
+        core_client (core_v1_api.CoreV1Api): The Kubernetes Core API client.
+        label_selector (str): The label selector of the cached Pods.
+    """
+
+    __slots__ = ['core_client', 'label_selector', '_pods', '_lock', '_synced', '_watch', '_thread']
+
+    def __init__(self, core_client: core_v1_api.CoreV1Api, label_selector: str = "app=kathara") -> None:
+        self.core_client: core_v1_api.CoreV1Api = core_client
+        self.label_selector: str = label_selector
+
+        self._pods: Dict[Tuple[str, str], client.V1Pod] = {}
+        self._lock: threading.RLock = threading.RLock()
+        self._synced: threading.Event = threading.Event()
+        self._watch: Optional[watch.Watch] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Fill the cache and start watching the Pods, if not already started.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            resource_version = self._resync()
+
+            self._watch = watch.Watch()
+            self._thread = threading.Thread(target=self._run, args=(resource_version,), daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching the Pods and clear the cache.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            if self._watch is not None:
+                self._watch.stop()
+            self._watch = None
+            self._thread = None
+            self._pods = {}
+            self._synced.clear()
+
+    def is_running(self) -> bool:
+        """Check if the cache is filled and kept up to date.
+
+        Returns:
+            bool: True if the informer is running, else False.
+        """
+        return self._thread is not None and self._synced.is_set()
+
+    def get_pods(self, lab_hash: str = None, machine_name: str = None) -> List[client.V1Pod]:
+        """Return the cached Kubernetes Pods, starting the informer if needed.
+
+        Args:
+            lab_hash (str): The hash of a network scenario. If specified, return all the Kubernetes Pod in the scenario.
+            machine_name (str): The name of a device. If specified, return the specified Kubernetes Pod of the scenario.
+
+        Returns:
+            List[client.V1Pod]: A list of Kubernetes Pods objects.
+        """
+        self.start()
+
+        with self._lock:
+            pods = list(self._pods.values())
+
+        return [pod for pod in pods
+                if (lab_hash is None or pod.metadata.namespace == lab_hash) and
+                (machine_name is None or pod.metadata.labels.get("name", None) == machine_name)]
+
+    def _resync(self) -> str:
+        """Replace the cache content with a fresh list of the Pods.
+
+        Returns:
+            str: The resource version of the list, to start watching from.
+        """
+        pod_list = self.core_client.list_pod_for_all_namespaces(label_selector=self.label_selector)
+
+        with self._lock:
+            self._pods = {(pod.metadata.namespace, pod.metadata.name): pod for pod in pod_list.items}
+        self._synced.set()
+
+        return pod_list.metadata.resource_version
+
+    def _run(self, resource_version: str) -> None:
+        """Apply the watch events to the cache, listing the Pods again when the watch cannot be resumed.
+
+        Args:
+            resource_version (str): The resource version to start watching from.
+
+        Returns:
+            None
+        """
+        current_thread = threading.current_thread()
+        while self._thread is current_thread:
+            pod_watch = self._watch
+            try:
+                for event in pod_watch.stream(self.core_client.list_pod_for_all_namespaces,
+                                              label_selector=self.label_selector,
+                                              resource_version=resource_version):
+                    self._apply_event(event)
+                    resource_version = pod_watch.resource_version
+            except Exception as e:
+                if self._thread is not current_thread:
+                    return
+
+                if isinstance(e, ApiException) and e.status == 410:
+                    logging.debug("Pods watch expired, listing Pods again...")
+                else:
+                    logging.debug("Pods watch failed, listing Pods again: %s" % str(e))
+                    time.sleep(RESYNC_BACKOFF)
+
+                self._synced.clear()
+                try:
+                    resource_version = self._resync()
+                except Exception as e:
+                    logging.debug("Cannot list Pods: %s" % str(e))
+
+    def _apply_event(self, event: Dict) -> None:
+        """Apply a watch event to the cache.
+
+        Args:
+            event (Dict): The watch event, with the event "type" and the V1Pod "object".
+
+        Returns:
+            None
+        """
+        pod = event['object']
+        key = (pod.metadata.namespace, pod.metadata.name)
+
+        with self._lock:
+            if event['type'] == 'DELETED':
+                self._pods.pop(key, None)
+            else:
+                self._pods[key] = pod
@@ -0,0 +1,42 @@
+from typing import Optional, Tuple
+
+from kubernetes import client
+from kubernetes.client.api import core_v1_api
+from kubernetes.stream import stream
+
+from ....foundation.manager.channel.CommandChannel import CommandChannel, CHANNEL_SHELL
+
+
+class KubernetesCommandChannel(CommandChannel):
+    """A long-lived shell session on a Kubernetes Pod, attached through a single websocket."""
+    __slots__ = ['_response']
+
+    def __init__(self, core_client: core_v1_api.CoreV1Api, pod: client.V1Pod) -> None:
+        super().__init__(pod.metadata.labels['name'])
+
+        self._response = stream(core_client.connect_get_namespaced_pod_exec,
+                                name=pod.metadata.name,
+                                namespace=pod.metadata.namespace,
+                                command=CHANNEL_SHELL,
+                                stdout=True,
+                                stderr=True,
+                                stdin=True,
+                                tty=False,
+                                _preload_content=False
+                                )
+
+    def _write(self, data: bytes) -> None:
+        self._response.write_stdin(data.decode('utf-8'))
+
+    def _read(self) -> Optional[Tuple[Optional[bytes], Optional[bytes]]]:
+        while self._response.is_open():
+            self._response.update(timeout=1)
+            stdout = self._response.read_stdout() if self._response.peek_stdout() else None
+            stderr = self._response.read_stderr() if self._response.peek_stderr() else None
+            if stdout or stderr:
+                return stdout.encode('utf-8') if stdout else None, stderr.encode('utf-8') if stderr else None
+
+        return None
+
+    def _close(self) -> None:
+        self._response.close()
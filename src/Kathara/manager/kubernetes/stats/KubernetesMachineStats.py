@@ -16,10 +16,8 @@ class KubernetesMachineStats(IMachineStats):
         self.name = machine_api_object.metadata.labels["name"]
         self.pod_name = machine_api_object.metadata.name
 
-        container_statuses = machine_api_object.status.container_statuses
-        self.image = container_statuses[0].image.replace('docker.io/', '') if container_statuses else "N/A"
-
         # Dynamic Information
+        self.image = None
         self.status = None
         self.assigned_node = None
 
@@ -31,6 +29,8 @@ class KubernetesMachineStats(IMachineStats):
         Returns:
             None
         """
+        container_statuses = self.machine_api_object.status.container_statuses
+        self.image = container_statuses[0].image.replace('docker.io/', '') if container_statuses else "N/A"
         self.status = self._get_detailed_machine_status(self.machine_api_object)
         self.assigned_node = self.machine_api_object.spec.node_name
 
@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Set
+
+from ..exceptions import MachineDependencyError
+
+
+class DependencyGraph(object):
+    """The boot dependencies among the devices of a network scenario.
+
+    All the operations run in O(V+E) time and are iterative, so they work on graphs of any depth.
+
+    Attributes:
+        dependencies (Dict[str, List[str]]): Keys are device names, Values are the names of the devices that must be
+            started before the key device.
+    """
+
+    __slots__ = ['dependencies', '_nodes', '_dependents']
+
+    def __init__(self, dependencies: Dict[str, List[str]]) -> None:
+        self.dependencies: Dict[str, List[str]] = dependencies
+
+        # Nodes are kept in order of appearance, so the order inside each level is stable
+        self._nodes: Dict[str, None] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        for name, deps in dependencies.items():
+            self._nodes.setdefault(name, None)
+            for dep in deps:
+                self._nodes.setdefault(dep, None)
+                self._dependents.setdefault(dep, []).append(name)
+
+    def get_levels(self) -> List[List[str]]:
+        """Return the boot levels of the devices, using Kahn's algorithm.
+
+        The devices of a level depend only on devices of the previous levels, so they can be started concurrently.
+
+        Returns:
+            List[List[str]]: The boot levels, each one containing device names.
+
+        Raises:
+            MachineDependencyError: If there is a dependency loop among the devices.
+        """
+        in_degree = {name: len(dict.fromkeys(self.dependencies.get(name, []))) for name in self._nodes}
+
+        levels = []
+        level = [name for name, degree in in_degree.items() if degree == 0]
+        visited = 0
+        while level:
+            levels.append(level)
+            visited += len(level)
+
+            next_level = []
+            for name in level:
+                for dependent in dict.fromkeys(self._dependents.get(name, [])):
+                    in_degree[dependent] -= 1
+                    if in_degree[dependent] == 0:
+                        next_level.append(dependent)
+            level = next_level
+
+        if visited < len(self._nodes):
+            cycle = self._find_cycle({name for name, degree in in_degree.items() if degree > 0})
+            raise MachineDependencyError("Machines' dependency loop in lab.dep file: %s." % " -> ".join(cycle))
+
+        return levels
+
+    def flatten(self) -> List[str]:
+        """Return the device names ordered considering the dependencies.
+
+        Returns:
+            List[str]: The device names, each one after all the devices it depends on.
+
+        Raises:
+            MachineDependencyError: If there is a dependency loop among the devices.
+        """
+        return [name for level in self.get_levels() for name in level]
+
+    def has_loop(self) -> bool:
+        """Check if there is a dependency loop among the devices.
+
+        Returns:
+            bool: True if there is a dependency loop, else False.
+        """
+        try:
+            self.get_levels()
+        except MachineDependencyError:
+            return True
+
+        return False
+
+    def _find_cycle(self, remaining: Set[str]) -> Optional[List[str]]:
+        """Find a dependency loop among the devices that Kahn's algorithm was not able to visit.
+
+        Each remaining device depends on at least another remaining device, so following those dependencies always
+        leads back to an already seen device.
+
+        Args:
+            remaining (Set[str]): The names of the devices not visited by Kahn's algorithm.
+
+        Returns:
+            Optional[List[str]]: The device names of the loop, starting and ending with the same device.
+        """
+        if not remaining:
+            return None
+
+        path = []
+        position = {}
+        name = next(iter(remaining))
+        while name not in position:
+            position[name] = len(path)
+            path.append(name)
+            name = next(dep for dep in self.dependencies[name] if dep in remaining)
+
+        return path[position[name]:] + [name]
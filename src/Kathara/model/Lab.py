@@ -4,6 +4,7 @@ from itertools import chain
 from typing import Dict, Set, Any, List, Union, Optional, Tuple
 
 from . import Machine as MachinePackage
+from .DependencyGraph import DependencyGraph
 from .ExternalLink import ExternalLink
 from .Link import Link
 from .. import utils
@@ -28,13 +29,15 @@ class Lab(object):
             Keys are collision domains names, Values are Kathara collision domain objects.
         general_options (Dict[str, Any]): Keys are option names, values are option values.
         has_dependencies (bool): True if there are dependencies among the devices boot.
+        dependencies (Dict[str, List[str]]): The boot dependencies among the devices. Keys are device names, Values
+            are the names of the devices that must be started before the key device.
         shared_startup_path(str) The path of the shared startup file, if exists.
         shared_shutdown_path(str) The path of the shared shutdown file, if exists.
         shared_folder(str) The path of the shared folder, if exists.
     """
     __slots__ = ['_name', 'description', 'version', 'author', 'email', 'web',
                  'path', 'hash', 'machines', 'links', 'general_options', 'has_dependencies',
-                 'shared_startup_path', 'shared_shutdown_path', 'shared_folder']
+                 'dependencies', 'shared_startup_path', 'shared_shutdown_path', 'shared_folder']
 
     def __init__(self, name: Optional[str], path: Optional[str] = None) -> None:
         """Create a new instance of a Kathara network scenario.
@@ -59,6 +62,7 @@ class Lab(object):
         self.general_options: Dict[str, Any] = {}
 
         self.has_dependencies: bool = False
+        self.dependencies: Dict[str, List[str]] = {}
 
         self.path: str = path
         self.shared_startup_path: Optional[str] = None
@@ -180,6 +184,8 @@ class Lab(object):
     def apply_dependencies(self, dependencies: List[str]) -> None:
         """Order the list of devices of the network scenario to satisfy the boot dependencies.
 
+        Since only the order is known, each listed device waits for the previous one to be started.
+
         Args:
             dependencies (List[str]): If not empty, dependencies are applied.
 
@@ -194,8 +200,24 @@ class Lab(object):
                 return 0
 
         self.machines = collections.OrderedDict(sorted(self.machines.items(), key=lambda t: dep_sort(t[0])))
+        self.dependencies = {name: [dependencies[i - 1]] for i, name in enumerate(dependencies) if i > 0}
         self.has_dependencies = True
 
+    def apply_dependency_graph(self, dependencies: Dict[str, List[str]]) -> None:
+        """Apply the boot dependencies among the devices of the network scenario.
+
+        Devices that do not depend on each other can be started concurrently.
+
+        Args:
+            dependencies (Dict[str, List[str]]): Keys are device names, Values are the names of the devices that must
+                be started before the key device.
+
+        Returns:
+            None
+        """
+        self.apply_dependencies(DependencyGraph(dependencies).flatten())
+        self.dependencies = dependencies
+
     def get_machine(self, name: str) -> 'MachinePackage.Machine':
         """Get the specified device.
 
@@ -365,6 +387,19 @@ class Lab(object):
         """
         return all(map(lambda x: self.find_machine(x), machine_names))
 
+    def __getstate__(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for (slot, value) in state.items():
+            setattr(self, slot, value)
+
+        # Attach again the devices to their collision domains, since they are not pickled with the collision domains
+        for machine in self.machines.values():
+            for link in machine.interfaces.values():
+                if link is not None:
+                    link.machines[machine.name] = machine
+
     def __repr__(self) -> str:
         return "Lab(%s, %s, %s, %s)" % (self.path, self.hash, self.machines, self.links)
 
@@ -28,5 +28,17 @@ class Link(object):
         self.machines: Dict[str, 'MachinePackage.Machine'] = {}
         self.api_object: Any = None
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Attached machines are restored by the network scenario, otherwise pickling would recursively traverse the
+        # whole topology
+        state = {slot: getattr(self, slot) for slot in self.__slots__}
+        state['machines'] = {}
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for (slot, value) in state.items():
+            setattr(self, slot, value)
+
     def __repr__(self) -> str:
         return "Link(%s, %s)" % (self.name, self.external)
@@ -1,11 +1,13 @@
 import collections
+import hashlib
+import io
+import json
 import logging
 import os
 import re
-import shutil
+import stat
 import tarfile
-import tempfile
-from distutils.util import strtobool
+import time
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional, List, OrderedDict
 
@@ -16,6 +18,11 @@ from .. import utils
 from ..exceptions import NonSequentialMachineInterfaceError, MachineOptionError, MachineCollisionDomainError
 from ..setting.Setting import Setting
 
+# Files changed less than this number of seconds ago are also fingerprinted by content
+RACY_MTIME_SECONDS = 2
+# Options that do not change the device itself, ignored by the configuration digest
+DIGEST_IGNORED_OPTIONS = ['num_terms']
+
 
 class Machine(object):
     """A Kathara device.
@@ -35,7 +42,7 @@ class Machine(object):
         folder (str): The path of the device folder, if exists.
     """
     __slots__ = ['lab', 'name', 'interfaces', 'meta', 'startup_commands', 'api_object', 'capabilities',
-                 'startup_path', 'shutdown_path', 'folder']
+                 'startup_path', 'shutdown_path', 'folder', '_config_digest']
 
     def __init__(self, lab: 'LabPackage.Lab', name: str, **kwargs) -> None:
         """Create a new instance of a Kathara device.
@@ -74,6 +81,8 @@ class Machine(object):
         self.startup_path: Optional[str] = None
         self.shutdown_path: Optional[str] = None
         self.folder: Optional[str] = None
+        # Last config digest, with the configuration and the fingerprint of the files it was computed from
+        self._config_digest: Optional[Tuple[str, str, str]] = None
 
         if lab.has_path():
             startup_file = os.path.join(lab.path, '%s.startup' % self.name)
@@ -154,7 +163,7 @@ class Machine(object):
             return
 
         if name == "bridged":
-            self.meta[name] = bool(strtobool(str(value)))
+            self.meta[name] = bool(utils.strtobool(str(value)))
             return
 
         if name == "sysctl":
@@ -233,75 +242,195 @@ class Machine(object):
         """Pack machine data into a .tar.gz file and returns the tar content as a byte array.
 
         While packing files, it also applies the win2linux patch in order to remove UTF-8 BOM.
+        The archive is built in memory and cached: if the device files did not change since the last call, the cached
+        archive is returned without packing them again.
 
         Returns:
             bytes: the tar content.
         """
-        # Make a temp folder and create a tar.gz of the lab directory
-        temp_path = tempfile.mkdtemp()
+        data_files = self._get_data_files()
 
-        is_empty = True
+        # If no machine files are found, return None.
+        if not data_files:
+            return None
 
-        with tarfile.open("%s/hostlab.tar.gz" % temp_path, "w:gz") as tar:
-            if self.folder:
-                machine_files = filter(lambda x: x.is_file(), Path(self.folder).rglob("*"))
+        cache_key = "%s_%s" % (self.lab.hash, self.name)
+        fingerprint = self._get_data_fingerprint(data_files)
+        tar_data = utils.get_cached_archive(cache_key, fingerprint)
+        if tar_data is not None:
+            logging.debug("Using cached archive for device `%s`." % self.name)
+            return tar_data
+
+        tar_buffer = io.BytesIO()
+        with tarfile.open(fileobj=tar_buffer, mode="w:gz") as tar:
+            for (file, arc_name, _) in data_files:
+                (tarinfo, content) = utils.pack_file_for_tar(file, arc_name=arc_name)
+                tar.addfile(tarinfo, content)
 
-                for file in machine_files:
-                    file = str(file)
+        tar_data = tar_buffer.getvalue()
+        utils.cache_archive(cache_key, fingerprint, tar_data)
 
-                    if utils.is_excluded_file(file):
-                        continue
+        return tar_data
 
-                    # Removes the last element of the path
-                    # (because it's the machine folder name and it should be included in the tar archive)
-                    lab_path, machine_folder = os.path.split(self.folder)
-                    (tarinfo, content) = utils.pack_file_for_tar(file,
-                                                                 arc_name="hostlab/%s" % os.path.relpath(file, lab_path)
-                                                                 )
-                    tar.addfile(tarinfo, content)
+    def _get_data_files(self) -> List[Tuple[str, str, os.stat_result]]:
+        """Return the files to pack in the device archive.
 
-                is_empty = False
+        Returns:
+            List[Tuple[str, str, os.stat_result]]: A list of tuples composed by the path of the file, its name in the
+                archive and its stat.
+        """
+        data_files = []
 
-            if self.startup_path:
-                (tarinfo, content) = utils.pack_file_for_tar(self.startup_path,
-                                                             arc_name="hostlab/%s.startup" % self.name
-                                                             )
-                tar.addfile(tarinfo, content)
-                is_empty = False
+        if self.folder:
+            # Removes the last element of the path
+            # (because it's the machine folder name and it should be included in the tar archive)
+            lab_path, _ = os.path.split(self.folder)
 
-            if self.shutdown_path:
-                (tarinfo, content) = utils.pack_file_for_tar(self.shutdown_path,
-                                                             arc_name="hostlab/%s.shutdown" % self.name
-                                                             )
-                tar.addfile(tarinfo, content)
-                is_empty = False
+            for file in Path(self.folder).rglob("*"):
+                file = str(file)
 
-            if self.lab.shared_startup_path:
-                (tarinfo, content) = utils.pack_file_for_tar(self.lab.shared_startup_path,
-                                                             arc_name="hostlab/shared.startup"
-                                                             )
-                tar.addfile(tarinfo, content)
-                is_empty = False
+                if utils.is_excluded_file(file):
+                    continue
 
-            if self.lab.shared_shutdown_path:
-                (tarinfo, content) = utils.pack_file_for_tar(self.lab.shared_shutdown_path,
-                                                             arc_name="hostlab/shared.shutdown"
-                                                             )
-                tar.addfile(tarinfo, content)
-                is_empty = False
+                file_stat = os.stat(file)
+                if not stat.S_ISREG(file_stat.st_mode):
+                    continue
 
-        # If no machine files are found, return None.
-        if is_empty:
-            return None
+                data_files.append((file, "hostlab/%s" % os.path.relpath(file, lab_path), file_stat))
 
-        # Read tar.gz content
-        with open("%s/hostlab.tar.gz" % temp_path, "rb") as tar_file:
-            tar_data = tar_file.read()
+        for (file, arc_name) in [(self.startup_path, "hostlab/%s.startup" % self.name),
+                                 (self.shutdown_path, "hostlab/%s.shutdown" % self.name),
+                                 (self.lab.shared_startup_path, "hostlab/shared.startup"),
+                                 (self.lab.shared_shutdown_path, "hostlab/shared.shutdown")]:
+            if file:
+                data_files.append((file, arc_name, os.stat(file)))
 
-        # Delete temporary tar.gz
-        shutil.rmtree(temp_path)
+        return data_files
 
-        return tar_data
+    def get_data_manifest(self) -> Dict[str, List]:
+        """Return the manifest of the device files, recording the size and modification time of each one.
+
+        Returns:
+            Dict[str, List]: Keys are the names of the files in the device archive, values are their size, their
+                modification time and the digest of their content (None, since it is not computed).
+        """
+        return {arc_name: [file_stat.st_size, file_stat.st_mtime_ns, None]
+                for (_, arc_name, file_stat) in self._get_data_files()}
+
+    def get_data_delta(self, manifest: Optional[Dict[str, List]]) -> Tuple[Dict[str, str], Dict[str, List]]:
+        """Return the device files that changed since the manifest was taken, and the manifest of the current files.
+
+        A file is hashed only if its size or modification time changed (or if it was modified in the last seconds),
+        so it is not considered changed if it was only touched and its digest is in the manifest.
+
+        Args:
+            manifest (Optional[Dict[str, List]]): A manifest returned by get_data_manifest or by a previous call. If
+                None, all the files are considered changed.
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, List]]: A dict containing the device path as key and the path of the
+                changed file on the host as value, and the manifest of the current files.
+        """
+        now = time.time()
+        delta = {}
+        current_manifest = {}
+        for (file, arc_name, file_stat) in self._get_data_files():
+            entry = manifest.get(arc_name) if manifest else None
+            if entry and entry[:2] == [file_stat.st_size, file_stat.st_mtime_ns] and \
+                    now - file_stat.st_mtime >= RACY_MTIME_SECONDS:
+                current_manifest[arc_name] = entry
+                continue
+
+            with open(file, 'rb') as file_obj:
+                content_digest = hashlib.sha256(file_obj.read()).hexdigest()
+            current_manifest[arc_name] = [file_stat.st_size, file_stat.st_mtime_ns, content_digest]
+
+            if not entry or entry[2] != content_digest:
+                delta[self._get_device_path(arc_name)] = file
+
+        return delta, current_manifest
+
+    def _get_device_path(self, arc_name: str) -> str:
+        """Return the path where a file of the device archive is placed in the running device.
+
+        Args:
+            arc_name (str): The name of the file in the device archive.
+
+        Returns:
+            str: The absolute path of the file in the device.
+        """
+        arc_name = arc_name.replace("\\", "/")
+        # Files of the device folder are copied into the root of the device at startup
+        machine_folder = "hostlab/%s/" % self.name
+        if arc_name.startswith(machine_folder):
+            return "/" + arc_name[len(machine_folder):]
+
+        return "/" + arc_name
+
+    @staticmethod
+    def _get_data_fingerprint(data_files: List[Tuple[str, str, os.stat_result]]) -> str:
+        """Return a fingerprint of the files to pack, based on their names, sizes, modification and change times.
+
+        The change time is updated by any write, even if the modification time is restored afterwards (e.g., by
+        `cp -p`), and it cannot be set by the user. The content of the files changed in the last seconds is also
+        hashed, since a further change in the same timestamp granularity would not update their change time. A content
+        change that preserves the size and both times is not detected, e.g., if the system clock is moved back.
+
+        Args:
+            data_files (List[Tuple[str, str, os.stat_result]]): The files to pack, as returned by _get_data_files.
+
+        Returns:
+            str: The hex digest of the fingerprint.
+        """
+        now = time.time()
+        digest = hashlib.sha256()
+        for (file, arc_name, file_stat) in data_files:
+            digest.update(("%s:%d:%d:%d;" % (arc_name, file_stat.st_size, file_stat.st_mtime_ns,
+                                             file_stat.st_ctime_ns)).encode('utf-8'))
+
+            if now - max(file_stat.st_mtime, file_stat.st_ctime) < RACY_MTIME_SECONDS:
+                with open(file, 'rb') as file_obj:
+                    digest.update(hashlib.sha256(file_obj.read()).digest())
+
+        return digest.hexdigest()
+
+    def get_config_digest(self) -> str:
+        """Return a digest of the device configuration: image, options, startup commands, interfaces and files.
+
+        Files are digested by content, so the digest does not change if they are only touched. The digest is stored on
+        the device and computed again only if its configuration or the fingerprint of its files change.
+
+        Returns:
+            str: The hex digest of the device configuration.
+        """
+        meta = {key: value for (key, value) in self.meta.items() if key not in DIGEST_IGNORED_OPTIONS}
+        # Port keys are tuples, that cannot be serialized
+        meta['ports'] = {"%d/%s" % key: value for (key, value) in self.meta['ports'].items()}
+
+        config = {
+            'image': self.get_image(),
+            'meta': meta,
+            'options': {key: value for (key, value) in self.lab.general_options.items()
+                        if key not in DIGEST_IGNORED_OPTIONS},
+            'capabilities': self.capabilities,
+            'startup_commands': self.startup_commands,
+            'interfaces': [(iface_num, link.name) for (iface_num, link) in self.interfaces.items()],
+        }
+        config_json = json.dumps(config, sort_keys=True, default=str)
+
+        data_files = self._get_data_files()
+        fingerprint = self._get_data_fingerprint(data_files)
+        if self._config_digest and self._config_digest[:2] == (config_json, fingerprint):
+            return self._config_digest[2]
+
+        digest = hashlib.sha256(config_json.encode('utf-8'))
+        for (file, arc_name, _) in data_files:
+            with open(file, 'rb') as file_obj:
+                digest.update(("%s:%s;" % (arc_name, hashlib.sha256(file_obj.read()).hexdigest())).encode('utf-8'))
+
+        self._config_digest = (config_json, fingerprint, digest.hexdigest())
+
+        return self._config_digest[2]
 
     def get_image(self) -> str:
         """Get the image of the device, if defined in options or device meta. If not, use default one.
@@ -414,8 +543,8 @@ class Machine(object):
             MachineOptionError: If the IPv6 value specified is not valid.
         """
         try:
-            return bool(strtobool(self.lab.general_options["ipv6"])) if "ipv6" in self.lab.general_options else \
-                bool(strtobool(self.meta["ipv6"])) if "ipv6" in self.meta else Setting.get_instance().enable_ipv6
+            return bool(utils.strtobool(self.lab.general_options["ipv6"])) if "ipv6" in self.lab.general_options else \
+                bool(utils.strtobool(self.meta["ipv6"])) if "ipv6" in self.meta else Setting.get_instance().enable_ipv6
         except ValueError:
             raise MachineOptionError("IPv6 value not valid on `%s`." % self.name)
 
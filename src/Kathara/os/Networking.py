@@ -1,7 +1,7 @@
 import logging
 import os
 import shutil
-from typing import Optional
+from typing import Optional, Dict, Iterable
 from ..exceptions import InterfaceNotFoundError
 
 
@@ -137,6 +137,57 @@ class Networking(object):
 
         ip.close()
 
+    @staticmethod
+    def get_bridges_traffic(bridge_names: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """Return the traffic counters of the specified bridges, reading all the host interfaces with a single
+        netlink dump.
+
+        The counters of a bridge are the sum of the counters of its ports, since the frames forwarded between ports
+        are not accounted on the bridge interface itself. "rx" is the traffic entering the bridge from its ports,
+        "tx" is the traffic delivered by the bridge to its ports.
+
+        Args:
+            bridge_names (Iterable[str]): The names of the bridges.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Keys are the names of the bridges found on the host, values are dicts with
+                "rx_bytes", "tx_bytes", "rx_packets" and "tx_packets" keys.
+        """
+        bridge_names = set(bridge_names)
+
+        logging.getLogger('pyroute2').disabled = True
+        from pyroute2 import IPRoute
+        ip = IPRoute()
+        logging.getLogger('pyroute2').disabled = False
+
+        try:
+            interfaces = ip.get_links()
+        finally:
+            ip.close()
+
+        bridges = {}
+        for interface in interfaces:
+            name = interface.get_attr('IFLA_IFNAME')
+            if name in bridge_names:
+                bridges[interface['index']] = name
+
+        traffic = {name: {'rx_bytes': 0, 'tx_bytes': 0, 'rx_packets': 0, 'tx_packets': 0}
+                   for name in bridges.values()}
+        for interface in interfaces:
+            master = interface.get_attr('IFLA_MASTER')
+            if master not in bridges:
+                continue
+
+            interface_stats = interface.get_attr('IFLA_STATS64') or interface.get_attr('IFLA_STATS')
+            if not interface_stats:
+                continue
+
+            bridge_traffic = traffic[bridges[master]]
+            for key in bridge_traffic:
+                bridge_traffic[key] += interface_stats[key]
+
+        return traffic
+
     @staticmethod
     def get_iptables_version() -> str:
         """Return the iptables version on a Linux host.
@@ -2,10 +2,10 @@ import logging
 import mmap
 import os
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from ...exceptions import MachineDependencyError
-from ...trdparty.depgen import depgen
+from .ParserCache import ParserCache
+from ...model.DependencyGraph import DependencyGraph
 
 
 class DepParser(object):
@@ -23,6 +23,26 @@ class DepParser(object):
             Optional[List[str]]: A List of string containing the names of the device ordered considering the
                 dependencies.
 
+        Raises:
+            IOError: If there is an error while opening lab.dep file.
+            SyntaxError: If there is a syntax error in lab.dep file.
+            MachineDependencyError: If there is a Machines dependency loop in lab.dep file.
+        """
+        dependencies = DepParser.parse_graph(path)
+
+        return DependencyGraph(dependencies).flatten() if dependencies else None
+
+    @staticmethod
+    def parse_graph(path: str) -> Optional[Dict[str, List[str]]]:
+        """Parse the lab.dep file and return the dependencies among the devices.
+
+        Args:
+            path (str): The path to the lab.dep file.
+
+        Returns:
+            Optional[Dict[str, List[str]]]: Keys are device names, Values are the names of the devices that must be
+                started before the key device.
+
         Raises:
             IOError: If there is an error while opening lab.dep file.
             SyntaxError: If there is a syntax error in lab.dep file.
@@ -37,6 +57,10 @@ class DepParser(object):
             logging.warning("lab.dep file is empty. Ignoring...")
             return None
 
+        dependencies = ParserCache.load(path, 'lab.dep')
+        if dependencies is not None:
+            return dependencies
+
         dependencies = {}
 
         # Reads lab.dep in memory so it is faster.
@@ -69,7 +93,9 @@ class DepParser(object):
             line_number += 1
             line = dep_mem_file.readline().decode('utf-8')
 
-        if depgen.has_loop(dependencies):
-            raise MachineDependencyError("Machines' dependency loop in lab.dep file.")
+        # Raises MachineDependencyError reporting the loop, if any
+        DependencyGraph(dependencies).get_levels()
+
+        ParserCache.save(path, 'lab.dep', dependencies)
 
-        return depgen.flatten(dependencies)
+        return dependencies
@@ -4,6 +4,7 @@ import os
 import re
 from typing import Dict, List, Optional
 
+from .ParserCache import ParserCache
 from ...model.ExternalLink import ExternalLink
 
 
@@ -36,6 +37,10 @@ class ExtParser(object):
             logging.warning("lab.ext file is empty. Ignoring...")
             return None
 
+        external_links = ParserCache.load(path, 'lab.ext')
+        if external_links is not None:
+            return external_links
+
         # Reads lab.ext in memory so it is faster.
         try:
             with open(lab_ext_path, 'r') as ext_file:
@@ -73,4 +78,6 @@ class ExtParser(object):
             line_number += 1
             line = ext_mem_file.readline().decode('utf-8')
 
+        ParserCache.save(path, 'lab.ext', external_links)
+
         return external_links
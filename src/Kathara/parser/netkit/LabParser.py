@@ -1,10 +1,18 @@
-import mmap
 import os
 import re
+from typing import Dict, List, Tuple
 
+from .ParserCache import ParserCache
+from ...exceptions import MachineCollisionDomainError, MachineOptionError, NonSequentialMachineInterfaceError
 from ...model.Lab import Lab
 from ...utils import RESERVED_MACHINE_NAMES
 
+# E.g. pc1[0]="A" or pc1[image]="kathara/frr"
+MACHINE_LINE_RE = re.compile(r"^(?P<key>[a-z0-9_]{1,30})\[(?P<arg>\w+)\]=(?P<value>\".+\"|\'.+\'|\w+)$")
+# E.g. LAB_DESCRIPTION="Description"
+LAB_LINE_RE = re.compile(r"^LAB_(?P<key>NAME|DESCRIPTION|VERSION|AUTHOR|EMAIL|WEB)=(?P<value>.*)$")
+COLLISION_DOMAIN_NAME_RE = re.compile(r"^\w+$")
+
 
 class LabParser(object):
     """Class responsible for parsing the lab.conf file."""
@@ -13,11 +21,21 @@ class LabParser(object):
     def parse(path: str) -> Lab:
         """Parse the lab.conf and return the corresponding Kathara network scenario.
 
+        The file is tokenized in a single pass, then the devices and collision domains are created all at once.
+
         Args:
             path (str): The path to lab.conf file.
 
         Returns:
             Kathara.model.Lab.Lab: A Kathara network scenario.
+
+        Raises:
+            IOError: If there is an error while opening lab.conf file.
+            SyntaxError: If there are errors in lab.conf file. All the errors are reported together.
+            MachineCollisionDomainError: If the only error is an interface conflicting with another one.
+            MachineOptionError: If the only error is an invalid device option.
+            NonSequentialMachineInterfaceError: If the only error is a missing interface number.
+            ValueError: If a device has a reserved name.
         """
         lab_conf_path = os.path.join(path, 'lab.conf')
 
@@ -27,60 +45,122 @@ class LabParser(object):
         if os.stat(lab_conf_path).st_size == 0:
             raise IOError("lab.conf file is empty.")
 
-        # Reads lab.conf in memory so it is faster.
+        lab = ParserCache.load(path, 'lab.conf')
+        if lab is not None:
+            return lab
+
+        # Reads the whole lab.conf in memory so it is faster.
         try:
-            with open(lab_conf_path, 'r') as lab_file:
-                lab_mem_file = mmap.mmap(lab_file.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(lab_conf_path, 'r', encoding='utf-8') as lab_file:
+                lines = lab_file.read().splitlines()
         except Exception:
             raise IOError("Cannot open lab.conf file.")
 
+        (lab_meta, machines, errors) = LabParser._tokenize(lines)
+
         lab = Lab(None, path=path)
 
-        line_number = 1
-        line = lab_mem_file.readline().decode('utf-8')
-        while line:
-            matches = re.search(r"^(?P<key>[a-z0-9_]{1,30})\[(?P<arg>\w+)\]=(?P<value>\".+\"|\'.+\'|\w+)$",
-                                line.strip())
+        for (key, value) in lab_meta:
+            setattr(lab, key, value)
+
+        # Invalid interfaces and options are collected with the syntax errors, so they are all reported together
+        checked_machines = []
+        for (machine_name, (interfaces, meta)) in machines.items():
+            machine = lab.get_or_new_machine(machine_name)
+            has_valid_interfaces = True
+
+            for (line_number, interface_number, link_name) in interfaces:
+                try:
+                    machine.add_interface(lab.get_or_new_link(link_name), number=interface_number)
+                except MachineCollisionDomainError as e:
+                    errors.append((line_number, MachineCollisionDomainError(f"In lab.conf - Line {line_number}: {e}")))
+                    has_valid_interfaces = False
+
+            for (line_number, meta_name, meta_value) in meta:
+                try:
+                    machine.add_meta(meta_name, meta_value)
+                except (MachineOptionError, ValueError) as e:
+                    errors.append((line_number, type(e)(f"In lab.conf - Line {line_number}: {e}")))
+
+            if has_valid_interfaces:
+                checked_machines.append(machine)
+
+        errors = [error for (_, error) in sorted(errors, key=lambda x: x[0])]
+
+        # Interfaces are checked only on devices without invalid interfaces, which would be reported as missing
+        for machine in checked_machines:
+            try:
+                machine.check()
+            except NonSequentialMachineInterfaceError as e:
+                errors.append(e)
+
+        if len(errors) == 1:
+            raise errors[0]
+        elif errors:
+            raise SyntaxError("\n".join(str(error) for error in errors))
+
+        ParserCache.save(path, 'lab.conf', lab)
 
+        return lab
+
+    @staticmethod
+    def _tokenize(lines: List[str]) -> Tuple[List[Tuple[str, str]],
+                                             Dict[str, Tuple[List[Tuple[int, int, str]], List[Tuple[int, str, str]]]],
+                                             List[Tuple[int, Exception]]]:
+        """Tokenize the lines of a lab.conf file.
+
+        Args:
+            lines (List[str]): The lines of the lab.conf file.
+
+        Returns:
+            Tuple[List[Tuple[str, str]], Dict[str, Tuple[List[Tuple[int, int, str]], List[Tuple[int, str, str]]]],
+                List[Tuple[int, Exception]]]: The network scenario meta as (name, value) tuples, the devices and the
+                syntax errors with their line number. Devices keys are device names, values are the lists of
+                (line number, interface number, collision domain name) and of (line number, meta name, meta value)
+                tuples, in order of appearance.
+
+        Raises:
+            ValueError: If a device has a reserved name.
+        """
+        lab_meta = []
+        machines = {}
+        errors = []
+
+        for (line_number, line) in enumerate(lines, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            matches = MACHINE_LINE_RE.match(line)
             if matches:
-                key = matches.group("key").strip()
-                arg = matches.group("arg").strip()
-                value = matches.group("value").replace('"', '').replace("'", '')
+                (key, arg, value) = matches.group("key", "arg", "value")
+                value = value.replace('"', '').replace("'", '')
 
                 if key in RESERVED_MACHINE_NAMES:
                     raise ValueError(f"In lab.conf - Line {line_number}: "
                                      f"`{key}` is a reserved name, you can not use it for a device.")
 
-                try:
+                (interfaces, meta) = machines.setdefault(key, ([], []))
+                if arg.isdecimal():
                     # It's an interface, handle it.
-                    interface_number = int(arg)
-
-                    if re.search(r"^\w+$", value):
-                        lab.connect_machine_to_link(key, value, machine_iface_number=interface_number)
+                    if COLLISION_DOMAIN_NAME_RE.match(value):
+                        interfaces.append((line_number, int(arg), value))
                     else:
-                        raise ValueError(f"In lab.conf - Line {line_number}: "
-                                         f"Collision domain `{value}` contains non-alphanumeric characters.")
-                except ValueError:
+                        errors.append((line_number, SyntaxError(f"In lab.conf - Line {line_number}: Collision domain "
+                                                                f"`{value}` contains non-alphanumeric characters.")))
+                else:
                     # Not an interface, add it to the machine metas.
-                    lab.assign_meta_to_machine(key, arg, value)
-            else:
-                if not line.startswith('#') and \
-                        line.strip():
-                    if not line.startswith("LAB_NAME=") and \
-                            not line.startswith("LAB_DESCRIPTION=") and \
-                            not line.startswith("LAB_VERSION=") and \
-                            not line.startswith("LAB_AUTHOR=") and \
-                            not line.startswith("LAB_EMAIL=") and \
-                            not line.startswith("LAB_WEB="):
-                        raise SyntaxError("In lab.conf - Line %d: Invalid characters `%s`." % (line_number, line))
-                    else:
-                        (key, value) = line.split("=")
-                        key = key.replace("LAB_", "").lower()
-                        setattr(lab, key, value.replace('"', '').replace("'", '').strip())
+                    meta.append((line_number, arg, value))
+                continue
 
-            line_number += 1
-            line = lab_mem_file.readline().decode('utf-8')
+            matches = LAB_LINE_RE.match(line)
+            if matches:
+                value = matches.group("value").replace('"', '').replace("'", '').strip()
+                lab_meta.append((matches.group("key").lower(), value))
+                continue
 
-        lab.check_integrity()
+            errors.append(
+                (line_number, SyntaxError("In lab.conf - Line %d: Invalid characters `%s`." % (line_number, line)))
+            )
 
-        return lab
+        return lab_meta, machines, errors
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Optional
+
+from ... import utils
+from ...version import CURRENT_VERSION
+
+# Files modified less than this number of seconds ago are not cached, since a further modification in the same
+# timestamp granularity would not change their modification time
+RACY_MTIME_SECONDS = 2
+
+
+class ParserCache(object):
+    """Class responsible for persisting the parsed network scenario files.
+
+    Each entry is invalidated by the fingerprint of the parsed file and of the network scenario directory, whose
+    modification time changes when device files or folders are created or removed.
+    """
+
+    @staticmethod
+    def load(path: str, file_name: str) -> Optional[Any]:
+        """Return the cached result of the parsing of file_name in the network scenario directory path.
+
+        Args:
+            path (str): The path to the network scenario directory.
+            file_name (str): The name of the parsed file (e.g. lab.conf).
+
+        Returns:
+            Optional[Any]: The parsed object, None if it is not cached or the files changed.
+        """
+        fingerprint = ParserCache._get_fingerprint(path, file_name)
+        if fingerprint is None:
+            return None
+
+        try:
+            with open(ParserCache._get_entry_path(path, file_name), 'rb') as entry_file:
+                (entry_fingerprint, parsed) = pickle.load(entry_file)
+        except Exception:
+            return None
+
+        if entry_fingerprint != fingerprint:
+            return None
+
+        logging.debug("Using cached %s of `%s`." % (file_name, path))
+        return parsed
+
+    @staticmethod
+    def save(path: str, file_name: str, parsed: Any) -> None:
+        """Cache the result of the parsing of file_name in the network scenario directory path.
+
+        Args:
+            path (str): The path to the network scenario directory.
+            file_name (str): The name of the parsed file (e.g. lab.conf).
+            parsed (Any): The parsed object.
+
+        Returns:
+            None
+        """
+        fingerprint = ParserCache._get_fingerprint(path, file_name)
+        if fingerprint is None:
+            return
+
+        entry_path = ParserCache._get_entry_path(path, file_name)
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+            # Write a temporary file and rename it, so concurrent readers never see a partial entry
+            with tempfile.NamedTemporaryFile(mode='wb', dir=os.path.dirname(entry_path), delete=False) as temp_file:
+                pickle.dump((fingerprint, parsed), temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file.name, entry_path)
+        except Exception as e:
+            logging.debug("Cannot cache %s of `%s`: %s" % (file_name, path, str(e)))
+
+    @staticmethod
+    def _get_entry_path(path: str, file_name: str) -> str:
+        """Return the path of the cache entry of file_name in the network scenario directory path.
+
+        Args:
+            path (str): The path to the network scenario directory.
+            file_name (str): The name of the parsed file (e.g. lab.conf).
+
+        Returns:
+            str: The path of the cache entry.
+        """
+        key = hashlib.sha256(os.path.join(os.path.abspath(path), file_name).encode('utf-8')).hexdigest()
+
+        return os.path.join(utils.get_cache_path(), "labs", "%s.pickle" % key)
+
+    @staticmethod
+    def _get_fingerprint(path: str, file_name: str) -> Optional[str]:
+        """Return the fingerprint of file_name and of the network scenario directory path.
+
+        Args:
+            path (str): The path to the network scenario directory.
+            file_name (str): The name of the parsed file (e.g. lab.conf).
+
+        Returns:
+            Optional[str]: The fingerprint, None if the files cannot be cached.
+        """
+        try:
+            dir_stat = os.stat(path)
+            file_stat = os.stat(os.path.join(path, file_name))
+        except OSError:
+            return None
+
+        if time.time() - max(dir_stat.st_mtime, file_stat.st_mtime) < RACY_MTIME_SECONDS:
+            return None
+
+        return "%s:%d:%d:%d" % (CURRENT_VERSION, dir_stat.st_mtime_ns, file_stat.st_size, file_stat.st_mtime_ns)
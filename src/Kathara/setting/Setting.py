@@ -12,7 +12,6 @@ from ..exceptions import HTTPConnectionError, SettingsError, SettingsNotFoundErr
 from ..exceptions import InstantiationError
 from ..foundation.setting.SettingsAddon import SettingsAddon
 from ..foundation.setting.SettingsAddonFactory import SettingsAddonFactory
-from ..webhooks.GitHubApi import GitHubApi
 
 AVAILABLE_DEBUG_LEVELS: List[str] = ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG", "EXCEPTION"]
 AVAILABLE_MANAGERS: List[str] = ["docker", "kubernetes"]
@@ -29,7 +28,8 @@ DEFAULTS: Dict[str, Any] = {
     "device_prefix": 'kathara',
     "debug_level": 'INFO',
     "print_startup_log": True,
-    "enable_ipv6": False
+    "enable_ipv6": False,
+    "pool_size": None
 }
 SETTINGS_FILENAME = "kathara.conf"
 DEFAULT_SETTINGS_PATH: str = os.path.join(utils.get_current_user_home(), ".config", SETTINGS_FILENAME)
@@ -39,7 +39,8 @@ class Setting(object):
     """Class responsible for interacting with Kathara Settings."""
 
     __slots__ = ['image', 'manager_type', 'terminal', 'open_terminals', 'device_shell', 'net_prefix',
-                 'device_prefix', 'debug_level', 'print_startup_log', 'enable_ipv6', 'last_checked', 'addons']
+                 'device_prefix', 'debug_level', 'print_startup_log', 'enable_ipv6', 'pool_size', 'last_checked',
+                 'addons']
 
     __instance: Setting = None
 
@@ -174,7 +175,7 @@ class Setting(object):
         """Check if Kathara is correctly working.
 
         Check if the selected manager is available. Check the presence of Kathara updates.
-        Check the correctness and validity of the net_prefix, device_prefix and debug level.
+        Check the correctness and validity of the net_prefix, device_prefix, debug level and pool size.
 
         Returns:
             None
@@ -183,6 +184,7 @@ class Setting(object):
             SettingsError: If the Networks Prefix does not contain only lowercase letters and underscore.
             SettingsError: If the Device Prefix does not contain only lowercase letters and underscore.
             SettingsError: If the Debug Level specified is not allowed.
+            SettingsError: If the Pool Size specified is not a positive integer.
         """
         self._check_manager()
 
@@ -194,6 +196,8 @@ class Setting(object):
 
             try:
                 logging.debug("Checking Kathara release...")
+                # Imported here since the release check runs once a week
+                from ..webhooks.GitHubApi import GitHubApi
 
                 latest_remote_release = GitHubApi.get_release_information()
                 latest_version = latest_remote_release["tag_name"]
@@ -223,6 +227,9 @@ class Setting(object):
         if self.debug_level not in AVAILABLE_DEBUG_LEVELS:
             raise SettingsError("Debug Level must be one of the following: %s." % (", ".join(AVAILABLE_DEBUG_LEVELS)))
 
+        if self.pool_size is not None and (type(self.pool_size) != int or self.pool_size <= 0):
+            raise SettingsError("Pool Size must be a positive integer.")
+
     def _check_manager(self) -> None:
         """Check if the selected manager is available.
 
@@ -232,10 +239,8 @@ class Setting(object):
         Raises:
             SettingsError: If the Manager Type is not allowed.
         """
-        from ..manager.Kathara import Kathara
-        managers = Kathara.get_available_managers_name()
-
-        if self.manager_type not in managers.keys():
+        # The managers are not imported here, so that only the selected one is loaded when used
+        if self.manager_type not in AVAILABLE_MANAGERS:
             raise SettingsError("Manager Type not allowed.")
 
     def check_image(self, image: str = None) -> None:
@@ -312,5 +317,6 @@ class Setting(object):
                 "debug_level": self.debug_level,
                 "print_startup_log": self.print_startup_log,
                 "enable_ipv6": self.enable_ipv6,
+                "pool_size": self.pool_size,
                 "last_checked": self.last_checked
                 }
@@ -8,12 +8,14 @@ DEFAULTS = {
     "image_update_policy": "Prompt",
     "shared_cd": False,
     "remote_url": None,
-    "cert_path": None
+    "cert_path": None,
+    "max_parallel_pulls": 3
 }
 
 
 class DockerSettingsAddon(SettingsAddon):
-    __slots__ = ['hosthome_mount', 'shared_mount', 'image_update_policy', 'shared_cd', 'remote_url', 'cert_path']
+    __slots__ = ['hosthome_mount', 'shared_mount', 'image_update_policy', 'shared_cd', 'remote_url', 'cert_path',
+                 'max_parallel_pulls']
 
     def __init__(self) -> None:
         self.hosthome_mount: bool = False
@@ -22,6 +24,7 @@ class DockerSettingsAddon(SettingsAddon):
         self.shared_cd: bool = False
         self.remote_url: Optional[str] = None
         self.cert_path: Optional[str] = None
+        self.max_parallel_pulls: int = 3
 
     def _to_dict(self) -> Dict[str, Any]:
         return {
@@ -30,5 +33,6 @@ class DockerSettingsAddon(SettingsAddon):
             'image_update_policy': self.image_update_policy,
             'shared_cd': self.shared_cd,
             'remote_url': self.remote_url,
-            'cert_path': self.cert_path
+            'cert_path': self.cert_path,
+            'max_parallel_pulls': self.max_parallel_pulls
         }
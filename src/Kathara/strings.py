@@ -8,6 +8,7 @@ strings = {
     "lclean": "Stop a Kathara network scenario",
     "linfo": "Show information about a Kathara network scenario",
     "lrestart": "Restart a Kathara network scenario",
+    "lsync": "Copy the changed files of a Kathara network scenario into its running devices",
     "ltest": "Test a Kathara network scenario",
     "lconfig": "Manage the network interfaces of a running Kathara device in a Kathara network scenario",
     "connect": "Connect to a Kathara device",
@@ -15,7 +16,8 @@ strings = {
     "wipe": "Delete all Kathara devices and collision domains, optionally also delete settings",
     "list": "Show all running Kathara devices of the current user",
     "settings": "Show and edit Kathara settings",
-    "check": "Check your system environment"
+    "check": "Check your system environment",
+    "daemon": "Run a local Kathara service that serves the other commands"
 }
 
 wiki_description = "For examples and further information visit: https://github.com/KatharaFramework/Kathara/wiki"
@@ -6,7 +6,9 @@ from typing import Dict, Union, List
 from deepdiff import DeepDiff
 
 from ..exceptions import MachineSignatureNotFoundError
+from ..foundation.manager.channel.CommandChannel import CommandChannel, CHANNEL_SHELL
 from ..foundation.test.Test import Test
+from ..manager.Kathara import Kathara
 from ..model.Lab import Lab
 from ..model.Machine import Machine
 
@@ -68,11 +70,14 @@ class BuiltInTest(Test):
 
     @staticmethod
     def _get_machine_status(machine: Machine) -> Dict:
+        # Run all the commands in the same shell session
+        with Kathara.get_instance().open_command_channel(machine.name, lab_hash=machine.lab.hash) as channel:
+            return BuiltInTest._get_channel_status(channel)
+
+    @staticmethod
+    def _get_channel_status(channel: CommandChannel) -> Dict:
         # Machine interfaces
-        (ip_addr, _) = Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                                        machine_name=machine.name,
-                                                        command="ip -j addr show"
-                                                        )
+        (ip_addr, _) = Test._get_channel_command_output(channel, "ip -j addr show")
         if ip_addr:
             ip_addr = json.loads(ip_addr)
 
@@ -88,28 +93,20 @@ class BuiltInTest(Test):
             ip_addr_clean = {}
 
         # Machine routes
-        (ip_route, _) = Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                                         machine_name=machine.name,
-                                                         command="ip -j route show"
-                                                         )
+        (ip_route, _) = Test._get_channel_command_output(channel, "ip -j route show")
 
         ip_route = json.loads(ip_route) if ip_route else []
 
         # Machine opened ports
-        (net_stat, _) = Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                                         machine_name=machine.name,
-                                                         command="netstat -tuwln"
-                                                         )
+        (net_stat, _) = Test._get_channel_command_output(channel, "netstat -tuwln")
         # Remove Docker ports and header lines. Sort the array alphabetically.
         net_stat = sorted(list(filter(lambda x: "127.0.0.11" not in x, net_stat.splitlines()))[2:]) if net_stat else []
 
         # Machine processes
-        (processes, _) = Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                                          machine_name=machine.name,
-                                                          command="ps -e -o command"
-                                                          )
-        # Remove header line and sort the array alphabetically.
-        processes = sorted([x.strip() for x in processes.splitlines()[1:]]) if processes else []
+        (processes, _) = Test._get_channel_command_output(channel, "ps -e -o command")
+        # Remove header line and the shell of the channel. Sort the array alphabetically.
+        processes = sorted([x.strip() for x in processes.splitlines()[1:]
+                            if x.strip() != " ".join(CHANNEL_SHELL)]) if processes else []
 
         return {
             "interfaces": ip_addr_clean,
@@ -85,18 +85,13 @@ class UserTest(Test):
 
     @staticmethod
     def _run_machine_test_file(machine: Machine) -> str:
-        # Give execution permissions to test file
-        Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                         machine_name=machine.name,
-                                         command="chmod u+x /%s.test" % machine.name
-                                         )
-
-        # Run the test file inside the container
-        (stdout, stderr) = Test._get_machine_command_output(lab_hash=machine.lab.hash,
-                                                            machine_name=machine.name,
-                                                            command="%s -c /%s.test" % (
-                                                                Setting.get_instance().device_shell,
-                                                                machine.name
-                                                            ))
+        with Kathara.get_instance().open_command_channel(machine.name, lab_hash=machine.lab.hash) as channel:
+            # Give execution permissions to test file
+            Test._get_channel_command_output(channel, "chmod u+x /%s.test" % machine.name)
+
+            # Run the test file inside the container
+            (stdout, stderr) = Test._get_channel_command_output(channel, "%s -c /%s.test" % (
+                Setting.get_instance().device_shell, machine.name
+            ))
 
         return stdout if stdout else stderr if stderr else ""
@@ -2,6 +2,7 @@ import base64
 import hashlib
 import importlib
 import io
+import json
 import logging
 import math
 import os
@@ -10,12 +11,11 @@ import shutil
 import sys
 import tarfile
 import tempfile
+import time
 from io import BytesIO
-from itertools import islice
-from multiprocessing import cpu_count
 from platform import node, machine
 from sys import platform as _platform
-from typing import Any, Optional, Match, Generator, List, Callable, Union, Dict, Iterable
+from typing import Any, Optional, Match, List, Callable, Union, Dict, Generator
 from types import ModuleType
 
 from binaryornot.check import is_binary
@@ -35,6 +35,19 @@ EXCLUDED_FILES: List[str] = ['.DS_Store']
 # Reserved names for devices
 RESERVED_MACHINE_NAMES: List[str] = ['shared', '_test']
 
+# Bounds for the number of workers of the managers.
+# Manager operations are I/O-bound (workers mostly wait for the Docker daemon or for the cluster APIs), so the number of
+# workers does not depend on the host cores.
+MIN_POOL_SIZE: int = 4
+MAX_POOL_SIZE: int = 64
+DEFAULT_POOL_SIZE: int = 32
+WORKERS_PER_REMOTE_CPU: int = 4
+
+# Maximum size in bytes of the archives cache, the least recently used archives are evicted beyond it
+ARCHIVE_CACHE_MAX_SIZE: int = 512 * 1024 * 1024
+# Seconds after which a temporary archive is considered left over by an interrupted write
+ARCHIVE_TEMP_FILE_TTL: int = 3600
+
 
 # Generic Functions
 def check_python_version() -> None:
@@ -93,20 +106,22 @@ def re_search_fail(expression: str, line: str) -> Match:
     return matches
 
 
-def list_chunks(iterable: List, size: int) -> Generator:
-    it = iter(iterable)
-    item = list(islice(it, size))
-    while item:
-        yield item
-        item = list(islice(it, size))
+def strtobool(value: str) -> int:
+    # Same as distutils.util.strtobool, without importing distutils (slow to import, removed in Python 3.12)
+    value = value.lower()
+    if value in ('y', 'yes', 't', 'true', 'on', '1'):
+        return 1
+    elif value in ('n', 'no', 'f', 'false', 'off', '0'):
+        return 0
 
+    raise ValueError("invalid truth value %r" % (value,))
 
-def chunk_list(iterable: Union[List, Iterable], size: int) -> List[List]:
-    return [iterable] if len(iterable) < size else list_chunks(iterable, size)
 
+def get_pool_size(remote_cpus: Optional[int] = None) -> int:
+    if not remote_cpus:
+        return DEFAULT_POOL_SIZE
 
-def get_pool_size() -> int:
-    return cpu_count()
+    return max(MIN_POOL_SIZE, min(MAX_POOL_SIZE, remote_cpus * WORKERS_PER_REMOTE_CPU))
 
 
 # Platform Specific Functions
@@ -309,6 +324,159 @@ def pack_files_for_tar(guest_to_host: Dict) -> bytes:
     return tar_data
 
 
+def stream_files_for_tar(guest_to_host: Dict) -> Generator[bytes, None, None]:
+    """Pack the files in a gzipped tar archive, yielding the archive in chunks while the files are added.
+
+    Only the file being added is kept in memory, so the archive can be streamed to its destination.
+
+    Args:
+        guest_to_host (Dict): Keys are the paths in the archive, values are the host paths or file objects.
+
+    Returns:
+        Generator[bytes, None, None]: A generator of chunks of the archive.
+    """
+    buffer = BytesIO()
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    with tarfile.open(fileobj=buffer, mode='w|gz') as tar_file:
+        for path, file_obj in guest_to_host.items():
+            tar_info, file_content = pack_file_for_tar(file_obj, arc_name=path)
+            tar_file.addfile(tar_info, file_content)
+
+            chunk = drain()
+            if chunk:
+                yield chunk
+
+    # Closing the archive flushes the compressor and writes the tar trailer
+    yield drain()
+
+
+def get_cache_path() -> str:
+    return os.path.join(get_current_user_home(), ".cache", "kathara")
+
+
+def get_daemon_socket_path() -> str:
+    return os.path.join(get_cache_path(), "daemon.sock")
+
+
+def get_archive_cache_path() -> str:
+    return os.path.join(get_cache_path(), "archives")
+
+
+def get_cached_archive(key: str, fingerprint: str) -> Optional[bytes]:
+    archive_path = os.path.join(get_archive_cache_path(), "%s-%s.tar.gz" % (key, fingerprint))
+
+    try:
+        with open(archive_path, "rb") as archive_file:
+            tar_data = archive_file.read()
+    except OSError:
+        return None
+
+    # Mark the archive as recently used, so it is evicted last
+    try:
+        os.utime(archive_path)
+    except OSError:
+        pass
+
+    return tar_data
+
+
+def cache_archive(key: str, fingerprint: str, archive: bytes) -> None:
+    cache_path = get_archive_cache_path()
+
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+
+        # Only the last archive of each key is kept
+        for file_name in os.listdir(cache_path):
+            if file_name.startswith("%s-" % key):
+                os.remove(os.path.join(cache_path, file_name))
+
+        # Write a temporary file and rename it, so concurrent readers never see a partial archive
+        with tempfile.NamedTemporaryFile(mode='wb', dir=cache_path, suffix=".tmp", delete=False) as temp_file:
+            temp_file.write(archive)
+        archive_path = os.path.join(cache_path, "%s-%s.tar.gz" % (key, fingerprint))
+        os.replace(temp_file.name, archive_path)
+
+        _evict_archives(cache_path, archive_path)
+    except OSError as e:
+        logging.debug("Cannot cache archive `%s`: %s" % (key, str(e)))
+
+
+def _evict_archives(cache_path: str, new_archive_path: str) -> None:
+    # Archives of deleted or renamed network scenarios are never replaced, so the cache size is bounded by evicting
+    # the least recently used archives (except the one just written)
+    now = time.time()
+    archives = []
+    for file_name in os.listdir(cache_path):
+        file_path = os.path.join(cache_path, file_name)
+        # Temporary archives of interrupted writes are never renamed, so they are removed once they are stale (recent
+        # ones may be still written by a concurrent process)
+        if file_name.endswith(".tmp"):
+            if now - os.stat(file_path).st_mtime > ARCHIVE_TEMP_FILE_TTL:
+                os.remove(file_path)
+            continue
+
+        if not file_name.endswith(".tar.gz") or file_path == new_archive_path:
+            continue
+
+        archive_stat = os.stat(file_path)
+        archives.append((archive_stat.st_mtime, archive_stat.st_size, file_path))
+
+    cache_size = sum(size for (_, size, _) in archives) + os.stat(new_archive_path).st_size
+    for (_, size, archive_path) in sorted(archives):
+        if cache_size <= ARCHIVE_CACHE_MAX_SIZE:
+            break
+
+        os.remove(archive_path)
+        cache_size -= size
+
+
+def get_metadata_cache_path() -> str:
+    return os.path.join(get_cache_path(), "metadata")
+
+
+def _get_metadata_entry_path(namespace: str, key: str) -> str:
+    key_hash = hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    return os.path.join(get_metadata_cache_path(), namespace, "%s.json" % key_hash)
+
+
+def get_cached_metadata(namespace: str, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+    try:
+        with open(_get_metadata_entry_path(namespace, key), "r") as entry_file:
+            entry = json.load(entry_file)
+    except (OSError, ValueError):
+        return None
+
+    # Without a TTL, return the entry whatever its age (e.g., as a fallback when offline)
+    if ttl is not None and time.time() - entry['time'] > ttl:
+        return None
+
+    return entry['value']
+
+
+def cache_metadata(namespace: str, key: str, value: Any) -> None:
+    entry_path = _get_metadata_entry_path(namespace, key)
+
+    try:
+        entry = json.dumps({'time': time.time(), 'value': value})
+
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write a temporary file and rename it, so concurrent readers never see a partial entry
+        with tempfile.NamedTemporaryFile(mode='w', dir=os.path.dirname(entry_path), delete=False) as temp_file:
+            temp_file.write(entry)
+        os.replace(temp_file.name, entry_path)
+    except (OSError, TypeError, ValueError) as e:
+        logging.debug("Cannot cache metadata `%s` of `%s`: %s" % (key, namespace, str(e)))
+
+
 def is_excluded_file(path: str) -> bool:
     _, filename = os.path.split(path)
 
@@ -3,22 +3,37 @@ from typing import Dict, Any
 
 import requests
 
+from .. import utils
 from ..exceptions import HTTPConnectionError
 
 GITHUB_RELEASES_URL = "https://api.github.com/repos/%s/releases/latest"
 REPOSITORY_NAME = "KatharaFramework/Kathara"
 
+# Seconds to wait for GitHub before giving up
+GITHUB_TIMEOUT = 5
+# Release information is cached on disk for this number of seconds
+RELEASE_CACHE_NAMESPACE = "github"
+RELEASE_CACHE_TTL = 86400
+
 
 class GitHubApi(object):
     @staticmethod
     def get_release_information() -> Dict[str, Any]:
+        release_information = utils.get_cached_metadata(RELEASE_CACHE_NAMESPACE, REPOSITORY_NAME,
+                                                        ttl=RELEASE_CACHE_TTL)
+        if release_information is not None:
+            return release_information
+
         try:
-            result = requests.get(GITHUB_RELEASES_URL % REPOSITORY_NAME)
-        except requests.exceptions.ConnectionError as e:
+            result = requests.get(GITHUB_RELEASES_URL % REPOSITORY_NAME, timeout=GITHUB_TIMEOUT)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
             raise HTTPConnectionError(str(e))
 
         if result.status_code != 200:
             logging.debug("GitHub replied with status code %s while looking for Kathara repo.", result.status_code)
             raise HTTPConnectionError("GitHub replied with status code %s." % result.status_code)
 
-        return result.json()
+        release_information = result.json()
+        utils.cache_metadata(RELEASE_CACHE_NAMESPACE, REPOSITORY_NAME, release_information)
+
+        return release_information
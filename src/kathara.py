@@ -10,6 +10,7 @@ import coloredlogs
 
 from Kathara import utils
 from Kathara.auth.PrivilegeHandler import PrivilegeHandler
+from Kathara.cli.daemon.DaemonClient import DaemonClient
 from Kathara.cli.ui.event.register import register_cli_events
 from Kathara.exceptions import SettingsError, DockerDaemonConnectionError, ClassNotFoundError, SettingsNotFoundError
 from Kathara.foundation.cli.command.CommandFactory import CommandFactory
@@ -64,6 +65,12 @@ class KatharaEntryPoint(object):
             parser.print_help()
             sys.exit(1)
 
+        # A running daemon already checked the settings, let it run the command
+        if DaemonClient.can_serve(args.command, sys.argv[2:]):
+            exit_code = DaemonClient.run(args.command, sys.argv[2:], os.getcwd())
+            if exit_code is not None:
+                sys.exit(exit_code)
+
         try:
             # Check settings only if the user is not executing "settings" command.
             if "settings" not in args.command:
@@ -96,6 +103,11 @@ class KatharaEntryPoint(object):
             else:
                 logging.critical(f"({type(e).__name__}) {str(e)}")
             sys.exit(1)
+        finally:
+            # The manager is imported only by the commands that use it
+            kathara_module = sys.modules.get('Kathara.manager.Kathara')
+            if kathara_module is not None:
+                kathara_module.Kathara.close_instance()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,235 @@
+import io
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from unittest import mock
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, './')
+
+from src.Kathara import utils
+from src.Kathara.cli.daemon.DaemonClient import DaemonClient
+from src.Kathara.cli.daemon.KatharaDaemon import KatharaDaemon
+from src.Kathara.exceptions import DaemonAlreadyRunningError
+
+
+class FakeCommand(object):
+    def run(self, current_path, argv):
+        print("running in %s" % current_path)
+        logging.warning("warning from the daemon")
+        if argv:
+            if argv[0] == "fail":
+                raise Exception("command failed")
+            sys.exit(int(argv[0]))
+
+
+def wait_for_daemon(socket_path):
+    for _ in range(100):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client_socket:
+            try:
+                client_socket.connect(socket_path)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    raise TimeoutError("Daemon not started")
+
+
+@pytest.fixture()
+def settings():
+    with mock.patch("src.Kathara.setting.Setting.Setting.get_instance") as mock_get_instance:
+        mock_get_instance.return_value = Mock(open_terminals=False, debug_level="INFO")
+        yield mock_get_instance.return_value
+
+
+@pytest.fixture()
+def settings_mtime():
+    with mock.patch.object(KatharaDaemon, "_get_settings_mtime", return_value=1.0) as mock_settings_mtime:
+        yield mock_settings_mtime
+
+
+@pytest.fixture()
+def client_sys():
+    # The daemon thread redirects the streams of the process, so the client writes on its own ones
+    client_sys = Mock(stdout=io.StringIO(), stderr=io.StringIO())
+    with mock.patch("src.Kathara.cli.daemon.DaemonClient.sys", client_sys):
+        yield client_sys
+
+
+@pytest.fixture()
+def daemon(settings, settings_mtime, client_sys):
+    daemon = KatharaDaemon()
+    with mock.patch("src.Kathara.cli.daemon.KatharaDaemon.Kathara.get_instance"), \
+            mock.patch("src.Kathara.cli.daemon.KatharaDaemon.CommandFactory") as mock_factory:
+        mock_factory.return_value.create_instance.return_value = FakeCommand()
+
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        wait_for_daemon(daemon.socket_path)
+
+        yield daemon
+
+        daemon.shutdown()
+        thread.join()
+
+
+# TEST: KatharaDaemon
+def test_daemon_socket_is_private(daemon):
+    assert daemon.socket_path == utils.get_daemon_socket_path()
+    assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+
+@mock.patch("src.Kathara.cli.daemon.KatharaDaemon.socketserver.UnixStreamServer")
+def test_daemon_socket_bound_with_private_umask(mock_server, settings):
+    bind_umasks = []
+
+    def bind(*_):
+        umask = os.umask(0o077)
+        os.umask(umask)
+        bind_umasks.append(umask)
+        return mock_server.return_value
+
+    mock_server.side_effect = bind
+    mock_server.return_value.serve_forever.side_effect = KeyboardInterrupt
+    old_umask = os.umask(0o022)
+    os.umask(old_umask)
+
+    daemon = KatharaDaemon()
+    with mock.patch("src.Kathara.cli.daemon.KatharaDaemon.Kathara.get_instance"), \
+            mock.patch("src.Kathara.cli.daemon.KatharaDaemon.os.chmod"), pytest.raises(KeyboardInterrupt):
+        daemon.serve_forever()
+
+    assert bind_umasks == [0o077]
+    assert os.umask(old_umask) == old_umask
+
+
+def test_daemon_removes_socket_on_shutdown(settings):
+    daemon = KatharaDaemon()
+    with mock.patch("src.Kathara.cli.daemon.KatharaDaemon.Kathara.get_instance") as mock_get_instance:
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        wait_for_daemon(daemon.socket_path)
+        daemon.shutdown()
+        thread.join()
+
+    assert not os.path.exists(daemon.socket_path)
+    mock_get_instance.return_value.close.assert_called_once()
+
+
+def test_daemon_already_running(daemon):
+    with pytest.raises(DaemonAlreadyRunningError):
+        KatharaDaemon().serve_forever()
+
+
+def test_daemon_removes_stale_socket(settings):
+    socket_path = utils.get_daemon_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(socket_path)
+    stale_socket.close()
+
+    daemon = KatharaDaemon()
+    with mock.patch("src.Kathara.cli.daemon.KatharaDaemon.Kathara.get_instance"):
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        wait_for_daemon(daemon.socket_path)
+        daemon.shutdown()
+        thread.join()
+
+
+# TEST: DaemonClient.run
+def test_run_streams_output(daemon, client_sys):
+    exit_code = DaemonClient.run("list", [], "/lab/path")
+
+    assert exit_code == 0
+    assert client_sys.stdout.getvalue() == "running in /lab/path\n"
+    assert "WARNING - warning from the daemon" in client_sys.stderr.getvalue()
+
+
+def test_run_returns_exit_code(daemon):
+    assert DaemonClient.run("list", ["3"], "/lab/path") == 3
+
+
+def test_run_command_exception(daemon, client_sys):
+    exit_code = DaemonClient.run("list", ["fail"], "/lab/path")
+
+    assert exit_code == 1
+    assert "(Exception) command failed" in client_sys.stderr.getvalue()
+
+
+def test_run_reloads_settings_after_command(daemon, settings):
+    DaemonClient.run("lstart", [], "/lab/path")
+
+    settings.load_from_disk.assert_called_once()
+
+
+def test_run_fallback_on_settings_change(daemon, settings_mtime, client_sys):
+    settings_mtime.return_value = 2.0
+
+    assert DaemonClient.run("list", [], "/lab/path") is None
+    assert client_sys.stdout.getvalue() == ""
+
+
+def test_run_fallback_on_not_served_command(daemon):
+    assert DaemonClient.run("connect", [], "/lab/path") is None
+
+
+def test_run_fallback_on_prompt_update_policy(daemon, settings, client_sys):
+    settings.image_update_policy = "Prompt"
+
+    assert DaemonClient.run("lstart", [], "/lab/path") is None
+    assert DaemonClient.run("vstart", ["-n", "pc1"], "/lab/path") is None
+    assert client_sys.stdout.getvalue() == ""
+    assert DaemonClient.run("list", [], "/lab/path") == 0
+
+
+def test_run_no_fallback_on_always_update_policy(daemon, settings):
+    settings.image_update_policy = "Always"
+
+    assert DaemonClient.run("lstart", [], "/lab/path") == 0
+
+
+def test_run_no_daemon():
+    socket_path = utils.get_daemon_socket_path()
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(socket_path)
+    stale_socket.close()
+
+    assert DaemonClient.run("list", [], "/lab/path") is None
+
+
+# TEST: DaemonClient.can_serve
+def test_can_serve(daemon):
+    assert DaemonClient.can_serve("list", [])
+    assert DaemonClient.can_serve("exec", ["-d", "lab", "pc1", "ls"])
+
+
+def test_can_serve_no_socket(settings):
+    assert not DaemonClient.can_serve("list", [])
+
+
+def test_can_serve_not_served_commands(daemon):
+    assert not DaemonClient.can_serve("connect", ["pc1"])
+    assert not DaemonClient.can_serve("settings", [])
+    assert not DaemonClient.can_serve("wipe", ["-f"])
+
+
+def test_can_serve_live_commands(daemon):
+    assert not DaemonClient.can_serve("list", ["--live"])
+    assert not DaemonClient.can_serve("linfo", ["-l"])
+    assert DaemonClient.can_serve("lstart", ["-l"])
+
+
+def test_can_serve_terminal_commands(daemon, settings):
+    assert DaemonClient.can_serve("lstart", [])
+    assert not DaemonClient.can_serve("lstart", ["--terminals"])
+
+    settings.open_terminals = True
+    assert not DaemonClient.can_serve("vstart", ["-n", "pc1"])
+    assert DaemonClient.can_serve("vstart", ["-n", "pc1", "--noterminals"])
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, './')
+
+SRC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src")
+
+# Seconds that the CLI may spend importing modules before running a command
+STARTUP_BUDGET = 0.5
+
+STARTUP_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+
+import kathara
+from Kathara.cli.ui.event.register import register_cli_events
+from Kathara.foundation.cli.command.CommandFactory import CommandFactory
+from Kathara.setting.Setting import Setting
+
+register_cli_events()
+Setting.get_instance()._check_manager()
+CommandFactory().create_instance(class_args=(sys.argv[1].capitalize(),))
+
+elapsed = time.perf_counter() - start
+
+print(json.dumps({'elapsed': elapsed, 'modules': list(sys.modules.keys())}))
+"""
+
+HEAVY_MODULES = ['docker', 'kubernetes', 'deepdiff', 'progressbar', 'pyroute2', 'requests', 'distutils',
+                 'pkg_resources', 'Kathara.trdparty.consolemenu', 'Kathara.manager.docker.DockerManager',
+                 'Kathara.manager.kubernetes.KubernetesManager']
+
+
+def run_startup(command):
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, command], cwd=SRC_PATH, capture_output=True,
+                            check=True)
+
+    return json.loads(result.stdout.decode('utf-8').splitlines()[-1])
+
+
+@pytest.mark.parametrize("command", ["list", "connect", "exec", "linfo", "lstart", "wipe", "vstart"])
+def test_startup_imports_only_command_dependencies(command):
+    startup = run_startup(command)
+
+    assert [module for module in HEAVY_MODULES if module in startup['modules']] == []
+
+
+def test_startup_ltest_imports_deepdiff():
+    startup = run_startup("ltest")
+
+    assert 'deepdiff' in startup['modules']
+    assert 'docker' not in startup['modules']
+
+
+def test_startup_budget():
+    # The best of several runs, to ignore the noise of the machine running the tests
+    elapsed = min(run_startup("list")['elapsed'] for _ in range(3))
+
+    assert elapsed < STARTUP_BUDGET
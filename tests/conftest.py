@@ -0,0 +1,14 @@
+import sys
+from unittest import mock
+
+import pytest
+
+sys.path.insert(0, './')
+
+
+@pytest.fixture(autouse=True)
+def kathara_cache_path(tmp_path):
+    # Keep the tests away from the user cache
+    with mock.patch("src.Kathara.utils.get_cache_path") as get_cache_path_mock:
+        get_cache_path_mock.return_value = str(tmp_path / "kathara_cache")
+        yield get_cache_path_mock.return_value
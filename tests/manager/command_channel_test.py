@@ -0,0 +1,111 @@
+import contextlib
+import os
+import selectors
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, './')
+
+from src.Kathara.exceptions import CommandChannelClosedError
+from src.Kathara.foundation.manager.channel.CommandChannel import CommandChannel, CHANNEL_SHELL
+
+
+class LocalCommandChannel(CommandChannel):
+    """Command channel on a local shell, connected through pipes."""
+    __slots__ = ['process', 'selector']
+
+    def __init__(self):
+        super().__init__("local")
+
+        self.process = subprocess.Popen(CHANNEL_SHELL, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.process.stdout, selectors.EVENT_READ, 'stdout')
+        self.selector.register(self.process.stderr, selectors.EVENT_READ, 'stderr')
+
+    def _write(self, data):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def _read(self):
+        for key, _ in self.selector.select():
+            data = os.read(key.fileobj.fileno(), 7)
+            if not data:
+                return None
+            return (data, None) if key.data == 'stdout' else (None, data)
+
+    def _close(self):
+        self.selector.close()
+        self.process.wait(5)
+        self.process.stdout.close()
+        self.process.stderr.close()
+        with contextlib.suppress(BrokenPipeError):
+            self.process.stdin.close()
+
+
+@pytest.fixture()
+def channel():
+    local_channel = LocalCommandChannel()
+    yield local_channel
+    local_channel.close()
+
+
+def test_exec(channel):
+    assert channel.exec("echo hello") == (b"hello\n", b"", 0)
+
+
+def test_exec_list_command(channel):
+    assert channel.exec(["echo", "hello world", "$HOME"]) == (b"hello world $HOME\n", b"", 0)
+
+
+def test_exec_stderr_and_exit_code(channel):
+    assert channel.exec("echo out; echo err >&2; exit 3") == (b"out\n", b"err\n", 3)
+
+
+def test_exec_output_without_newline(channel):
+    assert channel.exec("printf abc; printf def >&2") == (b"abc", b"def", 0)
+
+
+def test_exec_trailing_comment(channel):
+    assert channel.exec("echo hello # comment") == (b"hello\n", b"", 0)
+
+
+def test_exec_does_not_consume_next_commands(channel):
+    assert channel.exec("cat") == (b"", b"", 0)
+    assert channel.exec("echo after") == (b"after\n", b"", 0)
+
+
+def test_exec_isolates_commands(channel):
+    channel.exec("cd / && exit 1")
+
+    assert channel.exec("pwd") == (os.getcwd().encode() + b"\n", b"", 0)
+
+
+def test_exec_large_output(channel):
+    (stdout, _, exit_code) = channel.exec("seq 1 20000")
+
+    assert exit_code == 0
+    assert stdout.splitlines() == [str(x).encode() for x in range(1, 20001)]
+
+
+def test_exec_after_close(channel):
+    channel.close()
+
+    with pytest.raises(CommandChannelClosedError):
+        channel.exec("echo hello")
+
+    assert channel.process.returncode == 0
+
+
+def test_exec_shell_terminated(channel):
+    channel.process.kill()
+    channel.process.wait(5)
+
+    with pytest.raises(CommandChannelClosedError):
+        channel.exec("echo hello")
+
+    # The channel is closed, no more commands can be sent
+    with pytest.raises(CommandChannelClosedError):
+        channel.exec("echo hello")
@@ -0,0 +1,90 @@
+import socket
+import struct
+import sys
+from unittest import mock
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, './')
+
+from src.Kathara.exceptions import CommandChannelClosedError
+from src.Kathara.foundation.manager.channel.CommandChannel import CHANNEL_SHELL
+from src.Kathara.manager.docker.channel.DockerCommandChannel import DockerCommandChannel
+
+
+def frame(stream, data):
+    return struct.pack('>BxxxL', stream, len(data)) + data
+
+
+@pytest.fixture()
+def exec_sockets():
+    (channel_socket, daemon_socket) = socket.socketpair()
+    yield channel_socket, daemon_socket
+    daemon_socket.close()
+
+
+@pytest.fixture()
+def docker_channel(exec_sockets):
+    client = Mock()
+    client.api.exec_create.return_value = {"Id": "exec_id"}
+    client.api.exec_start.return_value = exec_sockets[0]
+    container = Mock()
+    container.id = "container_id"
+    container.labels = {"name": "pc1"}
+
+    return DockerCommandChannel(client, container)
+
+
+@pytest.fixture()
+def marker():
+    with mock.patch("src.Kathara.foundation.manager.channel.CommandChannel.uuid.uuid4") as mock_uuid4:
+        mock_uuid4.return_value.hex = "0123"
+        yield b"KATHARA_0123"
+
+
+def test_open(exec_sockets):
+    client = Mock()
+    client.api.exec_create.return_value = {"Id": "exec_id"}
+    client.api.exec_start.return_value = exec_sockets[0]
+    container = Mock()
+    container.id = "container_id"
+    container.labels = {"name": "pc1"}
+
+    channel = DockerCommandChannel(client, container)
+
+    assert channel.machine_name == "pc1"
+    client.api.exec_create.assert_called_once_with("container_id", CHANNEL_SHELL, stdout=True, stderr=True,
+                                                   stdin=True, tty=False)
+    client.api.exec_start.assert_called_once_with("exec_id", tty=False, socket=True)
+
+
+def test_exec(docker_channel, exec_sockets, marker):
+    (_, daemon_socket) = exec_sockets
+    daemon_socket.sendall(frame(1, b"out") + frame(2, b"err\n" + marker) + frame(1, b"\n" + marker + b" 2"))
+    daemon_socket.sendall(frame(2, b"\n") + frame(1, b"\n"))
+
+    assert docker_channel.exec(["ip", "-j", "addr"]) == (b"out\n", b"err\n", 2)
+
+    sent = daemon_socket.recv(4096)
+    assert b"\nip -j addr\n" in sent
+    assert marker in sent
+
+
+def test_exec_stream_closed(docker_channel, exec_sockets, marker):
+    (_, daemon_socket) = exec_sockets
+    daemon_socket.sendall(frame(1, b"partial"))
+    daemon_socket.shutdown(socket.SHUT_WR)
+
+    with pytest.raises(CommandChannelClosedError):
+        docker_channel.exec("ls")
+
+
+def test_close(docker_channel, exec_sockets):
+    (channel_socket, daemon_socket) = exec_sockets
+
+    with docker_channel:
+        pass
+
+    assert daemon_socket.recv(4096) == b"exit\n"
+    assert channel_socket.fileno() == -1
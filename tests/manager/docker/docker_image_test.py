@@ -1,5 +1,8 @@
 import sys
+import threading
+import time
 from unittest import mock
+from unittest.mock import Mock
 
 import docker.models.images
 import pytest
@@ -9,7 +12,7 @@ sys.path.insert(0, './')
 
 from src.Kathara.event.EventDispatcher import EventDispatcher
 from src.Kathara.manager.docker.DockerImage import DockerImage
-from src.Kathara.exceptions import InvalidImageArchitectureError
+from src.Kathara.exceptions import InvalidImageArchitectureError, DockerImagePullError
 
 
 class MockPullEvent(object):
@@ -31,24 +34,168 @@ def test_get_local(docker_image):
     docker_image.client.images.get.assert_called_once_with("kathara/test")
 
 
-def test_get_remote(docker_image):
-    docker_image.get_remote("kathara/test")
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+def test_get_remote(mock_get_cached_metadata, mock_cache_metadata, docker_image):
+    mock_get_cached_metadata.return_value = None
+    registry_data = docker_image.get_remote("kathara/test")
     docker_image.client.images.get_registry_data.assert_called_once_with("kathara/test")
-
-
-def test_pull(docker_image):
+    mock_cache_metadata.assert_called_once_with("registry", "kathara/test", registry_data.attrs)
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+def test_get_remote_cached(mock_get_cached_metadata, mock_cache_metadata, docker_image):
+    attrs = {'Descriptor': {'digest': 'sha256'}, 'Platforms': [{'os': 'linux', 'architecture': 'amd64'}]}
+    mock_get_cached_metadata.return_value = attrs
+    registry_data = docker_image.get_remote("kathara/test")
+    mock_get_cached_metadata.assert_called_once_with("registry", "kathara/test", ttl=3600)
+    assert not docker_image.client.images.get_registry_data.called
+    assert not mock_cache_metadata.called
+    assert isinstance(registry_data, docker.models.images.RegistryData)
+    assert registry_data.attrs == attrs
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+def test_get_remote_offline_fallback(mock_get_cached_metadata, mock_cache_metadata, docker_image):
+    attrs = {'Descriptor': {'digest': 'sha256'}}
+    mock_get_cached_metadata.side_effect = lambda namespace, key, ttl=None: None if ttl else attrs
+    docker_image.client.images.get_registry_data.side_effect = APIError(
+        "Fail", response=Mock(status_code=500), explanation="dial tcp: lookup registry-1.docker.io"
+    )
+    registry_data = docker_image.get_remote("kathara/test")
+    assert registry_data.attrs == attrs
+    assert not mock_cache_metadata.called
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+def test_get_remote_not_found_no_fallback(mock_get_cached_metadata, mock_cache_metadata, docker_image):
+    mock_get_cached_metadata.side_effect = lambda namespace, key, ttl=None: None if ttl else {}
+    docker_image.client.images.get_registry_data.side_effect = APIError(
+        "Fail", response=Mock(status_code=404), explanation="manifest unknown"
+    )
+    with pytest.raises(APIError):
+        docker_image.get_remote("kathara/test")
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    docker_image.client.api.pull.return_value = []
     docker_image.pull("kathara/test")
-    docker_image.client.images.pull.assert_called_once_with("kathara/test:latest")
+    docker_image.client.api.pull.assert_called_once_with("kathara/test:latest", stream=True, decode=True)
+    docker_image.client.images.get.assert_called_once_with("kathara/test:latest")
 
 
-def test_pull_latest(docker_image):
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_latest(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    docker_image.client.api.pull.return_value = []
     docker_image.pull("kathara/test:latest")
-    docker_image.client.images.pull.assert_called_once_with("kathara/test:latest")
+    docker_image.client.api.pull.assert_called_once_with("kathara/test:latest", stream=True, decode=True)
 
 
-def test_pull_tag(docker_image):
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_tag(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    docker_image.client.api.pull.return_value = []
     docker_image.pull("kathara/test:tag")
-    docker_image.client.images.pull.assert_called_once_with("kathara/test:tag")
+    docker_image.client.api.pull.assert_called_once_with("kathara/test:tag", stream=True, decode=True)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_digest(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    docker_image.client.api.pull.return_value = []
+    docker_image.pull("kathara/test@sha256:1234")
+    docker_image.client.api.pull.assert_called_once_with("kathara/test@sha256:1234", stream=True, decode=True)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_error(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    docker_image.client.api.pull.return_value = [{'error': "manifest unknown"}]
+    with pytest.raises(DockerImagePullError):
+        docker_image.pull("kathara/test")
+    assert not docker_image.client.images.get.called
+    assert docker_image._active_pulls == 0
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_limit(mock_setting_get_instance, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=2)
+    running = []
+    max_running = []
+    lock = threading.Lock()
+
+    def pull(image_name, stream, decode):
+        with lock:
+            running.append(image_name)
+            max_running.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(image_name)
+        return []
+
+    docker_image.client.api.pull.side_effect = pull
+    threads = [threading.Thread(target=docker_image.pull, args=("kathara/test%d" % i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert docker_image.client.api.pull.call_count == 6
+    assert max(max_running) == 2
+
+
+@mock.patch("src.Kathara.event.EventDispatcher.EventDispatcher.dispatch")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_pull_progress_shared_layers(mock_setting_get_instance, mock_dispatch, docker_image):
+    mock_setting_get_instance.return_value = Mock(max_parallel_pulls=3)
+    streams = {
+        "kathara/test1:latest": [
+            {'status': "Pulling from kathara/test1", 'id': "latest"},
+            {'status': "Pulling fs layer", 'id': "layer1", 'progressDetail': {}},
+            {'status': "Downloading", 'id': "layer1", 'progressDetail': {'current': 50, 'total': 100}},
+        ],
+        "kathara/test2:latest": [
+            {'status': "Pulling fs layer", 'id': "layer1", 'progressDetail': {}},
+            {'status': "Pulling fs layer", 'id': "layer2", 'progressDetail': {}},
+            {'status': "Downloading", 'id': "layer2", 'progressDetail': {'current': 10, 'total': 20}},
+            {'status': "Pull complete", 'id': "layer2", 'progressDetail': {}},
+        ]
+    }
+    docker_image.client.api.pull.side_effect = lambda image_name, stream, decode: streams[image_name]
+
+    # Simulate another running pull, so the progress is shared by the two pulls
+    docker_image._active_pulls = 1
+    docker_image.pull("kathara/test1")
+    docker_image.pull("kathara/test2")
+
+    # The layer shared by the two images is counted once, the tag line of the stream is not a layer
+    mock_dispatch.assert_called_with("docker_images_pull_progress",
+                                     progress={'layers': 2, 'done_layers': 1, 'current': 70, 'total': 120})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_tag_from_digest(mock_get_local, docker_image):
+    assert docker_image._tag_from_digest("kathara/test:tag", "sha256:1234")
+    mock_get_local.assert_called_once_with("kathara/test@sha256:1234")
+    mock_get_local.return_value.tag.assert_called_once_with("kathara/test", tag="tag")
+
+
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_tag_from_digest_no_tag(mock_get_local, docker_image):
+    assert docker_image._tag_from_digest("kathara/test", "sha256:1234")
+    mock_get_local.return_value.tag.assert_called_once_with("kathara/test", tag="latest")
+
+
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_tag_from_digest_not_found(mock_get_local, docker_image):
+    mock_get_local.side_effect = APIError("Fail")
+    assert not docker_image._tag_from_digest("kathara/test", "sha256:1234")
 
 
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
@@ -95,13 +242,14 @@ def test_check_for_updates_remote_image(mock_local_image, mock_remote_image, moc
     assert not mock_pull.called
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._tag_from_digest")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
 @mock.patch("docker.models.images.Image")
 @mock.patch("docker.models.images.Image")
 def test_check_for_updates_image_update(mock_local_image, mock_remote_image, mock_get_local, mock_get_remote,
-                                        mock_pull, docker_image):
+                                        mock_pull, mock_tag_from_digest, docker_image):
     mock_local_image.configure_mock(**{
         'attrs': {
             'RepoDigests': ['kathara/test@sha256']
@@ -116,12 +264,41 @@ def test_check_for_updates_image_update(mock_local_image, mock_remote_image, moc
     })
     mock_get_local.return_value = mock_local_image
     mock_get_remote.return_value = mock_remote_image
+    mock_tag_from_digest.return_value = False
     docker_image.check_for_updates("kathara/test")
     mock_get_local.assert_called_once_with("kathara/test")
     mock_get_remote.assert_called_once_with("kathara/test")
+    mock_tag_from_digest.assert_called_once_with("kathara/test", "different_sha")
     mock_pull.assert_called_once_with("kathara/test")
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._tag_from_digest")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_check_for_updates_image_update_available_locally(mock_get_local, mock_get_remote, mock_pull,
+                                                          mock_tag_from_digest, docker_image):
+    mock_get_local.return_value = Mock(attrs={'RepoDigests': ['kathara/test@sha256']})
+    mock_get_remote.return_value = Mock(attrs={'Descriptor': {'digest': 'different_sha'}})
+    mock_tag_from_digest.return_value = True
+    docker_image.check_for_updates("kathara/test")
+    mock_tag_from_digest.assert_called_once_with("kathara/test", "different_sha")
+    assert not mock_pull.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._tag_from_digest")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_check_for_updates_any_repo_digest(mock_get_local, mock_get_remote, mock_pull, mock_tag_from_digest,
+                                           docker_image):
+    mock_get_local.return_value = Mock(attrs={'RepoDigests': ['kathara/other@old_sha', 'kathara/test@sha256']})
+    mock_get_remote.return_value = Mock(attrs={'Descriptor': {'digest': 'sha256'}})
+    docker_image.check_for_updates("kathara/test")
+    assert not mock_tag_from_digest.called
+    assert not mock_pull.called
+
+
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_image_architecture")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
@@ -154,6 +331,22 @@ def test_check_and_pull_local_true(mock_get_local, mock_check_for_updates, mock_
     assert not mock_pull.called
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_image_architecture")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_for_updates")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_check_and_pull_local_no_check_updates(mock_get_local, mock_check_for_updates, mock_get_remote, mock_pull,
+                                               mock_check_image_architecture, docker_image):
+    mock_check_image_architecture.return_value = None
+
+    docker_image._check_and_pull("kathara/test", True, check_updates=False)
+    mock_get_local.assert_called_once_with("kathara/test")
+    assert not mock_check_for_updates.called
+    assert not mock_get_remote.called
+    assert not mock_pull.called
+
+
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_image_architecture")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
@@ -171,23 +364,42 @@ def test_check_and_pull_remote_false(mock_get_local, mock_check_for_updates, moc
     assert not mock_pull.called
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._tag_from_digest")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_image_architecture")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_for_updates")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
 def test_check_and_pull_remote_true(mock_get_local, mock_check_for_updates, mock_get_remote, mock_pull,
-                                    mock_check_image_architecture, docker_image):
+                                    mock_check_image_architecture, mock_tag_from_digest, docker_image):
     mock_check_image_architecture.return_value = None
+    mock_tag_from_digest.return_value = False
 
     mock_get_local.side_effect = APIError("Fail")
     docker_image._check_and_pull("kathara/test", True)
     mock_get_local.assert_called_once_with("kathara/test")
     assert not mock_check_for_updates.called
     mock_get_remote.assert_called_once_with("kathara/test")
+    mock_tag_from_digest.assert_called_once_with("kathara/test", mock_get_remote.return_value.id)
     mock_pull.assert_called_once_with("kathara/test")
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._tag_from_digest")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_image_architecture")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_local")
+def test_check_and_pull_remote_available_by_digest(mock_get_local, mock_get_remote, mock_pull,
+                                                   mock_check_image_architecture, mock_tag_from_digest,
+                                                   docker_image):
+    mock_check_image_architecture.return_value = None
+    mock_tag_from_digest.return_value = True
+
+    mock_get_local.side_effect = APIError("Fail")
+    docker_image._check_and_pull("kathara/test", True)
+    assert not mock_pull.called
+
+
 @mock.patch("src.Kathara.utils.get_architecture")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.pull")
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.get_remote")
@@ -244,14 +456,33 @@ def test_check(mock_check_and_pull, docker_image):
 def test_check_and_pull_from_list_3_elem(mock_check_and_pull, docker_image):
     images = ["kathara/test1", "kathara/test2", "kathara/test3"]
     docker_image.check_from_list(images)
-    mock_check_and_pull.assert_any_call("kathara/test1")
-    mock_check_and_pull.assert_any_call("kathara/test2")
-    mock_check_and_pull.assert_any_call("kathara/test3")
+    mock_check_and_pull.assert_any_call("kathara/test1", check_updates=True)
+    mock_check_and_pull.assert_any_call("kathara/test2", check_updates=True)
+    mock_check_and_pull.assert_any_call("kathara/test3", check_updates=True)
     assert mock_check_and_pull.call_count == 3
 
 
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_and_pull")
+def test_check_and_pull_from_list_no_check_updates(mock_check_and_pull, docker_image):
+    docker_image.check_from_list(["kathara/test1"], check_updates=False)
+    mock_check_and_pull.assert_called_once_with("kathara/test1", check_updates=False)
+
+
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage._check_and_pull")
 def test_check_and_pull_from_list_0_elem(mock_check_and_pull, docker_image):
     images = []
     docker_image.check_from_list(images)
     assert not mock_check_and_pull.called
+
+
+#
+# TEST: check_updates_from_list
+#
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_for_updates")
+def test_check_updates_from_list(mock_check_for_updates, docker_image):
+    mock_check_for_updates.side_effect = [APIError("not found"), None]
+
+    docker_image.check_updates_from_list(["kathara/test1", "kathara/test2"])
+
+    mock_check_for_updates.assert_has_calls([mock.call("kathara/test1"), mock.call("kathara/test2")])
+    assert mock_check_for_updates.call_count == 2
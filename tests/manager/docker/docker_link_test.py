@@ -1,14 +1,17 @@
 import sys
+import threading
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import Mock, MagicMock, call
 
 import docker.types
 import pytest
+from docker.errors import APIError, NotFound
 
 sys.path.insert(0, './')
 
 from src.Kathara.model.Lab import Lab
 from src.Kathara.manager.docker.DockerLink import DockerLink
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
 from src.Kathara import utils
 from src.Kathara.exceptions import LinkNotFoundError
 
@@ -25,7 +28,7 @@ def default_link():
 @pytest.fixture()
 @mock.patch("docker.DockerClient")
 def docker_link(mock_obj):
-    return DockerLink(mock_obj)
+    return DockerLink(mock_obj, ManagerExecutor(max_workers=4))
 
 
 @pytest.fixture()
@@ -37,7 +40,7 @@ def docker_network(mock_network):
 @pytest.fixture()
 @mock.patch("docker.DockerClient")
 def docker_link(mock_docker_client):
-    return DockerLink(mock_docker_client)
+    return DockerLink(mock_docker_client, ManagerExecutor(max_workers=4))
 
 
 #
@@ -134,28 +137,53 @@ def test_create_shared_cd(mock_get_current_user_name, mock_setting_get_instance,
     )
 
 
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.utils.get_current_user_name")
+def test_create_existing_network(mock_get_current_user_name, mock_setting_get_instance, docker_link, default_link):
+    mock_get_current_user_name.return_value = 'user'
+    mock_setting_get_instance.return_value = Mock(shared_cd=False, net_prefix='kathara', remote_url=None)
+    existing_network = Mock()
+
+    docker_link.create(default_link, {"kathara_user_A": existing_network, "kathara_user_AB": Mock()})
+
+    assert default_link.api_object == existing_network
+    assert not docker_link.client.networks.list.called
+    assert not docker_link.client.networks.create.called
+
+
 #
 # TEST: _deploy_link
 #
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.create")
 def test_deploy_link(mock_create, docker_link, default_link):
-    docker_link._deploy_link(("", default_link))
-    mock_create.called_once_with(default_link)
+    docker_link._deploy_link({}, ("", default_link))
+    mock_create.assert_called_once_with(default_link, {})
 
 
 #
 # TEST: deploy_links
 #
+@mock.patch("src.Kathara.utils.get_current_user_name")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._deploy_link")
-def test_deploy_links(mock_deploy_link, docker_link):
+def test_deploy_links(mock_deploy_link, mock_get_links_api_objects_by_filters, mock_setting_get_instance,
+                      mock_get_current_user_name, docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=False)
+    mock_get_current_user_name.return_value = "user"
+    existing_network = Mock()
+    existing_network.name = "kathara_user_A"
+    mock_get_links_api_objects_by_filters.return_value = [existing_network]
     lab = Lab("Default scenario")
     link_a = lab.get_or_new_link("A")
     link_b = lab.get_or_new_link("B")
     link_c = lab.get_or_new_link("C")
     docker_link.deploy_links(lab)
-    mock_deploy_link.assert_any_call(("A", link_a))
-    mock_deploy_link.assert_any_call(("B", link_b))
-    mock_deploy_link.assert_any_call(("C", link_c))
+    mock_get_links_api_objects_by_filters.assert_called_once_with(user="user")
+    existing_networks = {"kathara_user_A": existing_network}
+    mock_deploy_link.assert_any_call(existing_networks, ("A", link_a))
+    mock_deploy_link.assert_any_call(existing_networks, ("B", link_b))
+    mock_deploy_link.assert_any_call(existing_networks, ("C", link_c))
     assert mock_deploy_link.call_count == 3
 
 
@@ -166,6 +194,33 @@ def test_deploy_links_no_link(mock_deploy_link, docker_link):
     assert not mock_deploy_link.called
 
 
+#
+# TEST: submit_links
+#
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._deploy_link")
+def test_submit_links(mock_deploy_link, mock_get_links_api_objects_by_filters, mock_setting_get_instance,
+                      docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=True)
+    mock_get_links_api_objects_by_filters.return_value = []
+    mock_deploy_link.side_effect = lambda existing_networks, link_item: link_item[0]
+    lab = Lab("Default scenario")
+    lab.get_or_new_link("A")
+    lab.get_or_new_link("B")
+    links_futures = docker_link.submit_links(lab, selected_links={"B"})
+    mock_get_links_api_objects_by_filters.assert_called_once_with(user="shared_cd")
+    assert list(links_futures.keys()) == ["B"]
+    assert links_futures["B"].result() == "B"
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._deploy_link")
+def test_submit_links_no_link(mock_deploy_link, docker_link):
+    lab = Lab("Default scenario")
+    assert docker_link.submit_links(lab) == {}
+    assert not mock_deploy_link.called
+
+
 #
 # TEST: _delete_link
 #
@@ -232,27 +287,96 @@ def test_get_links_by_filters_only_user_name(mock_network_list, docker_link):
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
 def test_undeploy(mock_get_links_by_filters, mock_undeploy_link, mock_net1, mock_net2, mock_net3,
                   docker_link):
-    lab = Lab("Default scenario")
-    lab.get_or_new_link("A")
-    lab.get_or_new_link("B")
-    lab.get_or_new_link("C")
+    for network, name in [(mock_net1, "A"), (mock_net2, "B"), (mock_net3, "C")]:
+        network.name = "kathara_user_%s" % name
+        network.attrs = {"Labels": {"name": name, "external": ""}}
     mock_get_links_by_filters.return_value = [mock_net1, mock_net2, mock_net3]
+    docker_link.client.api.containers.return_value = []
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": ["kathara_user_A", "kathara_user_B"]}
+
     docker_link.undeploy("lab_hash")
-    mock_get_links_by_filters.called_once_with(lab.hash)
-    assert mock_net1.reload.call_count == 1
-    assert mock_net2.reload.call_count == 1
-    assert mock_net3.reload.call_count == 1
-    assert mock_undeploy_link.call_count == 3
+
+    mock_get_links_by_filters.assert_called_once_with(lab_hash="lab_hash")
+    docker_link.client.networks.prune.assert_called_once_with(
+        filters={"label": ["app=kathara", "external=", "lab_hash=lab_hash"]}
+    )
+    assert not mock_net1.reload.called
+    assert not mock_net2.reload.called
+    assert not mock_net3.reload.called
+    assert not mock_undeploy_link.called
+
+
+@mock.patch("docker.models.networks.Network")
+@mock.patch("docker.models.networks.Network")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._undeploy_link")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_undeploy_external_links(mock_get_links_by_filters, mock_undeploy_link, mock_net1, mock_net2, docker_link):
+    mock_net1.attrs = {"Labels": {"name": "A", "external": ""}}
+    mock_net2.attrs = {"Labels": {"name": "B", "external": "eth0.100"}}
+    mock_net2.containers = []
+    mock_get_links_by_filters.return_value = [mock_net1, mock_net2]
+    docker_link.client.api.containers.return_value = []
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": None}
+
+    docker_link.undeploy("lab_hash")
+
+    assert not mock_net1.reload.called
+    mock_net2.reload.assert_called_once()
+    mock_undeploy_link.assert_called_once_with(mock_net2)
+    docker_link.client.networks.prune.assert_called_once()
+
+
+@mock.patch("docker.models.networks.Network")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._undeploy_link")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_undeploy_external_link_in_use(mock_get_links_by_filters, mock_undeploy_link, mock_net1, docker_link):
+    mock_net1.attrs = {"Labels": {"name": "A", "external": "eth0.100"}}
+    mock_net1.id = "net1_id"
+    mock_get_links_by_filters.return_value = [mock_net1]
+    docker_link.client.api.containers.return_value = [
+        {"NetworkSettings": {"Networks": {"kathara_user_A": {"NetworkID": "net1_id"}}}}
+    ]
+
+    docker_link.undeploy("lab_hash")
+
+    docker_link.client.api.containers.assert_called_once_with(all=True, filters={"network": ["net1_id"]})
+    assert not mock_undeploy_link.called
+    assert not docker_link.client.networks.prune.called
+
+
+@mock.patch("src.Kathara.event.EventDispatcher.EventDispatcher.get_instance")
+@mock.patch("docker.models.networks.Network")
+@mock.patch("docker.models.networks.Network")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_undeploy_links_in_use_not_dispatched(mock_get_links_by_filters, mock_net1, mock_net2, mock_event_dispatcher,
+                                              docker_link):
+    for network, name in [(mock_net1, "A"), (mock_net2, "B")]:
+        network.id = "%s_id" % name
+        network.name = "kathara_user_%s" % name
+        network.attrs = {"Labels": {"name": name, "external": ""}}
+    mock_get_links_by_filters.return_value = [mock_net1, mock_net2]
+    docker_link.client.api.containers.return_value = [
+        {"NetworkSettings": {"Networks": {"kathara_user_B": {"NetworkID": "B_id"}}}}
+    ]
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": ["kathara_user_A"]}
+
+    docker_link.undeploy("lab_hash")
+
+    mock_event_dispatcher.return_value.dispatch.assert_has_calls([
+        mock.call("links_undeploy_started", items=[mock_net1]),
+        mock.call("link_undeployed", item=mock_net1),
+        mock.call("links_undeploy_ended")
+    ])
 
 
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._undeploy_link")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
 def test_undeploy_empty_lab(mock_get_links_by_filters, mock_undeploy_link, docker_link):
-    lab = Lab("Default scenario")
     mock_get_links_by_filters.return_value = []
     docker_link.undeploy("lab_hash")
-    mock_get_links_by_filters.called_once_with(lab.hash)
+    mock_get_links_by_filters.assert_called_once_with(lab_hash="lab_hash")
     assert not mock_undeploy_link.called
+    assert not docker_link.client.networks.prune.called
 
 
 @mock.patch("docker.models.networks.Network")
@@ -260,50 +384,174 @@ def test_undeploy_empty_lab(mock_get_links_by_filters, mock_undeploy_link, docke
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._undeploy_link")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
 def test_undeploy_selected_links(mock_get_links_by_filters, mock_undeploy_link, mock_net1, mock_net2, docker_link):
-    lab = Lab("Default scenario")
-    lab.get_or_new_link("A")
-    lab.get_or_new_link("B")
-
     mock_net1.attrs = {"Labels": {"name": "A"}}
     mock_net2.attrs = {"Labels": {"name": "B"}}
+    mock_net2.containers = []
 
     mock_get_links_by_filters.return_value = [mock_net1, mock_net2]
 
     docker_link.undeploy("lab_hash", selected_links={"B"})
-    mock_get_links_by_filters.called_once_with(lab.hash)
+    mock_get_links_by_filters.assert_called_once_with(lab_hash="lab_hash")
     assert mock_net1.reload.call_count == 0
     assert mock_net2.reload.call_count == 1
-    assert mock_undeploy_link.call_count == 1
+    mock_undeploy_link.assert_called_once_with(mock_net2)
+    assert not docker_link.client.networks.prune.called
 
 
 #
 # TEST: wipe
 #
-@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._undeploy_link")
-@mock.patch("docker.models.networks.Network")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("docker.models.networks.Network")
 @mock.patch("docker.models.networks.Network")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
-def test_wipe(mock_get_links_by_filters, mock_net1, mock_net2, mock_net3, mock_undeploy_link, docker_link):
-    lab = Lab("Default scenario")
-    lab.get_or_new_link("A")
-    lab.get_or_new_link("B")
-    lab.get_or_new_link("C")
-    mock_get_links_by_filters.return_value = [mock_net1, mock_net2, mock_net3]
+def test_wipe(mock_get_links_by_filters, mock_net1, mock_net2, mock_setting_get_instance, docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=False)
+    mock_net1.attrs = {"Labels": {"name": "A", "external": ""}}
+    mock_net2.attrs = {"Labels": {"name": "B", "external": ""}}
+    mock_get_links_by_filters.return_value = [mock_net1, mock_net2]
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": []}
+
+    docker_link.wipe(user="user")
+
+    mock_get_links_by_filters.assert_called_once_with(user="user")
+    docker_link.client.networks.prune.assert_called_once_with(
+        filters={"label": ["app=kathara", "external=", "user=user"]}
+    )
+    assert not mock_net1.reload.called
+    assert not mock_net2.reload.called
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_wipe_shared_cd(mock_get_links_by_filters, mock_setting_get_instance, docker_link, docker_network):
+    mock_setting_get_instance.return_value = Mock(shared_cd=True)
+    docker_network.attrs = {"Labels": {"name": "A", "external": ""}}
+    mock_get_links_by_filters.return_value = [docker_network]
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": []}
+
+    docker_link.wipe(user="user")
+
+    mock_get_links_by_filters.assert_called_once_with(user="shared_cd")
+    docker_link.client.networks.prune.assert_called_once_with(
+        filters={"label": ["app=kathara", "external=", "user=shared_cd"]}
+    )
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_wipe_no_links(mock_get_links_by_filters, mock_setting_get_instance, docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=False)
+    mock_get_links_by_filters.return_value = []
+
     docker_link.wipe()
-    mock_get_links_by_filters.called_once_with(lab.hash)
-    assert mock_net1.reload.call_count == 1
-    assert mock_net2.reload.call_count == 1
-    assert mock_net3.reload.call_count == 1
-    assert mock_undeploy_link.call_count == 3
+
+    assert not docker_link.client.networks.prune.called
+
+
+#
+# TEST: undeploy_released_links
+#
+def released_container(*network_ids):
+    return Mock(attrs={"NetworkSettings": {"Networks": {
+        network_id: {"NetworkID": network_id} for network_id in network_ids
+    }}})
+
+
+def released_network(network_id, external=""):
+    return Mock(id=network_id, attrs={"Labels": {"app": "kathara", "external": external}})
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_released_links_callback(mock_get_links_by_filters, mock_setting_get_instance, docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=False)
+    mock_get_links_by_filters.return_value = [released_network("net_a"), released_network("net_b", "eth0.100")]
+    docker_link.client.api.containers.return_value = [released_container("net_a", "other_net").attrs,
+                                                      released_container("net_a").attrs]
+
+    callback = docker_link.get_released_links_callback(lab_hash="lab_hash")
+
+    mock_get_links_by_filters.assert_called_once_with(lab_hash="lab_hash", user=None)
+    docker_link.client.api.containers.assert_called_once_with(all=True, filters={"network": ["net_a"]})
+    assert callback.keywords["networks"] == {"net_a": mock_get_links_by_filters.return_value[0]}
+    assert callback.keywords["endpoints"] == {"net_a": 2}
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_released_links_callback_shared_cd(mock_get_links_by_filters, mock_setting_get_instance, docker_link):
+    mock_setting_get_instance.return_value = Mock(shared_cd=True)
+    mock_get_links_by_filters.return_value = []
+
+    docker_link.get_released_links_callback(user="user")
+
+    mock_get_links_by_filters.assert_called_once_with(lab_hash=None, user="shared_cd")
+    assert not docker_link.client.api.containers.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._delete_link")
+def test_undeploy_released_links(mock_delete_link, docker_link):
+    network = released_network("net_a")
+    networks = {"net_a": network}
+    endpoints = {"net_a": 2}
+    lock = threading.Lock()
+
+    docker_link.undeploy_released_links(released_container("net_a"), networks, endpoints, lock)
+    assert not mock_delete_link.called
+
+    docker_link.undeploy_released_links(released_container("net_a"), networks, endpoints, lock)
+    mock_delete_link.assert_called_once_with(network)
+    assert networks == {}
+    assert not docker_link.client.networks.get.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._delete_link")
+def test_undeploy_released_links_other_networks(mock_delete_link, docker_link):
+    # Networks of other network scenarios or users, or with external interfaces, are not in networks
+    docker_link.undeploy_released_links(released_container("bridge", "other_lab_net"), {}, {}, threading.Lock())
+
+    assert not mock_delete_link.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink._delete_link")
+def test_undeploy_released_links_delete_error(mock_delete_link, docker_link):
+    network_a = released_network("net_a")
+    network_b = released_network("net_b")
+    mock_delete_link.side_effect = [APIError("network has active endpoints"), None]
+
+    docker_link.undeploy_released_links(released_container("net_a", "net_b"),
+                                        {"net_a": network_a, "net_b": network_b}, {"net_a": 1, "net_b": 1},
+                                        threading.Lock())
+
+    mock_delete_link.assert_has_calls([call(network_a), call(network_b)])
+
+
+#
+# TEST: _prune_links
+#
+@mock.patch("src.Kathara.event.EventDispatcher.EventDispatcher.get_instance")
+def test_prune_links_dispatches_deleted(mock_event_dispatcher, docker_link):
+    networks = []
+    for name in ["A", "B"]:
+        network = Mock(attrs={"Labels": {"name": name, "external": ""}})
+        network.name = "kathara_user_%s" % name
+        networks.append(network)
+    docker_link.client.networks.prune.return_value = {"NetworksDeleted": ["kathara_user_B"]}
+
+    docker_link._prune_links(networks, lab_hash="lab_hash")
+
+    mock_event_dispatcher.return_value.dispatch.assert_called_once_with("link_undeployed", item=networks[1])
 
 
 #
 # TEST: get_links_stats
 #
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
-def test_get_links_stats_lab_hash(mock_get_links_api_objects_by_filters, docker_link,
+def test_get_links_stats_lab_hash(mock_get_links_api_objects_by_filters, mock_setting_get_instance, docker_link,
                                   docker_network):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
     docker_network.api_object.name = "test_network"
     mock_get_links_api_objects_by_filters.return_value = [docker_network.api_object]
     stat = next(docker_link.get_links_stats(lab_hash="lab_hash"))
@@ -312,9 +560,11 @@ def test_get_links_stats_lab_hash(mock_get_links_api_objects_by_filters, docker_
     assert stat['test_network'].network_name == "test_network"
 
 
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
-def test_get_links_stats_lab_hash_link_name(mock_get_links_api_objects_by_filters, docker_link,
-                                            docker_network):
+def test_get_links_stats_lab_hash_link_name(mock_get_links_api_objects_by_filters, mock_setting_get_instance,
+                                            docker_link, docker_network):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
     docker_network.api_object.name = "test_network"
     mock_get_links_api_objects_by_filters.return_value = [docker_network.api_object]
     next(docker_link.get_links_stats(lab_hash="lab_hash", link_name="test_network"))
@@ -322,9 +572,11 @@ def test_get_links_stats_lab_hash_link_name(mock_get_links_api_objects_by_filter
                                                                   user=None)
 
 
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
-def test_get_links_stats_lab_hash_link_name_user(mock_get_links_api_objects_by_filters,
+def test_get_links_stats_lab_hash_link_name_user(mock_get_links_api_objects_by_filters, mock_setting_get_instance,
                                                  docker_link, docker_network):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
     docker_network.api_object.name = "test_network"
 
     mock_get_links_api_objects_by_filters.return_value = [docker_network.api_object]
@@ -333,6 +585,134 @@ def test_get_links_stats_lab_hash_link_name_user(mock_get_links_api_objects_by_f
                                                                   user="kathara-user")
 
 
+@mock.patch("src.Kathara.manager.docker.DockerLink.time.sleep")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_links_stats_reload_only_on_events(mock_get_links_api_objects_by_filters, mock_setting_get_instance,
+                                               mock_sleep, docker_link):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
+    network_1 = Mock(id="network_1_id", attrs={'Labels': {'lab_hash': 'lab_hash', 'name': 'A', 'user': 'user',
+                                                          'external': ''}}, containers=[])
+    network_1.name = "network_1"
+    network_2 = Mock(id="network_2_id", attrs={'Labels': {'lab_hash': 'lab_hash', 'name': 'B', 'user': 'user',
+                                                          'external': ''}}, containers=[])
+    network_2.name = "network_2"
+    mock_get_links_api_objects_by_filters.return_value = [network_1, network_2]
+
+    send_event = threading.Event()
+    event_received = threading.Event()
+    release_events = threading.Event()
+
+    def events():
+        send_event.wait(timeout=5)
+        yield {'Type': 'network', 'Action': 'connect', 'Actor': {'ID': 'network_2_id'}}
+        event_received.set()
+        release_events.wait(timeout=5)
+
+    docker_link.client.events.return_value = MagicMock()
+    docker_link.client.events.return_value.__iter__.side_effect = events
+
+    stats = docker_link.get_links_stats(lab_hash="lab_hash")
+    next(stats)
+    assert network_1.reload.call_count == 1
+    assert network_2.reload.call_count == 1
+
+    send_event.set()
+    assert event_received.wait(timeout=5)
+    next(stats)
+    assert network_1.reload.call_count == 1
+    assert network_2.reload.call_count == 2
+
+    next(stats)
+    assert network_2.reload.call_count == 2
+
+    stats.close()
+    release_events.set()
+    docker_link.client.events.return_value.close.assert_called_once()
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.time.sleep")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_links_stats_drop_destroyed(mock_get_links_api_objects_by_filters, mock_setting_get_instance, mock_sleep,
+                                        docker_link):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
+    network_1 = Mock(id="network_1_id", attrs={'Labels': {'lab_hash': 'lab_hash', 'name': 'A', 'user': 'user',
+                                                          'external': ''}}, containers=[])
+    network_1.name = "network_1"
+    network_2 = Mock(id="network_2_id", attrs={'Labels': {'lab_hash': 'lab_hash', 'name': 'B', 'user': 'user',
+                                                          'external': ''}}, containers=[])
+    network_2.name = "network_2"
+    mock_get_links_api_objects_by_filters.return_value = [network_1, network_2]
+
+    send_event = threading.Event()
+    event_received = threading.Event()
+    release_events = threading.Event()
+
+    def events():
+        send_event.wait(timeout=5)
+        yield {'Type': 'network', 'Action': 'disconnect', 'Actor': {'ID': 'network_2_id'}}
+        yield {'Type': 'network', 'Action': 'destroy', 'Actor': {'ID': 'network_2_id'}}
+        event_received.set()
+        release_events.wait(timeout=5)
+
+    docker_link.client.events.return_value = MagicMock()
+    docker_link.client.events.return_value.__iter__.side_effect = events
+
+    stats = docker_link.get_links_stats(lab_hash="lab_hash")
+    assert list(next(stats).keys()) == ["network_1", "network_2"]
+
+    send_event.set()
+    assert event_received.wait(timeout=5)
+    assert list(next(stats).keys()) == ["network_1"]
+    assert list(next(stats).keys()) == ["network_1"]
+    assert network_1.reload.call_count == 1
+    assert network_2.reload.call_count == 1
+
+    stats.close()
+    release_events.set()
+
+
+@mock.patch("src.Kathara.os.Networking.Networking.get_bridges_traffic")
+@mock.patch("src.Kathara.utils.is_platform")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_links_stats_traffic(mock_get_links_api_objects_by_filters, mock_setting_get_instance, mock_is_platform,
+                                 mock_get_bridges_traffic, docker_link):
+    mock_setting_get_instance.return_value = Mock(remote_url=None)
+    mock_is_platform.return_value = True
+    network = Mock(id="0123456789abcdef", attrs={'Labels': {'lab_hash': 'lab_hash', 'name': 'A', 'user': 'user',
+                                                             'external': ''}}, containers=[])
+    network.name = "network"
+    mock_get_links_api_objects_by_filters.return_value = [network]
+    mock_get_bridges_traffic.return_value = {
+        'kt-0123456789ab': {'rx_bytes': 100, 'tx_bytes': 200, 'rx_packets': 1, 'tx_packets': 2}
+    }
+
+    stat = next(docker_link.get_links_stats(lab_hash="lab_hash"))
+
+    mock_get_bridges_traffic.assert_called_once_with({'kt-0123456789ab': stat['network']}.keys())
+    assert stat['network'].rx_bytes == 100
+    assert stat['network'].tx_bytes == 200
+    assert stat['network'].rx_packets == 1
+    assert stat['network'].tx_packets == 2
+
+
+@mock.patch("src.Kathara.os.Networking.Networking.get_bridges_traffic")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
+def test_get_links_stats_no_traffic_remote(mock_get_links_api_objects_by_filters, mock_setting_get_instance,
+                                           mock_get_bridges_traffic, docker_link, docker_network):
+    mock_setting_get_instance.return_value = Mock(remote_url="http://remote")
+    docker_network.api_object.name = "test_network"
+    mock_get_links_api_objects_by_filters.return_value = [docker_network.api_object]
+
+    stat = next(docker_link.get_links_stats(lab_hash="lab_hash"))
+
+    assert not mock_get_bridges_traffic.called
+    assert stat['test_network'].rx_bytes is None
+
+
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_links_api_objects_by_filters")
 def test_get_links_stats_lab_hash_link_not_found(mock_get_links_api_objects_by_filters, docker_link,
                                                  docker_network):
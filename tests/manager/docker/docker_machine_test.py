@@ -1,8 +1,12 @@
 import sys
+import threading
+import time
+from concurrent.futures import Future
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 import pytest
+from docker.errors import NotFound
 
 sys.path.insert(0, './')
 
@@ -10,7 +14,9 @@ from src.Kathara.model.Lab import Lab
 from src.Kathara.model.Link import Link
 from src.Kathara.model.Machine import Machine
 from src.Kathara.manager.docker.DockerMachine import DockerMachine
-from src.Kathara.exceptions import MachineNotFoundError, DockerPluginError, MachineBinaryError
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
+from src.Kathara.exceptions import MachineNotFoundError, DockerPluginError, MachineBinaryError, \
+    MachineAlreadyExistsError, DockerImageNotFoundError, PrivilegeError
 
 
 #
@@ -20,7 +26,8 @@ from src.Kathara.exceptions import MachineNotFoundError, DockerPluginError, Mach
 @mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage")
 @mock.patch("docker.DockerClient")
 def docker_machine(mock_docker_client, mock_docker_image):
-    return DockerMachine(mock_docker_client, mock_docker_image)
+    mock_docker_client.api.api_version = "1.41"
+    return DockerMachine(mock_docker_client, mock_docker_image, ManagerExecutor(max_workers=4))
 
 
 @pytest.fixture()
@@ -58,13 +65,13 @@ def default_link_b(default_device):
 #
 # TEST: create
 #
-@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
 @mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.utils.get_current_user_name")
 def test_create(mock_get_current_user_name, mock_setting_get_instance, mock_copy_files,
-                mock_get_machines_api_objects_by_filters, docker_machine, default_device):
-    mock_get_machines_api_objects_by_filters.return_value = []
+                mock_get_existing_machine_names, docker_machine, default_device):
+    mock_get_existing_machine_names.return_value = set()
     mock_get_current_user_name.return_value = "test-user"
 
     setting_mock = Mock()
@@ -87,6 +94,7 @@ def test_create(mock_get_current_user_name, mock_setting_get_instance, mock_copy
         privileged=False,
         network=None,
         network_mode='none',
+        networking_config=None,
         sysctls={'net.ipv4.conf.all.rp_filter': 0,
                  'net.ipv4.conf.default.rp_filter': 0,
                  'net.ipv4.conf.lo.rp_filter': 0,
@@ -102,19 +110,19 @@ def test_create(mock_get_current_user_name, mock_setting_get_instance, mock_copy
         detach=True,
         volumes={},
         labels={'name': 'test_device', 'lab_hash': '9pe3y6IDMwx4PfOPu5mbNg', 'user': 'test-user', 'app': 'kathara',
-                'shell': '/bin/bash'}
+                'shell': '/bin/bash', 'config_digest': default_device.get_config_digest()}
     )
 
     assert not mock_copy_files.called
 
 
-@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
 @mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.utils.get_current_user_name")
 def test_create_ipv6(mock_get_current_user_name, mock_setting_get_instance, mock_copy_files,
-                     mock_get_machines_api_objects_by_filters, docker_machine, default_device):
-    mock_get_machines_api_objects_by_filters.return_value = []
+                     mock_get_existing_machine_names, docker_machine, default_device):
+    mock_get_existing_machine_names.return_value = set()
     mock_get_current_user_name.return_value = "test-user"
 
     setting_mock = Mock()
@@ -137,6 +145,7 @@ def test_create_ipv6(mock_get_current_user_name, mock_setting_get_instance, mock
         privileged=False,
         network=None,
         network_mode='none',
+        networking_config=None,
         sysctls={'net.ipv4.conf.all.rp_filter': 0,
                  'net.ipv4.conf.default.rp_filter': 0,
                  'net.ipv4.conf.lo.rp_filter': 0,
@@ -156,19 +165,19 @@ def test_create_ipv6(mock_get_current_user_name, mock_setting_get_instance, mock
         detach=True,
         volumes={},
         labels={'name': 'test_device', 'lab_hash': '9pe3y6IDMwx4PfOPu5mbNg', 'user': 'test-user', 'app': 'kathara',
-                'shell': '/bin/bash'}
+                'shell': '/bin/bash', 'config_digest': default_device.get_config_digest()}
     )
 
     assert not mock_copy_files.called
 
 
-@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
 @mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.utils.get_current_user_name")
 def test_create_privileged(mock_get_current_user_name, mock_setting_get_instance, mock_copy_files,
-                           mock_get_machines_api_objects_by_filters, docker_machine, default_device):
-    mock_get_machines_api_objects_by_filters.return_value = []
+                           mock_get_existing_machine_names, docker_machine, default_device):
+    mock_get_existing_machine_names.return_value = set()
 
     default_device.lab.add_option("privileged_machines", True)
     mock_get_current_user_name.return_value = "test-user"
@@ -191,6 +200,7 @@ def test_create_privileged(mock_get_current_user_name, mock_setting_get_instance
         privileged=True,
         network=None,
         network_mode='none',
+        networking_config=None,
         sysctls={'net.ipv4.conf.all.rp_filter': 0,
                  'net.ipv4.conf.default.rp_filter': 0,
                  'net.ipv4.conf.lo.rp_filter': 0,
@@ -209,11 +219,93 @@ def test_create_privileged(mock_get_current_user_name, mock_setting_get_instance
         detach=True,
         volumes={},
         labels={'name': 'test_device', 'lab_hash': '9pe3y6IDMwx4PfOPu5mbNg', 'user': 'test-user', 'app': 'kathara',
-                'shell': '/bin/bash'}
+                'shell': '/bin/bash', 'config_digest': default_device.get_config_digest()}
     )
     assert not mock_copy_files.called
 
 
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.utils.get_current_user_name")
+def test_create_attach_all_interfaces(mock_get_current_user_name, mock_setting_get_instance, mock_copy_files,
+                                      mock_get_existing_machine_names, docker_machine, default_device,
+                                      default_link, default_link_b):
+    mock_get_existing_machine_names.return_value = set()
+    mock_get_current_user_name.return_value = "test-user"
+    mock_setting_get_instance.return_value = Mock(shared_cd=False, device_prefix='dev_prefix', device_shell='/bin/bash',
+                                                  enable_ipv6=False, remote_url=None, hosthome_mount=False,
+                                                  shared_mount=False)
+    default_link.api_object.name = "network_a"
+    default_link_b.api_object.name = "network_b"
+    default_device.add_interface(default_link)
+    default_device.add_interface(default_link_b)
+    docker_machine.client.api.api_version = "1.48"
+    docker_machine.client.api.create_endpoint_config.side_effect = lambda driver_opt: driver_opt
+
+    docker_machine.create(default_device)
+
+    kwargs = docker_machine.client.containers.create.call_args.kwargs
+    assert kwargs['network'] == "network_a"
+    assert kwargs['networking_config'] == {
+        "network_a": {"com.docker.network.endpoint.ifname": "eth0"},
+        "network_b": {"com.docker.network.endpoint.ifname": "eth1"}
+    }
+    assert kwargs['sysctls']['net.ipv4.conf.eth0.rp_filter'] == 0
+    assert kwargs['sysctls']['net.ipv4.conf.eth1.rp_filter'] == 0
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.utils.get_current_user_name")
+def test_create_attach_first_interface_old_daemon(mock_get_current_user_name, mock_setting_get_instance,
+                                                  mock_copy_files, mock_get_existing_machine_names,
+                                                  docker_machine, default_device, default_link, default_link_b):
+    mock_get_existing_machine_names.return_value = set()
+    mock_get_current_user_name.return_value = "test-user"
+    mock_setting_get_instance.return_value = Mock(shared_cd=False, device_prefix='dev_prefix', device_shell='/bin/bash',
+                                                  enable_ipv6=False, remote_url=None, hosthome_mount=False,
+                                                  shared_mount=False)
+    default_link.api_object.name = "network_a"
+    default_link_b.api_object.name = "network_b"
+    default_device.add_interface(default_link)
+    default_device.add_interface(default_link_b)
+
+    docker_machine.create(default_device)
+
+    kwargs = docker_machine.client.containers.create.call_args.kwargs
+    assert kwargs['network'] == "network_a"
+    assert kwargs['networking_config'] is None
+    assert kwargs['sysctls']['net.ipv4.conf.eth0.rp_filter'] == 0
+    assert 'net.ipv4.conf.eth1.rp_filter' not in kwargs['sysctls']
+    assert not docker_machine.client.api.create_endpoint_config.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._get_existing_machine_names")
+def test_create_already_exists(mock_get_existing_machine_names, docker_machine, default_device):
+    with pytest.raises(MachineAlreadyExistsError):
+        docker_machine.create(default_device, {"test_device"})
+
+    assert not mock_get_existing_machine_names.called
+    assert not docker_machine.client.containers.create.called
+
+
+#
+# TEST: _get_existing_machine_names
+#
+@mock.patch("src.Kathara.utils.get_current_user_name")
+def test_get_existing_machine_names(mock_get_current_user_name, docker_machine):
+    mock_get_current_user_name.return_value = "user"
+    docker_machine.client.containers.list.return_value = [Mock(attrs={'Labels': {'name': 'pc1'}}),
+                                                          Mock(attrs={'Labels': {'name': 'pc2'}})]
+
+    assert docker_machine._get_existing_machine_names("lab_hash") == {"pc1", "pc2"}
+    docker_machine.client.containers.list.assert_called_once_with(
+        all=True, filters={"label": ["app=kathara", "user=user", "lab_hash=lab_hash"]}, sparse=True
+    )
+
+
 #
 # TEST: start
 #
@@ -236,6 +328,22 @@ def test_start(docker_machine, default_device, default_link, default_link_b):
     default_link_b.api_object.connect.assert_called_once()
 
 
+def test_start_skip_attached_interfaces(docker_machine, default_device, default_link, default_link_b):
+    default_link.api_object.name = "network_a"
+    default_link_b.api_object.name = "network_b"
+    default_device.add_interface(default_link)
+    default_device.add_interface(default_link_b)
+    default_device.api_object.attrs = {"NetworkSettings": {"Networks": {"network_a": {}, "network_b": {}}}}
+    docker_machine.client.api.exec_create.return_value = {"Id": "1234"}
+    docker_machine.client.api.exec_start.return_value = ("cmd_stdout", "cmd_stderr")
+    docker_machine.client.api.exec_inspect.return_value = {"ExitCode": 0}
+
+    docker_machine.start(default_device)
+
+    assert not default_link.api_object.connect.called
+    assert not default_link_b.api_object.connect.called
+
+
 def test_start_plugin_error_endpoint_start(default_device, docker_machine):
     default_device.api_object.start.side_effect = DockerPluginError("endpoint does not exists")
     with pytest.raises(DockerPluginError):
@@ -273,8 +381,8 @@ def test_deploy_and_start_machine(mock_create, mock_start, docker_machine, defau
     machine_item = ("", default_device)
     mock_create.return_value = True
     mock_start.return_value = True
-    docker_machine._deploy_and_start_machine(machine_item)
-    mock_create.assert_called_once()
+    docker_machine._deploy_and_start_machine({"pc1"}, machine_item)
+    mock_create.assert_called_once_with(default_device, {"pc1"})
     mock_start.assert_called_once()
 
 
@@ -289,10 +397,97 @@ def test_deploy_machines(mock_deploy_and_start, docker_machine):
     docker_machine.docker_image.check_from_list.return_value = None
     mock_deploy_and_start.return_value = None
     docker_machine.deploy_machines(lab)
-    docker_machine.docker_image.check_from_list.assert_called_once_with({'kathara/test1', 'kathara/test2'})
+    docker_machine.docker_image.check_from_list.assert_has_calls(
+        [call(['kathara/test1'], check_updates=True), call(['kathara/test2'], check_updates=True)], any_order=True
+    )
     assert mock_deploy_and_start.call_count == 2
 
 
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_no_check_updates(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.get_or_new_machine("pc1", **{'image': 'kathara/test1'})
+    docker_machine.deploy_machines(lab, check_updates=False)
+    docker_machine.docker_image.check_from_list.assert_called_once_with(['kathara/test1'], check_updates=False)
+    assert mock_deploy_and_start.call_count == 1
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_same_image_checked_once(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.get_or_new_machine("pc1", **{'image': 'kathara/test1'})
+    lab.get_or_new_machine("pc2", **{'image': 'kathara/test1'})
+    docker_machine.deploy_machines(lab)
+    docker_machine.docker_image.check_from_list.assert_called_once_with(['kathara/test1'], check_updates=True)
+    assert mock_deploy_and_start.call_count == 2
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_waits_own_links(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.connect_machine_to_link("pc1", "A")
+    lab.connect_machine_to_link("pc2", "B")
+    link_a = Future()
+    link_b = Future()
+    pc2_deployed = threading.Event()
+
+    def deploy_and_start(existing_machines, machine_item):
+        if machine_item[0] == "pc2":
+            pc2_deployed.set()
+
+    def wait_pc2_then_deploy_a():
+        assert pc2_deployed.wait(5)
+        link_a.set_result(None)
+
+    mock_deploy_and_start.side_effect = deploy_and_start
+    link_b.set_result(None)
+    threading.Thread(target=wait_pc2_then_deploy_a, daemon=True).start()
+
+    docker_machine.deploy_machines(lab, links_futures={"A": link_a, "B": link_b})
+
+    # pc2 does not wait for the collision domain of pc1
+    assert mock_deploy_and_start.call_count == 2
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_link_error(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.connect_machine_to_link("pc1", "A")
+    link_a = Future()
+    link_a.set_exception(PrivilegeError("error"))
+
+    with pytest.raises(PrivilegeError):
+        docker_machine.deploy_machines(lab, links_futures={"A": link_a})
+
+    assert not mock_deploy_and_start.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_image_error(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.get_or_new_machine("pc1", **{'image': 'kathara/test1'})
+    docker_machine.docker_image.check_from_list.side_effect = DockerImageNotFoundError("kathara/test1")
+
+    with pytest.raises(DockerImageNotFoundError):
+        docker_machine.deploy_machines(lab)
+
+    assert not mock_deploy_and_start.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._deploy_and_start_machine")
+def test_deploy_machines_with_dependencies(mock_deploy_and_start, docker_machine):
+    lab = Lab("Default scenario")
+    lab.get_or_new_machine("pc1", **{'image': 'kathara/test1'})
+    lab.get_or_new_machine("pc2", **{'image': 'kathara/test2'})
+    lab.get_or_new_machine("pc3", **{'image': 'kathara/test3'})
+    lab.apply_dependency_graph({'pc1': ['pc2', 'pc3'], 'pc3': ['pc2']})
+    docker_machine.docker_image.check_from_list.return_value = None
+    mock_deploy_and_start.return_value = None
+    docker_machine.deploy_machines(lab)
+    deployed = [call.args[1][0] for call in mock_deploy_and_start.call_args_list]
+    assert deployed == ['pc2', 'pc3', 'pc1']
+
+
 #
 # TEST: connect_to_link
 #
@@ -380,6 +575,47 @@ def test_undeploy_no_devices(mock_get_machines_api_objects_by_filters, mock_unde
     assert not mock_undeploy_machine.called
 
 
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_undeploy_no_shutdown(mock_get_machines_api_objects_by_filters, mock_undeploy_machine, docker_machine,
+                              default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    docker_machine.undeploy("lab_hash", shutdown=False)
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, shutdown=False)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._run_shutdown_commands")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_undeploy_shutdown_timeout(mock_get_machines_api_objects_by_filters, mock_undeploy_machine,
+                                   mock_run_shutdown_commands, docker_machine, default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    docker_machine.undeploy("lab_hash", shutdown_timeout=10)
+    mock_run_shutdown_commands.assert_called_once_with([default_device.api_object], 10)
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, shutdown=False)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._run_shutdown_commands")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_undeploy_no_shutdown_ignores_timeout(mock_get_machines_api_objects_by_filters, mock_undeploy_machine,
+                                              mock_run_shutdown_commands, docker_machine, default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    docker_machine.undeploy("lab_hash", shutdown=False, shutdown_timeout=10)
+    assert not mock_run_shutdown_commands.called
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, shutdown=False)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_undeploy_machine_undeployed_callback(mock_get_machines_api_objects_by_filters, mock_undeploy_machine,
+                                              docker_machine, default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    callback = Mock()
+    docker_machine.undeploy("lab_hash", machine_undeployed_callback=callback)
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, callback=callback)
+
+
 #
 # TEST: wipe
 #
@@ -413,6 +649,53 @@ def test_wipe_three_devices(mock_get_machines_api_objects_by_filters, mock_undep
     assert mock_undeploy_machine.call_count == 3
 
 
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_wipe_no_shutdown(mock_get_machines_api_objects_by_filters, mock_undeploy_machine, docker_machine,
+                          default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    docker_machine.wipe(user="user", shutdown=False)
+    mock_get_machines_api_objects_by_filters.assert_called_once_with(user="user")
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, shutdown=False)
+
+
+#
+# TEST: _run_shutdown_commands
+#
+@mock.patch("src.Kathara.manager.docker.DockerMachine.SHUTDOWN_POLL_INTERVAL", 0.01)
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._start_shutdown_commands")
+def test_run_shutdown_commands(mock_start_shutdown_commands, docker_machine, default_device):
+    mock_start_shutdown_commands.side_effect = ["exec_1", None]
+    docker_machine.client.api.exec_inspect.side_effect = [{'Running': True}, {'Running': False}]
+
+    docker_machine._run_shutdown_commands([default_device.api_object, default_device.api_object], 10)
+
+    assert mock_start_shutdown_commands.call_count == 2
+    assert docker_machine.client.api.exec_inspect.call_args_list == [call("exec_1"), call("exec_1")]
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.SHUTDOWN_POLL_INTERVAL", 0.01)
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._start_shutdown_commands")
+def test_run_shutdown_commands_deadline(mock_start_shutdown_commands, docker_machine, default_device):
+    mock_start_shutdown_commands.return_value = "exec_1"
+    docker_machine.client.api.exec_inspect.return_value = {'Running': True}
+
+    with mock.patch("src.Kathara.manager.docker.DockerMachine.logging.warning") as mock_warning:
+        docker_machine._run_shutdown_commands([default_device.api_object], 0.05)
+
+    mock_warning.assert_called_once()
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._start_shutdown_commands")
+def test_run_shutdown_commands_exec_not_found(mock_start_shutdown_commands, docker_machine, default_device):
+    mock_start_shutdown_commands.return_value = "exec_1"
+    docker_machine.client.api.exec_inspect.side_effect = NotFound("exec not found")
+
+    docker_machine._run_shutdown_commands([default_device.api_object], 10)
+
+    docker_machine.client.api.exec_inspect.assert_called_once_with("exec_1")
+
+
 #
 # TEST: _undeploy_machine
 #
@@ -423,6 +706,27 @@ def test_undeploy_machine(mock_delete_machine, docker_machine, default_device):
     mock_delete_machine.assert_called_once()
 
 
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._delete_machine")
+def test_undeploy_machine_callback(mock_delete_machine, docker_machine, default_device):
+    callback = Mock()
+
+    docker_machine._undeploy_machine(default_device.api_object, callback=callback)
+
+    mock_delete_machine.assert_called_once_with(default_device.api_object, shutdown=True)
+    callback.assert_called_once_with(default_device.api_object)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._delete_machine")
+def test_undeploy_machine_callback_not_called_on_error(mock_delete_machine, docker_machine, default_device):
+    mock_delete_machine.side_effect = NotFound("container not found")
+    callback = Mock()
+
+    with pytest.raises(NotFound):
+        docker_machine._undeploy_machine(default_device.api_object, callback=callback)
+
+    assert not callback.called
+
+
 #
 # TEST: exec
 #
@@ -452,6 +756,96 @@ def test_exec(mock_get_machines_api_objects_by_filters, mock_setting_get_instanc
     assert output == ('cmd_stdout', 'cmd_stderr')
 
 
+#
+# TEST: open_command_channel
+#
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerCommandChannel")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_open_command_channel(mock_get_machines_api_objects_by_filters, mock_channel, docker_machine, default_device):
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+
+    channel = docker_machine.open_command_channel("lab_hash", "test_device", user="user")
+
+    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", machine_name="test_device",
+                                                                     user="user")
+    mock_channel.assert_called_once_with(docker_machine.client, default_device.api_object)
+    assert channel == mock_channel.return_value
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_open_command_channel_not_running(mock_get_machines_api_objects_by_filters, docker_machine):
+    mock_get_machines_api_objects_by_filters.return_value = []
+
+    with pytest.raises(MachineNotFoundError):
+        docker_machine.open_command_channel("lab_hash", "test_device")
+
+
+#
+# TEST: exec_machines
+#
+def build_container(name):
+    container = Mock()
+    container.id = "%s_id" % name
+    container.labels = {"user": "user", "name": name, "lab_hash": "lab_hash"}
+    return container
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_exec_machines(mock_get_machines_api_objects_by_filters, docker_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_container("pc1"), build_container("pc2")]
+    docker_machine.client.api.exec_create.side_effect = lambda container_id, *args, **kwargs: {"Id": container_id}
+    docker_machine.client.api.exec_start.side_effect = lambda exec_id, **kwargs: iter([(exec_id.encode(), None)])
+    docker_machine.client.api.exec_inspect.side_effect = lambda exec_id: {"ExitCode": 0 if exec_id == "pc1_id" else 2}
+
+    result = list(docker_machine.exec_machines("lab_hash", "ip -j addr", user="user"))
+
+    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", user="user")
+    assert sorted(result, key=lambda x: (x[0], x[3] is not None)) == [
+        ("pc1", b"pc1_id", None, None), ("pc1", None, None, 0),
+        ("pc2", b"pc2_id", None, None), ("pc2", None, None, 2),
+    ]
+    docker_machine.client.api.exec_create.assert_any_call(
+        "pc1_id", ["ip", "-j", "addr"], stdout=True, stderr=True, stdin=False, tty=False, privileged=False, user='',
+        environment=None, workdir=None
+    )
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_exec_machines_selected(mock_get_machines_api_objects_by_filters, docker_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_container("pc1"), build_container("pc2")]
+    docker_machine.client.api.exec_create.return_value = {"Id": "1234"}
+    docker_machine.client.api.exec_start.return_value = iter([])
+    docker_machine.client.api.exec_inspect.return_value = {"ExitCode": 0}
+
+    result = list(docker_machine.exec_machines("lab_hash", ["ls"], machine_names=["pc2"]))
+
+    assert result == [("pc2", None, None, 0)]
+    docker_machine.client.api.exec_create.assert_called_once()
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_exec_machines_not_running(mock_get_machines_api_objects_by_filters, docker_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_container("pc1")]
+
+    with pytest.raises(MachineNotFoundError):
+        list(docker_machine.exec_machines("lab_hash", ["ls"], machine_names=["pc1", "pc2"]))
+
+    assert not docker_machine.client.api.exec_create.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._exec_run")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_exec_machines_binary_error(mock_get_machines_api_objects_by_filters, mock_exec_run, docker_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_container("pc1")]
+    mock_exec_run.side_effect = MachineBinaryError("exe", "pc1")
+
+    result = list(docker_machine.exec_machines("lab_hash", ["exe"]))
+
+    assert len(result) == 2
+    assert result[0][0] == "pc1" and b"exe" in result[0][2]
+    assert result[1] == ("pc1", None, None, None)
+
+
 #
 # TEST: _exec_run
 #
@@ -475,7 +869,7 @@ def test_exec_run_demux(docker_machine, default_device):
         "1234", detach=False, tty=False, stream=False, socket=False, demux=True
     )
     docker_machine.client.api.exec_inspect.assert_called_once_with("1234")
-    assert result == {'exit_code': 0, 'output': output_iter}
+    assert result == {'id': "1234", 'exit_code': 0, 'output': output_iter}
 
 
 def test_exec_run_demux_stream(docker_machine, default_device):
@@ -499,7 +893,7 @@ def test_exec_run_demux_stream(docker_machine, default_device):
         "1234", detach=False, tty=False, stream=True, socket=False, demux=True
     )
     docker_machine.client.api.exec_inspect.assert_called_once_with("1234")
-    assert result == {'exit_code': None, 'output': output_gen}
+    assert result == {'id': "1234", 'exit_code': None, 'output': output_gen}
 
 
 def test_exec_run_oci_runtime_error_1_no_demux(docker_machine, default_device):
@@ -577,7 +971,7 @@ def test_exec_run_oci_runtime_error_1_stream(docker_machine, default_device):
         "1234", detach=False, tty=False, stream=False, socket=False, demux=True
     )
     docker_machine.client.api.exec_inspect.assert_called_once_with("1234")
-    assert result == {'exit_code': None, 'output': output_gen}
+    assert result == {'id': "1234", 'exit_code': None, 'output': output_gen}
 
 
 def test_exec_run_oci_runtime_error_2_no_demux(docker_machine, default_device):
@@ -655,45 +1049,151 @@ def test_exec_run_oci_runtime_error_2_stream(docker_machine, default_device):
         "1234", detach=False, tty=False, stream=False, socket=False, demux=True
     )
     docker_machine.client.api.exec_inspect.assert_called_once_with("1234")
-    assert result == {'exit_code': None, 'output': output_gen}
+    assert result == {'id': "1234", 'exit_code': None, 'output': output_gen}
+
+
+#
+# TEST: sync_files
+#
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.stream_files_for_tar")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._exec_run")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.model.Machine.Machine.get_data_delta")
+def test_sync_files(mock_get_data_delta, mock_copy_files, mock_exec_run, mock_get_cached_metadata,
+                    mock_stream_files_for_tar, mock_cache_metadata, docker_machine, default_device):
+    mock_get_cached_metadata.return_value = {'container': "device_id", 'files': {"hostlab/old": [1, 1, "digest"]}}
+    mock_stream_files_for_tar.return_value = b"tar_data"
+    mock_get_data_delta.return_value = (
+        {"/etc/file": "/lab/test_device/etc/file"}, {"hostlab/new": [1, 1, "digest"]}
+    )
+
+    copied_files = docker_machine.sync_files(default_device)
+
+    assert copied_files == ["/etc/file"]
+    mock_get_cached_metadata.assert_called_once_with("sync", "lab_hash_test_device")
+    mock_get_data_delta.assert_called_once_with({"hostlab/old": [1, 1, "digest"]})
+    mock_stream_files_for_tar.assert_called_once_with({"/etc/file": "/lab/test_device/etc/file"})
+    mock_copy_files.assert_called_once_with(default_device.api_object, "/", b"tar_data")
+    assert not mock_exec_run.called
+    mock_cache_metadata.assert_called_once_with(
+        "sync", "lab_hash_test_device", {'container': "device_id", 'files': {"hostlab/new": [1, 1, "digest"]}}
+    )
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.stream_files_for_tar")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._exec_run")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.model.Machine.Machine.get_data_delta")
+def test_sync_files_reload_command(mock_get_data_delta, mock_copy_files, mock_exec_run, mock_get_cached_metadata,
+                                   mock_stream_files_for_tar, mock_cache_metadata, docker_machine, default_device):
+    mock_get_cached_metadata.return_value = None
+    mock_exec_run.return_value = {'id': "exec_id", 'exit_code': 0, 'output': b""}
+    mock_get_data_delta.return_value = ({"/etc/file": "/lab/test_device/etc/file"}, {})
+
+    docker_machine.sync_files(default_device, reload_command="vtysh -b")
+
+    mock_get_data_delta.assert_called_once_with(None)
+    mock_exec_run.assert_called_once_with(default_device.api_object, cmd=['/bin/bash', '-c', "vtysh -b"],
+                                          stdout=True, stderr=True, privileged=True)
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._exec_run")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.model.Machine.Machine.get_data_delta")
+def test_sync_files_no_changes(mock_get_data_delta, mock_copy_files, mock_exec_run, mock_get_cached_metadata,
+                               mock_cache_metadata, docker_machine, default_device):
+    mock_get_cached_metadata.return_value = {'container': "device_id", 'files': {"hostlab/file": [1, 1, "digest"]}}
+    mock_get_data_delta.return_value = ({}, {"hostlab/file": [1, 1, "digest"]})
+
+    assert docker_machine.sync_files(default_device, reload_command="vtysh -b") == []
+
+    assert not mock_copy_files.called
+    assert not mock_exec_run.called
+    assert mock_cache_metadata.called
+
+
+@mock.patch("src.Kathara.utils.cache_metadata")
+@mock.patch("src.Kathara.utils.get_cached_metadata")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.copy_files")
+@mock.patch("src.Kathara.model.Machine.Machine.get_data_delta")
+def test_sync_files_manifest_of_other_container(mock_get_data_delta, mock_copy_files, mock_get_cached_metadata,
+                                                mock_cache_metadata, docker_machine, default_device):
+    mock_get_cached_metadata.return_value = {'container': "old_id", 'files': {"hostlab/file": [1, 1, "digest"]}}
+    mock_get_data_delta.return_value = ({}, {})
+
+    docker_machine.sync_files(default_device)
+
+    mock_get_data_delta.assert_called_once_with(None)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine._exec_run")
+def test_run_reload_command_error(mock_exec_run, docker_machine, default_device):
+    mock_exec_run.return_value = {'id': "exec_id", 'exit_code': 1, 'output': b"error"}
+
+    with mock.patch("src.Kathara.manager.docker.DockerMachine.logging.warning") as mock_warning:
+        docker_machine._run_reload_command(default_device.api_object, "vtysh -b")
+
+    mock_warning.assert_called_once_with("Reload command of device `test_device` exited with code 1: error")
 
 
 #
 # TEST: get_machines_api_objects
 #
 def test_get_machines_api_objects_by_filters(docker_machine):
-    docker_machine.client.containers.list.return_value = ["test_device"]
-    docker_machine.get_machines_api_objects_by_filters("lab_hash_value", "test_device", "user_name_value")
+    sparse_container = Mock(id="test_device_id")
+    docker_machine.client.containers.list.return_value = [sparse_container]
+    docker_machine.client.containers.get.return_value = "test_device"
+    containers = docker_machine.get_machines_api_objects_by_filters("lab_hash_value", "test_device", "user_name_value")
     filters = {"label": ["app=kathara", "user=user_name_value", "lab_hash=lab_hash_value", "name=test_device"]}
-    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters)
+    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters, sparse=True)
+    docker_machine.client.containers.get.assert_called_once_with("test_device_id")
+    assert containers == ["test_device"]
+
+
+def test_get_machines_api_objects_by_filters_removed_container(docker_machine):
+    def get_container(container_id):
+        if container_id == "removed_id":
+            raise NotFound("No such container")
+        return "test_device"
+
+    docker_machine.client.containers.list.return_value = [Mock(id="test_device_id"), Mock(id="removed_id")]
+    docker_machine.client.containers.get.side_effect = get_container
+    containers = docker_machine.get_machines_api_objects_by_filters("lab_hash_value")
+    assert containers == ["test_device"]
 
 
 def test_get_machines_api_objects_by_filters_empty_filters(docker_machine):
-    docker_machine.client.containers.list.return_value = None
+    docker_machine.client.containers.list.return_value = []
     docker_machine.get_machines_api_objects_by_filters()
     filters = {"label": ["app=kathara"]}
-    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters)
+    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters, sparse=True)
 
 
 def test_get_machines_api_objects_by_filters_lab_hash_filter(docker_machine):
-    docker_machine.client.containers.list.return_value = None
+    docker_machine.client.containers.list.return_value = []
     docker_machine.get_machines_api_objects_by_filters("lab_hash_value", None, None)
     filters = {"label": ["app=kathara", "lab_hash=lab_hash_value"]}
-    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters)
+    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters, sparse=True)
 
 
 def test_get_machines_api_objects_by_filters_lab_device_name_filter(docker_machine):
-    docker_machine.client.containers.list.return_value = ["test_device"]
+    docker_machine.client.containers.list.return_value = [Mock(id="test_device_id")]
     docker_machine.get_machines_api_objects_by_filters(None, "test_device", None)
     filters = {"label": ["app=kathara", "name=test_device"]}
-    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters)
+    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters, sparse=True)
 
 
 def test_get_machines_api_objects_by_filters_user_filter(docker_machine):
-    docker_machine.client.containers.list.return_value = None
+    docker_machine.client.containers.list.return_value = []
     docker_machine.get_machines_api_objects_by_filters(None, None, "user_name_value")
     filters = {"label": ["app=kathara", "user=user_name_value"]}
-    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters)
+    docker_machine.client.containers.list.assert_called_once_with(all=True, filters=filters, sparse=True)
 
 
 #
@@ -744,6 +1244,14 @@ def test_delete_machine_running(docker_machine, default_device):
     default_device.api_object.remove.assert_called_once_with(force=True)
 
 
+def test_delete_machine_no_shutdown(docker_machine, default_device):
+    default_device.api_object.status = "running"
+
+    docker_machine._delete_machine(default_device.api_object, shutdown=False)
+    assert not docker_machine.client.api.exec_create.called
+    default_device.api_object.remove.assert_called_once_with(force=True)
+
+
 def test_delete_machine_not_running(docker_machine, default_device):
     default_device.api_object.exec_run.return_value = None
     default_device.api_object.remove.return_value = None
@@ -761,11 +1269,12 @@ def test_delete_machine_not_running(docker_machine, default_device):
 def test_get_machines_stats_lab_hash(mock_get_machines_api_objects_by_filters, docker_machine, default_device):
     default_device.api_object.name = "test_device"
     mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
-    default_device.api_object.stats.return_value = iter([{'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}])
+    docker_machine.client.api.api_version = "1.41"
+    default_device.api_object.stats.return_value = {'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}
     next(docker_machine.get_machines_stats(lab_hash="lab_hash"))
 
     mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", machine_name=None, user=None)
-    default_device.api_object.stats.assert_called_once()
+    default_device.api_object.stats.assert_called_once_with(stream=False, one_shot=True)
 
 
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
@@ -773,12 +1282,13 @@ def test_get_machines_stats_lab_hash_device_name(mock_get_machines_api_objects_b
                                                  default_device):
     default_device.api_object.name = "test_device"
     mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
-    default_device.api_object.stats.return_value = iter([{'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}])
+    docker_machine.client.api.api_version = "1.41"
+    default_device.api_object.stats.return_value = {'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}
     next(docker_machine.get_machines_stats(lab_hash="lab_hash", machine_name="test_device", user="user"))
 
     mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", machine_name="test_device",
                                                                      user="user")
-    default_device.api_object.stats.assert_called_once()
+    default_device.api_object.stats.assert_called_once_with(stream=False, one_shot=True)
 
 
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
@@ -786,12 +1296,60 @@ def test_get_machines_stats_lab_hash_device_name_user(mock_get_machines_api_obje
                                                       default_device):
     default_device.api_object.name = "test_device"
     mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
-    default_device.api_object.stats.return_value = iter([{'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}])
+    docker_machine.client.api.api_version = "1.41"
+    default_device.api_object.stats.return_value = {'pids_stats': {}, 'cpu_stats': {}, 'memory_stats': {}}
     next(docker_machine.get_machines_stats(lab_hash="lab_hash", machine_name="test_device"))
 
     mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", machine_name="test_device",
                                                                      user=None)
-    default_device.api_object.stats.assert_called_once()
+    default_device.api_object.stats.assert_called_once_with(stream=False, one_shot=True)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.STATS_REFRESH_INTERVAL", 0.1)
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
+def test_get_machines_stats_slow_device(mock_get_machines_api_objects_by_filters, docker_machine):
+    release_slow_device = threading.Event()
+    slow_device_calls = []
+
+    def slow_stats(**kwargs):
+        slow_device_calls.append(kwargs)
+        # The first request is slower than the refresh interval, the following ones wait to be released
+        if len(slow_device_calls) == 1:
+            time.sleep(0.3)
+        else:
+            release_slow_device.wait(5)
+        return {'pids_stats': {'current': len(slow_device_calls) + 1}, 'cpu_stats': {}, 'memory_stats': {}}
+
+    fast_device = Mock(labels={'lab_hash': 'lab_hash', 'name': 'fast', 'user': 'user'})
+    fast_device.name = "fast"
+    fast_device.image.tags = ["kathara/base"]
+    fast_device.stats.return_value = {'pids_stats': {'current': 1}, 'cpu_stats': {}, 'memory_stats': {}}
+    slow_device = Mock(labels={'lab_hash': 'lab_hash', 'name': 'slow', 'user': 'user'})
+    slow_device.name = "slow"
+    slow_device.image.tags = ["kathara/base"]
+    slow_device.stats.side_effect = slow_stats
+    mock_get_machines_api_objects_by_filters.return_value = [fast_device, slow_device]
+    docker_machine.client.api.api_version = "1.40"
+
+    machines_stats = docker_machine.get_machines_stats(lab_hash="lab_hash")
+    # The first snapshot waits for all the devices
+    snapshot = next(machines_stats)
+    assert snapshot['fast'].pids == 1
+    assert snapshot['slow'].pids == 2
+
+    # The following snapshots do not wait for slow devices, that keep the previous values
+    snapshot = next(machines_stats)
+    assert snapshot['slow'].pids == 2
+
+    snapshot = next(machines_stats)
+    # The slow device is not requested again while its request is pending
+    assert fast_device.stats.call_count == 3
+    assert slow_device.stats.call_count == 2
+    fast_device.stats.assert_called_with(stream=False)
+
+    release_slow_device.set()
+    docker_machine.executor.shutdown()
+    assert snapshot['slow'].pids == 3
 
 
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.get_machines_api_objects_by_filters")
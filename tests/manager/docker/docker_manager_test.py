@@ -1,8 +1,11 @@
 import sys
+from concurrent.futures import Future
 from unittest import mock
-from unittest.mock import Mock
+from unittest.mock import Mock, call
 
 import pytest
+from docker.errors import DockerException, APIError
+from requests.exceptions import ConnectionError as RequestsConnectionError
 
 sys.path.insert(0, './')
 
@@ -13,7 +16,8 @@ from src.Kathara.model.Link import Link
 from src.Kathara.utils import generate_urlsafe_hash
 from src.Kathara.manager.docker.stats.DockerLinkStats import DockerLinkStats
 from src.Kathara.manager.docker.stats.DockerMachineStats import DockerMachineStats
-from src.Kathara.exceptions import MachineNotFoundError, LabNotFoundError, InvocationError, LinkNotFoundError
+from src.Kathara.exceptions import MachineNotFoundError, LabNotFoundError, InvocationError, LinkNotFoundError, \
+    MachineAlreadyExistsError, PrivilegeError, DockerDaemonConnectionError
 
 
 #
@@ -180,25 +184,124 @@ def docker_container_empty_meta(mock_container):
     return mock_container
 
 
+#
+# TEST: __init__
+#
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin.check_and_download_plugin")
+@mock.patch("docker.from_env")
+def test_init_docker_not_running(mock_from_env, mock_check_and_download_plugin):
+    mock_from_env.side_effect = DockerException("Error while fetching server API version")
+    with pytest.raises(DockerDaemonConnectionError):
+        DockerManager()
+    assert not mock_check_and_download_plugin.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin.check_and_download_plugin")
+@mock.patch("docker.from_env")
+def test_init_no_ping(mock_from_env, mock_check_and_download_plugin):
+    DockerManager()
+    mock_check_and_download_plugin.assert_called_once()
+    assert not mock_from_env.return_value.ping.called
+
+
 #
 # TEST: deploy_lab
 #
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_updates_from_list")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
-@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.deploy_links")
-def test_deploy_lab(mock_deploy_links, mock_deploy_machines, docker_manager, two_device_scenario):
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab(mock_submit_links, mock_deploy_machines, mock_check_updates_from_list, mock_setting_get_instance,
+                    docker_manager, two_device_scenario):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Always")
+    mock_submit_links.return_value = {}
     docker_manager.deploy_lab(two_device_scenario)
-    mock_deploy_links.assert_called_once_with(two_device_scenario, selected_links=None)
-    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines=None)
+    mock_submit_links.assert_called_once_with(two_device_scenario, selected_links=None)
+    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines=None, links_futures={},
+                                                 check_updates=True)
+    assert not mock_check_updates_from_list.called
 
 
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_updates_from_list")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
-@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.deploy_links")
-def test_deploy_lab_selected_machines(mock_deploy_links, mock_deploy_machines, docker_manager,
-                                      two_device_scenario: Lab):
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab_prompt_updates_before_deploy(mock_submit_links, mock_deploy_machines, mock_check_updates_from_list,
+                                                 mock_setting_get_instance, docker_manager, two_device_scenario):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Prompt")
+    mock_submit_links.return_value = {}
+    manager_mock = Mock()
+    manager_mock.attach_mock(mock_check_updates_from_list, "check_updates_from_list")
+    manager_mock.attach_mock(mock_submit_links, "submit_links")
+
+    docker_manager.deploy_lab(two_device_scenario)
+
+    assert [x[0] for x in manager_mock.mock_calls] == ["check_updates_from_list", "submit_links"]
+    mock_check_updates_from_list.assert_called_once_with(["kathara/test1", "kathara/test2"])
+    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines=None, links_futures={},
+                                                 check_updates=False)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab_selected_machines(mock_submit_links, mock_deploy_machines, mock_setting_get_instance,
+                                      docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Always")
+    mock_submit_links.return_value = {}
+    docker_manager.deploy_lab(two_device_scenario, selected_machines={"pc1"})
+
+    mock_submit_links.assert_called_once_with(two_device_scenario, selected_links={"A", "B"})
+    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines={"pc1"}, links_futures={},
+                                                 check_updates=True)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_updates_from_list")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab_selected_machines_prompt_updates(mock_submit_links, mock_deploy_machines,
+                                                     mock_check_updates_from_list, mock_setting_get_instance,
+                                                     docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Prompt")
+    mock_submit_links.return_value = {}
     docker_manager.deploy_lab(two_device_scenario, selected_machines={"pc1"})
 
-    mock_deploy_links.assert_called_once_with(two_device_scenario, selected_links={"A", "B"})
-    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines={"pc1"})
+    mock_check_updates_from_list.assert_called_once_with(["kathara/test1"])
+    mock_deploy_machines.assert_called_once_with(two_device_scenario, selected_machines={"pc1"}, links_futures={},
+                                                 check_updates=False)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab_machines_error_cancels_links(mock_submit_links, mock_deploy_machines, mock_setting_get_instance,
+                                                 docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Always")
+    link_future = Future()
+    mock_submit_links.return_value = {"A": link_future}
+    mock_deploy_machines.side_effect = MachineAlreadyExistsError("pc1")
+
+    with pytest.raises(MachineAlreadyExistsError):
+        docker_manager.deploy_lab(two_device_scenario)
+
+    assert link_future.cancelled()
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.submit_links")
+def test_deploy_lab_unused_link_error(mock_submit_links, mock_deploy_machines, mock_setting_get_instance,
+                                      docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Always")
+    link_future = Future()
+    link_future.set_exception(PrivilegeError("error"))
+    mock_submit_links.return_value = {"A": link_future}
+
+    with pytest.raises(PrivilegeError):
+        docker_manager.deploy_lab(two_device_scenario)
+
+    mock_deploy_machines.assert_called_once()
 
 
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
@@ -211,17 +314,340 @@ def test_deploy_lab_selected_machines_exception(mock_deploy_links, mock_deploy_m
     assert not mock_deploy_links.called
 
 
+#
+# TEST: reconcile_lab
+#
+def running_lab_side_effect(machines: dict, statuses: dict = None, digests: dict = None):
+    def update_lab_from_api(running_lab: Lab):
+        for (name, links) in machines.items():
+            running_lab.get_or_new_machine(name)
+            for link in links:
+                running_lab.connect_machine_to_link(name, link)
+            running_lab.machines[name].api_object = Mock(
+                status=statuses.get(name, "running") if statuses else "running",
+                labels={"config_digest": digests[name]}
+            )
+
+    return update_lab_from_api
+
+
+def network_mock(name: str, external: str = ""):
+    network = Mock()
+    network.attrs = {"Labels": {"name": name, "external": external}}
+    return network
+
+
+@pytest.fixture()
+def two_device_digests(two_device_scenario: Lab):
+    return {name: machine.get_config_digest() for (name, machine) in two_device_scenario.machines.items()}
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_unchanged(mock_update_lab_from_api, mock_get_links_api_objects, mock_undeploy_machines,
+                                 mock_undeploy_links, mock_deploy_lab, docker_manager, two_device_scenario: Lab,
+                                 two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"]}, digests=two_device_digests
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    assert not mock_undeploy_machines.called
+    assert not mock_undeploy_links.called
+    assert not mock_deploy_lab.called
+    assert two_device_scenario.machines["pc1"].api_object.labels["config_digest"] == two_device_digests["pc1"]
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_changed_device(mock_update_lab_from_api, mock_get_links_api_objects, mock_undeploy_machines,
+                                      mock_undeploy_links, mock_deploy_lab, docker_manager, two_device_scenario: Lab,
+                                      two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"]}, digests={**two_device_digests, "pc2": "old_digest"}
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc2"})
+    assert not mock_undeploy_links.called
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc2"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_changed_interfaces(mock_update_lab_from_api, mock_get_links_api_objects,
+                                          mock_undeploy_machines, mock_undeploy_links, mock_deploy_lab,
+                                          docker_manager, two_device_scenario: Lab, two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A"], "pc2": ["A"]}, digests=two_device_digests
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc1"})
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc1"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_stopped_device(mock_update_lab_from_api, mock_get_links_api_objects, mock_undeploy_machines,
+                                      mock_undeploy_links, mock_deploy_lab, docker_manager, two_device_scenario: Lab,
+                                      two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"]}, statuses={"pc1": "exited"}, digests=two_device_digests
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc1"})
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc1"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_missing_device(mock_update_lab_from_api, mock_get_links_api_objects, mock_undeploy_machines,
+                                      mock_undeploy_links, mock_deploy_lab, docker_manager, two_device_scenario: Lab,
+                                      two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect({"pc1": ["A", "B"]}, digests=two_device_digests)
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    assert not mock_undeploy_machines.called
+    assert not mock_undeploy_links.called
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc2"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_removed_device_and_link(mock_update_lab_from_api, mock_get_links_api_objects,
+                                               mock_undeploy_machines, mock_undeploy_links, mock_deploy_lab,
+                                               docker_manager, two_device_scenario: Lab, two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"], "pc3": ["C"]}, digests={**two_device_digests, "pc3": "digest"}
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B"), network_mock("C")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc3"})
+    mock_undeploy_links.assert_called_once_with(two_device_scenario.hash, selected_links={"C"})
+    assert not mock_deploy_lab.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_changed_external_link(mock_update_lab_from_api, mock_get_links_api_objects,
+                                             mock_undeploy_machines, mock_undeploy_links, mock_deploy_lab,
+                                             docker_manager, two_device_scenario: Lab, two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"]}, digests=two_device_digests
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A", external="eth0.10"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario)
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc1", "pc2"})
+    mock_undeploy_links.assert_called_once_with(two_device_scenario.hash, selected_links={"A"})
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc1", "pc2"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_links_api_objects")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_selected_machines(mock_update_lab_from_api, mock_get_links_api_objects,
+                                         mock_undeploy_machines, mock_undeploy_links, mock_deploy_lab,
+                                         docker_manager, two_device_scenario: Lab, two_device_digests):
+    mock_update_lab_from_api.side_effect = running_lab_side_effect(
+        {"pc1": ["A", "B"], "pc2": ["A"], "pc3": ["A"]},
+        digests={"pc1": "old_digest", "pc2": "old_digest", "pc3": "digest"}
+    )
+    mock_get_links_api_objects.return_value = [network_mock("A"), network_mock("B")]
+
+    docker_manager.reconcile_lab(two_device_scenario, selected_machines={"pc2"})
+
+    mock_undeploy_machines.assert_called_once_with(two_device_scenario.hash, selected_machines={"pc2"})
+    mock_deploy_lab.assert_called_once_with(two_device_scenario, selected_machines={"pc2"})
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.deploy_lab")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.update_lab_from_api")
+def test_reconcile_lab_selected_machines_exception(mock_update_lab_from_api, mock_deploy_lab, docker_manager,
+                                                   two_device_scenario: Lab):
+    with pytest.raises(MachineNotFoundError):
+        docker_manager.reconcile_lab(two_device_scenario, selected_machines={"pc3"})
+    assert not mock_update_lab_from_api.called
+    assert not mock_deploy_lab.called
+
+
+#
+# TEST: resume_lab
+#
+@mock.patch("src.Kathara.manager.docker.DockerManager.time.sleep")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.reconcile_lab")
+def test_resume_lab(mock_reconcile_lab, mock_sleep, docker_manager, two_device_scenario: Lab):
+    docker_manager.resume_lab(two_device_scenario, selected_machines={"pc1"})
+
+    mock_reconcile_lab.assert_called_once_with(two_device_scenario, {"pc1"})
+    assert not mock_sleep.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.time.sleep")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.reconcile_lab")
+def test_resume_lab_transient_error(mock_reconcile_lab, mock_sleep, docker_manager, two_device_scenario: Lab):
+    mock_reconcile_lab.side_effect = [APIError("error", response=Mock(status_code=500)),
+                                      RequestsConnectionError("error"), None]
+
+    docker_manager.resume_lab(two_device_scenario)
+
+    assert mock_reconcile_lab.call_count == 3
+    mock_sleep.assert_has_calls([call(1), call(2)])
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.time.sleep")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.reconcile_lab")
+def test_resume_lab_transient_error_retries_exhausted(mock_reconcile_lab, mock_sleep, docker_manager,
+                                                      two_device_scenario: Lab):
+    mock_reconcile_lab.side_effect = APIError("error", response=Mock(status_code=503))
+
+    with pytest.raises(APIError):
+        docker_manager.resume_lab(two_device_scenario)
+
+    assert mock_reconcile_lab.call_count == 4
+    mock_sleep.assert_has_calls([call(1), call(2), call(4)])
+
+
+@mock.patch("src.Kathara.manager.docker.DockerManager.time.sleep")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.reconcile_lab")
+def test_resume_lab_permanent_error(mock_reconcile_lab, mock_sleep, docker_manager, two_device_scenario: Lab):
+    mock_reconcile_lab.side_effect = APIError("error", response=Mock(status_code=404))
+
+    with pytest.raises(APIError):
+        docker_manager.resume_lab(two_device_scenario)
+
+    mock_reconcile_lab.assert_called_once()
+    assert not mock_sleep.called
+
+
+#
+# TEST: sync_lab_files
+#
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.sync_files")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_machines_api_objects")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_sync_lab_files(mock_setting_get_instance, mock_get_machines_api_objects, mock_sync_files, docker_manager,
+                        two_device_scenario: Lab):
+    pc1_container = Mock(labels={"name": "pc1"})
+    pc2_container = Mock(labels={"name": "pc2"})
+    mock_setting_get_instance.return_value = Mock(pool_size=2)
+    mock_get_machines_api_objects.return_value = [pc1_container, pc2_container]
+    mock_sync_files.side_effect = lambda machine, reload_command: ["/etc/%s" % machine.name]
+
+    copied_files = docker_manager.sync_lab_files(two_device_scenario, reload_command="reload")
+
+    assert copied_files == {"pc1": ["/etc/pc1"], "pc2": ["/etc/pc2"]}
+    mock_get_machines_api_objects.assert_called_once_with(lab_hash=two_device_scenario.hash)
+    mock_sync_files.assert_any_call(two_device_scenario.machines["pc1"], reload_command="reload")
+    mock_sync_files.assert_any_call(two_device_scenario.machines["pc2"], reload_command="reload")
+    assert two_device_scenario.machines["pc1"].api_object == pc1_container
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.sync_files")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_machines_api_objects")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_sync_lab_files_selected_machines(mock_setting_get_instance, mock_get_machines_api_objects, mock_sync_files,
+                                          docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(pool_size=2)
+    mock_get_machines_api_objects.return_value = [Mock(labels={"name": "pc1"}), Mock(labels={"name": "pc2"})]
+    mock_sync_files.return_value = []
+
+    copied_files = docker_manager.sync_lab_files(two_device_scenario, selected_machines={"pc2"})
+
+    assert copied_files == {"pc2": []}
+    mock_sync_files.assert_called_once_with(two_device_scenario.machines["pc2"], reload_command=None)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.sync_files")
+@mock.patch("src.Kathara.manager.docker.DockerManager.DockerManager.get_machines_api_objects")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_sync_lab_files_not_running_device(mock_setting_get_instance, mock_get_machines_api_objects, mock_sync_files,
+                                           docker_manager, two_device_scenario: Lab):
+    mock_setting_get_instance.return_value = Mock(pool_size=2)
+    mock_get_machines_api_objects.return_value = [Mock(labels={"name": "pc1"})]
+    mock_sync_files.return_value = []
+
+    copied_files = docker_manager.sync_lab_files(two_device_scenario)
+
+    assert copied_files == {"pc1": []}
+    mock_sync_files.assert_called_once_with(two_device_scenario.machines["pc1"], reload_command=None)
+
+
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.sync_files")
+def test_sync_lab_files_selected_machines_exception(mock_sync_files, docker_manager, two_device_scenario: Lab):
+    with pytest.raises(MachineNotFoundError):
+        docker_manager.sync_lab_files(two_device_scenario, selected_machines={"pc3"})
+    assert not mock_sync_files.called
+
+
 #
 # TEST: deploy_machine
 #
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.deploy_links")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
-def test_deploy_machine(mock_deploy_machines, mock_deploy_links, docker_manager, default_device, default_link):
+def test_deploy_machine(mock_deploy_machines, mock_deploy_links, mock_setting_get_instance, docker_manager,
+                        default_device, default_link):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Always")
     default_device.add_interface(default_link)
 
     docker_manager.deploy_machine(default_device)
     mock_deploy_links.assert_called_once_with(default_device.lab, selected_links={default_link.name})
-    mock_deploy_machines.assert_called_once_with(default_device.lab, selected_machines={default_device.name})
+    mock_deploy_machines.assert_called_once_with(default_device.lab, selected_machines={default_device.name},
+                                                 check_updates=True)
+
+
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+@mock.patch("src.Kathara.manager.docker.DockerImage.DockerImage.check_updates_from_list")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.deploy_links")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.deploy_machines")
+def test_deploy_machine_prompt_updates(mock_deploy_machines, mock_deploy_links, mock_check_updates_from_list,
+                                       mock_setting_get_instance, docker_manager, default_device, default_link):
+    mock_setting_get_instance.return_value = Mock(image_update_policy="Prompt")
+    default_device.add_interface(default_link)
+
+    docker_manager.deploy_machine(default_device)
+    mock_check_updates_from_list.assert_called_once_with([default_device.get_image()])
+    mock_deploy_machines.assert_called_once_with(default_device.lab, selected_machines={default_device.name},
+                                                 check_updates=False)
 
 
 def test_deploy_machine_no_lab(docker_manager, default_device):
@@ -398,42 +824,88 @@ def test_undeploy_link_no_lab(docker_manager, default_link):
 #
 # TEST: undeploy_lab
 #
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
-def test_undeploy_lab(mock_undeploy_machine, mock_undeploy_link, docker_manager):
+def test_undeploy_lab(mock_undeploy_machine, mock_undeploy_link, mock_get_released_links_callback,
+                      docker_manager):
     docker_manager.undeploy_lab('lab_hash')
-    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines=None)
+    mock_get_released_links_callback.assert_called_once_with(lab_hash='lab_hash')
+    mock_undeploy_machine.assert_called_once_with(
+        'lab_hash', selected_machines=None, shutdown=True, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
     mock_undeploy_link.assert_called_once_with('lab_hash')
 
 
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
-def test_undeploy_lab_selected_machines(mock_undeploy_machine, mock_undeploy_link, docker_manager):
+def test_undeploy_lab_selected_machines(mock_undeploy_machine, mock_undeploy_link, mock_get_released_links_callback,
+                                        docker_manager):
     docker_manager.undeploy_lab('lab_hash', selected_machines={'pc1', 'pc2'})
-    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines={'pc1', 'pc2'})
+    mock_undeploy_machine.assert_called_once_with(
+        'lab_hash', selected_machines={'pc1', 'pc2'}, shutdown=True, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
+    mock_undeploy_link.assert_called_once_with('lab_hash')
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.undeploy")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.undeploy")
+def test_undeploy_lab_shutdown_timeout(mock_undeploy_machine, mock_undeploy_link, mock_get_released_links_callback,
+                                       docker_manager):
+    docker_manager.undeploy_lab('lab_hash', shutdown_timeout=5)
+    mock_undeploy_machine.assert_called_once_with(
+        'lab_hash', selected_machines=None, shutdown=True, shutdown_timeout=5,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
     mock_undeploy_link.assert_called_once_with('lab_hash')
 
 
 #
 # TEST: wipe
 #
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.wipe")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.wipe")
 @mock.patch("src.Kathara.utils.get_current_user_name")
-def test_wipe(mock_get_current_user_name, mock_wipe_machines, mock_wipe_links, docker_manager):
+def test_wipe(mock_get_current_user_name, mock_wipe_machines, mock_wipe_links, mock_get_released_links_callback,
+              docker_manager):
     mock_get_current_user_name.return_value = "kathara_user"
     docker_manager.wipe()
     mock_get_current_user_name.assert_called_once()
-    mock_wipe_machines.assert_called_once_with(user="kathara_user")
+    mock_get_released_links_callback.assert_called_once_with(user="kathara_user")
+    mock_wipe_machines.assert_called_once_with(
+        user="kathara_user", shutdown=True, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
     mock_wipe_links.assert_called_once_with(user="kathara_user")
 
 
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.wipe")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.wipe")
+@mock.patch("src.Kathara.utils.get_current_user_name")
+def test_wipe_no_shutdown(mock_get_current_user_name, mock_wipe_machines, mock_wipe_links,
+                          mock_get_released_links_callback, docker_manager):
+    mock_get_current_user_name.return_value = "kathara_user"
+    docker_manager.wipe(shutdown=False)
+    mock_wipe_machines.assert_called_once_with(
+        user="kathara_user", shutdown=False, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
+    mock_wipe_links.assert_called_once_with(user="kathara_user")
+
+
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.wipe")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.wipe")
 @mock.patch("src.Kathara.utils.get_current_user_name")
 @mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 def test_wipe_all_users(mock_setting_get_instance, mock_get_current_user_name, mock_wipe_machines, mock_wipe_links,
-                        docker_manager):
+                        mock_get_released_links_callback, docker_manager):
     setting_mock = Mock()
     setting_mock.configure_mock(**{
         'shared_cd': False,
@@ -443,16 +915,20 @@ def test_wipe_all_users(mock_setting_get_instance, mock_get_current_user_name, m
 
     docker_manager.wipe(all_users=True)
     assert not mock_get_current_user_name.called
-    mock_wipe_machines.assert_called_once_with(user=None)
+    mock_wipe_machines.assert_called_once_with(
+        user=None, shutdown=True, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
     mock_wipe_links.assert_called_once_with(user=None)
 
 
+@mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.get_released_links_callback")
 @mock.patch("src.Kathara.manager.docker.DockerLink.DockerLink.wipe")
 @mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.wipe")
 @mock.patch("src.Kathara.utils.get_current_user_name")
 @mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
 def test_wipe_all_users_and_shared_cd(mock_setting_get_instance, mock_get_current_user_name, mock_wipe_machines,
-                                      mock_wipe_links, docker_manager):
+                                      mock_wipe_links, mock_get_released_links_callback, docker_manager):
     setting_mock = Mock()
     setting_mock.configure_mock(**{
         'shared_cd': True,
@@ -463,10 +939,50 @@ def test_wipe_all_users_and_shared_cd(mock_setting_get_instance, mock_get_curren
 
     docker_manager.wipe(all_users=True)
     assert not mock_get_current_user_name.called
-    mock_wipe_machines.assert_called_once_with(user=None)
+    mock_wipe_machines.assert_called_once_with(
+        user=None, shutdown=True, shutdown_timeout=None,
+        machine_undeployed_callback=mock_get_released_links_callback.return_value
+    )
     mock_wipe_links.assert_called_once_with(user=None)
 
 
+#
+# TEST: open_command_channel
+#
+@mock.patch("src.Kathara.utils.get_current_user_name")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.open_command_channel")
+def test_open_command_channel(mock_open_command_channel, mock_get_current_user_name, docker_manager):
+    mock_get_current_user_name.return_value = "kathara_user"
+
+    docker_manager.open_command_channel("pc1", lab_name="lab_name")
+
+    mock_open_command_channel.assert_called_once_with(generate_urlsafe_hash("lab_name"), "pc1", user="kathara_user")
+
+
+def test_open_command_channel_no_lab(docker_manager):
+    with pytest.raises(InvocationError):
+        docker_manager.open_command_channel("pc1")
+
+
+#
+# TEST: exec_machines
+#
+@mock.patch("src.Kathara.utils.get_current_user_name")
+@mock.patch("src.Kathara.manager.docker.DockerMachine.DockerMachine.exec_machines")
+def test_exec_machines(mock_exec_machines, mock_get_current_user_name, docker_manager):
+    mock_get_current_user_name.return_value = "kathara_user"
+
+    docker_manager.exec_machines(["ls"], machine_names=["pc1", "pc2"], lab_name="lab_name")
+
+    mock_exec_machines.assert_called_once_with(generate_urlsafe_hash("lab_name"), ["ls"],
+                                               machine_names=["pc1", "pc2"], user="kathara_user")
+
+
+def test_exec_machines_no_lab(docker_manager):
+    with pytest.raises(InvocationError):
+        docker_manager.exec_machines(["ls"])
+
+
 #
 # TEST: get_machine_api_object
 #
@@ -701,6 +1217,7 @@ def test_get_lab_from_api_lab_name_all_info(mock_get_links_api_objects, mock_get
     mock_get_machines_api_objects.return_value = [docker_container]
     mock_get_links_api_objects.return_value = [docker_network]
     lab = docker_manager.get_lab_from_api(lab_name="lab_test")
+    assert not docker_container.reload.called
     assert len(lab.machines) == 1
     assert docker_container.labels["name"] in lab.machines
     reconstructed_device = lab.get_or_new_machine(docker_container.labels["name"])
@@ -785,6 +1302,9 @@ def test_update_lab_from_api_add_link(mock_get_links_api_objects, mock_get_machi
     docker_container.attrs["NetworkSettings"]["Networks"] = ["kathara_user_hash_test_network",
                                                              "kathara_user_hash_test_network_b"]
     docker_manager.update_lab_from_api(lab)
+    mock_get_links_api_objects.assert_called_once_with(lab_hash=lab.hash)
+    assert not docker_container.reload.called
+    assert not docker_network.reload.called
     assert len(lab.machines) == 1
     assert docker_container.labels["name"] in lab.machines
     assert len(lab.links) == 2
@@ -966,3 +1486,21 @@ def test_get_link_stats_no_lab_hash_and_no_name(mock_get_links_stats, docker_net
     with pytest.raises(InvocationError):
         next(docker_manager.get_link_stats(link_name="test_network"))
     assert not mock_get_links_stats.called
+
+
+#
+# TEST: upgrade_plugin
+#
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin.check_and_download_plugin")
+def test_upgrade_plugin(mock_check_and_download_plugin, docker_manager):
+    docker_manager.upgrade_plugin()
+    mock_check_and_download_plugin.assert_called_once_with(upgrade=True)
+
+
+#
+# TEST: close
+#
+def test_close(docker_manager):
+    docker_manager.executor = Mock()
+    docker_manager.close()
+    docker_manager.executor.shutdown.assert_called_once()
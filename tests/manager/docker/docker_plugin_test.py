@@ -16,6 +16,7 @@ from src.Kathara.exceptions import DockerPluginError
 @pytest.fixture()
 @mock.patch("docker.DockerClient")
 def docker_plugin(mock_docker_client):
+    mock_docker_client.api.base_url = "http+docker://localhost"
     return DockerPlugin(mock_docker_client)
 
 
@@ -29,7 +30,8 @@ def mock_plugin():
                             'Options': ['rbind'], 'Settable': None, 'Source': '/mount/path', 'Type': 'bind'}]
             }
         },
-        'enabled': False
+        'enabled': False,
+        'id': "plugin_id"
     })
     return mock_plugin
 
@@ -54,7 +56,7 @@ def test_check_and_download_plugin_not_enabled(mock_setting_get_instance, mock_g
     docker_plugin.client.plugins.get.return_value = mock_plugin
     docker_plugin.check_and_download_plugin()
     docker_plugin.client.plugins.get.assert_called_once_with("kathara/katharanp:" + utils.get_architecture())
-    mock_plugin.upgrade.assert_called_once()
+    assert not mock_plugin.upgrade.called
     mock_get_xtables_lock_mount.assert_called_once()
     mock_configure_xtables_mount.assert_called_once()
     mock_plugin.enable.assert_called_once()
@@ -70,7 +72,7 @@ def test_check_and_download_plugin_enabled(mock_setting_get_instance, mock_get_x
     docker_plugin.client.plugins.get.return_value = mock_plugin
     docker_plugin.check_and_download_plugin()
     docker_plugin.client.plugins.get.assert_called_once_with("kathara/katharanp:" + utils.get_architecture())
-    mock_plugin.upgrade.assert_called_once()
+    assert not mock_plugin.upgrade.called
     mock_get_xtables_lock_mount.assert_called_once()
     mock_plugin.disable.assert_called_once()
     mock_configure_xtables_mount.assert_called_once()
@@ -127,3 +129,65 @@ def test_check_and_download_remote_plugin_not_enabled(mock_setting_get_instance,
     assert str(e.value) == "Kathara Network Plugin not enabled on remote Docker connection."
     assert not mock_get_xtables_lock_mount.called
     assert not mock_configure_xtables_mount.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin._configure_xtables_mount")
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin._get_xtables_lock_mount")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_check_and_download_plugin_cached(mock_setting_get_instance, mock_get_xtables_lock_mount,
+                                          mock_configure_xtables_mount, docker_plugin, mock_plugin, mock_setting):
+    mock_setting_get_instance.return_value = mock_setting
+    mock_get_xtables_lock_mount.return_value = "/mount/path"
+    mock_plugin.enabled = True
+    docker_plugin.client.plugins.get.return_value = mock_plugin
+    docker_plugin.check_and_download_plugin()
+    mock_get_xtables_lock_mount.assert_called_once()
+
+    # The second check finds the health record of the plugin on the same daemon
+    docker_plugin.check_and_download_plugin()
+    mock_get_xtables_lock_mount.assert_called_once()
+    assert not mock_configure_xtables_mount.called
+    assert docker_plugin.client.plugins.get.call_count == 2
+
+
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin._get_xtables_lock_mount")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_check_and_download_plugin_cached_changed(mock_setting_get_instance, mock_get_xtables_lock_mount,
+                                                  docker_plugin, mock_plugin, mock_setting):
+    mock_setting_get_instance.return_value = mock_setting
+    mock_get_xtables_lock_mount.return_value = "/mount/path"
+    mock_plugin.enabled = True
+    docker_plugin.client.plugins.get.return_value = mock_plugin
+    docker_plugin.check_and_download_plugin()
+
+    mock_plugin.id = "upgraded_plugin_id"
+    docker_plugin.check_and_download_plugin()
+    assert mock_get_xtables_lock_mount.call_count == 2
+
+    docker_plugin.client.api.base_url = "tcp://remote:2375"
+    docker_plugin.check_and_download_plugin()
+    assert mock_get_xtables_lock_mount.call_count == 3
+    assert not docker_plugin.client.info.called
+
+
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin._configure_xtables_mount")
+@mock.patch("src.Kathara.manager.docker.DockerPlugin.DockerPlugin._get_xtables_lock_mount")
+@mock.patch("src.Kathara.setting.Setting.Setting.get_instance")
+def test_check_and_download_plugin_upgrade(mock_setting_get_instance, mock_get_xtables_lock_mount,
+                                           mock_configure_xtables_mount, docker_plugin, mock_plugin, mock_setting):
+    mock_setting_get_instance.return_value = mock_setting
+    mock_get_xtables_lock_mount.return_value = "/mount/path"
+    mock_plugin.enabled = True
+    docker_plugin.client.plugins.get.return_value = mock_plugin
+    docker_plugin.check_and_download_plugin()
+
+    def upgrade():
+        mock_plugin.enabled = False
+        yield {"status": "Upgraded"}
+
+    mock_plugin.upgrade.side_effect = upgrade
+    docker_plugin.check_and_download_plugin(upgrade=True)
+    mock_plugin.disable.assert_called_once()
+    mock_plugin.upgrade.assert_called_once()
+    mock_configure_xtables_mount.assert_called_once()
+    mock_plugin.enable.assert_called_once()
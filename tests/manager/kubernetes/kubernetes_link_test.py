@@ -10,6 +10,7 @@ sys.path.insert(0, './')
 
 from src.Kathara.model.Lab import Lab
 from src.Kathara.manager.kubernetes.KubernetesLink import KubernetesLink
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
 from src.Kathara.exceptions import LinkNotFoundError
 
 
@@ -63,7 +64,7 @@ def default_link():
 def kubernetes_link(kubernetes_namespace_mock, config_mock, _):
     config_mock.get_default_copy.return_value = FakeConfig()
 
-    return KubernetesLink(kubernetes_namespace_mock)
+    return KubernetesLink(kubernetes_namespace_mock, ManagerExecutor(max_workers=4))
 
 
 @pytest.fixture()
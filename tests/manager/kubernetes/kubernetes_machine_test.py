@@ -11,6 +11,8 @@ from kubernetes import client
 from src.Kathara.model.Lab import Lab
 from src.Kathara.model.Machine import Machine
 from src.Kathara.manager.kubernetes.KubernetesMachine import KubernetesMachine, STARTUP_COMMANDS
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
+from src.Kathara.foundation.manager.channel.CommandChannel import CHANNEL_SHELL
 from src.Kathara.exceptions import MachineNotFoundError
 
 
@@ -23,7 +25,7 @@ from src.Kathara.exceptions import MachineNotFoundError
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesConfigMap")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesNamespace")
 def kubernetes_machine(kubernetes_namespace_mock, config_map_mock, core_v1_api_mock, apps_v1_api_mock):
-    return KubernetesMachine(kubernetes_namespace_mock)
+    return KubernetesMachine(kubernetes_namespace_mock, ManagerExecutor(max_workers=4))
 
 
 @pytest.fixture()
@@ -440,6 +442,21 @@ def test_deploy_machines(mock_deploy, kubernetes_machine):
     assert mock_deploy.call_count == 2
 
 
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine._deploy_machine")
+def test_deploy_machines_with_dependencies(mock_deploy, kubernetes_machine):
+    lab = Lab("Default scenario")
+
+    lab.get_or_new_machine("pc1", **{'image': 'kathara/test1'})
+    lab.get_or_new_machine("pc2", **{'image': 'kathara/test2'})
+    lab.apply_dependency_graph({'pc1': ['pc2']})
+
+    mock_deploy.return_value = None
+
+    kubernetes_machine.deploy_machines(lab)
+
+    assert [call.args[0][0] for call in mock_deploy.call_args_list] == ['pc2', 'pc1']
+
+
 #
 # TEST: undeploy
 #
@@ -485,6 +502,18 @@ def test_undeploy_no_devices(mock_get_machines_api_objects_by_filters, mock_unde
     assert not mock_undeploy_machine.called
 
 
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine._undeploy_machine")
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
+def test_undeploy_no_shutdown(mock_get_machines_api_objects_by_filters, mock_undeploy_machine, kubernetes_machine,
+                              default_device):
+    default_device.api_object.metadata.labels = {'name': "test_device"}
+    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+
+    kubernetes_machine.undeploy("lab_hash", shutdown=False)
+
+    mock_undeploy_machine.assert_called_once_with(default_device.api_object, shutdown=False)
+
+
 #
 # TEST: wipe
 #
@@ -539,35 +568,30 @@ def test_undeploy_machine(mock_delete_machine, kubernetes_machine, default_devic
 #
 # TEST: get_machines_api_objects_by_filter
 #
-@mock.patch("kubernetes.client.api.core_v1_api.CoreV1Api.list_namespaced_pod")
+@mock.patch("kubernetes.client.api.core_v1_api.CoreV1Api.list_pod_for_all_namespaces")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesNamespace.KubernetesNamespace.get_all")
-def test_get_machines_api_objects_by_filter_empty_filter(mock_namespace_get_all, mock_list_namespaced_pod,
-                                                         kubernetes_namespace, default_device, kubernetes_machine):
-    mock_namespace_get_all.return_value = [kubernetes_namespace]
+def test_get_machines_api_objects_by_filter_empty_filter(mock_namespace_get_all, mock_list_pod_for_all_namespaces,
+                                                         default_device, kubernetes_machine):
     kubernetes_machine.kubernetes_namespace.get_all = mock_namespace_get_all
-    mock_list_namespaced_pod.return_value = V1PodList(items=[default_device])
-    kubernetes_machine.core_client.list_namespaced_pod = mock_list_namespaced_pod
+    mock_list_pod_for_all_namespaces.return_value = V1PodList(items=[default_device])
+    kubernetes_machine.core_client.list_pod_for_all_namespaces = mock_list_pod_for_all_namespaces
     kubernetes_machine.get_machines_api_objects_by_filters()
-    mock_namespace_get_all.assert_called_once()
-    mock_list_namespaced_pod.assert_called_once_with(namespace="test_namespace",
-                                                     label_selector="app=kathara",
-                                                     timeout_seconds=9999)
+    assert not mock_namespace_get_all.called
+    mock_list_pod_for_all_namespaces.assert_called_once_with(label_selector="app=kathara", timeout_seconds=9999)
 
 
-@mock.patch("kubernetes.client.api.core_v1_api.CoreV1Api.list_namespaced_pod")
+@mock.patch("kubernetes.client.api.core_v1_api.CoreV1Api.list_pod_for_all_namespaces")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesNamespace.KubernetesNamespace.get_all")
-def test_get_machines_api_objects_by_filter_machine_name(mock_namespace_get_all, mock_list_namespaced_pod,
-                                                         kubernetes_namespace, default_device, kubernetes_machine):
-    mock_namespace_get_all.return_value = [kubernetes_namespace]
+def test_get_machines_api_objects_by_filter_machine_name(mock_namespace_get_all, mock_list_pod_for_all_namespaces,
+                                                         default_device, kubernetes_machine):
     kubernetes_machine.kubernetes_namespace.get_all = mock_namespace_get_all
     default_device.api_object.name = "test_device"
-    mock_list_namespaced_pod.return_value = V1PodList(items=[default_device.api_object])
-    kubernetes_machine.core_client.list_namespaced_pod = mock_list_namespaced_pod
+    mock_list_pod_for_all_namespaces.return_value = V1PodList(items=[default_device.api_object])
+    kubernetes_machine.core_client.list_pod_for_all_namespaces = mock_list_pod_for_all_namespaces
     kubernetes_machine.get_machines_api_objects_by_filters(machine_name="test_device")
-    mock_namespace_get_all.assert_called_once()
-    mock_list_namespaced_pod.assert_called_once_with(namespace="test_namespace",
-                                                     label_selector="app=kathara,name=test_device",
-                                                     timeout_seconds=9999)
+    assert not mock_namespace_get_all.called
+    mock_list_pod_for_all_namespaces.assert_called_once_with(label_selector="app=kathara,name=test_device",
+                                                             timeout_seconds=9999)
 
 
 @mock.patch("kubernetes.client.api.core_v1_api.CoreV1Api.list_namespaced_pod")
@@ -599,50 +623,162 @@ def test_get_machines_api_objects_by_filter_lab_hash_machine_name(mock_namespace
 
 
 #
-# TEST: get_machines_stats
+# TEST: open_command_channel
 #
+@mock.patch("src.Kathara.manager.kubernetes.channel.KubernetesCommandChannel.stream")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
-def test_get_machines_stats_lab_hash(mock_get_machines_api_objects_by_filters, kubernetes_machine, default_device):
-    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+def test_open_command_channel(mock_get_machines_api_objects_by_filters, mock_stream, kubernetes_machine):
+    pod = Mock()
+    pod.metadata.name = "pc1-pod"
+    pod.metadata.namespace = "lab_hash"
+    pod.metadata.labels = {"name": "pc1"}
+    mock_get_machines_api_objects_by_filters.return_value = [pod]
+
+    channel = kubernetes_machine.open_command_channel("lab_hash", "pc1")
+
+    assert channel.machine_name == "pc1"
+    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash", machine_name="pc1")
+    mock_stream.assert_called_once_with(kubernetes_machine.core_client.connect_get_namespaced_pod_exec,
+                                        name="pc1-pod", namespace="lab_hash", command=CHANNEL_SHELL, stdout=True,
+                                        stderr=True, stdin=True, tty=False, _preload_content=False)
+
+    channel.close()
+    mock_stream.return_value.write_stdin.assert_called_once_with("exit\n")
+    assert mock_stream.return_value.close.called
+
+
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
+def test_open_command_channel_not_running(mock_get_machines_api_objects_by_filters, kubernetes_machine):
+    mock_get_machines_api_objects_by_filters.return_value = []
+
+    with pytest.raises(MachineNotFoundError):
+        kubernetes_machine.open_command_channel("lab_hash", "pc1")
+
+
+#
+# TEST: exec_machines
+#
+def build_pod(name):
+    pod = Mock()
+    pod.metadata.name = "%s-pod" % name
+    pod.metadata.namespace = "lab_hash"
+    pod.metadata.labels = {"name": name}
+    return pod
+
+
+def build_exec_response(stdout, returncode):
+    response = Mock()
+    response.is_open.side_effect = [True, False]
+    response.peek_stdout.return_value = True
+    response.read_stdout.return_value = stdout
+    response.peek_stderr.return_value = False
+    response.returncode = returncode
+    return response
+
+
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.stream")
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
+def test_exec_machines(mock_get_machines_api_objects_by_filters, mock_stream, kubernetes_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_pod("pc1"), build_pod("pc2")]
+    responses = {"pc1-pod": build_exec_response("out1", 0), "pc2-pod": build_exec_response("out2", 1)}
+    mock_stream.side_effect = lambda func, name, **kwargs: responses[name]
+
+    result = list(kubernetes_machine.exec_machines("lab_hash", "ip addr", machine_names=["pc1", "pc2"]))
+
+    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash")
+    assert sorted(result, key=lambda x: (x[0], x[3] is not None)) == [
+        ("pc1", b"out1", None, None), ("pc1", None, None, 0),
+        ("pc2", b"out2", None, None), ("pc2", None, None, 1),
+    ]
+    mock_stream.assert_any_call(kubernetes_machine.core_client.connect_get_namespaced_pod_exec, name="pc1-pod",
+                                namespace="lab_hash", command=["ip", "addr"], stdout=True, stderr=True,
+                                stdin=False, tty=False, _preload_content=False)
+    assert responses["pc1-pod"].close.called
+
+
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
+def test_exec_machines_not_running(mock_get_machines_api_objects_by_filters, kubernetes_machine):
+    mock_get_machines_api_objects_by_filters.return_value = [build_pod("pc1")]
+
+    with pytest.raises(MachineNotFoundError):
+        list(kubernetes_machine.exec_machines("lab_hash", ["ls"], machine_names=["pc2"]))
+
+
+#
+# TEST: get_machines_stats
+#
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_lab_hash(mock_get_pods, kubernetes_machine, default_device):
+    mock_get_pods.return_value = [default_device.api_object]
     next(kubernetes_machine.get_machines_stats(lab_hash="lab_hash"))
-    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash",
+    mock_get_pods.assert_called_once_with(lab_hash="lab_hash",
                                                                      machine_name=None)
 
 
-@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
-def test_get_machines_stats_lab_hash_device_name(mock_get_machines_api_objects_by_filters, kubernetes_machine,
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_lab_hash_device_name(mock_get_pods, kubernetes_machine,
                                                  default_device):
     default_device.api_object.name = "test_device"
-    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    mock_get_pods.return_value = [default_device.api_object]
     next(kubernetes_machine.get_machines_stats(lab_hash="lab_hash", machine_name="test_device"))
-    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash",
+    mock_get_pods.assert_called_once_with(lab_hash="lab_hash",
                                                                      machine_name="test_device")
 
 
-@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
-def test_get_machines_stats_no_hash_no_name(mock_get_machines_api_objects_by_filters, kubernetes_machine,
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_no_hash_no_name(mock_get_pods, kubernetes_machine,
                                             default_device):
-    mock_get_machines_api_objects_by_filters.return_value = [default_device.api_object]
+    mock_get_pods.return_value = [default_device.api_object]
     next(kubernetes_machine.get_machines_stats())
-    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash=None,
+    mock_get_pods.assert_called_once_with(lab_hash=None,
                                                                      machine_name=None)
 
 
-@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
-def test_get_machines_stats_lab_hash_device_not_found(mock_get_machines_api_objects_by_filters, kubernetes_machine,
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_lab_hash_device_not_found(mock_get_pods, kubernetes_machine,
                                                       default_device):
-    mock_get_machines_api_objects_by_filters.return_value = []
+    mock_get_pods.return_value = []
     with pytest.raises(MachineNotFoundError):
         next(kubernetes_machine.get_machines_stats(lab_hash="lab_hash"))
-    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash="lab_hash",
+    mock_get_pods.assert_called_once_with(lab_hash="lab_hash",
                                                                      machine_name=None)
 
 
-@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
-def test_get_machines_stats_device_not_found(mock_get_machines_api_objects_by_filters, kubernetes_machine,
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_device_not_found(mock_get_pods, kubernetes_machine,
                                              default_device):
-    mock_get_machines_api_objects_by_filters.return_value = []
+    mock_get_pods.return_value = []
     with pytest.raises(MachineNotFoundError):
         next(kubernetes_machine.get_machines_stats())
-    mock_get_machines_api_objects_by_filters.assert_called_once_with(lab_hash=None,
+    mock_get_pods.assert_called_once_with(lab_hash=None,
                                                                      machine_name=None)
+
+
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.time.sleep")
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer.get_pods")
+def test_get_machines_stats_reuse_stats(mock_get_pods, mock_sleep, kubernetes_machine):
+    pod_1 = Mock(metadata=Mock(namespace="lab_hash", labels={"name": "pc1"}), status=Mock(container_statuses=None,
+                                                                                            phase="Pending"))
+    pod_1.metadata.name = "pc1-pod"
+    pod_1_running = Mock(metadata=pod_1.metadata, status=Mock(phase="Running"))
+    pod_1_running.status.container_statuses = [Mock(image="docker.io/kathara/base",
+                                                    state=Mock(terminated=None, waiting=None))]
+    pod_2 = Mock(metadata=Mock(namespace="lab_hash", labels={"name": "pc2"}), status=Mock(container_statuses=None,
+                                                                                            phase="Running"))
+    pod_2.metadata.name = "pc2-pod"
+
+    stats = kubernetes_machine.get_machines_stats(lab_hash="lab_hash")
+
+    mock_get_pods.return_value = [pod_1, pod_2]
+    first_snapshot = dict(next(stats))
+    assert first_snapshot["pc1-pod"].status == "Pending"
+    assert first_snapshot["pc1-pod"].image == "N/A"
+    assert not mock_sleep.called
+
+    mock_get_pods.return_value = [pod_1_running]
+    second_snapshot = next(stats)
+    assert second_snapshot["pc1-pod"] is first_snapshot["pc1-pod"]
+    assert second_snapshot["pc1-pod"].status == "Running"
+    assert second_snapshot["pc1-pod"].image == "kathara/base"
+    assert "pc2-pod" not in second_snapshot
+    mock_sleep.assert_called_once()
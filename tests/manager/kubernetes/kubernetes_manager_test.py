@@ -11,6 +11,7 @@ sys.path.insert(0, './')
 from src.Kathara.exceptions import NotSupportedError, MachineNotFoundError, LabNotFoundError, InvocationError, \
     LinkNotFoundError
 from src.Kathara.manager.kubernetes.KubernetesMachine import KubernetesMachine
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
 from src.Kathara.manager.kubernetes.KubernetesManager import KubernetesManager
 from src.Kathara.model.Lab import Lab
 from src.Kathara.model.Machine import Machine
@@ -35,7 +36,7 @@ def kubernetes_namespace(mock_kubernetes_namespace):
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesConfigMap")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesNamespace")
 def kubernetes_machine(mock_kubernetes_namespace, mock_config_map, mock_core_v1_api, mock_apps_v1_api):
-    return KubernetesMachine(mock_kubernetes_namespace)
+    return KubernetesMachine(mock_kubernetes_namespace, ManagerExecutor(max_workers=4))
 
 
 @pytest.fixture()
@@ -294,6 +295,30 @@ def test_deploy_link_no_lab(kubernetes_manager, default_link):
         kubernetes_manager.deploy_link(default_link)
 
 
+#
+# TEST: reconcile_lab
+#
+def test_reconcile_lab_not_supported(kubernetes_manager):
+    with pytest.raises(NotSupportedError):
+        kubernetes_manager.reconcile_lab(Lab("test"))
+
+
+#
+# TEST: resume_lab
+#
+def test_resume_lab_not_supported(kubernetes_manager):
+    with pytest.raises(NotSupportedError):
+        kubernetes_manager.resume_lab(Lab("test"))
+
+
+#
+# TEST: sync_lab_files
+#
+def test_sync_lab_files_not_supported(kubernetes_manager):
+    with pytest.raises(NotSupportedError):
+        kubernetes_manager.sync_lab_files(Lab("test"))
+
+
 #
 # TEST: connect_machine_to_link
 #
@@ -427,11 +452,19 @@ def test_undeploy_link_no_lab(kubernetes_manager, default_link):
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.undeploy")
 def test_undeploy_lab(mock_undeploy_machine, mock_undeploy_link, kubernetes_manager):
     kubernetes_manager.undeploy_lab('lab_hash')
-    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines=None)
+    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines=None, shutdown=True)
     mock_undeploy_link.assert_called_once_with('lab_hash', selected_links=None)
     kubernetes_manager.k8s_namespace.undeploy.assert_called_once_with(lab_hash='lab_hash')
 
 
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesLink.KubernetesLink.undeploy")
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.undeploy")
+def test_undeploy_lab_no_shutdown(mock_undeploy_machine, mock_undeploy_link, kubernetes_manager):
+    kubernetes_manager.undeploy_lab('lab_hash', shutdown=False)
+    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines=None, shutdown=False)
+    mock_undeploy_link.assert_called_once_with('lab_hash', selected_links=None)
+
+
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesLink.KubernetesLink.get_links_api_objects_by_filters")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.get_machines_api_objects_by_filters")
 @mock.patch("src.Kathara.manager.kubernetes.KubernetesNamespace.KubernetesNamespace.undeploy")
@@ -447,11 +480,36 @@ def test_undeploy_lab_selected_machines(mock_undeploy_machine, mock_undeploy_lin
     kubernetes_manager.undeploy_lab('lab_hash', selected_machines={'pc1'})
     mock_get_links_api_objects.assert_called_once_with(lab_hash='lab_hash')
     mock_get_machines_api_objects.assert_called_once_with(lab_hash='lab_hash')
-    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines={'pc1'})
+    mock_undeploy_machine.assert_called_once_with('lab_hash', selected_machines={'pc1'}, shutdown=True)
     mock_undeploy_link.assert_called_once_with('lab_hash', selected_links={'netprefix-b'})
     assert not mock_namespace_undeploy.called
 
 
+#
+# TEST: open_command_channel
+#
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.open_command_channel")
+def test_open_command_channel(mock_open_command_channel, kubernetes_manager):
+    kubernetes_manager.open_command_channel("pc1", lab_name="lab_name")
+
+    mock_open_command_channel.assert_called_once_with(generate_urlsafe_hash("lab_name").lower(), "pc1")
+
+
+#
+# TEST: exec_machines
+#
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesMachine.KubernetesMachine.exec_machines")
+def test_exec_machines(mock_exec_machines, kubernetes_manager):
+    kubernetes_manager.exec_machines(["ls"], lab_name="lab_name")
+
+    mock_exec_machines.assert_called_once_with(generate_urlsafe_hash("lab_name").lower(), ["ls"], machine_names=None)
+
+
+def test_exec_machines_no_lab(kubernetes_manager):
+    with pytest.raises(InvocationError):
+        kubernetes_manager.exec_machines(["ls"])
+
+
 #
 # TEST: get_machine_api_objects
 #
@@ -0,0 +1,112 @@
+import sys
+from unittest import mock
+from unittest.mock import Mock
+
+import pytest
+from kubernetes.client import V1PodList, V1ListMeta
+from kubernetes.client.rest import ApiException
+
+sys.path.insert(0, './')
+
+from src.Kathara.manager.kubernetes.KubernetesPodInformer import KubernetesPodInformer
+
+
+def build_pod(namespace, name, machine_name):
+    pod = Mock(metadata=Mock(namespace=namespace, labels={"name": machine_name}))
+    pod.metadata.name = name
+    return pod
+
+
+#
+# FIXTURE
+#
+@pytest.fixture()
+def pod_1():
+    return build_pod("lab_hash_1", "pc1-pod", "pc1")
+
+
+@pytest.fixture()
+def pod_2():
+    return build_pod("lab_hash_2", "pc2-pod", "pc2")
+
+
+@pytest.fixture()
+def informer(pod_1, pod_2):
+    core_client = Mock()
+    core_client.list_pod_for_all_namespaces.return_value = V1PodList(
+        items=[pod_1, pod_2], metadata=V1ListMeta(resource_version="10")
+    )
+    return KubernetesPodInformer(core_client)
+
+
+#
+# TEST: get_pods
+#
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer._run")
+def test_get_pods_lists_once(mock_run, informer, pod_1, pod_2):
+    assert not informer.is_running()
+
+    assert informer.get_pods() == [pod_1, pod_2]
+    assert informer.get_pods(lab_hash="lab_hash_1") == [pod_1]
+    assert informer.get_pods(machine_name="pc2") == [pod_2]
+    assert informer.get_pods(lab_hash="lab_hash_1", machine_name="pc2") == []
+
+    informer.core_client.list_pod_for_all_namespaces.assert_called_once_with(label_selector="app=kathara")
+    mock_run.assert_called_once_with("10")
+    assert informer.is_running()
+
+
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer._run")
+def test_stop(mock_run, informer):
+    informer.start()
+    informer.stop()
+
+    assert not informer.is_running()
+    informer.get_pods()
+    assert informer.core_client.list_pod_for_all_namespaces.call_count == 2
+
+
+#
+# TEST: _apply_event
+#
+@mock.patch("src.Kathara.manager.kubernetes.KubernetesPodInformer.KubernetesPodInformer._run")
+def test_apply_event(mock_run, informer, pod_1, pod_2):
+    informer.start()
+    pod_1_updated = build_pod("lab_hash_1", "pc1-pod", "pc1")
+    pod_3 = build_pod("lab_hash_1", "pc3-pod", "pc3")
+
+    informer._apply_event({'type': 'MODIFIED', 'object': pod_1_updated})
+    informer._apply_event({'type': 'ADDED', 'object': pod_3})
+    informer._apply_event({'type': 'DELETED', 'object': pod_2})
+
+    assert informer.get_pods() == [pod_1_updated, pod_3]
+
+
+#
+# TEST: _run
+#
+def test_run_resync_on_expired_watch(informer, pod_1, pod_2):
+    pod_3 = build_pod("lab_hash_1", "pc3-pod", "pc3")
+    pod_watch = Mock(resource_version="11")
+
+    def stream(*args, **kwargs):
+        if pod_watch.stream.call_count == 1:
+            yield {'type': 'ADDED', 'object': pod_3}
+            raise ApiException(status=410)
+
+        informer._thread = None
+        return
+        yield
+
+    pod_watch.stream.side_effect = stream
+    informer._watch = pod_watch
+    informer._thread = mock.ANY
+
+    with mock.patch("threading.current_thread", return_value=mock.ANY):
+        informer._run("10")
+
+    # The event is applied, then the watch expires and the cache is filled again from a fresh list
+    assert informer.core_client.list_pod_for_all_namespaces.call_count == 1
+    assert pod_watch.stream.call_args_list[0].kwargs['resource_version'] == "10"
+    assert pod_watch.stream.call_args_list[1].kwargs['resource_version'] == "10"
+    assert list(informer._pods.values()) == [pod_1, pod_2]
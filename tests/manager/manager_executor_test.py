@@ -0,0 +1,217 @@
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+sys.path.insert(0, './')
+
+from src.Kathara.exceptions import MachineDependencyError
+from src.Kathara.foundation.manager.ManagerExecutor import ManagerExecutor
+
+
+@pytest.fixture()
+def executor():
+    manager_executor = ManagerExecutor(max_workers=4)
+    yield manager_executor
+    manager_executor.shutdown()
+
+
+def test_map_keeps_order(executor):
+    assert executor.map(lambda x: x * 2, range(10)) == [x * 2 for x in range(10)]
+
+
+def test_map_empty(executor):
+    assert executor.map(lambda x: x, []) == []
+
+
+def test_map_raises_first_error(executor):
+    def fail_on_three(x):
+        if x == 3:
+            raise ValueError("three")
+        return x
+
+    with pytest.raises(ValueError):
+        executor.map(fail_on_three, range(10))
+
+
+def test_map_cancels_pending_on_error():
+    manager_executor = ManagerExecutor(max_workers=1)
+    started = []
+    lock = threading.Lock()
+
+    def fail_on_first(x):
+        with lock:
+            started.append(x)
+        if x == 0:
+            raise ValueError("first")
+        time.sleep(0.01)
+        return x
+
+    with pytest.raises(ValueError):
+        manager_executor.map(fail_on_first, range(50))
+
+    assert len(started) < 50
+    manager_executor.shutdown()
+
+
+def test_lazy_max_workers():
+    max_workers = Mock(return_value=2)
+    manager_executor = ManagerExecutor(max_workers=max_workers)
+    max_workers.assert_not_called()
+
+    manager_executor.map(lambda x: x, range(4))
+    manager_executor.map(lambda x: x, range(4))
+
+    max_workers.assert_called_once()
+    assert manager_executor.max_workers == 2
+    manager_executor.shutdown()
+
+
+def test_map_graph_respects_dependencies(executor):
+    started = []
+    lock = threading.Lock()
+
+    def record(x):
+        with lock:
+            started.append(x)
+        time.sleep(0.01)
+        return x * 2
+
+    items = {"a": 1, "b": 2, "c": 3, "d": 4}
+    dependencies = {"d": ["b", "c"], "b": ["a"], "c": ["a", "missing"]}
+
+    results = executor.map_graph(record, items, dependencies)
+
+    assert results == {"a": 2, "b": 4, "c": 6, "d": 8}
+    assert started[0] == 1
+    assert started[-1] == 4
+
+
+def test_map_graph_runs_independent_items_concurrently(executor):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(x):
+        barrier.wait()
+        return x
+
+    assert executor.map_graph(meet, {"a": 1, "b": 2}, {}) == {"a": 1, "b": 2}
+
+
+def test_map_graph_stops_on_error(executor):
+    def fail_on_one(x):
+        if x == 1:
+            raise ValueError("one")
+        return x
+
+    started = Mock(side_effect=fail_on_one)
+
+    with pytest.raises(ValueError):
+        executor.map_graph(started, {"a": 1, "b": 2}, {"b": ["a"]})
+
+    started.assert_called_once_with(1)
+
+
+def test_map_graph_loop(executor):
+    with pytest.raises(MachineDependencyError):
+        executor.map_graph(lambda x: x, {"a": 1, "b": 2, "c": 3}, {"a": ["b"], "b": ["a"]})
+
+
+def test_map_from_worker_runs_inline():
+    manager_executor = ManagerExecutor(max_workers=1)
+
+    def nested(x):
+        return sum(manager_executor.map(lambda y: y * x, range(3)))
+
+    # With a single worker, waiting for other workers from a worker would never return
+    assert manager_executor.map(nested, [1, 2]) == [3, 6]
+    manager_executor.shutdown()
+
+
+def test_stream_yields_all_values(executor):
+    def produce(x):
+        for i in range(x):
+            yield i
+
+    values = list(executor.stream(produce, {"a": 1, "b": 2, "c": 3}))
+
+    assert sorted(values) == [("a", 0), ("b", 0), ("b", 1), ("c", 0), ("c", 1), ("c", 2)]
+
+
+def test_stream_yields_values_as_soon_as_available(executor):
+    release = threading.Event()
+
+    def produce(x):
+        yield x
+        if x == "slow":
+            release.wait(5)
+            yield "done"
+
+    stream = executor.stream(produce, {"fast": "fast", "slow": "slow"})
+
+    assert sorted([next(stream), next(stream)]) == [("fast", "fast"), ("slow", "slow")]
+    release.set()
+    assert list(stream) == [("slow", "done")]
+
+
+def test_stream_bounded_by_workers():
+    manager_executor = ManagerExecutor(max_workers=2)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def produce(x):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.05)
+        yield x
+        with lock:
+            running[0] -= 1
+
+    assert len(list(manager_executor.stream(produce, {str(x): x for x in range(6)}))) == 6
+    assert running[1] == 2
+    manager_executor.shutdown()
+
+
+def test_stream_raises_error_at_the_end(executor):
+    def produce(x):
+        if x == 2:
+            raise ValueError("two")
+        yield x
+
+    values = []
+    with pytest.raises(ValueError):
+        for value in executor.stream(produce, {"a": 1, "b": 2, "c": 3}):
+            values.append(value)
+
+    assert sorted(values) == [("a", 1), ("c", 3)]
+
+
+def test_stream_close_stops_calls():
+    manager_executor = ManagerExecutor(max_workers=1)
+    produced = []
+
+    def produce(x):
+        for i in range(100):
+            produced.append(i)
+            yield i
+            time.sleep(0.01)
+
+    stream = manager_executor.stream(produce, {"a": 1, "b": 2})
+    next(stream)
+    stream.close()
+    manager_executor.shutdown()
+
+    # The running call stops at its next value, the pending one never starts
+    assert len(produced) < 100
+
+
+def test_stream_from_worker_runs_inline():
+    manager_executor = ManagerExecutor(max_workers=1)
+
+    def nested(x):
+        return list(manager_executor.stream(lambda y: iter([y * x]), {"a": 1, "b": 2}))
+
+    assert manager_executor.map(nested, [1, 2]) == [[("a", 1), ("b", 2)], [("a", 2), ("b", 4)]]
+    manager_executor.shutdown()
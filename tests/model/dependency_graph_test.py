@@ -0,0 +1,65 @@
+import sys
+
+import pytest
+
+sys.path.insert(0, './')
+
+from src.Kathara.exceptions import MachineDependencyError
+from src.Kathara.model.DependencyGraph import DependencyGraph
+
+
+def test_get_levels():
+    graph = DependencyGraph({'pc1': ['pc2', 'pc3'], 'pc3': ['pc2'], 'pc4': ['r1']})
+    assert graph.get_levels() == [['pc2', 'r1'], ['pc3', 'pc4'], ['pc1']]
+
+
+def test_get_levels_empty():
+    assert DependencyGraph({}).get_levels() == []
+
+
+def test_get_levels_duplicated_dependencies():
+    graph = DependencyGraph({'pc1': ['pc2', 'pc2']})
+    assert graph.get_levels() == [['pc2'], ['pc1']]
+
+
+def test_flatten():
+    graph = DependencyGraph({'pc1': ['pc2', 'pc3'], 'pc3': ['pc2']})
+    assert graph.flatten() == ['pc2', 'pc3', 'pc1']
+
+
+def test_loop():
+    graph = DependencyGraph({'pc1': ['pc2'], 'pc2': ['pc3'], 'pc3': ['pc1'], 'pc4': ['pc1']})
+    assert graph.has_loop()
+    with pytest.raises(MachineDependencyError) as e:
+        graph.get_levels()
+    cycle = str(e.value).split(": ")[1].rstrip(".").split(" -> ")
+    assert cycle[0] == cycle[-1]
+    assert set(cycle) == {'pc1', 'pc2', 'pc3'}
+
+
+def test_self_loop():
+    with pytest.raises(MachineDependencyError):
+        DependencyGraph({'pc1': ['pc1']}).get_levels()
+
+
+def test_no_loop():
+    assert not DependencyGraph({'pc1': ['pc2']}).has_loop()
+
+
+def test_deep_chain():
+    # Deeper than the recursion limit
+    dependencies = {'pc%d' % i: ['pc%d' % (i - 1)] for i in range(1, 10000)}
+    levels = DependencyGraph(dependencies).get_levels()
+    assert len(levels) == 10000
+    assert levels[0] == ['pc0'] and levels[-1] == ['pc9999']
+
+
+def test_diamonds():
+    # Each layer depends on every device of the previous layer
+    dependencies = {}
+    for layer in range(1, 50):
+        for i in range(4):
+            dependencies['pc%d_%d' % (layer, i)] = ['pc%d_%d' % (layer - 1, j) for j in range(4)]
+    levels = DependencyGraph(dependencies).get_levels()
+    assert len(levels) == 50
+    assert all(len(level) == 4 for level in levels)
@@ -273,6 +273,19 @@ def test_apply_dependencies(default_scenario: Lab):
     assert default_scenario.machines.popitem()[0] == "pc2"
     assert default_scenario.machines.popitem()[0] == "pc1"
     assert default_scenario.machines.popitem()[0] == "pc3"
+    assert default_scenario.dependencies == {"pc1": ["pc3"], "pc2": ["pc1"]}
+
+
+def test_apply_dependency_graph(default_scenario: Lab):
+    default_scenario.get_or_new_machine("pc1")
+    default_scenario.get_or_new_machine("pc2")
+    default_scenario.get_or_new_machine("pc3")
+
+    default_scenario.apply_dependency_graph({"pc1": ["pc2", "pc3"], "pc3": ["pc2"]})
+
+    assert default_scenario.has_dependencies
+    assert default_scenario.dependencies == {"pc1": ["pc2", "pc3"], "pc3": ["pc2"]}
+    assert list(default_scenario.machines.keys()) == ["pc2", "pc3", "pc1"]
 
 
 def test_find_machine_true(default_scenario: Lab):
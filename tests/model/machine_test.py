@@ -1,6 +1,9 @@
+import hashlib
+import io
 import os
 import sys
 import tarfile
+import time
 from unittest import mock
 from unittest.mock import Mock
 
@@ -11,7 +14,7 @@ from src.Kathara.exceptions import MachineCollisionDomainError
 sys.path.insert(0, './')
 
 from src.Kathara.model.Lab import Lab
-from src.Kathara.model.Machine import Machine
+from src.Kathara.model.Machine import Machine, RACY_MTIME_SECONDS
 from src.Kathara.model.Link import Link
 from src.Kathara.exceptions import MachineOptionError, NonSequentialMachineInterfaceError
 
@@ -298,11 +301,156 @@ def test_get_num_terms_mix():
     assert device2.get_num_terms() == 2
 
 
+#
+# TEST: get_config_digest
+#
+def test_get_config_digest_unchanged():
+    lab = Lab("test_lab")
+    device = lab.get_or_new_machine("test_machine", **{'image': 'kathara/test', 'port': "3000:55/udp"})
+    lab.connect_machine_to_link(device.name, "A")
+
+    other_lab = Lab("test_lab")
+    other_device = other_lab.get_or_new_machine("test_machine", **{'image': 'kathara/test', 'port': "3000:55/udp"})
+    other_lab.connect_machine_to_link(other_device.name, "A")
+
+    assert device.get_config_digest() == other_device.get_config_digest()
+
+
+def test_get_config_digest_changed_options():
+    device = Machine(Lab("test_lab"), "test_machine", **{'image': 'kathara/test'})
+    digest = device.get_config_digest()
+
+    device.add_meta("mem", "64m")
+
+    assert device.get_config_digest() != digest
+
+
+def test_get_config_digest_changed_interfaces():
+    lab = Lab("test_lab")
+    device = lab.get_or_new_machine("test_machine", **{'image': 'kathara/test'})
+    lab.connect_machine_to_link(device.name, "A")
+    digest = device.get_config_digest()
+
+    lab.connect_machine_to_link(device.name, "B")
+
+    assert device.get_config_digest() != digest
+
+
+def test_get_config_digest_ignores_num_terms():
+    device = Machine(Lab("test_lab"), "test_machine", **{'image': 'kathara/test'})
+    digest = device.get_config_digest()
+
+    device.add_meta("num_terms", 2)
+
+    assert device.get_config_digest() == digest
+
+
+def test_get_config_digest_files(tmp_path):
+    os.makedirs(os.path.join(tmp_path, "test_machine"))
+    file_path = os.path.join(tmp_path, "test_machine", "file")
+    with open(file_path, "w") as file:
+        file.write("content")
+
+    lab = Lab(None, str(tmp_path))
+    device = lab.get_or_new_machine("test_machine", **{'image': 'kathara/test'})
+    digest = device.get_config_digest()
+
+    # Only touching the file does not change the digest
+    os.utime(file_path, (0, 0))
+    assert device.get_config_digest() == digest
+
+    with open(file_path, "w") as file:
+        file.write("new content")
+    assert device.get_config_digest() != digest
+
+
+def test_get_config_digest_files_hashed_once(tmp_path):
+    os.makedirs(os.path.join(tmp_path, "test_machine"))
+    with open(os.path.join(tmp_path, "test_machine", "file"), "w") as file:
+        file.write("content")
+
+    lab = Lab(None, str(tmp_path))
+    device = lab.get_or_new_machine("test_machine", **{'image': 'kathara/test'})
+
+    # Not changed in the last seconds, so the fingerprint does not hash its content
+    with mock.patch("src.Kathara.model.Machine.time.time", return_value=time.time() + RACY_MTIME_SECONDS), \
+            mock.patch("src.Kathara.model.Machine.hashlib.sha256", wraps=hashlib.sha256) as mock_sha256:
+        digest = device.get_config_digest()
+        assert mock_sha256.call_count == 3
+        assert device.get_config_digest() == digest
+        assert mock_sha256.call_count == 4
+
+    device.add_meta("mem", "64m")
+    assert device.get_config_digest() != digest
+
+
+#
+# TEST: get_data_delta
+#
+@pytest.fixture()
+def device_with_files(tmp_path):
+    os.makedirs(os.path.join(tmp_path, "test_machine", "etc"))
+    for file_path in [os.path.join(tmp_path, "test_machine", "etc", "file"),
+                      os.path.join(tmp_path, "test_machine.startup")]:
+        with open(file_path, "w") as file:
+            file.write("content")
+        # Files modified in the last seconds are always hashed
+        os.utime(file_path, (1000, 1000))
+
+    return Lab(None, str(tmp_path)).get_or_new_machine("test_machine")
+
+
+def test_get_data_delta_no_manifest(device_with_files: Machine, tmp_path):
+    (delta, manifest) = device_with_files.get_data_delta(None)
+
+    assert delta == {
+        "/etc/file": os.path.join(tmp_path, "test_machine", "etc", "file"),
+        "/hostlab/test_machine.startup": os.path.join(tmp_path, "test_machine.startup")
+    }
+    assert set(manifest.keys()) == {"hostlab/test_machine/etc/file", "hostlab/test_machine.startup"}
+    assert all(entry[2] is not None for entry in manifest.values())
+
+
+def test_get_data_delta_unchanged(device_with_files: Machine):
+    manifest = device_with_files.get_data_manifest()
+
+    (delta, current_manifest) = device_with_files.get_data_delta(manifest)
+
+    assert delta == {}
+    assert current_manifest == manifest
+
+
+def test_get_data_delta_changed(device_with_files: Machine, tmp_path):
+    file_path = os.path.join(tmp_path, "test_machine", "etc", "file")
+    (_, manifest) = device_with_files.get_data_delta(None)
+
+    with open(file_path, "w") as file:
+        file.write("new content")
+
+    (delta, _) = device_with_files.get_data_delta(manifest)
+
+    assert delta == {"/etc/file": file_path}
+
+
+def test_get_data_delta_touched(device_with_files: Machine, tmp_path):
+    file_path = os.path.join(tmp_path, "test_machine", "etc", "file")
+    (_, manifest) = device_with_files.get_data_delta(None)
+
+    os.utime(file_path, (2000, 2000))
+
+    (delta, current_manifest) = device_with_files.get_data_delta(manifest)
+
+    assert delta == {}
+    assert current_manifest["hostlab/test_machine/etc/file"][1] == 2000 * 10 ** 9
+
+
 #
 # TEST: pack_data
 #
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
 @mock.patch("src.Kathara.utils.pack_file_for_tar")
-def test_pack_data_hidden_files(pack_file_for_tar_mock):
+def test_pack_data_hidden_files(pack_file_for_tar_mock, get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path)
     lab_path = os.path.join("tests", "model", "hiddenfiles")
     lab = Lab(None, lab_path)
     device = lab.get_or_new_machine("test_machine")
@@ -324,8 +472,10 @@ def test_pack_data_hidden_files(pack_file_for_tar_mock):
     assert pack_file_for_tar_mock.call_count == 2
 
 
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
 @mock.patch("src.Kathara.utils.pack_file_for_tar")
-def test_pack_data_hidden_files_recursive(pack_file_for_tar_mock):
+def test_pack_data_hidden_files_recursive(pack_file_for_tar_mock, get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path)
     lab_path = os.path.join("tests", "model", "hiddenfilesrecursive")
     lab = Lab(None, lab_path)
     device = lab.get_or_new_machine("test_machine")
@@ -367,8 +517,10 @@ def test_pack_data_hidden_files_recursive(pack_file_for_tar_mock):
     assert pack_file_for_tar_mock.call_count == 6
 
 
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
 @mock.patch("src.Kathara.utils.pack_file_for_tar")
-def test_pack_data_only_hidden_files(pack_file_for_tar_mock):
+def test_pack_data_only_hidden_files(pack_file_for_tar_mock, get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path)
     lab_path = os.path.join("tests", "model", "hiddenfilesonly")
     lab = Lab(None, lab_path)
     device = lab.get_or_new_machine("test_machine")
@@ -393,3 +545,104 @@ def test_pack_data_only_hidden_files(pack_file_for_tar_mock):
     )
 
     assert pack_file_for_tar_mock.call_count == 3
+
+
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
+def test_pack_data_in_memory(get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path)
+    lab_path = os.path.join("tests", "model", "hiddenfiles")
+    lab = Lab(None, lab_path)
+    device = lab.get_or_new_machine("test_machine")
+
+    tar_data = device.pack_data()
+
+    with tarfile.open(fileobj=io.BytesIO(tar_data), mode="r:gz") as tar:
+        assert sorted(tar.getnames()) == ["hostlab/test_machine/.hidden", "hostlab/test_machine/nothidden"]
+
+
+def test_pack_data_no_files(default_device: Machine):
+    assert default_device.pack_data() is None
+
+
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
+def test_pack_data_cached(get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path / "cache")
+    lab_path = tmp_path / "lab"
+    (lab_path / "pc1" / "etc").mkdir(parents=True)
+    (lab_path / "pc1" / "etc" / "file").write_text("content")
+    (lab_path / "pc1.startup").write_text("ip link set eth0 up")
+    lab = Lab(None, str(lab_path))
+    device = lab.get_or_new_machine("pc1")
+
+    tar_data = device.pack_data()
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+    with mock.patch("src.Kathara.utils.pack_file_for_tar") as pack_file_for_tar_mock:
+        assert device.pack_data() == tar_data
+        assert not pack_file_for_tar_mock.called
+
+    (lab_path / "pc1" / "etc" / "file").write_text("new longer content")
+
+    assert device.pack_data() != tar_data
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
+def test_pack_data_cache_content_changed_same_stat(get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path / "cache")
+    lab_path = tmp_path / "lab"
+    (lab_path / "pc1").mkdir(parents=True)
+    file_path = lab_path / "pc1" / "file"
+    file_path.write_text("content")
+    os.utime(file_path, (1000, 1000))
+    lab = Lab(None, str(lab_path))
+    device = lab.get_or_new_machine("pc1")
+
+    # Not changed in the last seconds, so only the stat of the file is fingerprinted
+    with mock.patch("src.Kathara.model.Machine.time.time", return_value=time.time() + RACY_MTIME_SECONDS):
+        tar_data = device.pack_data()
+
+        # Same size and modification time (e.g., `cp -p`), only the change time differs
+        time.sleep(0.01)
+        file_path.write_text("CONTENT")
+        os.utime(file_path, (1000, 1000))
+
+        assert device.pack_data() != tar_data
+
+
+@mock.patch("src.Kathara.utils.ARCHIVE_CACHE_MAX_SIZE", 1)
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
+def test_pack_data_cache_evicts_least_recently_used(get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path / "cache")
+    lab_path = tmp_path / "lab"
+    for name in ["pc1", "pc2"]:
+        (lab_path / name).mkdir(parents=True)
+        (lab_path / name / "file").write_text("content")
+    lab = Lab(None, str(lab_path))
+
+    lab.get_or_new_machine("pc1").pack_data()
+    lab.get_or_new_machine("pc2").pack_data()
+
+    cached_archives = os.listdir(tmp_path / "cache")
+    assert len(cached_archives) == 1
+    assert cached_archives[0].startswith("%s_pc2-" % lab.hash)
+
+
+@mock.patch("src.Kathara.utils.get_archive_cache_path")
+def test_pack_data_cache_removes_stale_temporary_archives(get_archive_cache_path_mock, tmp_path):
+    get_archive_cache_path_mock.return_value = str(tmp_path / "cache")
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache" / "tmpstale.tmp").write_bytes(b"partial")
+    os.utime(tmp_path / "cache" / "tmpstale.tmp", (1000, 1000))
+    (tmp_path / "cache" / "tmprecent.tmp").write_bytes(b"partial")
+    lab_path = tmp_path / "lab"
+    (lab_path / "pc1").mkdir(parents=True)
+    (lab_path / "pc1" / "file").write_text("content")
+    lab = Lab(None, str(lab_path))
+
+    lab.get_or_new_machine("pc1").pack_data()
+
+    cached_files = sorted(os.listdir(tmp_path / "cache"))
+    assert len(cached_files) == 2
+    assert cached_files[0].startswith("%s_pc1-" % lab.hash)
+    assert cached_files[1] == "tmprecent.tmp"
@@ -1,5 +1,8 @@
-import pytest
+import os
 import sys
+import time
+
+import pytest
 
 sys.path.insert(0, './')
 
@@ -25,3 +28,32 @@ def test_with_comment():
 def test_syntax_error():
     with pytest.raises(SyntaxError):
         DepParser.parse("tests/parser/labdep/syntax_error")
+
+
+def test_parse_graph():
+    dependencies = DepParser.parse_graph("tests/parser/labdep/three_devices_dependencies")
+    assert dependencies == {'pc1': ['pc2', 'pc3'], 'pc3': ['pc2']}
+
+
+def test_devices_loop_reports_loop():
+    with pytest.raises(MachineDependencyError) as e:
+        DepParser.parse("tests/parser/labdep/devices_loop")
+    assert "->" in str(e.value)
+
+
+def test_parse_10k_devices_benchmark(tmp_path):
+    # 100 branches of 100 chained devices, each branch depending on a shared set of routers
+    with open(os.path.join(tmp_path, "lab.dep"), "w") as lab_dep:
+        lab_dep.write("r0: r1 r2 r3\n")
+        for branch in range(100):
+            lab_dep.write("b%d_0: r0 r1 r2 r3\n" % branch)
+            for i in range(1, 100):
+                lab_dep.write("b%d_%d: b%d_%d r0\n" % (branch, i, branch, i - 1))
+
+    start = time.perf_counter()
+    dependencies = DepParser.parse(str(tmp_path))
+    elapsed = time.perf_counter() - start
+
+    assert len(dependencies) == 10004
+    assert dependencies.index("r0") < dependencies.index("b0_0") < dependencies.index("b0_99")
+    assert elapsed < 1
@@ -1,9 +1,12 @@
+import os
 import sys
+import time
 
 import pytest
 
 from src.Kathara.exceptions import MachineCollisionDomainError
 from src.Kathara.parser.netkit.LabParser import LabParser
+from src.Kathara.parser.netkit.ParserCache import ParserCache
 
 sys.path.insert(0, './')
 
@@ -41,7 +44,7 @@ def test_one_device_interface_name_error():
 
 
 def test_one_device_shared_name_error():
-    with pytest.raises(Exception):
+    with pytest.raises(ValueError):
         LabParser.parse("tests/parser/labconf/one_device_shared_error")
 
 
@@ -60,3 +63,75 @@ def test_two_device_one_cd():
     assert lab.machines['pc2']
     assert len(lab.machines['pc2'].interfaces) == 1
     assert lab.machines['pc2'].interfaces[0].name == 'A'
+
+
+def test_one_device_interface_name_syntax_error():
+    with pytest.raises(SyntaxError):
+        LabParser.parse("tests/parser/labconf/one_device_interface_name_error")
+
+
+def test_multiple_syntax_errors():
+    with pytest.raises(SyntaxError) as e:
+        LabParser.parse("tests/parser/labconf/multiple_syntax_errors")
+    errors = str(e.value).split("\n")
+    assert len(errors) == 6
+    assert errors[0].startswith("In lab.conf - Line 2:")
+    assert errors[1].startswith("In lab.conf - Line 4:")
+    assert errors[2].startswith("In lab.conf - Line 5:")
+    assert errors[3] == "In lab.conf - Line 7: Device `pc2` is already connected to collision domain `A`."
+    assert errors[4] == "In lab.conf - Line 8: Port value not valid on `pc1`."
+    assert errors[5] == "Interface `0` missing on device `pc3`."
+
+
+def test_parse_50k_lines_benchmark(tmp_path):
+    with open(os.path.join(tmp_path, "lab.conf"), "w") as lab_conf:
+        lab_conf.write('LAB_DESCRIPTION="Generated topology"\n')
+        for i in range(5000):
+            lab_conf.write("# Device %d\n" % i)
+            for j in range(4):
+                lab_conf.write("pc%d[%d]=\"cd%d\"\n" % (i, j, i + j))
+            lab_conf.write("pc%d[image]=\"kathara/frr\"\n" % i)
+            lab_conf.write("pc%d[mem]=\"150m\"\n" % i)
+            lab_conf.write("pc%d[exec]=\"ip address add 10.0.%d.%d/24 dev eth0\"\n" % (i, i // 250, i % 250 + 1))
+            lab_conf.write("pc%d[port]=\"%d:80/tcp\"\n" % (i, 2000 + i))
+            lab_conf.write("pc%d[env]=\"ID=%d\"\n" % (i, i))
+
+    start = time.perf_counter()
+    lab = LabParser.parse(str(tmp_path))
+    elapsed = time.perf_counter() - start
+
+    assert lab.description == "Generated topology"
+    assert len(lab.machines) == 5000
+    assert len(lab.links) == 5003
+    assert lab.machines['pc4999'].interfaces[3].name == 'cd5002'
+    assert lab.machines['pc4999'].meta['envs']['ID'] == '4999'
+    assert elapsed < 5
+
+
+def test_parse_cached(tmp_path):
+    lab_path = tmp_path / "lab"
+    lab_path.mkdir()
+    (lab_path / "lab.conf").write_text("pc1[0]='A'\n")
+    old_time = time.time() - 60
+    os.utime(lab_path / "lab.conf", (old_time, old_time))
+    os.utime(lab_path, (old_time, old_time))
+
+    lab = LabParser.parse(str(lab_path))
+    cached_lab = LabParser.parse(str(lab_path))
+    assert cached_lab is not lab
+    assert cached_lab.machines['pc1'].interfaces[0].name == 'A'
+    assert cached_lab.machines['pc1'].lab is cached_lab
+    assert cached_lab.links['A'].machines['pc1'] is cached_lab.machines['pc1']
+
+    (lab_path / "lab.conf").write_text("pc1[0]='B'\n")
+    os.utime(lab_path / "lab.conf", (old_time + 1, old_time + 1))
+
+    assert LabParser.parse(str(lab_path)).machines['pc1'].interfaces[0].name == 'B'
+
+
+def test_parse_recently_modified_not_cached(tmp_path):
+    (tmp_path / "lab.conf").write_text("pc1[0]='A'\n")
+
+    LabParser.parse(str(tmp_path))
+
+    assert ParserCache.load(str(tmp_path), 'lab.conf') is None